@@ -9,9 +9,11 @@ from datetime import datetime, timezone
 import logging
 
 from ..core.auth import get_current_user, User
-from ..core.database import get_database
-from sqlalchemy.orm import Session
+from ..core.database import get_async_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..core.encryption import encryption_manager
+from ..core.api_key_cache import api_key_cache
 from ..models.api_key_models import UserApiKey
 
 logger = logging.getLogger(__name__)
@@ -58,7 +60,7 @@ class TestConnectionResponse(BaseModel):
 async def save_api_key(
     request: SaveApiKeyRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Save or update user's API key (encrypted)
@@ -77,10 +79,10 @@ async def save_api_key(
         encrypted_key = encryption_manager.encrypt(api_key)
         
         # Check if key already exists
-        existing_key = db.query(UserApiKey).filter(
+        existing_key = (await db.execute(select(UserApiKey).where(
             UserApiKey.user_id == current_user.user_id,
             UserApiKey.provider == request.provider
-        ).first()
+        ))).scalars().first()
         
         now = datetime.now(timezone.utc).isoformat()
         
@@ -90,9 +92,10 @@ async def save_api_key(
             existing_key.updated_at = now
             existing_key.is_active = True
             existing_key.last_test_status = None  # Reset test status
-            db.commit()
-            db.refresh(existing_key)
+            await db.commit()
+            await db.refresh(existing_key)
             
+            api_key_cache.invalidate(current_user.user_id)
             logger.info(f"✅ Updated API key for user {current_user.username}, provider {request.provider}")
             api_key_record = existing_key
         else:
@@ -106,9 +109,10 @@ async def save_api_key(
                 updated_at=now
             )
             db.add(new_key)
-            db.commit()
-            db.refresh(new_key)
+            await db.commit()
+            await db.refresh(new_key)
             
+            api_key_cache.invalidate(current_user.user_id)
             logger.info(f"✅ Saved new API key for user {current_user.username}, provider {request.provider}")
             api_key_record = new_key
         
@@ -134,7 +138,7 @@ async def save_api_key(
 @router.get("/list", response_model=ApiKeysListResponse)
 async def list_api_keys(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get list of user's configured API keys (masked)
@@ -143,9 +147,9 @@ async def list_api_keys(
     try:
         
         # Get all keys for user
-        keys = db.query(UserApiKey).filter(
+        keys = (await db.execute(select(UserApiKey).where(
             UserApiKey.user_id == current_user.user_id
-        ).all()
+        ))).scalars().all()
         
         api_keys_list = []
         keys_to_delete = []
@@ -187,10 +191,11 @@ async def list_api_keys(
         # Delete corrupted keys
         for key in keys_to_delete:
             logger.info(f"🗑️ Deleting corrupted {key.provider} key for user {current_user.username}")
-            db.delete(key)
+            await db.delete(key)
         
         if keys_to_delete:
-            db.commit()
+            await db.commit()
+            api_key_cache.invalidate(current_user.user_id)
             logger.warning(f"⚠️ Deleted {len(keys_to_delete)} corrupted API keys. User needs to re-enter them.")
         
         logger.info(f"📋 Retrieved {len(api_keys_list)} API keys for user {current_user.username}")
@@ -205,17 +210,21 @@ async def list_api_keys(
 @router.get("/decrypted")
 async def get_decrypted_api_keys(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user's API keys in decrypted form for use in AI requests
     Returns dictionary of {provider: api_key}
     """
     try:
-        keys = db.query(UserApiKey).filter(
+        cached_keys = api_key_cache.get(current_user.user_id)
+        if cached_keys is not None:
+            return cached_keys
+        
+        keys = (await db.execute(select(UserApiKey).where(
             UserApiKey.user_id == current_user.user_id,
             UserApiKey.is_active == True
-        ).all()
+        ))).scalars().all()
         
         decrypted_keys = {}
         
@@ -228,6 +237,7 @@ async def get_decrypted_api_keys(
                 continue
         
         logger.info(f"✅ Loaded {len(decrypted_keys)} API keys for user {current_user.username}: {list(decrypted_keys.keys())}")
+        api_key_cache.put(current_user.user_id, decrypted_keys)
         
         return decrypted_keys
         
@@ -246,7 +256,7 @@ async def get_decrypted_api_keys(
 async def delete_api_key(
     provider: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete user's API key for specified provider
@@ -254,16 +264,17 @@ async def delete_api_key(
     try:
         
         # Find and delete key
-        key = db.query(UserApiKey).filter(
+        key = (await db.execute(select(UserApiKey).where(
             UserApiKey.user_id == current_user.user_id,
             UserApiKey.provider == provider
-        ).first()
+        ))).scalars().first()
         
         if not key:
             raise HTTPException(status_code=404, detail=f"API key not found for provider {provider}")
         
-        db.delete(key)
-        db.commit()
+        await db.delete(key)
+        await db.commit()
+        api_key_cache.invalidate(current_user.user_id)
         
         logger.info(f"🗑️ Deleted API key for user {current_user.username}, provider {provider}")
         
@@ -283,7 +294,7 @@ async def delete_api_key(
 async def test_connection(
     request: TestConnectionRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Test connection to API provider (validates API key)
@@ -292,10 +303,10 @@ async def test_connection(
     try:
         
         # Get user's API key
-        key_record = db.query(UserApiKey).filter(
+        key_record = (await db.execute(select(UserApiKey).where(
             UserApiKey.user_id == current_user.user_id,
             UserApiKey.provider == request.provider
-        ).first()
+        ))).scalars().first()
         
         if not key_record:
             raise HTTPException(status_code=404, detail=f"No API key configured for {request.provider}")
@@ -480,7 +491,7 @@ async def test_connection(
         now = datetime.now(timezone.utc).isoformat()
         key_record.last_test_status = "success" if success else "failed"
         key_record.last_test_at = now
-        db.commit()
+        await db.commit()
         
         logger.info(f"🧪 API key test for {request.provider}: {'success' if success else 'failed'}")
         
@@ -501,17 +512,17 @@ async def test_connection(
 @router.get("/status")
 async def get_keys_status(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_database)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get quick status of which providers are configured
     """
     try:
         
-        keys = db.query(UserApiKey).filter(
+        keys = (await db.execute(select(UserApiKey).where(
             UserApiKey.user_id == current_user.user_id,
             UserApiKey.is_active == True
-        ).all()
+        ))).scalars().all()
         
         status = {
             "anthropic": False,
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta, timezone
@@ -9,6 +10,8 @@ import logging
 
 from ..core.database import get_db_session as get_database
 from ..core.config import settings
+from ..core.auth import security, verify_token
+from ..core.token_cache import token_cache
 from ..models.user_models import User as UserModel
 
 logger = logging.getLogger(__name__)
@@ -52,8 +55,9 @@ class User(BaseModel):
 def create_access_token(data: dict):
     """Create JWT access token"""
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.JWT_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    issued_at = datetime.now(timezone.utc)
+    expire = issued_at + timedelta(minutes=settings.JWT_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": issued_at})  # iat lets token_cache.revoke_user() reject older tokens
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
@@ -188,6 +192,16 @@ async def login_user(
         raise HTTPException(status_code=500, detail="Login failed")
         raise HTTPException(status_code=500, detail="Login failed")
 
+@router.post("/logout")
+async def logout_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Revoke the Bearer token of the request (rejected until it expires)"""
+    if not credentials or not credentials.credentials:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    # Only verified tokens are revoked (invalid, expired or revoked ones get a 401)
+    claims = await verify_token(credentials.credentials, request)
+    token_cache.revoke(credentials.credentials, claims)
+    return {"status": "success", "message": "Logged out"}
+
 @router.get("/me", response_model=User)
 async def get_current_user(
     db = Depends(get_database),
@@ -18,10 +18,11 @@ from ..core.context_manager import context_manager  # Context management
 # improvement_suggestions and auto_routing removed - chat only mode
 from ..core.research_storage import research_storage  # Research storage
 # auto_workflow_orchestrator and progress_tracker removed - direct coding after research
-from ..core.testing_agent import TestingAgent  # NEW: Testing Agent
 # Code review agents removed - chat only mode
 from ..core.documentation_agent import documentation_agent  # NEW: Documentation Agent
 from ..core.edit_agent import edit_agent  # NEW: Edit Agent
+from ..core.post_generation import post_generation_pipeline  # Concurrent post-generation agents
+from ..core.cache_manager import make_key
 from ..core.token_tracker import token_tracker  # NEW: Token tracking
 from ..core.auth import get_current_user, get_optional_user, User  # NEW: Authentication
 from ..core.multi_agent_orchestrator import get_orchestrator, AgentType  # HYBRID: Multi-Agent System
@@ -31,8 +32,10 @@ from ..core.developer_mode import developer_mode_manager  # PHASE 2: Developer M
 from ..models.session_models import Session as SessionModel, Message as MessageModel
 from ..models.api_key_models import UserApiKey
 from ..core.encryption import encryption_manager
+from ..core.api_key_cache import api_key_cache
 from sqlalchemy import desc, func
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from .chat_stream import manager as stream_manager
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -68,7 +71,12 @@ def get_user_api_keys(db, user_id: str) -> Dict[str, str]:
     """
     Get user's API keys from database (decrypted)
     Returns dict with provider -> api_key mapping
+    Served from api_key_cache after the first load
     """
+    cached_keys = api_key_cache.get(user_id)
+    if cached_keys is not None:
+        return cached_keys
+    
     try:
         # Get all active API keys for user
         api_keys = db.query(UserApiKey).filter(
@@ -99,6 +107,7 @@ def get_user_api_keys(db, user_id: str) -> Dict[str, str]:
             logger.warning(f"⚠️ Deleted {len(keys_to_delete)} corrupted API keys")
         
         logger.info(f"🔑 Retrieved {len(decrypted_keys)} API keys for user {user_id}: {list(decrypted_keys.keys())}")
+        api_key_cache.put(user_id, decrypted_keys)
         return decrypted_keys
         
     except Exception as e:
@@ -127,6 +136,7 @@ class ChatRequest(BaseModel):
     auto_agent_selection: bool = True  # Enable intelligent agent selection
     ultra_thinking: Optional[bool] = None  # Auto-set by developer_mode
     multi_agent_mode: bool = False  # HYBRID: Enable Multi-Agent System (default OFF for streaming)
+    async_agents: bool = False  # Return the answer immediately, deliver summary/testing/docs results via WebSocket
     
     @validator('messages')
     def validate_messages(cls, v):
@@ -150,6 +160,7 @@ class ChatResponse(BaseModel):
     token_usage: Optional[Dict[str, Any]] = None  # NEW: Token usage stats
     quick_actions: Optional[Dict[str, Any]] = None  # NEW: Quick action buttons (research/post-code options)
     research_sources: Optional[List[Dict[str, Any]]] = None  # NEW: Research sources from Perplexity
+    pending_agents: Optional[List[str]] = None  # Post-generation stages still running (async_agents)
 
 class ChatSession(BaseModel):
     session_id: str
@@ -159,6 +170,147 @@ class ChatSession(BaseModel):
     message_count: int
     last_message: Optional[str] = None
 
+def _generated_file_names(code_process_result: Dict[str, Any]) -> str:
+    """Comma-separated names of generated files (handles list of strings and list of dicts)"""
+    file_names = []
+    for f in code_process_result.get('files', []):
+        if isinstance(f, dict):
+            file_names.append(f.get('file_path') or f.get('path') or f.get('name') or 'unknown')
+        else:
+            file_names.append(str(f))
+    return ', '.join(file_names) if file_names else 'generated files'
+
+
+async def _generate_auto_summary(
+    ai_manager: AIManager, api_keys: Dict[str, str], messages_dict: List[Dict[str, str]], code_process_result: Dict[str, Any],
+    ai_content: str, user_id: str
+) -> Optional[Dict[str, Any]]:
+    """💡 AUTO-SUMMARY: Brief summary and recommendations after coding (gpt-4o-mini)"""
+    # Detect language from messages
+    language = "de"
+    first_user_msg = next((msg for msg in messages_dict if msg["role"] == "user"), None)
+    if first_user_msg:
+        content_lower = first_user_msg["content"].lower()
+        english_indicators = ["create", "build", "develop", "please", "help me", "i want"]
+        if any(indicator in content_lower for indicator in english_indicators):
+            language = "en"
+    
+    files_str = _generated_file_names(code_process_result)
+    if language == "de":
+        summary_prompt = f"""Analysiere diesen generierten Code und gib eine SEHR KURZE Antwort (maximal 2-3 Sätze):
+
+Code-Dateien: {files_str}
+
+1. Was wurde implementiert? (1 Satz)
+2. Empfohlene nächste Schritte? (1-2 Sätze)
+
+Antworte direkt und prägnant, ohne Einleitung."""
+    else:
+        summary_prompt = f"""Analyze this generated code and provide a VERY BRIEF response (max 2-3 sentences):
+
+Code files: {files_str}
+
+1. What was implemented? (1 sentence)
+2. Recommended next steps? (1-2 sentences)
+
+Answer directly and concisely, without introduction."""
+    
+    # Use cost-effective model for summary (gpt-4o-mini)
+    summary_response = await ai_manager.generate_response(
+        provider="openai",
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": summary_prompt}],
+        stream=False,
+        api_keys=api_keys,
+        cache_scope=user_id,
+        cache_context=make_key(ai_content)  # The prompt only names the files - key on the code itself
+    )
+    
+    auto_summary = summary_response.get("content", "").strip()
+    if not auto_summary:
+        return None
+    logger.info(f"💡 Auto-summary generated: {auto_summary[:100]}...")
+    return {
+        "agent": "Summary",
+        "icon": "💡",
+        "content": auto_summary,
+        "summary": "Zusammenfassung & Empfehlungen"
+    }
+
+
+async def _generate_tests(
+    ai_manager: AIManager, api_keys: Dict[str, str], messages_dict: List[Dict[str, str]], ai_content: str
+) -> Optional[Dict[str, Any]]:
+    """🧪 TESTING AGENT: Generate tests for the generated code"""
+    # Generate test code for generated files
+    test_prompt = f"""Erstelle vollständige automatische Tests für diesen generierten Code:
+
+{ai_content[:3000]}
+
+Erstelle:
+1. Unit Tests für alle Funktionen
+2. Integration Tests
+3. Test-Setup und Konfiguration
+
+Format: Vollständige Test-Dateien mit Code-Blöcken."""
+
+    # 🎯 Hybrid Model Router: Smart test generation
+    from ..core.hybrid_model_router import HybridModelRouter
+    hybrid_router = HybridModelRouter()
+    # Get original user message from messages
+    original_user_prompt = messages_dict[-1]['content'] if messages_dict else ""
+    test_model_config = hybrid_router.get_model_for_testing(
+        test_prompt,
+        context={"type": "test_generation", "original_prompt": original_user_prompt}
+    )
+    
+    test_response = await ai_manager.generate_response(
+        provider=test_model_config["provider"],
+        model=test_model_config["model"],
+        messages=[{"role": "user", "content": test_prompt}],
+        stream=False,
+        api_keys=api_keys
+    )
+    
+    logger.info(
+        f"🧪 Test Generation using {test_model_config['model']} "
+        f"({test_model_config['reason']})"
+    )
+    
+    test_content = test_response.get("content", "")
+    if not test_content:
+        return None
+    return {
+        "agent": "Testing",
+        "icon": "🧪",
+        "content": test_content,
+        "summary": f"Tests generiert ({len(test_content)} Zeichen)"
+    }
+
+
+async def _generate_documentation(
+    ai_manager: AIManager, api_keys: Dict[str, str], code_files: List[Any], ai_content: str, user_id: str
+) -> Optional[Dict[str, Any]]:
+    """📚 DOCUMENTATION AGENT: README for the generated code"""
+    doc_result = await documentation_agent.generate_documentation(
+        code_files=code_files,
+        project_description="Generated code project",
+        ai_manager=ai_manager,
+        api_keys=api_keys,
+        cache_scope=user_id,
+        cache_context=make_key(ai_content)
+    )
+    
+    if not doc_result.get("success"):
+        return None
+    return {
+        "agent": "Documentation",
+        "icon": "📚",
+        "content": documentation_agent.format_documentation_summary(doc_result),
+        "summary": "README erstellt"
+    }
+
+
 @router.post("/", response_model=ChatResponse)
 async def chat_completion(
     request: ChatRequest,
@@ -428,7 +580,8 @@ async def chat_completion(
                                     model="sonar-deep-research",  # Always use deep research
                                     messages=[{"role": "user", "content": research_prompt}],
                                     stream=False,
-                                    api_keys=request.api_keys
+                                    api_keys=request.api_keys,
+                                    cache_scope=current_user.user_id  # Repeated research question -> cached answer
                                 )
                             except Exception as perplexity_error:
                                 # Fallback to Anthropic Claude for research
@@ -439,7 +592,8 @@ async def chat_completion(
                                     model="claude-sonnet-4-5-20250929",
                                     messages=[{"role": "user", "content": research_prompt}],
                                     stream=False,
-                                    api_keys=request.api_keys
+                                    api_keys=request.api_keys,
+                                    cache_scope=current_user.user_id
                                 )
                             
                             research_content = research_response.get("content", "")
@@ -704,57 +858,22 @@ Create production-ready, runnable code with all necessary files."""
             logger.info("🌱 JUNIOR MODE: Using Claude Haiku (no smart routing)")
         
         # Generate response with classic AI manager (with automatic fallback)
-        try:
-            response = await ai_manager.generate_response(
-                provider=request.provider,
-                model=request.model,
-                messages=messages_dict,
-                stream=request.stream,
-                api_keys=request.api_keys,
-                ultra_thinking=request.ultra_thinking
-            )
-        except Exception as e:
-            # 🎯 PHASE 2: Auto-fallback - Sonnet → Opus → GPT-4o
-            logger.error(f"❌ Primary model failed: {str(e)}")
-            
-            if request.provider == "anthropic" and "sonnet" in request.model.lower():
-                # Fallback to Opus 4.1
-                fallback_model = "claude-opus-4-1"
-                logger.info("⚠️ PHASE 2: Falling back from Sonnet to Opus 4.1")
-                try:
-                    response = await ai_manager.generate_response(
-                        provider=request.provider,
-                        model=fallback_model,
-                        messages=messages_dict,
-                        stream=request.stream,
-                        api_keys=request.api_keys,
-                        ultra_thinking=request.ultra_thinking
-                    )
-                except Exception:
-                    # Final fallback to OpenAI GPT-4o
-                    logger.error("❌ Opus also failed, falling back to OpenAI GPT-4o")
-                    response = await ai_manager.generate_response(
-                        provider="openai",
-                        model="gpt-4o",
-                        messages=messages_dict,
-                        stream=request.stream,
-                        api_keys=request.api_keys,
-                        ultra_thinking=False  # GPT doesn't support ultra-thinking
-                    )
-            elif request.provider == "anthropic" and "opus" in request.model.lower():
-                # Opus failed, fallback to OpenAI
-                logger.info("⚠️ PHASE 2: Falling back from Opus to OpenAI GPT-4o")
-                response = await ai_manager.generate_response(
-                    provider="openai",
-                    model="gpt-4o",
-                    messages=messages_dict,
-                    stream=request.stream,
-                    api_keys=request.api_keys,
-                    ultra_thinking=False
-                )
-            else:
-                # Re-raise if not Claude
-                raise
+        # 🎯 PHASE 2: Auto-fallback - Sonnet → Opus → GPT-4o
+        # Degraded providers are skipped, failures fall through immediately and
+        # slow calls are hedged with the next model (see provider_router)
+        candidates = [(request.provider, request.model)]
+        if request.provider == "anthropic" and "sonnet" in request.model.lower():
+            candidates += [("anthropic", "claude-opus-4-1"), ("openai", "gpt-4o")]
+        elif request.provider == "anthropic" and "opus" in request.model.lower():
+            candidates += [("openai", "gpt-4o")]
+        
+        response = await ai_manager.generate_with_fallback(
+            candidates,
+            messages=messages_dict,
+            stream=request.stream,
+            api_keys=request.api_keys,
+            ultra_thinking=request.ultra_thinking
+        )
         
         # Debug: Check response content
         logger.info(f"✅ AI Response received: content_length={len(response.get('content', ''))} chars")
@@ -764,6 +883,8 @@ Create production-ready, runnable code with all necessary files."""
         else:
             logger.error(f"❌ EMPTY CONTENT! Full response: {response}")
         
+        message_id = str(uuid.uuid4())
+        
         # 🚀 EMERGENT-STYLE: Process code blocks and write to files automatically
         ai_content = response.get("content", "")
         
@@ -784,81 +905,8 @@ Create production-ready, runnable code with all necessary files."""
                 flags=re.DOTALL
             )
             
-            # 💡 AUTO-SUMMARY: Generate brief summary and recommendations after coding
-            try:
-                # Detect language from messages
-                language = "de"
-                if messages_dict and len(messages_dict) > 0:
-                    first_user_msg = next((msg for msg in messages_dict if msg["role"] == "user"), None)
-                    if first_user_msg:
-                        content_lower = first_user_msg["content"].lower()
-                        english_indicators = ["create", "build", "develop", "please", "help me", "i want"]
-                        if any(indicator in content_lower for indicator in english_indicators):
-                            language = "en"
-                
-                # Create prompt for summary
-                if language == "de":
-                    # Extract file names (handle both list of strings and list of dicts)
-                    files_list = code_process_result.get('files', [])
-                    file_names = []
-                    for f in files_list:
-                        if isinstance(f, dict):
-                            file_names.append(f.get('path', f.get('name', 'unknown')))
-                        else:
-                            file_names.append(str(f))
-                    files_str = ', '.join(file_names) if file_names else 'generated files'
-                    
-                    summary_prompt = f"""Analysiere diesen generierten Code und gib eine SEHR KURZE Antwort (maximal 2-3 Sätze):
-
-Code-Dateien: {files_str}
-
-1. Was wurde implementiert? (1 Satz)
-2. Empfohlene nächste Schritte? (1-2 Sätze)
-
-Antworte direkt und prägnant, ohne Einleitung."""
-                else:
-                    # Extract file names (handle both list of strings and list of dicts)
-                    files_list = code_process_result.get('files', [])
-                    file_names = []
-                    for f in files_list:
-                        if isinstance(f, dict):
-                            file_names.append(f.get('path', f.get('name', 'unknown')))
-                        else:
-                            file_names.append(str(f))
-                    files_str = ', '.join(file_names) if file_names else 'generated files'
-                    
-                    summary_prompt = f"""Analyze this generated code and provide a VERY BRIEF response (max 2-3 sentences):
-
-Code files: {files_str}
-
-1. What was implemented? (1 sentence)
-2. Recommended next steps? (1-2 sentences)
-
-Answer directly and concisely, without introduction."""
-                
-                # Use cost-effective model for summary (gpt-4o-mini)
-                summary_response = await ai_manager.generate_response(
-                    provider="openai",
-                    model="gpt-4o-mini",
-                    messages=[{"role": "user", "content": summary_prompt}],
-                    stream=False,
-                    api_keys=request.api_keys
-                )
-                
-                auto_summary = summary_response.get("content", "").strip()
-                logger.info(f"💡 Auto-summary generated: {auto_summary[:100]}...")
-                
-                # Add summary after code summary
-                response["content"] = f"{cleaned_content.strip()}\n\n{code_summary}\n\n---\n\n**💡 Zusammenfassung & Empfehlungen:**\n\n{auto_summary}"
-            except Exception as e:
-                logger.error(f"❌ Failed to generate auto-summary: {str(e)}")
-                # Fallback: just use code summary without auto-summary
-                response["content"] = f"{cleaned_content.strip()}\n\n{code_summary}"
-            
-            logger.info(f"🎯 Code processing: {code_process_result['files_written']} files written with enhanced summary")
-            
-            # 🤖 AUTO-AGENTS: Testing, Review & Documentation
-            # NUR aktivieren wenn Code von Claude Sonnet 4-5 generiert wurde
+            # 🤖 POST-GENERATION: Auto-summary, Testing & Documentation (concurrent)
+            # Testing/Documentation NUR aktivieren wenn Code von Claude Sonnet 4-5 generiert wurde
             used_model = response.get("model", "").lower()
             is_sonnet_45 = "sonnet-4" in used_model or "sonnet-5" in used_model
             
@@ -867,88 +915,44 @@ Answer directly and concisely, without introduction."""
             else:
                 logger.info(f"ℹ️ Auto-Agents übersprungen (Code von {response.get('model')}, nicht Sonnet 4-5)")
             
-            agent_results = []
-            
-            # 1. TESTING AGENT (nur bei Sonnet 4-5)
+            stages = [post_generation_pipeline.stage(
+                "summary", lambda: _generate_auto_summary(ai_manager, request.api_keys, messages_dict, code_process_result, ai_content, current_user.user_id)
+            )]
             if is_sonnet_45:
-                try:
-                    testing_agent = TestingAgent()
-                    # Generate test code for generated files
-                    test_prompt = f"""Erstelle vollständige automatische Tests für diesen generierten Code:
-
-{ai_content[:3000]}
-
-Erstelle:
-1. Unit Tests für alle Funktionen
-2. Integration Tests
-3. Test-Setup und Konfiguration
-
-Format: Vollständige Test-Dateien mit Code-Blöcken."""
-
-                    # 🎯 Hybrid Model Router: Smart test generation
-                    from ..core.hybrid_model_router import HybridModelRouter, TaskCategory
-                    hybrid_router = HybridModelRouter()
-                    # Get original user message from messages
-                    original_user_prompt = messages_dict[-1]['content'] if messages_dict else ""
-                    test_model_config = hybrid_router.get_model_for_testing(
-                        test_prompt,
-                        context={"type": "test_generation", "original_prompt": original_user_prompt}
-                    )
-                    
-                    test_response = await ai_manager.generate_response(
-                        provider=test_model_config["provider"],
-                        model=test_model_config["model"],
-                        messages=[{"role": "user", "content": test_prompt}],
-                        stream=False,
-                        api_keys=request.api_keys
-                    )
-                    
-                    logger.info(
-                        f"🧪 Test Generation using {test_model_config['model']} "
-                        f"({test_model_config['reason']})"
-                    )
-                    
-                    test_content = test_response.get("content", "")
-                    if test_content:
-                        agent_results.append({
-                            "agent": "Testing",
-                            "icon": "🧪",
-                            "content": test_content,
-                            "summary": f"Tests generiert ({len(test_content)} Zeichen)"
-                        })
-                        logger.info("✅ Testing Agent abgeschlossen")
-                except Exception as e:
-                    logger.error(f"❌ Testing Agent failed: {e}")
+                stages.append(post_generation_pipeline.stage(
+                    "testing", lambda: _generate_tests(ai_manager, request.api_keys, messages_dict, ai_content)
+                ))
+                # Code Review Agent removed - chat only mode
+                stages.append(post_generation_pipeline.stage(
+                    "documentation", lambda: _generate_documentation(ai_manager, request.api_keys, code_process_result['files'], ai_content, current_user.user_id)
+                ))
             
-            # Code Review Agent removed - chat only mode
+            response["content"] = f"{cleaned_content.strip()}\n\n{code_summary}"
             
-            # 3. DOCUMENTATION AGENT (nur bei Sonnet 4-5)
-            if is_sonnet_45:
-                try:
-                    doc_result = await documentation_agent.generate_documentation(
-                        code_files=code_process_result['files'],
-                        project_description=user_last_message if 'user_last_message' in locals() else "Generated code project",
-                        ai_manager=ai_manager,
-                        api_keys=request.api_keys
-                    )
-                    
-                    if doc_result.get("success"):
-                        doc_summary = documentation_agent.format_documentation_summary(doc_result)
-                        agent_results.append({
-                            "agent": "Documentation",
-                            "icon": "📚",
-                            "content": doc_summary,
-                            "summary": "README erstellt"
-                        })
-                        logger.info("✅ Documentation Agent abgeschlossen")
-                except Exception as e:
-                    logger.error(f"❌ Documentation Agent failed: {e}")
-            
-            # Add all agent results to response
-            if agent_results:
+            if request.async_agents:
+                # Return the answer now - results follow on the session's WebSocket
+                # (and via GET /api/chat/agent-results/{message_id})
+                job = post_generation_pipeline.start(
+                    message_id, session_id, stages,
+                    lambda message: stream_manager.publish(message, session_id),
+                    user_id=current_user.user_id
+                )
+                response["pending_agents"] = job['pending']
+            else:
+                stage_results = await post_generation_pipeline.run_all(stages)
+                
+                auto_summary = stage_results.pop("summary", None)
+                if auto_summary:
+                    # Add summary after code summary
+                    response["content"] += f"\n\n---\n\n**💡 Zusammenfassung & Empfehlungen:**\n\n{auto_summary['content']}"
+                
                 # Return structured agent results instead of appending to content
-                response["agent_results"] = agent_results
-                logger.info(f"✅ Alle {len(agent_results)} Agenten erfolgreich abgeschlossen")
+                agent_results = [result for result in stage_results.values() if result]
+                if agent_results:
+                    response["agent_results"] = agent_results
+                    logger.info(f"✅ Alle {len(agent_results)} Agenten erfolgreich abgeschlossen")
+            
+            logger.info(f"🎯 Code processing: {code_process_result['files_written']} files written with enhanced summary")
             
         # Auto-routing removed - chat only mode
         
@@ -987,7 +991,6 @@ Format: Vollständige Test-Dateien mit Code-Blöcken."""
             response["quick_actions"] = quick_actions
             logger.info("💡 Quick actions added to response")
         
-        message_id = str(uuid.uuid4())
         timestamp = datetime.now(timezone.utc)
         
         # Save to database in background
@@ -1047,7 +1050,9 @@ Format: Vollständige Test-Dateien mit Code-Blöcken."""
             context_stats=final_context_stats,  # NEW: Include context statistics
             token_usage=token_stats,  # NEW: Include token usage stats
             quick_actions=post_code_options,  # NEW: Post-code options
-            research_sources=research_sources if research_sources else None  # NEW: Research sources from Perplexity
+            research_sources=research_sources if research_sources else None,  # NEW: Research sources from Perplexity
+            agent_results=response.get("agent_results"),
+            pending_agents=response.get("pending_agents")
         )
         
     except ValueError as e:
@@ -1066,6 +1071,24 @@ Format: Vollständige Test-Dateien mit Code-Blöcken."""
         logger.critical(f"Unexpected chat error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
 
+@router.get("/agent-results/{message_id}")
+async def get_agent_results(message_id: str, current_user: User = Depends(get_current_user)):
+    """Status and results of post-generation agents started with async_agents"""
+    job = post_generation_pipeline.get_job(message_id)
+    if job is None or job['user_id'] != current_user.user_id:
+        raise HTTPException(status_code=404, detail="No agent results for this message")
+    return job
+
+
+@router.delete("/agent-results/{message_id}")
+async def cancel_agent_results(message_id: str, current_user: User = Depends(get_current_user)):
+    """Cancel post-generation agents that are still running"""
+    job = post_generation_pipeline.get_job(message_id)
+    if job is None or job['user_id'] != current_user.user_id:
+        raise HTTPException(status_code=404, detail="No agent results for this message")
+    return {"message_id": message_id, "cancelled": post_generation_pipeline.cancel(message_id)}
+
+
 @router.get("/hybrid-routing-info")
 async def get_hybrid_routing_info(current_user: User = Depends(get_current_user)):
     """
@@ -1090,7 +1113,8 @@ async def get_ai_providers():
     
     return {
         "providers": ai_manager.get_provider_status(),
-        "models": ai_manager.get_available_models()
+        "models": ai_manager.get_available_models(),
+        "health": ai_manager.router.get_stats()  # Latency, error rates and circuit states
     }
 
 @router.post("/agent-recommendation")
@@ -12,8 +12,14 @@ import asyncio
 import logging
 from datetime import datetime, timezone
 
-from ..core.ai_manager import AIManager
-from ..core.database import get_db_session as get_database
+from ..core.ai_manager import get_ai_manager
+from ..core.database import get_async_db_session
+from sqlalchemy import select
+from ..core.project_context_cache import project_context_cache
+from ..core.message_journal import message_journal
+from ..core.api_key_cache import api_key_cache
+from ..core.stream_delivery import SocketSender, ChunkCoalescer, DEFAULT_QUEUE_SIZE
+from ..core.stream_backplane import StreamBackplane, InMemoryBackplane
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -111,45 +117,45 @@ async def handle_command(
         project_name = args.strip()
         
         # Update session with active project
-        db = get_database()
         try:
             from ..models.session_models import Session
             
-            session = db.query(Session).filter(Session.id == session_id).first()
+            async with get_async_db_session() as db:
+                session = await db.get(Session, session_id)
             
-            if session:
-                # Verify project exists in workspace
-                import os
-                from pathlib import Path
-                home_dir = Path.home()
-                github_imports_dir = home_dir / ".xionimus_ai" / "github_imports"
-                repo_path = github_imports_dir / user_id / project_name
+                if session:
+                    # Verify project exists in workspace
+                    import os
+                    from pathlib import Path
+                    home_dir = Path.home()
+                    github_imports_dir = home_dir / ".xionimus_ai" / "github_imports"
+                    repo_path = github_imports_dir / user_id / project_name
                 
-                if repo_path.exists():
-                    session.active_project = project_name
-                    session.updated_at = datetime.now(timezone.utc)
-                    db.commit()
+                    if repo_path.exists():
+                        session.active_project = project_name
+                        session.updated_at = datetime.now(timezone.utc).isoformat()
+                        await db.commit()
                     
-                    await manager.send_message({
-                        "type": "command_response",
-                        "message": f"✅ Active project set to: **{project_name}**",
-                        "details": f"Repository path: {repo_path}",
-                        "timestamp": datetime.now(timezone.utc).isoformat()
-                    }, session_id)
-                    logger.info(f"✅ Active project set via /activate: {project_name}")
+                        await manager.send_message({
+                            "type": "command_response",
+                            "message": f"✅ Active project set to: **{project_name}**",
+                            "details": f"Repository path: {repo_path}",
+                            "timestamp": datetime.now(timezone.utc).isoformat()
+                        }, session_id)
+                        logger.info(f"✅ Active project set via /activate: {project_name}")
+                    else:
+                        await manager.send_message({
+                            "type": "error",
+                            "message": f"❌ Project '{project_name}' not found",
+                            "details": f"Expected path: {repo_path}\n\nPlease import the repository first.",
+                            "timestamp": datetime.now(timezone.utc).isoformat()
+                        }, session_id)
                 else:
                     await manager.send_message({
                         "type": "error",
-                        "message": f"❌ Project '{project_name}' not found",
-                        "details": f"Expected path: {repo_path}\n\nPlease import the repository first.",
+                        "message": "❌ Session not found",
                         "timestamp": datetime.now(timezone.utc).isoformat()
                     }, session_id)
-            else:
-                await manager.send_message({
-                    "type": "error",
-                    "message": "❌ Session not found",
-                    "timestamp": datetime.now(timezone.utc).isoformat()
-                }, session_id)
         
         except Exception as e:
             logger.error(f"Error handling /activate command: {e}")
@@ -159,8 +165,6 @@ async def handle_command(
                 "details": str(e),
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }, session_id)
-        finally:
-            db.close()
         
         return True
     
@@ -439,22 +443,108 @@ def format_repository_context(repo_structure: dict, project_name: str, framework
     return "\n".join(lines)
 
 
+def build_project_context(repo_path: str, project_name: str) -> tuple:
+    """
+    Scan repository, detect framework and render the AI context text.
+    
+    Blocking - called from a worker thread by the project context cache.
+    
+    Returns:
+        Tuple of (repo_structure, detection_result, combined_context_string)
+    """
+    logger.info(f"📂 Scanning repository structure: {repo_path}")
+    repo_structure = scan_repository_structure(repo_path, max_files=2500)
+    
+    logger.info(f"🎯 Detecting framework...")
+    detection_result, framework_context = detect_and_format_framework(repo_path)
+    
+    combined_context = ""
+    if repo_structure.get("success"):
+        repo_context_text = format_repository_context(
+            repo_structure,
+            project_name,
+            framework_context
+        )
+        # Code Analysis Instructions + Framework + Repository Structure
+        combined_context = CODE_ANALYSIS_INSTRUCTIONS + "\n\n" + framework_context + "\n\n" + repo_context_text
+    
+    return repo_structure, detection_result, combined_context
+
+
 # ============================================================================
 # CONNECTION MANAGER (UNVERÄNDERT)
 # ============================================================================
 
 class ConnectionManager:
-    """Manages WebSocket connections for streaming"""
+    """
+    Manages WebSocket connections for streaming
     
-    def __init__(self):
+    Every socket has its own bounded send queue and writer task, so messages
+    fan out to all sockets of a session concurrently and a slow client is
+    dropped instead of stalling the producer. Messages are also published on
+    the backplane so sockets of the same session on other workers get them.
+    """
+    
+    def __init__(self, max_queue: int = DEFAULT_QUEUE_SIZE, backplane: StreamBackplane = None):
         self.active_connections: Dict[str, Set[WebSocket]] = {}
+        self._senders: Dict[WebSocket, SocketSender] = {}
+        self._sessions: Dict[WebSocket, str] = {}
+        self.max_queue = max_queue
+        self.dropped_slow_consumers = 0
+        self.backplane: StreamBackplane = backplane or InMemoryBackplane()
+        self._background: Set[asyncio.Task] = set()
+    
+    async def start_backplane(self, backplane: StreamBackplane = None):
+        """Start (or replace) the backplane; falls back to in-memory if it fails"""
+        if backplane is not None:
+            try:
+                await backplane.start(self._deliver_remote)
+            except Exception as e:
+                logger.warning(f"⚠️ Stream backplane {backplane.name} unavailable ({e}) - using in-memory")
+                backplane = InMemoryBackplane()
+                await backplane.start(self._deliver_remote)
+            self.backplane = backplane
+        else:
+            await self.backplane.start(self._deliver_remote)
+        for session_id in self.active_connections:
+            await self.backplane.subscribe(session_id)
+        logger.info(f"✅ Stream backplane: {self.backplane.name}")
+    
+    async def stop_backplane(self):
+        """Stop the backplane (application shutdown)"""
+        await self.backplane.stop()
+    
+    def _run_background(self, coro):
+        """Fire-and-forget helper that keeps a reference to the task"""
+        try:
+            task = asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:
+            coro.close()  # Event loop already shut down
+            return
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+    
+    def _presence_changed(self):
+        self._run_background(self.backplane.report_presence(
+            len(self.active_connections),
+            sum(len(conns) for conns in self.active_connections.values())
+        ))
     
     async def connect(self, websocket: WebSocket, session_id: str):
         """Accept and store WebSocket connection"""
         await websocket.accept()
-        if session_id not in self.active_connections:
+        first_local_socket = session_id not in self.active_connections
+        if first_local_socket:
             self.active_connections[session_id] = set()
         self.active_connections[session_id].add(websocket)
+        
+        sender = SocketSender(websocket, self._on_sender_dropped, max_queue=self.max_queue)
+        sender.start()
+        self._senders[websocket] = sender
+        self._sessions[websocket] = session_id
+        if first_local_socket:
+            await self.backplane.subscribe(session_id)
+        self._presence_changed()
         logger.info(f"✅ WebSocket connected: {session_id}")
     
     def disconnect(self, websocket: WebSocket, session_id: str):
@@ -463,22 +553,95 @@ class ConnectionManager:
             self.active_connections[session_id].discard(websocket)
             if not self.active_connections[session_id]:
                 del self.active_connections[session_id]
+                self._run_background(self.backplane.unsubscribe(session_id))
+        sender = self._senders.pop(websocket, None)
+        if sender:
+            sender.stop()
+        if self._sessions.pop(websocket, None) is not None:
+            self._presence_changed()
         logger.info(f"❌ WebSocket disconnected: {session_id}")
     
+    def _on_sender_dropped(self, sender: SocketSender, reason: str):
+        """Writer failed or queue overflowed - drop the socket without blocking the producer"""
+        session_id = self._sessions.get(sender.websocket)
+        logger.warning(f"⚠️ Dropping WebSocket for {session_id}: {reason}")
+        if "queue full" in reason:
+            self.dropped_slow_consumers += 1
+            # 1013 = Try Again Later; close in the background
+            asyncio.create_task(self._close_quietly(sender.websocket, 1013, "Client too slow"))
+        if session_id is not None:
+            self.disconnect(sender.websocket, session_id)
+    
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, code: int, reason: str):
+        try:
+            await websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+    
+    def publish(self, message: dict, session_id: str) -> int:
+        """
+        Enqueue message for all connections in a session (on every worker)
+        without awaiting sends
+        
+        Returns:
+            Number of local sockets the message was queued for
+        """
+        self.backplane.publish(session_id, message)
+        return self._deliver_local(message, session_id)
+    
+    def _deliver_remote(self, session_id: str, message: dict):
+        """Backplane callback: message published by another worker"""
+        self._deliver_local(message, session_id)
+    
+    def _deliver_local(self, message: dict, session_id: str) -> int:
+        delivered = 0
+        for connection in list(self.active_connections.get(session_id, ())):
+            sender = self._senders.get(connection)
+            if sender and sender.offer(message):
+                delivered += 1
+        return delivered
+    
     async def send_message(self, message: dict, session_id: str):
         """Send message to all connections in a session"""
-        if session_id in self.active_connections:
-            disconnected = set()
-            for connection in self.active_connections[session_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending message: {e}")
-                    disconnected.add(connection)
-            
-            # Clean up disconnected sockets
-            for conn in disconnected:
-                self.disconnect(conn, session_id)
+        self.publish(message, session_id)
+    
+    async def send_to(self, websocket: WebSocket, message: dict):
+        """Send message to a single connection (keeps ordering with queued messages)"""
+        sender = self._senders.get(websocket)
+        if sender:
+            sender.offer(message)
+    
+    def has_listeners(self, session_id: str) -> bool:
+        """True if any socket of the session is connected on this or another worker"""
+        return session_id in self.active_connections or self.backplane.remote_listeners(session_id) > 0
+    
+    def chunk_stream(self, session_id: str) -> ChunkCoalescer:
+        """Create a coalescer that publishes chunk frames to this session"""
+        return ChunkCoalescer(lambda frame: self.publish(frame, session_id))
+    
+    async def drain(self, session_id: str, timeout: float = 5.0):
+        """Wait until queued messages for a session have been sent"""
+        senders = [
+            self._senders[conn]
+            for conn in self.active_connections.get(session_id, ())
+            if conn in self._senders
+        ]
+        if senders:
+            await asyncio.gather(*(sender.drain(timeout) for sender in senders))
+    
+    @property
+    def connection_count(self) -> int:
+        """Open WebSocket connections on this worker"""
+        return len(self._senders)
+    
+    def get_stats(self) -> dict:
+        """Get delivery statistics"""
+        return {
+            "connections": self.connection_count,
+            "queued_messages": sum(sender.queue.qsize() for sender in self._senders.values()),
+            "dropped_slow_consumers": self.dropped_slow_consumers
+        }
 
 
 # Global connection manager
@@ -541,7 +704,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
             
             if message_data.get("type") == "ping":
                 # Heartbeat
-                await websocket.send_json({"type": "pong"})
+                await manager.send_to(websocket, {"type": "pong"})
                 continue
             
             if message_data.get("type") != "chat":
@@ -564,7 +727,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
             user_id = None
             project_context = None
             
-            db = get_database()
+            db = get_async_db_session()
             try:
                 from ..models.session_models import Session
                 from ..models.user_models import User
@@ -572,7 +735,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
                 import os
                 
                 # STEP 1: Try to get user_id from session
-                session_obj = db.query(Session).filter(Session.id == session_id).first()
+                session_obj = await db.get(Session, session_id)
                 
                 if session_obj and session_obj.user_id:
                     user_id = session_obj.user_id
@@ -587,26 +750,18 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
                         # Check if directory exists
                         if os.path.exists(repo_path):
                             # ===================================================================
-                            # 🆕 ENHANCED: SCAN REPOSITORY + DETECT FRAMEWORK
+                            # 🆕 ENHANCED: SCAN REPOSITORY + DETECT FRAMEWORK (cached per tree state)
                             # ===================================================================
-                            logger.info(f"📂 Scanning repository structure: {repo_path}")
-                            repo_structure = scan_repository_structure(repo_path, max_files=2500)
-                            
-                            # 🆕 Detect Framework
-                            logger.info(f"🎯 Detecting framework...")
-                            detection_result, framework_context = detect_and_format_framework(repo_path)
+                            cached_context = await project_context_cache.get_or_build(
+                                user_id,
+                                session_obj.active_project,
+                                repo_path,
+                                build_project_context
+                            )
+                            repo_structure = cached_context.repo_structure
+                            detection_result = cached_context.detection_result
                             
                             if repo_structure.get("success"):
-                                # Format repository structure + framework info for System Message
-                                repo_context_text = format_repository_context(
-                                    repo_structure, 
-                                    session_obj.active_project,
-                                    framework_context  # 🆕 Include framework context
-                                )
-                                
-                                # 🆕 Add Code Analysis Instructions + Framework + Repository Structure
-                                combined_context = CODE_ANALYSIS_INSTRUCTIONS + "\n\n" + framework_context + "\n\n" + repo_context_text
-                                
                                 project_context = {
                                     "project_name": session_obj.active_project,
                                     "branch": session_obj.active_project_branch or "main",
@@ -615,14 +770,13 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
                                     "framework_confidence": detection_result.get('confidence'),  # 🆕 Confidence
                                     "framework_evidence": detection_result.get('evidence', []),  # 🆕 Evidence
                                     "repository_structure": repo_structure,  # Raw structure data
-                                    "repository_context": combined_context   # 🆕 COMBINED context with Framework + Structure
+                                    "repository_context": cached_context.context_text   # 🆕 COMBINED context with Framework + Structure
                                 }
                                 
                                 logger.info(f"✅ Active project from session: {session_obj.active_project}")
                                 logger.info(f"✅ Framework: {detection_result.get('framework', 'unknown')}")
                                 logger.info(f"✅ Repository path: {repo_path}")
                                 logger.info(f"✅ Repository contains {repo_structure['summary']['total_files']} files in {repo_structure['summary']['total_directories']} directories")
-                                logger.info(f"✅ Framework detection + structure scan complete!")
                             else:
                                 # Fallback if scan fails
                                 project_context = {
@@ -641,7 +795,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
                 # STEP 2: If no user_id, use first available user (demo mode)
                 if not user_id:
                     logger.warning(f"⚠️ No user_id in session, using first available user (demo mode)")
-                    first_user = db.query(User).first()
+                    first_user = (await db.execute(select(User).limit(1))).scalars().first()
                     
                     if first_user:
                         user_id = first_user.id
@@ -649,37 +803,43 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
                 
                 # STEP 3: Now load API keys for this user_id if missing from frontend
                 if user_id and not api_keys.get(provider):
-                    logger.warning(f"⚠️ API key for {provider} not sent from frontend - loading from database")
-                    try:
-                        from ..models.api_key_models import UserApiKey
-                        from ..core.encryption import encryption_manager
-                        
-                        # Load all stored API keys for this user
-                        user_api_keys = db.query(UserApiKey).filter(
-                            UserApiKey.user_id == user_id,
-                            UserApiKey.is_active == True
-                        ).all()
-                        
-                        # Decrypt and add to api_keys dict
-                        loaded_count = 0
-                        for key_record in user_api_keys:
-                            try:
-                                decrypted_key = encryption_manager.decrypt(key_record.encrypted_key)
-                                api_keys[key_record.provider] = decrypted_key
-                                loaded_count += 1
-                                logger.info(f"✅ Loaded {key_record.provider} API key from database")
-                            except Exception as decrypt_error:
-                                logger.error(f"❌ Failed to decrypt {key_record.provider} key: {decrypt_error}")
+                    # Decrypted keys are cached per user - no query/decrypt per message
+                    stored_keys = api_key_cache.get(user_id)
+                    if stored_keys is None:
+                        logger.warning(f"⚠️ API key for {provider} not sent from frontend - loading from database")
+                        try:
+                            from ..models.api_key_models import UserApiKey
+                            from ..core.encryption import encryption_manager
+                            
+                            # Load all stored API keys for this user
+                            user_api_keys = (await db.execute(
+                                select(UserApiKey).where(
+                                    UserApiKey.user_id == user_id,
+                                    UserApiKey.is_active == True
+                                )
+                            )).scalars().all()
+                            
+                            # Decrypt once, then serve from the cache
+                            stored_keys = {}
+                            for key_record in user_api_keys:
+                                try:
+                                    stored_keys[key_record.provider] = encryption_manager.decrypt(key_record.encrypted_key)
+                                    logger.info(f"✅ Loaded {key_record.provider} API key from database")
+                                except Exception as decrypt_error:
+                                    logger.error(f"❌ Failed to decrypt {key_record.provider} key: {decrypt_error}")
+                            api_key_cache.put(user_id, stored_keys)
                         
-                        if loaded_count > 0:
-                            logger.info(f"✅ Successfully loaded {loaded_count} API key(s) from database for user {user_id}")
-                        else:
-                            logger.warning(f"⚠️ No API keys found in database for user {user_id}")
+                        except Exception as e:
+                            logger.error(f"❌ Failed to load API keys: {e}")
+                            import traceback
+                            traceback.print_exc()
+                            stored_keys = {}
                     
-                    except Exception as e:
-                        logger.error(f"❌ Failed to load API keys: {e}")
-                        import traceback
-                        traceback.print_exc()
+                    api_keys.update(stored_keys)
+                    if stored_keys:
+                        logger.info(f"✅ Using {len(stored_keys)} stored API key(s) for user {user_id}")
+                    else:
+                        logger.warning(f"⚠️ No API keys found in database for user {user_id}")
                 
                 # FINAL: Logging
                 if project_context:
@@ -695,7 +855,7 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
                 import traceback
                 traceback.print_exc()
             finally:
-                db.close()
+                await db.close()
             
             # ============================================================================
             # 🆕 CHECK FOR SLASH COMMANDS FIRST
@@ -727,35 +887,57 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
             }, session_id)
             
             try:
-                # Initialize AI Manager
-                ai_manager = AIManager()
+                # Shared AI Manager (provider clients are pooled per API key)
+                ai_manager = get_ai_manager()
                 
                 # Stream AI response
                 full_response = ""
                 chunk_count = 0
+                citations = None
+                stream_metrics = None
                 
                 # Pass api_keys and project_context to stream_response
-                async for chunk in ai_manager.stream_response(
+                chunks = manager.chunk_stream(session_id)
+                response_stream = ai_manager.stream_response(
                     provider=provider,
                     model=model,
                     messages=conversation_history,
                     ultra_thinking=ultra_thinking,
                     api_keys=api_keys,
                     project_context=project_context
-                ):
-                    chunk_count += 1
-                    chunk_text = chunk.get("content", "")
-                    full_response += chunk_text
-                    
-                    # Send chunk to client
-                    await manager.send_message({
-                        "type": "chunk",
-                        "content": chunk_text,
-                        "chunk_id": chunk_count
-                    }, session_id)
-                    
-                    # Small delay to prevent overwhelming client
-                    await asyncio.sleep(0.01)
+                )
+                try:
+                    async for chunk in response_stream:
+                        chunk_type = chunk.get("type")
+                        
+                        if chunk_type == "citations":
+                            chunks.flush()
+                            citations = {
+                                "citations": chunk.get("citations", []),
+                                "search_results": chunk.get("search_results", [])
+                            }
+                            await manager.send_message({"type": "citations", **citations}, session_id)
+                            continue
+                        
+                        if chunk_type == "metrics":
+                            stream_metrics = chunk.get("metrics")
+                            continue
+                        
+                        chunk_count += 1
+                        chunk_text = chunk.get("content", "")
+                        full_response += chunk_text
+                        
+                        # Coalesced into frames (size/time window), queued per socket
+                        chunks.add(chunk_text)
+                        
+                        # Every socket of this session is gone - stop generating
+                        if not manager.has_listeners(session_id):
+                            logger.info(f"🛑 All clients disconnected, cancelling stream for {session_id}")
+                            break
+                finally:
+                    chunks.flush()
+                    # Closes the upstream provider request if we stopped early
+                    await response_stream.aclose()
                 
                 # Send completion message
                 # Get token usage stats
@@ -768,61 +950,21 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
                     "model": model,
                     "provider": provider,
                     "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "token_usage": token_stats  # NEW: Include token usage
+                    "token_usage": token_stats,  # NEW: Include token usage
+                    "citations": citations,
+                    "stream_metrics": stream_metrics
                 }, session_id)
                 
-                # Save to SQLite
-                db = get_database()
-                
+                # Write-behind: the journal batches inserts, the socket loop continues immediately
                 try:
-                    from ..models.session_models import Message, Session
-                    import uuid
-                    
-                    # Check if session exists, create if not
-                    session = db.query(Session).filter(Session.id == session_id).first()
-                    if not session:
-                        # Create session if it doesn't exist
-                        new_session = Session(
-                            id=session_id,
-                            name="Chat Session",
-                            user_id=None  # Will be set later if authenticated
-                        )
-                        db.add(new_session)
-                        db.commit()
-                    
-                    # Save user message
-                    user_msg = Message(
-                        id=f"msg_{uuid.uuid4().hex[:16]}",
-                        session_id=session_id,
-                        role="user",
-                        content=user_message,
-                        provider=provider,
-                        model=model
-                    )
-                    db.add(user_msg)
-                    
-                    # Save assistant message
-                    assistant_msg = Message(
-                        id=f"msg_{uuid.uuid4().hex[:16]}",
-                        session_id=session_id,
-                        role="assistant",
-                        content=full_response,
-                        provider=provider,
-                        model=model
-                    )
-                    db.add(assistant_msg)
-                    
-                    db.commit()
-                    logger.info(f"✅ Messages saved to database")
-                    
+                    await message_journal.submit(session_id, [
+                        {"role": "user", "content": user_message, "provider": provider, "model": model},
+                        {"role": "assistant", "content": full_response, "provider": provider, "model": model}
+                    ])
                 except Exception as e:
-                    logger.error(f"❌ Error saving messages to database: {e}")
-                    db.rollback()
-                finally:
-                    if "db" in locals() and db is not None:
-                        db.close()
+                    logger.error(f"❌ Error queueing messages for persistence: {e}")
                 
-                logger.info(f"✅ Streaming complete: {chunk_count} chunks, {len(full_response)} chars")
+                logger.info(f"✅ Streaming complete: {chunk_count} chunks in {chunks.frames} frames, {len(full_response)} chars")
                 
             except ValueError as e:
                 # Handle configuration errors (missing API keys)
@@ -859,9 +1001,13 @@ async def websocket_chat_endpoint(websocket: WebSocket, session_id: str):
 
 @router.get("/stream/status")
 async def get_stream_status():
-    """Get streaming service status"""
+    """Get streaming service status (local worker + cluster-wide via backplane)"""
     return {
         "status": "active",
+        "worker_id": manager.backplane.worker_id,
         "active_sessions": len(manager.active_connections),
-        "total_connections": sum(len(conns) for conns in manager.active_connections.values())
+        "total_connections": sum(len(conns) for conns in manager.active_connections.values()),
+        **manager.get_stats(),
+        **(await manager.backplane.cluster_status()),
+        "message_journal": message_journal.get_stats()
     }
@@ -22,6 +22,7 @@ from ..core.github_integration import (
 from ..core.auth import get_current_user_optional, User
 
 from ..core.config import settings
+from ..core.project_context_cache import project_context_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -795,6 +796,7 @@ async def import_repository(
                     file_types[ext] = file_types.get(ext, 0) + 1
             
             logger.info(f"✅ Successfully imported {owner}/{repo_name} ({total_files} files)")
+            project_context_cache.invalidate_path(target_dir)
             
             # Auto-activate project if session_id provided
             project_activated = False
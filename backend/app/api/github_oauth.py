@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session as DBSession
 from ..core.database import get_db_session as get_database
 from ..core.auth import get_current_user, User
 from ..models.api_key_models import UserApiKey
+from ..core.api_key_cache import api_key_cache
 from ..core.encryption import encryption_manager
 from ..core.config import settings
 
@@ -247,6 +248,7 @@ async def github_oauth_callback(
             logger.info(f"Created new GitHub token for user {current_user.username}")
         
         db.commit()
+        api_key_cache.invalidate(current_user.user_id)
         
         logger.info(f"✅ GitHub OAuth successful for user {current_user.username} (GitHub: {github_user.get('login')})")
         
@@ -286,6 +288,7 @@ async def github_oauth_disconnect(
         
         db.delete(token_record)
         db.commit()
+        api_key_cache.invalidate(current_user.user_id)
         
         logger.info(f"✅ Disconnected GitHub for user {current_user.username}")
         
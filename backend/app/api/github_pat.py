@@ -31,9 +31,11 @@ from ..core.auth import get_current_user, User
 from ..models.user_models import User as UserModel
 from ..models.session_models import Session, Message
 from ..models.api_key_models import UserApiKey
+from ..core.api_key_cache import api_key_cache
 from ..core.encryption import encryption_manager
 from ..core.config import settings
 from ..core.github_pat_storage import get_github_pat, is_github_pat_configured
+from ..core.project_context_cache import project_context_cache
 from sqlalchemy.exc import SQLAlchemyError
 from jose import jwt
 
@@ -348,6 +350,7 @@ async def github_oauth_callback(
                 logger.info(f"✅ Stored new GitHub OAuth token for user: {current_user.username}")
             
             db.commit()
+            api_key_cache.invalidate(current_user.user_id)
             
             return GitHubOAuthStatusResponse(
                 connected=True,
@@ -423,6 +426,7 @@ async def get_github_oauth_user_status(
                 if api_key_record:
                     api_key_record.is_active = False
                     db.commit()
+                    api_key_cache.invalidate(current_user.user_id)
                 
                 return GitHubOAuthStatusResponse(
                     connected=False,
@@ -1597,6 +1601,7 @@ async def import_from_github(
             
             logger.info(f"✅ Imported {files_imported} files from {request.repo_full_name} (skipped {files_skipped} files)")
             logger.info(f"📁 Files saved to: {workspace_dir}")
+            project_context_cache.invalidate_path(workspace_dir)
             
             # ===================================================================
             # 🆕 AUTO-SET ACTIVE PROJECT AFTER SUCCESSFUL IMPORT
@@ -1770,6 +1775,7 @@ async def import_from_url(
             
             logger.info(f"✅ Imported {files_imported} files from {repo_full_name} (skipped {files_skipped} files)")
             logger.info(f"📁 Files saved to: {workspace_dir}")
+            project_context_cache.invalidate_path(workspace_dir)
             
             # ===================================================================
             # 🆕 AUTO-SET ACTIVE PROJECT AFTER SUCCESSFUL IMPORT
@@ -2036,6 +2042,7 @@ async def import_with_progress(
                                 files_skipped += 1
                     
                     logger.info(f"📊 Import statistics: {files_imported} files imported, {files_skipped} files skipped")
+                    project_context_cache.invalidate_path(workspace_dir)
                     
                     # ===================================================================
                     # 🆕 AUTO-SET ACTIVE PROJECT AFTER SUCCESSFUL IMPORT
@@ -23,7 +23,12 @@ router = APIRouter(prefix="/multi-agents", tags=["multi-agents"])
 
 
 def get_user_api_keys(db, user_id: str) -> Dict[str, str]:
-    """Get user's API keys from database (decrypted)"""
+    """Get user's API keys from database (decrypted, cached per user)"""
+    from ..core.api_key_cache import api_key_cache
+    cached_keys = api_key_cache.get(user_id)
+    if cached_keys is not None:
+        return cached_keys
+    
     try:
         from ..core.encryption import encryption_manager
         api_keys = db.query(UserApiKey).filter(
@@ -34,11 +39,12 @@ def get_user_api_keys(db, user_id: str) -> Dict[str, str]:
         keys_dict = {}
         for key_obj in api_keys:
             try:
-                decrypted = encryption_manager.decrypt(key_obj.api_key)
+                decrypted = encryption_manager.decrypt(key_obj.encrypted_key)
                 keys_dict[key_obj.provider] = decrypted
             except Exception as e:
                 logger.error(f"Failed to decrypt {key_obj.provider} key: {e}")
         
+        api_key_cache.put(user_id, keys_dict)
         return keys_dict
     except Exception as e:
         logger.error(f"Error loading API keys from DB: {e}")
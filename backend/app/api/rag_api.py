@@ -5,6 +5,7 @@ RAG (Retrieval-Augmented Generation) API endpoints
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import asyncio
 import logging
 
 from ..core.rag_system import RAGSystem
@@ -40,7 +41,7 @@ class ContextRequest(BaseModel):
 @router.get("/stats")
 async def get_rag_stats():
     """Get RAG system statistics"""
-    return rag_system.get_stats()
+    return await asyncio.to_thread(rag_system.get_stats)
 
 @router.post("/message/add")
 async def add_message(request: AddMessageRequest):
@@ -56,7 +57,7 @@ async def add_message(request: AddMessageRequest):
         return {
             "status": "success",
             "doc_id": doc_id,
-            "message": "Message added to RAG system"
+            "message": "Message queued for indexing"
         }
     except Exception as e:
         logger.error(f"Error adding message to RAG: {e}")
@@ -75,7 +76,7 @@ async def add_document(request: AddDocumentRequest):
         return {
             "status": "success",
             "doc_id": doc_id,
-            "message": "Document added to RAG system"
+            "message": "Document queued for indexing"
         }
     except Exception as e:
         logger.error(f"Error adding document to RAG: {e}")
@@ -85,7 +86,7 @@ async def add_document(request: AddDocumentRequest):
 async def search_messages(request: SearchRequest):
     """Search for relevant chat messages"""
     try:
-        results = rag_system.search_relevant_messages(
+        results = await rag_system.asearch_relevant_messages(
             query=request.query,
             session_id=request.session_id,
             limit=request.limit
@@ -105,7 +106,7 @@ async def search_messages(request: SearchRequest):
 async def search_documents(request: SearchRequest):
     """Search for relevant documents"""
     try:
-        results = rag_system.search_documents(
+        results = await rag_system.asearch_documents(
             query=request.query,
             limit=request.limit
         )
@@ -124,7 +125,7 @@ async def search_documents(request: SearchRequest):
 async def get_context(request: ContextRequest):
     """Get relevant context for a query"""
     try:
-        context = rag_system.get_context_for_query(
+        context = await rag_system.aget_context_for_query(
             query=request.query,
             session_id=request.session_id,
             include_documents=request.include_documents,
@@ -145,7 +146,7 @@ async def get_context(request: ContextRequest):
 async def clear_session(session_id: str):
     """Clear RAG history for a session"""
     try:
-        count = rag_system.clear_session_history(session_id)
+        count = await asyncio.to_thread(rag_system.clear_session_history, session_id)
         
         return {
             "status": "success",
@@ -160,7 +161,7 @@ async def clear_session(session_id: str):
 async def reset_rag():
     """Reset RAG system (delete all data) - USE WITH CAUTION"""
     try:
-        rag_system.reset()
+        await asyncio.to_thread(rag_system.reset)
         
         return {
             "status": "success",
@@ -29,7 +29,7 @@ class RateLimitInfo(BaseModel):
 @router.get("/quota", response_model=QuotaStatus)
 async def get_user_quota(current_user: User = Depends(get_current_user)):
     """Get current user's quota status"""
-    quota_status = rate_limiter.get_quota_status(current_user.user_id, current_user.role)
+    quota_status = await rate_limiter.get_quota_status(current_user.user_id, current_user.role)
     
     return QuotaStatus(
         requests=quota_status["requests"],
@@ -59,30 +59,18 @@ async def get_rate_limits():
 @router.get("/stats")
 async def get_rate_limit_stats(admin_user: User = Depends(get_current_admin_user)):
     """Get rate limiting statistics (admin only)"""
-    
-    # Count active users and buckets
-    active_users = len([uid for uid in rate_limiter.user_quotas.keys() if rate_limiter.user_quotas[uid]["requests"] > 0])
-    active_buckets = sum(len(buckets) for buckets in rate_limiter.user_buckets.values())
-    
-    # Top users by request count
-    top_users = []
-    for user_id, quota in rate_limiter.user_quotas.items():
-        if quota["requests"] > 0:
-            top_users.append({
-                "user_id": user_id,
-                "requests": quota["requests"],
-                "ai_calls": quota["ai_calls"]
-            })
-    
-    top_users.sort(key=lambda x: x["requests"], reverse=True)
+    stats = rate_limiter.get_stats()
+    local = stats.get("fallback", stats)
     
     return {
         "summary": {
-            "active_users": active_users,
-            "active_buckets": active_buckets,
-            "total_quotas_tracked": len(rate_limiter.user_quotas)
+            "backend": stats["backend"],
+            "active_users": local["quotas"],
+            "active_buckets": local["buckets"],
+            "total_quotas_tracked": local["quotas"]
         },
-        "top_users": top_users[:10],
+        "backend": stats,
+        "top_users": local["top_users"],
         "quotas_by_role": rate_limiter.USER_QUOTAS
     }
 
@@ -93,28 +81,14 @@ async def reset_user_rate_limits(
 ):
     """Reset rate limits for a specific user (admin only)"""
     
-    # Clear user quotas
-    if user_id in rate_limiter.user_quotas:
-        old_quotas = rate_limiter.user_quotas[user_id].copy()
-        rate_limiter.user_quotas[user_id] = {"requests": 0, "ai_calls": 0}
-        
-        # Clear user buckets
-        user_key = f"user:{user_id}"
-        if user_key in rate_limiter.user_buckets:
-            bucket_count = len(rate_limiter.user_buckets[user_key])
-            del rate_limiter.user_buckets[user_key]
-        else:
-            bucket_count = 0
-        
-        # Reset quota timer
-        if user_id in rate_limiter.quota_reset_time:
-            del rate_limiter.quota_reset_time[user_id]
-        
+    # Clear user quota and buckets
+    cleared = await rate_limiter.reset_user(user_id)
+    if cleared["found"]:
         return {
             "success": True,
             "user_id": user_id,
-            "cleared_quotas": old_quotas,
-            "cleared_buckets": bucket_count,
+            "cleared_quotas": cleared["cleared_quotas"],
+            "cleared_buckets": cleared["cleared_buckets"],
             "reset_by": admin_user.username
         }
     
@@ -131,18 +105,26 @@ async def rate_limiter_health():
         # Test basic functionality
         from datetime import datetime
         test_time = datetime.now()
+        backend_stats = rate_limiter.get_stats()
+        local = backend_stats.get("fallback", backend_stats)
         
         stats = {
             "status": "healthy",
             "timestamp": test_time.isoformat(),
-            "active_users": len(rate_limiter.user_quotas),
-            "active_buckets": sum(len(buckets) for buckets in rate_limiter.user_buckets.values()),
+            "backend": backend_stats["backend"],
+            "active_users": local["quotas"],
+            "active_buckets": local["buckets"],
             "memory_usage": {
-                "user_quotas_count": len(rate_limiter.user_quotas),
-                "user_buckets_count": len(rate_limiter.user_buckets),
-                "quota_timers_count": len(rate_limiter.quota_reset_time)
+                "user_quotas_count": local["quotas"],
+                "user_buckets_count": local["buckets"],
+                "quota_timers_count": local["quotas"],
+                "max_keys": local["max_keys"],
+                "expired_buckets": local["expired"],
+                "evicted_keys": local["evicted"]
             }
         }
+        if "redis_available" in backend_stats:
+            stats["redis_available"] = backend_stats["redis_available"]
         
         return stats
         
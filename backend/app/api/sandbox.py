@@ -3,14 +3,17 @@ Sandbox API - Secure Code Execution
 Provides endpoints for running code in isolated environment
 """
 import sys
+import json
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
+from sse_starlette.sse import EventSourceResponse
 from typing import Optional, List, Dict, Any
 import logging
 
 IS_WINDOWS = sys.platform == 'win32'
 
 from ..core.sandbox_executor import sandbox_executor
+from ..core.sandbox_engine import sandbox_engine, SandboxQueueFull
 from ..core.auth import get_current_user, User
 from ..core.rate_limiter import rate_limiter
 
@@ -34,6 +37,7 @@ class CodeExecutionResponse(BaseModel):
     language: str
     execution_id: Optional[str] = None
     timeout_occurred: Optional[bool] = False
+    queue_time: Optional[float] = None
     error: Optional[str] = None
 
 
@@ -56,14 +60,16 @@ async def execute_code(
     - Isolated file system
     
     Rate limit: 10 executions per minute per user
+    Concurrency: queued per user, 429 when the user's queue is full
     """
     try:
         logger.info(f"📋 Code execution request from user: {current_user.username}")
         logger.info(f"   Language: {request.language}")
         logger.info(f"   Code length: {len(request.code)} chars")
         
-        # Execute code
-        result = sandbox_executor.execute_code(
+        # Execute code (waits for a free sandbox slot)
+        result = await sandbox_engine.execute(
+            user_id=current_user.user_id,
             code=request.code,
             language=request.language,
             timeout=request.timeout,
@@ -76,11 +82,48 @@ async def execute_code(
         
         return CodeExecutionResponse(**result)
         
+    except SandboxQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Sandbox API error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/execute/stream")
+async def execute_code_stream(
+    request: CodeExecutionRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Execute code and stream its output as Server-Sent Events
+    
+    Events: queued, started, stdout, stderr, then complete (same payload
+    as /execute) or error. Disconnecting cancels the execution.
+    """
+    events = sandbox_engine.stream(
+        user_id=current_user.user_id,
+        code=request.code,
+        language=request.language,
+        timeout=request.timeout,
+        stdin_input=request.stdin
+    )
+    try:
+        # Submit before the response starts so a full queue is a plain 429
+        first_event = await events.__anext__()
+    except SandboxQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    async def event_generator():
+        try:
+            yield {"event": first_event["event"], "data": json.dumps(first_event)}
+            async for event in events:
+                yield {"event": event["event"], "data": json.dumps(event)}
+        finally:
+            await events.aclose()
+    
+    return EventSourceResponse(event_generator())
+
+
 @router.get("/languages", response_model=SupportedLanguagesResponse)
 async def get_supported_languages(
     current_user: User = Depends(get_current_user)
@@ -101,5 +144,8 @@ async def sandbox_health():
         "status": "healthy",
         "service": "sandbox",
         "executor": "subprocess",
-        "supported_languages": len(sandbox_executor.LANGUAGE_CONFIGS)
+        "supported_languages": len(sandbox_executor.LANGUAGE_CONFIGS),
+        "engine": sandbox_engine.get_stats(),
+        "compile_cache": sandbox_executor.compile_cache.get_stats(),
+        "interpreter_pool": sandbox_executor.interpreter_pool.get_stats() if sandbox_executor.interpreter_pool else None
     }
\ No newline at end of file
@@ -9,7 +9,10 @@ from datetime import datetime, timezone
 import uuid
 import logging
 
-from ..core.database import get_db_session as get_database
+from sqlalchemy import func, select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import get_db_session as get_database, get_async_db
 from ..core.auth import get_current_user_optional, User
 
 logger = logging.getLogger(__name__)
@@ -75,11 +78,11 @@ class MessageResponse(BaseModel):
 @router.post("/", response_model=SessionResponse)
 async def create_session(
     request: CreateSessionRequest,
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new chat session (user-specific if authenticated)"""
     try:
-        db = get_database()
         session_id = f"session_{uuid.uuid4().hex[:16]}"
         
         # Import models
@@ -95,8 +98,7 @@ async def create_session(
         )
         
         db.add(new_session)
-        db.commit()
-        db.refresh(new_session)
+        await db.commit()
         
         logger.info(f"✅ Session created: {session_id} for user: {user_id or 'anonymous'}")
         
@@ -114,16 +116,14 @@ async def create_session(
     except Exception as e:
         logger.error(f"Create session error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if "db" in locals() and db is not None:
-            db.close()
 
 
 @router.get("/list", response_model=List[SessionResponse])
 async def list_sessions(
     workspace_id: Optional[str] = None, 
     limit: int = 100,
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List sessions for authenticated user only
     
@@ -131,12 +131,9 @@ async def list_sessions(
     """
     try:
         from ..models.session_models import Session, Message
-        from sqlalchemy import func
-        
-        db = get_database()
         
         # Query sessions with user filter
-        query = db.query(
+        query = select(
             Session.id,
             Session.name,
             Session.workspace_id,
@@ -151,7 +148,7 @@ async def list_sessions(
         user_id = current_user.user_id if current_user else None
         if user_id:
             # Show sessions that belong to user OR have no user_id (legacy migration)
-            query = query.filter((Session.user_id == user_id) | (Session.user_id == None))
+            query = query.where((Session.user_id == user_id) | (Session.user_id == None))
             logger.info(f"✅ Authenticated session list: user_id={user_id}")
         else:
             # If no user_id, return empty to enforce authentication
@@ -160,9 +157,10 @@ async def list_sessions(
         
         # Optional workspace filter
         if workspace_id:
-            query = query.filter(Session.workspace_id == workspace_id)
+            query = query.where(Session.workspace_id == workspace_id)
         
-        sessions = query.group_by(Session.id).order_by(Session.updated_at.desc()).limit(limit).all()
+        query = query.group_by(Session.id).order_by(Session.updated_at.desc()).limit(limit)
+        sessions = (await db.execute(query)).all()
         
         return [SessionResponse(
             id=s.id,
@@ -178,35 +176,34 @@ async def list_sessions(
     except Exception as e:
         logger.error(f"List sessions error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if "db" in locals() and db is not None:
-            db.close()
 
 
 @router.get("/{session_id}", response_model=SessionResponse)
-async def get_session(session_id: str, current_user: Optional[User] = Depends(get_current_user_optional)):
+async def get_session(
+    session_id: str,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get a specific session (user must own it)"""
     try:
         from ..models.session_models import Session, Message
-        from sqlalchemy import func
-        
-        db = get_database()
         
         # Query session with message count
-        result = db.query(
-            Session.id,
-            Session.name,
-            Session.workspace_id,
-            Session.active_project,
-            Session.active_project_branch,
-            Session.created_at,
-            Session.updated_at,
-            Session.user_id,
-            func.count(Message.id).label('message_count')
-        ).outerjoin(Message, Session.id == Message.session_id)\
-         .filter(Session.id == session_id)\
-         .group_by(Session.id)\
-         .first()
+        result = (await db.execute(
+            select(
+                Session.id,
+                Session.name,
+                Session.workspace_id,
+                Session.active_project,
+                Session.active_project_branch,
+                Session.created_at,
+                Session.updated_at,
+                Session.user_id,
+                func.count(Message.id).label('message_count')
+            ).outerjoin(Message, Session.id == Message.session_id)
+             .where(Session.id == session_id)
+             .group_by(Session.id)
+        )).first()
         
         if not result:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -232,9 +229,6 @@ async def get_session(session_id: str, current_user: Optional[User] = Depends(ge
     except Exception as e:
         logger.error(f"Get session error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if "db" in locals() and db is not None:
-            db.close()
 
 
 @router.patch("/sessions/{session_id}", response_model=SessionResponse)
@@ -271,15 +265,15 @@ async def update_session(session_id: str, request: UpdateSessionRequest):
 async def set_active_project(
     session_id: str,
     request: SetActiveProjectRequest,
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Set active project for a session (for AI context awareness)"""
     try:
-        db = get_database()
-        from ..models.session_models import Session
+        from ..models.session_models import Session, Message
         
         # Get session
-        session = db.query(Session).filter(Session.id == session_id).first()
+        session = await db.get(Session, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
@@ -288,14 +282,14 @@ async def set_active_project(
         session.active_project_branch = request.branch
         session.updated_at = datetime.now(timezone.utc).isoformat()
         
-        db.commit()
-        db.refresh(session)
+        await db.commit()
         
         logger.info(f"✅ Active project set for session {session_id}: {request.project_name} (branch: {request.branch})")
         
         # Count messages
-        from ..models.session_models import Message
-        message_count = db.query(Message).filter(Message.session_id == session_id).count()
+        message_count = await db.scalar(
+            select(func.count(Message.id)).where(Message.session_id == session_id)
+        )
         
         return SessionResponse(
             id=session.id,
@@ -305,7 +299,7 @@ async def set_active_project(
             active_project_branch=session.active_project_branch,
             created_at=session.created_at,
             updated_at=session.updated_at,
-            message_count=message_count
+            message_count=message_count or 0
         )
         
     except HTTPException:
@@ -313,36 +307,31 @@ async def set_active_project(
     except Exception as e:
         logger.error(f"Set active project error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
 
 
 @router.delete("/{session_id}")
 async def delete_session(
     session_id: str,
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a session and all its messages
     
     Optional authentication: If authenticated, validates ownership
     """
     try:
-        db = get_database()
-        
         # Import models
         from ..models.session_models import Session as SessionModel, Message
         
         # Check if session exists
-        session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+        session = await db.get(SessionModel, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        # Delete all messages first
-        db.query(Message).filter(Message.session_id == session_id).delete()
-        
-        # Delete session
-        db.delete(session)
-        db.commit()
+        # Delete all messages first, then the session (bulk deletes - no relationship lazy-loads)
+        await db.execute(delete(Message).where(Message.session_id == session_id))
+        await db.execute(delete(SessionModel).where(SessionModel.id == session_id))
+        await db.commit()
         
         return {"status": "deleted", "session_id": session_id}
         
@@ -350,24 +339,22 @@ async def delete_session(
         raise
     except Exception as e:
         logger.error(f"Delete session error: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # ==================== MESSAGE ENDPOINTS ====================
 
 @router.post("/messages", response_model=MessageResponse)
-async def add_message(request: AddMessageRequest):
+async def add_message(request: AddMessageRequest, db: AsyncSession = Depends(get_async_db)):
     """Add a message to a session"""
     try:
-        db = get_database()
-        
         # Import models
         from ..models.session_models import Session, Message
         import json
         
         # Check if session exists
-        session = db.query(Session).filter(Session.id == request.session_id).first()
+        session = await db.get(Session, request.session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
@@ -386,8 +373,7 @@ async def add_message(request: AddMessageRequest):
         )
         
         db.add(new_message)
-        db.commit()
-        db.refresh(new_message)
+        await db.commit()
         
         return MessageResponse(
             id=new_message.id,
@@ -402,35 +388,35 @@ async def add_message(request: AddMessageRequest):
         )
         
     except HTTPException:
-        db.close()
         raise
     except Exception as e:
-        db.close()
         logger.error(f"Add message error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{session_id}/messages", response_model=List[MessageResponse])
-async def get_session_messages(session_id: str, limit: Optional[int] = None):
+async def get_session_messages(
+    session_id: str,
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get all messages for a session"""
     try:
-        db = get_database()
-        
         # Import models
         from ..models.session_models import Session, Message
         import json
         
         # Check if session exists
-        session = db.query(Session).filter(Session.id == session_id).first()
+        session = await db.get(Session, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
         # Get messages for this session
-        query = db.query(Message).filter(Message.session_id == session_id)
+        query = select(Message).where(Message.session_id == session_id).order_by(Message.timestamp)
         if limit:
             query = query.limit(limit)
         
-        messages = query.order_by(Message.timestamp).all()
+        messages = (await db.execute(query)).scalars().all()
         
         return [MessageResponse(
             id=msg.id,
@@ -449,9 +435,6 @@ async def get_session_messages(session_id: str, limit: Optional[int] = None):
     except Exception as e:
         logger.error(f"Get messages error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if "db" in locals() and db is not None:
-            db.close()
 
 
 @router.patch("/messages/{message_id}", response_model=MessageResponse)
@@ -7,6 +7,8 @@ from typing import Dict, Any
 import logging
 
 from ..core.token_tracker import token_tracker
+from ..core.tokenizers import tokenizer_registry
+from ..core.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -22,9 +24,14 @@ async def get_token_stats() -> Dict[str, Any]:
     - Limits and percentages
     - Fork/summary recommendations
     - All-time usage
+    - Loaded tokenizers and their load times
+    - AI response cache hits and savings
     """
     try:
         stats = token_tracker.get_usage_stats()
+        stats['tokenizers'] = tokenizer_registry.get_stats()
+        cache_stats = response_cache.get_stats()
+        stats['response_cache'].update({key: cache_stats[key] for key in ('enabled', 'semantic', 'entries', 'bytes')})
         return stats
     except Exception as e:
         logger.error(f"Failed to get token stats: {e}")
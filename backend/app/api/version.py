@@ -59,7 +59,7 @@ async def get_version_stats(request: Request):
     versioning_middleware = None
     for middleware in request.app.user_middleware:
         if hasattr(middleware, 'cls'):
-            if middleware.cls.__name__ == "APIVersioningMiddleware":
+            if middleware.cls.__name__ == "RequestPipelineMiddleware":
                 versioning_middleware = middleware
                 break
     
@@ -7,6 +7,7 @@ import aiofiles
 import logging
 
 from ..core.config import settings
+from ..core.project_context_cache import project_context_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -110,6 +111,7 @@ async def save_file_content(
         
         async with aiofiles.open(full_path, 'w', encoding='utf-8') as f:
             await f.write(content["content"])
+        project_context_cache.invalidate_path(full_path)
         
         return {
             "status": "saved",
@@ -137,6 +139,7 @@ async def delete_workspace_file(file_path: str):
             full_path.rmdir()
         else:
             full_path.unlink()
+        project_context_cache.invalidate_path(full_path)
         
         return {"status": "deleted", "path": file_path}
         
@@ -154,6 +157,7 @@ async def create_directory(
         full_path = validate_path(dir_path)
         
         full_path.mkdir(parents=True, exist_ok=True)
+        project_context_cache.invalidate_path(full_path)
         
         return {
             "status": "created",
@@ -1,10 +1,17 @@
-from typing import Dict, Any, Optional, List, AsyncGenerator
+from typing import Dict, Any, Optional, List, AsyncGenerator, AsyncIterator
+import asyncio
 import logging
+import time
 from openai import AsyncOpenAI
 import anthropic
 import httpx
 import json
 from .config import settings
+from .instrumentation import record_ai_call
+from .provider_pool import provider_pool
+from .provider_router import provider_router, Candidate
+from .response_cache import response_cache
+from .tokenizers import tokenizer_registry
 
 # Retry logic for AI API calls
 from tenacity import (
@@ -20,8 +27,9 @@ logger = logging.getLogger(__name__)
 class AIProvider:
     """Base class for AI providers"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key
+        self.http_client = http_client  # Shared, pooled HTTP client (see provider_pool)
         self.client = None
     
     async def generate_response(
@@ -33,10 +41,10 @@ class AIProvider:
         raise NotImplementedError
 
 class OpenAIProvider(AIProvider):
-    def __init__(self, api_key: str):
-        super().__init__(api_key)
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
+        super().__init__(api_key, http_client)
         if api_key:
-            self.client = AsyncOpenAI(api_key=api_key)
+            self.client = AsyncOpenAI(api_key=api_key, http_client=http_client)
     
     @retry(
         stop=stop_after_attempt(3),
@@ -163,10 +171,10 @@ class OpenAIProvider(AIProvider):
             raise ValueError(f"OpenAI API error: {error_msg}")
 
 class AnthropicProvider(AIProvider):
-    def __init__(self, api_key: str):
-        super().__init__(api_key)
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
+        super().__init__(api_key, http_client)
         if api_key:
-            self.client = anthropic.AsyncAnthropic(api_key=api_key)
+            self.client = anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client)
     
     @retry(
         stop=stop_after_attempt(3),
@@ -278,12 +286,13 @@ class AnthropicProvider(AIProvider):
             raise ValueError(f"Anthropic API error: {error_msg}")
 
 class PerplexityProvider(AIProvider):
-    def __init__(self, api_key: str):
-        super().__init__(api_key)
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
+        super().__init__(api_key, http_client)
+        # Auth is sent per request so the pooled client can be shared across keys
+        self.headers = {"Authorization": f"Bearer {api_key}"}
         if api_key:
-            self.client = httpx.AsyncClient(
+            self.client = http_client or httpx.AsyncClient(
                 base_url="https://api.perplexity.ai",
-                headers={"Authorization": f"Bearer {api_key}"},
                 timeout=900.0  # Increased timeout for deep research queries (15 minutes = 900 seconds)
             )
     
@@ -335,7 +344,8 @@ class PerplexityProvider(AIProvider):
             
             response = await self.client.post(
                 "/chat/completions",
-                json=payload
+                json=payload,
+                headers=self.headers
             )
             
             logger.info(f"🔍 Perplexity response status: {response.status_code}")
@@ -393,15 +403,62 @@ class PerplexityProvider(AIProvider):
                 error_msg = "Invalid API key provided"
             raise ValueError(f"Perplexity API error: {error_msg}")
 
+async def iter_sse_data(lines: AsyncIterator[str]) -> AsyncGenerator[str, None]:
+    """
+    Parse a Server-Sent Events line stream and yield each event's data payload
+    
+    Multi-line `data:` fields are joined with newlines; comments and other
+    fields (event, id, retry) are ignored.
+    """
+    data_lines: List[str] = []
+    async for line in lines:
+        if line == "":
+            # Blank line terminates the event
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+def build_stream_metrics(
+    started_at: float,
+    first_token_at: Optional[float],
+    finished_at: float,
+    completion_tokens: int
+) -> Dict[str, Any]:
+    """Time-to-first-token and throughput for a finished stream"""
+    generation_seconds = finished_at - first_token_at if first_token_at else 0.0
+    return {
+        "ttft_ms": round((first_token_at - started_at) * 1000, 1) if first_token_at else None,
+        "total_ms": round((finished_at - started_at) * 1000, 1),
+        "completion_tokens": completion_tokens,
+        "tokens_per_second": round(completion_tokens / generation_seconds, 1) if generation_seconds > 0 else None
+    }
+
+
 class AIManager:
     """Classic AI Manager - Only traditional API keys, no third-party integration"""
     
+    PROVIDER_CLASSES = {
+        "openai": OpenAIProvider,
+        "anthropic": AnthropicProvider,
+        "perplexity": PerplexityProvider
+    }
+    
     def __init__(self):
         self.providers = {
-            "openai": OpenAIProvider(settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None,
-            "anthropic": AnthropicProvider(settings.ANTHROPIC_API_KEY) if settings.ANTHROPIC_API_KEY else None,
-            "perplexity": PerplexityProvider(settings.PERPLEXITY_API_KEY) if settings.PERPLEXITY_API_KEY else None
+            "openai": self._create_dynamic_provider("openai", settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None,
+            "anthropic": self._create_dynamic_provider("anthropic", settings.ANTHROPIC_API_KEY) if settings.ANTHROPIC_API_KEY else None,
+            "perplexity": self._create_dynamic_provider("perplexity", settings.PERPLEXITY_API_KEY) if settings.PERPLEXITY_API_KEY else None
         }
+        self.router = provider_router
     
     async def generate_response(
         self,
@@ -410,37 +467,88 @@ class AIManager:
         messages: List[Dict[str, str]],
         stream: bool = False,
         api_keys: Optional[Dict[str, str]] = None,
-        ultra_thinking: bool = False
+        ultra_thinking: bool = False,
+        cache_scope: Optional[str] = None,
+        cache_ttl: Optional[float] = None,
+        cache_context: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Generate AI response using specified provider - Classic APIs only"""
+        """
+        Generate AI response using specified provider - Classic APIs only
+        
+        Args:
+            cache_scope: Opt in to the response cache for deterministic calls;
+                responses are only shared within the scope (e.g. the user id)
+            cache_ttl: TTL of a cached response (default: AI_RESPONSE_CACHE_TTL)
+            cache_context: Part of the cache key for inputs the prompt only refers
+                to (e.g. a hash of the generated code the prompt names by file)
+        """
+        if cache_scope and not stream:
+            params = {"ultra_thinking": ultra_thinking}
+            if cache_context:
+                params["context"] = cache_context
+            return await response_cache.get_or_generate(
+                cache_scope, provider, model, messages, params,
+                lambda: self.generate_response(provider, model, messages, api_keys=api_keys, ultra_thinking=ultra_thinking),
+                ttl_seconds=cache_ttl
+            )
         
         # Use dynamic API keys if provided
         if api_keys and api_keys.get(provider):
-            dynamic_provider = self._create_dynamic_provider(provider, api_keys[provider])
+            ai_provider = self._create_dynamic_provider(provider, api_keys[provider])
+        else:
+            # Use configured providers
+            if provider not in self.providers or self.providers[provider] is None:
+                raise ValueError(f"Provider {provider} not configured - Please configure API key")
+            ai_provider = self.providers[provider]
+        
+        # Latency and outcome feed the provider router (hedge delays, circuit breakers)
+        started_at = time.perf_counter()
+        try:
             # Pass ultra_thinking only to Anthropic provider
             if provider == "anthropic":
-                return await dynamic_provider.generate_response(messages, model, stream, extended_thinking=ultra_thinking)
-            return await dynamic_provider.generate_response(messages, model, stream)
-        
-        # Use configured providers
-        if provider not in self.providers or self.providers[provider] is None:
-            raise ValueError(f"Provider {provider} not configured - Please configure API key")
+                response = await ai_provider.generate_response(messages, model, stream, extended_thinking=ultra_thinking)
+            else:
+                response = await ai_provider.generate_response(messages, model, stream)
+        except Exception as e:
+            duration = time.perf_counter() - started_at
+            self.router.record(provider, model, duration, e)
+            record_ai_call(provider, model, "error", duration)
+            raise
+        if not stream:
+            duration = time.perf_counter() - started_at
+            self.router.record(provider, model, duration)
+            record_ai_call(provider, model, "success", duration, response.get("usage"))
+        return response
+    
+    async def generate_with_fallback(
+        self,
+        candidates: List[Candidate],
+        messages: List[Dict[str, str]],
+        stream: bool = False,
+        api_keys: Optional[Dict[str, str]] = None,
+        ultra_thinking: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Generate AI response along a fallback chain of (provider, model) candidates
         
-        # Pass ultra_thinking only to Anthropic provider
-        if provider == "anthropic":
-            return await self.providers[provider].generate_response(messages, model, stream, extended_thinking=ultra_thinking)
-        return await self.providers[provider].generate_response(messages, model, stream)
+        Degraded providers (open circuit) are skipped, a failure moves on to the
+        next candidate immediately, and a call slower than its model's p95 latency
+        is hedged with the next candidate (not for streams).
+        """
+        return await self.router.route(
+            candidates,
+            lambda provider, model: self.generate_response(
+                provider, model, messages, stream=stream, api_keys=api_keys, ultra_thinking=ultra_thinking
+            ),
+            hedge=not stream
+        )
     
     def _create_dynamic_provider(self, provider: str, api_key: str):
-        """Create provider instance with dynamic API key"""
-        if provider == "openai":
-            return OpenAIProvider(api_key)
-        elif provider == "anthropic":
-            return AnthropicProvider(api_key)
-        elif provider == "perplexity":
-            return PerplexityProvider(api_key)
-        else:
+        """Get pooled provider instance for a dynamic API key (reuses connections)"""
+        provider_class = self.PROVIDER_CLASSES.get(provider)
+        if provider_class is None:
             raise ValueError(f"Unknown provider: {provider}")
+        return provider_pool.acquire(provider, api_key, provider_class)
     
     def get_provider_status(self) -> Dict[str, bool]:
         """Get status of all AI providers"""
@@ -489,8 +597,51 @@ class AIManager:
             project_context: Optional dict with project info (project_name, branch, working_directory)
         
         Yields:
-            Dict with 'content' key containing text chunk
+            Dict with 'content' key containing text chunk. Providers may also yield
+            trailing events with a 'type' key ('citations', 'metrics') and empty content.
+            Closing the generator early (e.g. client disconnected) cancels the upstream request.
         """
+        # TTFT, latency and (approximate) tokens are exported per provider/model
+        started_at = time.perf_counter()
+        first_token_at = None
+        completion_parts: List[str] = []
+        reported_tokens = None
+        status = "error"
+        chunks = self._stream_provider(provider, model, messages, ultra_thinking, api_keys, project_context)
+        try:
+            async for chunk in chunks:
+                if chunk.get("type") == "metrics":
+                    reported_tokens = chunk["metrics"].get("completion_tokens")
+                elif chunk.get("content") and not chunk.get("type"):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    completion_parts.append(chunk["content"])
+                yield chunk
+            status = "success"
+        except (GeneratorExit, asyncio.CancelledError):
+            status = "cancelled"
+            raise
+        finally:
+            await chunks.aclose()
+            prompt_tokens = sum(tokenizer_registry.count_many(
+                [msg["content"] for msg in messages if isinstance(msg.get("content"), str)], model
+            ))
+            completion_tokens = reported_tokens or tokenizer_registry.count("".join(completion_parts), model)
+            record_ai_call(
+                provider, model, status, time.perf_counter() - started_at,
+                {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens},
+                ttft=first_token_at - started_at if first_token_at else None
+            )
+    
+    async def _stream_provider(
+        self,
+        provider: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        ultra_thinking: bool,
+        api_keys: Optional[Dict[str, str]],
+        project_context: Optional[Dict[str, Any]]
+    ) -> AsyncGenerator[Dict[str, Any], None]:
         # CRITICAL: Inject project context into system message
         if project_context and project_context.get("project_name"):
             # 🆕 CHECK: Use enhanced repository_context if available
@@ -682,36 +833,86 @@ class AIManager:
             if not provider_instance.client:
                 raise ValueError("Perplexity API key not configured")
             
+            started_at = time.perf_counter()
+            first_token_at = None
+            chunk_count = 0
+            usage = None
+            citations: List[Any] = []
+            search_results: List[Any] = []
+            
             try:
-                response = await provider_instance.client.post(
+                # client.stream() yields lines as they arrive instead of buffering the body
+                async with provider_instance.client.stream(
+                    "POST",
                     "/chat/completions",
                     json={
                         "model": model,
                         "messages": messages,
                         "stream": True,
                         "temperature": 0.7
-                    }
-                )
-                
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
+                    },
+                    headers=provider_instance.headers
+                ) as response:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", errors="replace")
+                        raise ValueError(f"Perplexity API error (status {response.status_code}): {body[:200]}")
+                    
+                    async for data in iter_sse_data(response.aiter_lines()):
                         if data == "[DONE]":
                             break
                         try:
                             chunk = json.loads(data)
-                            if chunk["choices"][0]["delta"].get("content"):
-                                yield {"content": chunk["choices"][0]["delta"]["content"]}
-                        except (json.JSONDecodeError, KeyError, IndexError):
+                        except json.JSONDecodeError:
                             continue
-            
+                        
+                        # Citations, search results and usage are repeated per chunk - keep the latest
+                        citations = chunk.get("citations") or citations
+                        search_results = chunk.get("search_results") or search_results
+                        usage = chunk.get("usage") or usage
+                        
+                        choices = chunk.get("choices") or []
+                        content = choices[0].get("delta", {}).get("content") if choices else None
+                        if content:
+                            if first_token_at is None:
+                                first_token_at = time.perf_counter()
+                            chunk_count += 1
+                            yield {"content": content}
+            
+            except httpx.ReadTimeout:
+                logger.error("Perplexity streaming timeout: no data for 900 seconds")
+                raise ValueError("Perplexity API timeout: The research query is taking longer than expected (15 min limit). Please try again or use a simpler query.")
             except Exception as e:
                 logger.error(f"Perplexity streaming error: {e}")
                 raise
+            
+            # Trailing events: sources first, then stream metrics
+            if citations or search_results:
+                yield {
+                    "type": "citations",
+                    "content": "",
+                    "citations": citations,
+                    "search_results": search_results
+                }
+            
+            completion_tokens = (usage or {}).get("completion_tokens") or chunk_count
+            metrics = build_stream_metrics(started_at, first_token_at, time.perf_counter(), completion_tokens)
+            logger.info(f"⏱️ Perplexity stream: TTFT {metrics['ttft_ms']}ms, {metrics['tokens_per_second']} tokens/s")
+            yield {"type": "metrics", "content": "", "metrics": metrics}
         
         else:
             raise ValueError(f"Unknown provider: {provider}")
 
+_ai_manager: Optional[AIManager] = None
+
+
+def get_ai_manager() -> AIManager:
+    """Get shared AIManager instance"""
+    global _ai_manager
+    if _ai_manager is None:
+        _ai_manager = AIManager()
+    return _ai_manager
+
+
 async def test_ai_services():
     """Test AI service availability - Classic APIs only"""
     ai_manager = AIManager()
@@ -0,0 +1,129 @@
+"""
+API Key Cache - Decrypted provider keys per user, in memory only
+
+The chat hot path needs a user's provider keys on every message. Loading
+them means a UserApiKey query plus a Fernet decrypt per key, so decrypted
+keys are cached per user with a TTL and a bound on the number of users.
+
+Keys are held as bytearrays and overwritten with zeros when an entry is
+evicted, expires or is invalidated. Callers receive `str` copies (Python
+strings are immutable), so zeroing limits how long the cache itself keeps
+secrets around, not the lifetime of copies handed out.
+
+The app/api/api_keys.py endpoints (and the GitHub token endpoints) call
+`invalidate(user_id)` whenever a user's keys change.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_USERS = 1000
+
+
+class _Entry:
+    __slots__ = ("keys", "expires_at")
+
+    def __init__(self, keys: Dict[str, bytearray], expires_at: float):
+        self.keys = keys
+        self.expires_at = expires_at
+
+    def wipe(self):
+        for buffer in self.keys.values():
+            buffer[:] = b"\x00" * len(buffer)
+        self.keys.clear()
+
+
+class ApiKeyCache:
+    """TTL- and size-bounded LRU of decrypted API keys per user"""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_users: int = DEFAULT_MAX_USERS):
+        """
+        Args:
+            ttl_seconds: How long decrypted keys stay cached
+            max_users: Maximum number of users kept (least recently used evicted)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()  # sync chat endpoints run in the threadpool
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+    def get(self, user_id: str) -> Optional[Dict[str, str]]:
+        """
+        Get a user's decrypted keys
+
+        Returns:
+            {provider: api_key}, or None if not cached / expired
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(user_id)
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.stats['hits'] += 1
+            return {provider: buffer.decode("utf-8") for provider, buffer in entry.keys.items()}
+
+    def put(self, user_id: str, keys: Dict[str, str]):
+        """Cache a user's decrypted keys (an empty dict caches 'no keys stored')"""
+        entry = _Entry(
+            {provider: bytearray(key.encode("utf-8")) for provider, key in keys.items() if key},
+            time.monotonic() + self.ttl_seconds
+        )
+        with self._lock:
+            self._remove(user_id)
+            self._entries[user_id] = entry
+            while len(self._entries) > self.max_users:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, user_id: str):
+        """Drop a user's cached keys (call after create/update/delete)"""
+        with self._lock:
+            if self._remove(user_id):
+                self.stats['invalidations'] += 1
+                logger.debug(f"🔑 API key cache invalidated for user {user_id}")
+
+    def clear(self):
+        """Drop all cached keys"""
+        with self._lock:
+            for user_id in list(self._entries):
+                self._remove(user_id)
+
+    def _remove(self, user_id: str) -> bool:
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return False
+        entry.wipe()
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics (never includes key material)"""
+        total = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'users': len(self._entries),
+            'max_users': self.max_users,
+            'ttl_seconds': self.ttl_seconds,
+            'hit_rate': round(self.stats['hits'] / total * 100, 2) if total else 0.0
+        }
+
+
+# Global API key cache
+api_key_cache = ApiKeyCache()
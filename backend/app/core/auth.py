@@ -2,15 +2,15 @@
 Authentication and Authorization Core Module
 Provides JWT token validation and user dependency injection
 """
-from fastapi import HTTPException, Depends, status
+from fastapi import HTTPException, Depends, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+import jwt
 from typing import Optional
 import logging
-from datetime import datetime, timezone
 
 from .config import settings
 from .database import get_database
+from .token_cache import RevokedTokenError, request_claims
 from ..models.user_models import User as UserModel
 
 logger = logging.getLogger(__name__)
@@ -33,30 +33,31 @@ class User:
         self.role = role
         self.is_admin = role == "admin"
 
-async def verify_token(token: str) -> dict:
-    """Verify JWT token and extract payload"""
+async def verify_token(token: str, request: Optional[Request] = None) -> dict:
+    """
+    Verify JWT token and extract payload
+    
+    Verified claims are cached (app/core/token_cache.py); with a request, the
+    claims already verified by the request pipeline are reused.
+    """
     try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise AuthenticationError("Token missing user ID")
-        
-        # Check token expiration
-        exp = payload.get("exp")
-        if exp and datetime.fromtimestamp(exp, timezone.utc) < datetime.now(timezone.utc):
-            raise AuthenticationError("Token expired")
-            
-        return payload
-        
-    except JWTError as e:
+        payload = request_claims(request.state if request is not None else None, token)
+    except RevokedTokenError:
+        raise AuthenticationError("Token revoked")
+    except jwt.ExpiredSignatureError:
+        raise AuthenticationError("Token expired")
+    except jwt.InvalidTokenError as e:
         logger.warning(f"JWT validation failed: {e}")
         raise AuthenticationError("Invalid token")
+    
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        raise AuthenticationError("Token missing user ID")
+    
+    return payload
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db = Depends(get_database)
 ) -> User:
@@ -68,7 +69,7 @@ async def get_current_user(
         raise AuthenticationError("Authentication token required")
     
     # Verify token
-    payload = await verify_token(credentials.credentials)
+    payload = await verify_token(credentials.credentials, request)
     user_id = payload.get("sub")
     
     # Fetch user from database
@@ -97,6 +98,7 @@ async def get_current_user(
 
 
 async def get_current_user_optional(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db = Depends(get_database)
 ) -> Optional[User]:
@@ -109,7 +111,7 @@ async def get_current_user_optional(
             return None
         
         # Verify token
-        payload = await verify_token(credentials.credentials)
+        payload = await verify_token(credentials.credentials, request)
         user_id = payload.get("sub")
         
         # Fetch user from database
@@ -142,6 +144,7 @@ async def get_current_admin_user(
     return current_user
 
 async def get_optional_user(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ) -> Optional[User]:
     """
@@ -152,7 +155,7 @@ async def get_optional_user(
         return None
         
     try:
-        payload = await verify_token(credentials.credentials)
+        payload = await verify_token(credentials.credentials, request)
         user_id = payload.get("sub")
         username = payload.get("username")
         
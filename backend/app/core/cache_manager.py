@@ -1,134 +1,416 @@
 """
-Cache Manager - Simple in-memory caching for performance optimization
+Cache Manager - In-memory LRU/TTL cache engine for performance optimization
+
+- O(1) LRU (OrderedDict) with per-entry TTL on a monotonic clock
+- Bounded by entry count and by approximate size in bytes
+- Namespaces with hit/miss/eviction counters (exported to Prometheus)
+- Negative caching: `None` results can be cached with a shorter TTL
+- Single-flight: concurrent misses for one key share a single load
+- Optional Redis L2 tier for JSON-serializable values (CACHE_REDIS_L2=true)
 """
-from functools import lru_cache
-from typing import Optional, Any
+import asyncio
 import hashlib
 import json
 import logging
-from datetime import datetime, timedelta
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_NAMESPACE = "default"
+DEFAULT_NEGATIVE_TTL = 60
+
+# Marks "not cached" so that None can be a cached value
+MISSING = object()
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", errors="ignore"))
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def make_key(*args, **kwargs) -> str:
+    """
+    Build a stable cache key from arbitrary arguments
+
+    JSON (sorted keys) is used where possible; non-JSON values fall back
+    to repr(), so objects never make key generation fail.
+    """
+    try:
+        key_string = json.dumps({'args': args, 'kwargs': kwargs}, sort_keys=True, default=repr)
+    except (TypeError, ValueError):
+        key_string = repr((args, sorted(kwargs.items(), key=lambda item: item[0])))
+    return hashlib.sha256(key_string.encode()).hexdigest()
+
+
+_prometheus = None
+
+
+def _metrics():
+    """Prometheus collectors, resolved on first use (None if unavailable)"""
+    global _prometheus
+    if _prometheus is None:
+        try:
+            from . import prometheus_metrics
+            _prometheus = prometheus_metrics
+        except ImportError:
+            _prometheus = False
+    return _prometheus or None
+
+
+class RedisL2:
+    """Redis second-level tier; stores JSON-serializable values only"""
 
-class SimpleCacheManager:
+    def __init__(self, client, prefix: str = "xionimus:cache:", owns_client: bool = True):
+        """
+        Args:
+            client: redis.asyncio client (or the shared AsyncRedisClient)
+            prefix: Key prefix for all cache entries
+            owns_client: Close the client in aclose()
+        """
+        self.client = client
+        self.prefix = prefix
+        self.owns_client = owns_client
+        self.errors = 0
+
+    async def get(self, key: str) -> Any:
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            logger.debug(f"Cache L2 get failed: {e}")
+            return MISSING
+        if raw is None:
+            return MISSING
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl_seconds: float):
+        try:
+            payload = json.dumps(value)
+        except (TypeError, ValueError):
+            return  # Not portable across workers - keep it L1 only
+        try:
+            await self.client.set(self.prefix + key, payload, ex=max(1, int(ttl_seconds)))
+        except Exception as e:
+            self.errors += 1
+            logger.debug(f"Cache L2 set failed: {e}")
+
+    async def delete(self, key: str):
+        try:
+            await self.client.delete(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            logger.debug(f"Cache L2 delete failed: {e}")
+
+    async def aclose(self):
+        if not self.owns_client:
+            return
+        try:
+            await self.client.aclose()
+        except Exception as e:
+            logger.warning(f"⚠️ Cache L2 close failed: {e}")
+
+
+def create_cache_l2() -> Optional[RedisL2]:
+    """Create the Redis L2 tier if CACHE_REDIS_L2=true and Redis is initialized"""
+    if os.environ.get("CACHE_REDIS_L2", "false").lower() != "true":
+        return None
+    from .redis_client import get_redis
+    client = get_redis()
+    if client is None:
+        logger.warning("⚠️ CACHE_REDIS_L2=true but Redis is not configured - L2 cache disabled")
+        return None
+    # Shared pooled client (with circuit breaker); closed by close_redis_async()
+    return RedisL2(client, owns_client=False)
+
+
+class CacheManager:
     """
-    Simple in-memory cache with TTL support
+    In-memory LRU/TTL cache with namespaces and single-flight loading
     Used for caching expensive operations like AI responses (when appropriate)
     """
-    
-    def __init__(self, max_size: int = 1000, default_ttl_seconds: int = 3600):
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        default_ttl_seconds: int = 3600,
+        max_bytes: int = 64 * 1024 * 1024,
+        l2: Optional[RedisL2] = None
+    ):
         """
         Initialize cache manager
-        
+
         Args:
             max_size: Maximum number of items to cache
             default_ttl_seconds: Default time-to-live in seconds (1 hour default)
+            max_bytes: Maximum approximate size of all cached values
+            l2: Optional Redis tier consulted by get_or_set() on L1 misses
         """
-        self.cache = {}
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
         self.max_size = max_size
+        self.max_bytes = max_bytes
         self.default_ttl = default_ttl_seconds
+        self.l2 = l2
+        self.total_bytes = 0
+        self._namespaces: Dict[str, Dict[str, int]] = {}
         logger.info(f"✅ Cache Manager initialized (max_size: {max_size}, ttl: {default_ttl_seconds}s)")
-    
+
+    # ==================== CORE OPERATIONS ====================
+
     def _generate_key(self, *args, **kwargs) -> str:
         """Generate cache key from arguments"""
-        key_data = {
-            'args': args,
-            'kwargs': kwargs
-        }
-        key_string = json.dumps(key_data, sort_keys=True)
-        # Using MD5 for cache keys only (not security-critical)
-        return hashlib.md5(key_string.encode(), usedforsecurity=False).hexdigest()
-    
-    def get(self, key: str) -> Optional[Any]:
+        return make_key(*args, **kwargs)
+
+    def get(self, key: str, default: Any = None, namespace: str = DEFAULT_NAMESPACE) -> Any:
         """
         Get value from cache
-        
+
         Args:
             key: Cache key
-            
+            default: Returned on miss (pass MISSING to tell a cached None from a miss)
+            namespace: Cache namespace
+
         Returns:
-            Cached value if exists and not expired, None otherwise
+            Cached value if present and not expired, `default` otherwise
         """
-        if key in self.cache:
-            value, expiry = self.cache[key]
-            
-            # Check if expired
-            if datetime.now() < expiry:
-                logger.debug(f"✅ Cache HIT: {key[:8]}...")
-                return value
-            else:
-                # Expired, remove from cache
-                del self.cache[key]
-                logger.debug(f"⏰ Cache EXPIRED: {key[:8]}...")
-        
-        logger.debug(f"❌ Cache MISS: {key[:8]}...")
-        return None
-    
-    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        value = self._lookup(namespace, key)
+        return default if value is MISSING else value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None, namespace: str = DEFAULT_NAMESPACE):
         """
         Set value in cache with TTL
-        
+
         Args:
             key: Cache key
-            value: Value to cache
+            value: Value to cache (None allowed - negative caching)
             ttl_seconds: Time to live in seconds (uses default if not provided)
+            namespace: Cache namespace
         """
         if ttl_seconds is None:
             ttl_seconds = self.default_ttl
-        
-        expiry = datetime.now() + timedelta(seconds=ttl_seconds)
-        
-        # Check cache size limit
-        if len(self.cache) >= self.max_size:
-            # Remove oldest entry (simple FIFO eviction)
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
-            logger.debug(f"🗑️ Cache EVICTED: {oldest_key[:8]}... (size limit)")
-        
-        self.cache[key] = (value, expiry)
-        logger.debug(f"💾 Cache SET: {key[:8]}... (ttl: {ttl_seconds}s)")
-    
-    def delete(self, key: str):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Cache SKIP: {key[:8]}... larger than max_bytes")
+            with self._lock:
+                self._remove((namespace, key))  # Never serve the value this write replaced
+            return
+
+        entry = _Entry(value, time.monotonic() + ttl_seconds, size)
+        ns_stats = self._ns(namespace)
+        with self._lock:
+            self._remove((namespace, key))
+            self._entries[(namespace, key)] = entry
+            self.total_bytes += size
+            ns_stats['entries'] += 1
+            ns_stats['bytes'] += size
+            ns_stats['sets'] += 1
+            self._enforce_limits()
+
+    def delete(self, key: str, namespace: str = DEFAULT_NAMESPACE):
         """Delete specific key from cache"""
-        if key in self.cache:
-            del self.cache[key]
-            logger.debug(f"🗑️ Cache DELETED: {key[:8]}...")
-    
-    def clear(self):
-        """Clear all cache entries"""
-        count = len(self.cache)
-        self.cache.clear()
-        logger.info(f"🗑️ Cache CLEARED: {count} entries removed")
-    
+        with self._lock:
+            if self._remove((namespace, key)):
+                logger.debug(f"🗑️ Cache DELETED: {key[:8]}...")
+
+    def clear(self, namespace: Optional[str] = None):
+        """Clear all cache entries (or only one namespace)"""
+        with self._lock:
+            keys = [k for k in self._entries if namespace is None or k[0] == namespace]
+            for cache_key in keys:
+                self._remove(cache_key)
+        logger.info(f"🗑️ Cache CLEARED: {len(keys)} entries removed")
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[float] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+        negative_ttl: Optional[float] = DEFAULT_NEGATIVE_TTL
+    ) -> Any:
+        """
+        Return the cached value or load it once, sharing the load between concurrent callers
+
+        Args:
+            key: Cache key
+            loader: Async callable producing the value on a miss
+            ttl_seconds: TTL for loaded values
+            namespace: Cache namespace
+            negative_ttl: TTL for None results (None disables negative caching)
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        value = self._lookup(namespace, key)
+        if value is not MISSING:
+            return value
+
+        cache_key = (namespace, key)
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            self._ns(namespace)['coalesced'] += 1
+            await asyncio.wait({pending})
+            if pending.cancelled():
+                # The loading caller was cancelled - load again ourselves
+                return await self.get_or_set(key, loader, ttl_seconds, namespace, negative_ttl)
+            return pending.result()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            value = MISSING
+            if self.l2 is not None:
+                value = await self.l2.get(f"{namespace}:{key}")
+                if value is not MISSING:
+                    self._ns(namespace)['l2_hits'] += 1
+                    self.set(key, value, ttl_seconds, namespace)
+            if value is MISSING:
+                value = await loader()
+                ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl
+                if value is not None:
+                    self.set(key, value, ttl, namespace)
+                    if self.l2 is not None:
+                        await self.l2.set(f"{namespace}:{key}", value, ttl)
+                elif negative_ttl is not None:
+                    self.set(key, None, negative_ttl, namespace)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    # ==================== INTERNALS ====================
+
+    def _lookup(self, namespace: str, key: str) -> Any:
+        ns_stats = self._ns(namespace)
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove((namespace, key))
+                ns_stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                ns_stats['misses'] += 1
+                self._export(namespace, "miss")
+                return MISSING
+            self._entries.move_to_end((namespace, key))
+            ns_stats['hits'] += 1
+        self._export(namespace, "hit")
+        return entry.value
+
+    def _remove(self, cache_key: Tuple[str, str]) -> bool:
+        entry = self._entries.pop(cache_key, None)
+        if entry is None:
+            return False
+        ns_stats = self._ns(cache_key[0])
+        self.total_bytes -= entry.size
+        ns_stats['entries'] -= 1
+        ns_stats['bytes'] -= entry.size
+        return True
+
+    def _enforce_limits(self):
+        while self._entries and (len(self._entries) > self.max_size or self.total_bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._ns(oldest[0])['evictions'] += 1
+            metrics = _metrics()
+            if metrics:
+                metrics.cache_evictions_total.labels(namespace=oldest[0]).inc()
+            logger.debug(f"🗑️ Cache EVICTED: {oldest[1][:8]}... (size limit)")
+
+    def _ns(self, namespace: str) -> Dict[str, int]:
+        stats = self._namespaces.get(namespace)
+        if stats is None:
+            stats = self._namespaces.setdefault(namespace, {
+                'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'expirations': 0,
+                'coalesced': 0, 'l2_hits': 0, 'entries': 0, 'bytes': 0
+            })
+        return stats
+
+    def _export(self, namespace: str, result: str):
+        metrics = _metrics()
+        if metrics:
+            metrics.cache_requests_total.labels(namespace=namespace, result=result).inc()
+
+    # ==================== STATS ====================
+
     def get_stats(self) -> dict:
-        """Get cache statistics"""
-        total_entries = len(self.cache)
-        
-        # Count expired entries
-        expired_count = 0
-        for _, (_, expiry) in self.cache.items():
-            if datetime.now() >= expiry:
-                expired_count += 1
-        
+        """Get cache statistics (O(namespaces), no scan over entries)"""
+        namespaces = {}
+        for name, stats in self._namespaces.items():
+            lookups = stats['hits'] + stats['misses']
+            namespaces[name] = {
+                **stats,
+                'hit_rate': round(stats['hits'] / lookups * 100, 2) if lookups else 0.0
+            }
+            metrics = _metrics()
+            if metrics:
+                metrics.cache_entries.labels(namespace=name).set(stats['entries'])
+                metrics.cache_bytes.labels(namespace=name).set(stats['bytes'])
+
+        total_entries = len(self._entries)
         return {
             'total_entries': total_entries,
-            'active_entries': total_entries - expired_count,
-            'expired_entries': expired_count,
+            'total_bytes': self.total_bytes,
             'max_size': self.max_size,
-            'utilization': f"{(total_entries / self.max_size) * 100:.1f}%"
+            'max_bytes': self.max_bytes,
+            'utilization': f"{(total_entries / self.max_size) * 100:.1f}%",
+            'l2_enabled': self.l2 is not None,
+            'namespaces': namespaces
         }
 
+    async def aclose(self):
+        """Release the L2 connection"""
+        if self.l2 is not None:
+            await self.l2.aclose()
+            self.l2 = None
+
+
+# Backwards-compatible name
+SimpleCacheManager = CacheManager
 
 # Global cache instance
-cache_manager = SimpleCacheManager(max_size=1000, default_ttl_seconds=3600)
+cache_manager = CacheManager(max_size=1000, default_ttl_seconds=3600)
 
 
 # Decorator for easy caching
-def cached(ttl_seconds: int = 3600):
+def cached(ttl_seconds: int = 3600, namespace: Optional[str] = None, negative_ttl: Optional[float] = DEFAULT_NEGATIVE_TTL):
     """
-    Decorator to cache function results
-    
+    Decorator to cache async function results
+
+    Concurrent calls with the same arguments share one execution; None
+    results are cached for `negative_ttl` seconds.
+
     Example:
         @cached(ttl_seconds=300)
         async def expensive_operation(arg1, arg2):
@@ -136,23 +418,19 @@ def cached(ttl_seconds: int = 3600):
             return result
     """
     def decorator(func):
+        ns = namespace or func.__qualname__
+
+        @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Generate cache key
-            key = cache_manager._generate_key(func.__name__, *args, **kwargs)
-            
-            # Try to get from cache
-            result = cache_manager.get(key)
-            if result is not None:
-                return result
-            
-            # Execute function if not in cache
-            result = await func(*args, **kwargs)
-            
-            # Store in cache
-            cache_manager.set(key, result, ttl_seconds)
-            
-            return result
-        
+            key = make_key(*args, **kwargs)
+            return await cache_manager.get_or_set(
+                key,
+                lambda: func(*args, **kwargs),
+                ttl_seconds=ttl_seconds,
+                namespace=ns,
+                negative_ttl=negative_ttl
+            )
+
         return wrapper
     return decorator
 
@@ -0,0 +1,247 @@
+"""
+Compile Cache - Content-addressed build artifacts for compiled sandbox languages
+
+Users re-run the same snippet many times (different stdin, templates), and
+g++/javac/go build dominate those runs. Artifacts are stored on disk under
+a key of (language, compile command with the per-run directory stripped,
+source hash) and copied into the execution directory on a hit, so the
+compiler is skipped entirely.
+
+Entries are evicted least-recently-used once the cache exceeds `max_bytes`.
+Artifacts are copied (never hard-linked) and verified against their stored
+SHA-256 on restore, so a program that modifies its own binary cannot
+affect later runs.
+
+Configuration (environment):
+    SANDBOX_COMPILE_CACHE     "false" disables the cache (default: enabled)
+    SANDBOX_COMPILE_CACHE_MB  disk budget in MB (default: 512)
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MB = 512
+META_FILE = "meta.json"
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CompileCache:
+    """Size-bounded LRU of compiled artifacts on disk"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None, enabled: bool = True):
+        """
+        Args:
+            cache_dir: Directory holding one sub-directory per cached build
+            max_bytes: Disk budget; least recently used builds are evicted beyond it
+            enabled: False turns lookups/stores into no-ops
+        """
+        self.cache_dir = cache_dir or Path(tempfile.gettempdir()).resolve() / "xionimus_compile_cache"
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.environ.get("SANDBOX_COMPILE_CACHE_MB", DEFAULT_MAX_MB)
+        ) * 1024 * 1024
+        self.enabled = enabled
+        # key -> size in bytes; order is least -> most recently used
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()  # restore/store run in worker threads
+        self._loaded = False
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'corrupt': 0,
+            'compile_ms_saved': 0.0
+        }
+
+    @staticmethod
+    def make_key(language: str, compile_cmd: List[str], exec_dir: Path, source: bytes) -> str:
+        """Key of (language, compiler + flags, source hash); per-run paths are normalized away"""
+        flags = [arg.replace(str(exec_dir), "$DIR") for arg in compile_cmd]
+        digest = hashlib.sha256()
+        digest.update(language.encode())
+        digest.update(b"\0")
+        digest.update("\0".join(flags).encode())
+        digest.update(b"\0")
+        digest.update(hashlib.sha256(source).digest())
+        return digest.hexdigest()
+
+    async def restore(self, key: str, exec_dir: Path) -> Optional[Dict[str, Any]]:
+        """
+        Copy a cached build into exec_dir
+
+        Returns:
+            Stored metadata (artifacts, compile_ms, extra), or None on a miss
+        """
+        if not self.enabled:
+            return None
+        meta = await asyncio.to_thread(self._restore, key, exec_dir)
+        with self._lock:
+            if meta is None:
+                self.stats['misses'] += 1
+            else:
+                self.stats['hits'] += 1
+                self.stats['compile_ms_saved'] += meta.get("compile_ms", 0.0)
+        self._record(meta is not None, meta)
+        return meta
+
+    async def store(self, key: str, exec_dir: Path, artifacts: List[str], compile_ms: float, extra: Optional[Dict[str, Any]] = None):
+        """
+        Cache the given artifact files (names relative to exec_dir)
+
+        Args:
+            key: Cache key from make_key()
+            exec_dir: Directory the compiler wrote to
+            artifacts: File names to keep (binary, *.class, ...)
+            compile_ms: How long the compile took (reported as time saved on hits)
+            extra: Additional metadata returned by restore() (e.g. Java class name)
+        """
+        if not self.enabled or not artifacts:
+            return
+        try:
+            await asyncio.to_thread(self._store, key, exec_dir, artifacts, compile_ms, extra or {})
+        except Exception as e:
+            logger.warning(f"⚠️ Compile cache store failed: {e}")
+
+    def _ensure_loaded(self):
+        """Rebuild the index from disk once (survives restarts); caller holds the lock"""
+        if self._loaded:
+            return
+        self._loaded = True
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            meta_path = entry / META_FILE
+            if entry.is_dir() and meta_path.exists():
+                try:
+                    size = json.loads(meta_path.read_text())["size"]
+                except Exception:
+                    shutil.rmtree(entry, ignore_errors=True)
+                    continue
+                entries.append((meta_path.stat().st_mtime, entry.name, size))
+            elif entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)  # interrupted store
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+
+    def _restore(self, key: str, exec_dir: Path) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._ensure_loaded()
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        entry = self.cache_dir / key
+        try:
+            meta = json.loads((entry / META_FILE).read_text())
+            for name, digest in meta["artifacts"].items():
+                target = exec_dir / name
+                shutil.copy2(entry / name, target)
+                if _file_digest(target) != digest:
+                    raise ValueError(f"digest mismatch for {name}")
+            os.utime(entry / META_FILE)  # LRU position survives restarts
+            return meta
+        except Exception as e:
+            logger.warning(f"⚠️ Dropping unusable compile cache entry {key[:12]}: {e}")
+            with self._lock:
+                self.stats['corrupt'] += 1
+                self._evict(key)
+            return None
+
+    def _store(self, key: str, exec_dir: Path, artifacts: List[str], compile_ms: float, extra: Dict[str, Any]):
+        with self._lock:
+            self._ensure_loaded()
+            if key in self._index:
+                return
+        staging = self.cache_dir / f".tmp-{uuid.uuid4().hex}"
+        staging.mkdir(parents=True)
+        try:
+            digests = {}
+            size = 0
+            for name in artifacts:
+                shutil.copy2(exec_dir / name, staging / name)
+                digests[name] = _file_digest(staging / name)
+                size += (staging / name).stat().st_size
+            meta = {
+                "artifacts": digests,
+                "compile_ms": round(compile_ms, 2),
+                "size": size,
+                "created_at": time.time(),
+                **extra
+            }
+            (staging / META_FILE).write_text(json.dumps(meta))
+            if size > self.max_bytes:
+                return
+            os.rename(staging, self.cache_dir / key)
+        except OSError:
+            return  # another worker stored the same build first
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+
+        with self._lock:
+            self._index[key] = size
+            self._bytes += size
+            self.stats['stores'] += 1
+            while self._bytes > self.max_bytes and len(self._index) > 1:
+                oldest = next(iter(self._index))
+                self._evict(oldest)
+                self.stats['evictions'] += 1
+
+    def _evict(self, key: str):
+        """Caller holds the lock"""
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._bytes -= size
+        shutil.rmtree(self.cache_dir / key, ignore_errors=True)
+
+    def clear(self):
+        """Remove all cached builds"""
+        with self._lock:
+            self._ensure_loaded()
+            for key in list(self._index):
+                self._evict(key)
+
+    def _record(self, hit: bool, meta: Optional[Dict[str, Any]]):
+        try:
+            from .prometheus_metrics import MetricsCollector
+            MetricsCollector.record_compile_cache(hit, (meta or {}).get("compile_ms", 0.0) / 1000)
+        except ImportError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        total = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'compile_ms_saved': round(self.stats['compile_ms_saved'], 2),
+            'enabled': self.enabled,
+            'entries': len(self._index),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hit_rate': round(self.stats['hits'] / total * 100, 2) if total else 0.0
+        }
+
+
+# Global compile cache
+compile_cache = CompileCache(enabled=os.environ.get("SANDBOX_COMPILE_CACHE", "true").lower() != "false")
@@ -5,6 +5,8 @@ Verwaltet 200k Token Context-Fenster intelligent
 import logging
 from typing import List, Dict, Any, Optional
 
+from .tokenizers import tokenizer_registry
+
 logger = logging.getLogger(__name__)
 
 class ContextManager:
@@ -28,45 +30,28 @@ class ContextManager:
     
     def __init__(self):
         """Initialize context manager"""
-        # Try to load tiktoken for accurate counting (optional dependency)
-        self.encoder = None
-        try:
-            import tiktoken
-            self.encoder = tiktoken.encoding_for_model("gpt-4")
-            logger.info("✅ Tiktoken encoder loaded for accurate token counting")
-        except ImportError:
-            logger.warning("⚠️ Tiktoken not installed. Using approximate counting (4 chars = 1 token).")
-            logger.info("💡 Install tiktoken for accurate token counting: pip install tiktoken")
-        except Exception as e:
-            logger.warning(f"⚠️ Tiktoken error: {e}. Using approximate counting.")
+        # Encoders are loaded lazily per model family on the first exact count
+        self.tokenizers = tokenizer_registry
     
-    def count_tokens(self, text: str) -> int:
+    def count_tokens(self, text: str, model: str = "default", exact: bool = True) -> int:
         """
-        Count tokens in text
-        Uses tiktoken if available, otherwise approximates (4 chars = 1 token)
+        Count tokens in text with the model's tokenizer
+        exact=False uses the fast character-based approximation of the model family
         """
-        if self.encoder:
-            try:
-                return len(self.encoder.encode(text))
-            except Exception as e:
-                logger.warning(f"Tiktoken encoding failed: {e}, using approximation")
-        
-        # Fallback: approximate counting
-        return len(text) // 4
+        return self.tokenizers.count(text, model, exact=exact)
+    
+    def message_token_counts(self, messages: List[Dict[str, str]], model: str = "default", exact: bool = True) -> List[int]:
+        """
+        Tokens per message including overhead (~4 for the role, ~3 for formatting)
+        Exact counts of unchanged history messages are served from the token count cache
+        """
+        contents = [msg.get('content') or '' for msg in messages]
+        contents = [content if isinstance(content, str) else str(content) for content in contents]
+        return [tokens + 7 for tokens in self.tokenizers.count_many(contents, model, exact=exact)]
     
-    def count_messages_tokens(self, messages: List[Dict[str, str]]) -> int:
+    def count_messages_tokens(self, messages: List[Dict[str, str]], model: str = "default", exact: bool = True) -> int:
         """Count total tokens in message list"""
-        total = 0
-        for msg in messages:
-            # Add tokens for role (usually ~4 tokens)
-            total += 4
-            # Add content tokens
-            total += self.count_tokens(msg.get('content', ''))
-        
-        # Add overhead for message formatting (~3 tokens per message)
-        total += len(messages) * 3
-        
-        return total
+        return sum(self.message_token_counts(messages, model, exact=exact))
     
     def get_model_limit(self, model: str) -> int:
         """Get token limit for specific model"""
@@ -98,7 +83,9 @@ class ContextManager:
         max_tokens = self.get_model_limit(model)
         target_tokens = max_tokens - reserve_tokens
         
-        current_tokens = self.count_messages_tokens(messages)
+        # Count every message once (exact - this is the budgeting decision); all totals below are sums of these
+        counts = self.message_token_counts(messages, model)
+        current_tokens = sum(counts)
         
         # If we're within limit, return as-is
         if current_tokens <= target_tokens:
@@ -116,26 +103,23 @@ class ContextManager:
         
         # Strategy: Keep system message (if any) + recent messages
         system_messages = [msg for msg in messages if msg.get('role') == 'system']
-        non_system = [msg for msg in messages if msg.get('role') != 'system']
+        non_system = [(msg, tokens) for msg, tokens in zip(messages, counts) if msg.get('role') != 'system']
         
         # Start with system messages
-        trimmed = system_messages.copy()
-        tokens_used = self.count_messages_tokens(trimmed)
+        tokens_used = sum(tokens for msg, tokens in zip(messages, counts) if msg.get('role') == 'system')
         
         # Add messages from the end (most recent)
-        for msg in reversed(non_system):
-            msg_tokens = self.count_tokens(msg.get('content', '')) + 7  # +7 for message overhead
+        recent = []
+        for msg, msg_tokens in reversed(non_system):
             if tokens_used + msg_tokens <= target_tokens:
-                trimmed.insert(len(system_messages), msg)
+                recent.append(msg)
                 tokens_used += msg_tokens
             else:
                 break
         
-        # Ensure chronological order (except system at start)
-        if len(system_messages) > 0:
-            trimmed = system_messages + trimmed[len(system_messages):]
-        
-        final_tokens = self.count_messages_tokens(trimmed)
+        # Chronological order, system messages first
+        trimmed = system_messages + recent[::-1]
+        final_tokens = tokens_used
         
         logger.info(f"✂️ Context trimmed: {len(messages)} → {len(trimmed)} messages, {current_tokens} → {final_tokens} tokens")
         
@@ -150,9 +134,12 @@ class ContextManager:
             'reserved_for_response': reserve_tokens
         }
     
-    def get_context_stats(self, messages: List[Dict[str, str]], model: str) -> Dict[str, Any]:
-        """Get detailed context statistics"""
-        total_tokens = self.count_messages_tokens(messages)
+    def get_context_stats(self, messages: List[Dict[str, str]], model: str, exact: bool = False) -> Dict[str, Any]:
+        """
+        Get detailed context statistics
+        Approximate by default (no BPE pass); trim_context makes the exact budgeting decision
+        """
+        total_tokens = self.count_messages_tokens(messages, model, exact=exact)
         model_limit = self.get_model_limit(model)
         usage_percent = (total_tokens / model_limit) * 100
         
@@ -164,6 +151,8 @@ class ContextManager:
             'usage_percent': round(usage_percent, 2),
             'tokens_remaining': model_limit - total_tokens,
             'is_near_limit': usage_percent > 80,
+            'token_count': 'exact' if exact else 'approximate',
+            'tokenizer': self.tokenizers.family_for_model(model),
             'breakdown': {
                 'system': len([m for m in messages if m.get('role') == 'system']),
                 'user': len([m for m in messages if m.get('role') == 'user']),
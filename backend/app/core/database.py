@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from pathlib import Path
@@ -62,6 +63,49 @@ else:
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _to_async_url(url: str) -> str:
+    """Map a sync database URL to its async driver (asyncpg / aiosqlite)"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg:" + url[len(prefix):]
+    return url
+
+
+# Async engine for request handlers - keeps queries off the event loop
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL") or _to_async_url(DATABASE_URL)
+async_engine = None
+AsyncSessionLocal = None
+
+try:
+    if IS_POSTGRESQL:
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            pool_size=20,
+            max_overflow=40,
+            pool_timeout=60,
+            pool_recycle=3600,
+            pool_pre_ping=True,
+            echo=False
+        )
+    else:
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            connect_args={"timeout": 30.0},
+            pool_pre_ping=True,
+            echo=False
+        )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False  # Objects stay readable after commit without a lazy reload
+    )
+except ImportError as e:
+    logger.warning(f"⚠️ Async database driver not installed ({e}) - async DB layer disabled")
+
 # Base class for models
 Base = declarative_base()
 
@@ -85,6 +129,29 @@ def get_db_session():
     """
     return SessionLocal()
 
+async def get_async_db():
+    """
+    Get async database session - for dependency injection
+    
+    Usage:
+        async def endpoint(db: AsyncSession = Depends(get_async_db)): ...
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database driver not installed (aiosqlite / asyncpg)")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_async_db_session() -> AsyncSession:
+    """
+    Get async database session - for direct usage (not dependency injection)
+    IMPORTANT: Use as `async with get_async_db_session() as db:` so it is closed
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database driver not installed (aiosqlite / asyncpg)")
+    return AsyncSessionLocal()
+
+
 async def init_database():
     """Initialize database and create tables"""
     try:
@@ -118,6 +185,8 @@ async def close_database():
     """Close database connection"""
     try:
         engine.dispose()
+        if async_engine is not None:
+            await async_engine.dispose()
         logger.info("👋 Database connection closed")
     except Exception as e:
         logger.warning(f"⚠️ Database close failed: {e}")
@@ -132,6 +201,10 @@ async def get_database_health() -> bool:
     """
     try:
         from sqlalchemy import text
+        if async_engine is not None:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return True
         db = SessionLocal()
         try:
             # Execute a simple query to test connection
@@ -19,7 +19,9 @@ class DocumentationAgent:
         code_files: List[Dict[str, Any]],
         project_description: str,
         ai_manager,
-        api_keys: Dict[str, str]
+        api_keys: Dict[str, str],
+        cache_scope: Optional[str] = None,
+        cache_context: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate complete documentation for the project
@@ -29,6 +31,8 @@ class DocumentationAgent:
             project_description: Description of what was built
             ai_manager: AI Manager for LLM calls
             api_keys: API keys for LLM
+            cache_scope: Response cache scope (user id) - None disables caching
+            cache_context: Hash of the code content (the prompt only lists file paths)
             
         Returns:
             Dict with README content and API docs
@@ -112,7 +116,9 @@ Schreibe die README direkt, ohne zusätzliche Erklärungen."""
                 model="claude-sonnet-4-5-20250929",
                 messages=[{"role": "user", "content": readme_prompt}],
                 stream=False,
-                api_keys=api_keys
+                api_keys=api_keys,
+                cache_scope=cache_scope,
+                cache_context=cache_context  # Same code -> same README
             )
             
             readme_content = response.get("content", "")
@@ -6,7 +6,7 @@ Location: /backend/app/core/enhanced_orchestrator.py
 """
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional, AsyncGenerator
+from typing import Dict, List, Any, Optional, AsyncGenerator, Set
 from datetime import datetime, timezone
 from enum import Enum
 from dataclasses import dataclass, field
@@ -30,6 +30,9 @@ from .ai_manager import AIManager
 
 logger = logging.getLogger(__name__)
 
+# Task states that still lead to an execution (pending tasks wait on one of these)
+ACTIVE_STATUSES = (TaskStatus.READY, TaskStatus.RUNNING, TaskStatus.SCHEDULED)
+
 
 class ExecutionMode(Enum):
     """How tasks should be executed"""
@@ -72,6 +75,7 @@ class ExecutionContext:
     
     # Custom artifacts
     artifacts: Dict[str, Any] = field(default_factory=dict)
+    agent_results: Dict[str, Any] = field(default_factory=dict)  # agent_type -> result
     
     # Timeline
     events: List[Dict[str, Any]] = field(default_factory=list)
@@ -502,32 +506,26 @@ class EnhancedOrchestrator:
         """Execute tasks smartly based on dependencies"""
         logger.info("🧠 Executing in smart mode")
         
-        # Keep processing until all tasks done
-        while True:
-            # Get ready tasks
-            ready_tasks = self.task_queue.get_ready_tasks()
-            
-            if not ready_tasks:
-                # Check if we're done
-                running = self.task_queue.get_running_tasks()
-                if not running:
-                    break
+        # Start every task as soon as the queue hands it out; wake on the
+        # next ready task or the next finished one instead of polling
+        in_flight: Set[asyncio.Task] = set()
+        next_task: Optional[asyncio.Task] = None
+        try:
+            while in_flight or any(t.status in ACTIVE_STATUSES for t in plan.tasks):
+                if next_task is None:
+                    next_task = asyncio.ensure_future(self.task_queue.dequeue())
                 
-                # Wait for running tasks
-                await asyncio.sleep(0.5)
-                continue
-            
-            # Execute ready tasks in parallel
-            tasks = [
-                self._execute_task(
-                    await self.task_queue.dequeue(timeout=0.1),
-                    context,
-                    api_keys
-                )
-                for _ in range(len(ready_tasks))
-            ]
-            
-            await asyncio.gather(*[t for t in tasks if t], return_exceptions=True)
+                done, _ = await asyncio.wait(in_flight | {next_task}, return_when=asyncio.FIRST_COMPLETED)
+                
+                if next_task in done:
+                    in_flight.add(asyncio.ensure_future(
+                        self._execute_task(next_task.result(), context, api_keys)
+                    ))
+                    next_task = None
+                in_flight -= done
+        finally:
+            if next_task is not None:
+                next_task.cancel()
     
     async def _execute_with_updates(
         self,
@@ -552,7 +550,7 @@ class EnhancedOrchestrator:
             
             if task is None:
                 # Check if we're done
-                if stats["running"] == 0 and stats["ready"] == 0 and stats["pending"] == 0:
+                if stats["running"] == 0 and stats["ready"] == 0 and stats["pending"] == 0 and stats["scheduled"] == 0:
                     break
                 continue
             
@@ -661,8 +659,9 @@ Provide a detailed, high-quality response."""
     ) -> OrchestratorResult:
         """Collect and aggregate results"""
         
-        completed = self.task_queue.get_completed_tasks()
-        failed = self.task_queue.get_failed_tasks()
+        # Statuses of this plan's tasks (the queue only retains recently finished tasks)
+        completed = [t for t in plan.tasks if t.status == TaskStatus.COMPLETED]
+        failed = [t for t in plan.tasks if t.status == TaskStatus.FAILED]
         
         execution_time = (datetime.now(timezone.utc) - start_time).total_seconds()
         
@@ -14,11 +14,105 @@ INSTALLATION:
 import os
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Directories never searched (vendored code, caches, VCS data)
+IGNORED_DIRS = ['venv', '.venv', '__pycache__', 'node_modules', '.git']
+
+
+class ProjectIndex:
+    """
+    In-memory index of a project, built with a single directory walk
+    
+    Holds file/dir names -> relative paths (in walk order), the parsed
+    dependency manifests and lazily read, memoized file contents, so all
+    framework signatures are scored without touching the disk again.
+    """
+    
+    REQUIREMENT_FILES = ["requirements.txt", "backend/requirements.txt", "pyproject.toml"]
+    PACKAGE_FILES = ["package.json", "frontend/package.json"]
+    
+    def __init__(self, root: Path):
+        self.root = root
+        self.files: Set[Tuple[str, ...]] = set()
+        self.dirs: Set[Tuple[str, ...]] = {()}
+        self.files_by_name: Dict[str, List[Tuple[str, ...]]] = {}
+        self.dirs_by_name: Dict[str, List[Tuple[str, ...]]] = {}
+        self.python_files: List[Tuple[str, ...]] = []
+        self._contents: Dict[Path, Optional[str]] = {}
+        self._manifests: Optional[Tuple[List[str], List[Dict]]] = None
+        self.stats = {'traversals': 0, 'files_read': 0}
+        self._build()
+    
+    def _build(self):
+        self.stats['traversals'] += 1
+        root_parts = len(self.root.parts)
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            rel_dir = Path(dirpath).parts[root_parts:]
+            for name in dirnames:
+                self.dirs.add(rel_dir + (name,))
+            # Never descend into ignored directories
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+            for name in dirnames:
+                self.dirs_by_name.setdefault(name, []).append(rel_dir + (name,))
+            for name in filenames:
+                rel = rel_dir + (name,)
+                self.files.add(rel)
+                self.files_by_name.setdefault(name, []).append(rel)
+                if name.endswith(".py"):
+                    self.python_files.append(rel)
+    
+    def path(self, rel: Tuple[str, ...]) -> Path:
+        return self.root.joinpath(*rel)
+    
+    def exists(self, rel: Tuple[str, ...]) -> bool:
+        return rel in self.files or rel in self.dirs
+    
+    def is_dir(self, rel: Tuple[str, ...]) -> bool:
+        return rel in self.dirs
+    
+    def read_text(self, path: Path) -> Optional[str]:
+        """File content (utf-8), read at most once per run; None if unreadable"""
+        if path not in self._contents:
+            self.stats['files_read'] += 1
+            try:
+                self._contents[path] = path.read_text(encoding='utf-8')
+            except Exception:
+                self._contents[path] = None
+        return self._contents[path]
+    
+    def manifests(self) -> Tuple[List[str], List[Dict]]:
+        """
+        Parsed dependency manifests
+        
+        Returns:
+            (lowercased requirements/pyproject contents, package.json dependency maps)
+        """
+        if self._manifests is None:
+            requirements = []
+            for req_file in self.REQUIREMENT_FILES:
+                rel = tuple(req_file.split("/"))
+                if rel in self.files:
+                    content = self.read_text(self.path(rel))
+                    if content is not None:
+                        requirements.append(content.lower())
+            
+            package_deps = []
+            for pkg_file in self.PACKAGE_FILES:
+                rel = tuple(pkg_file.split("/"))
+                if rel in self.files:
+                    try:
+                        data = json.loads(self.read_text(self.path(rel)))
+                        package_deps.append({**data.get("dependencies", {}), **data.get("devDependencies", {})})
+                    except Exception:
+                        pass
+            
+            self._manifests = (requirements, package_deps)
+        return self._manifests
+
 
 class FrameworkDetector:
     """
@@ -78,6 +172,8 @@ class FrameworkDetector:
         self.detected_framework = None
         self.confidence = 0.0
         self.evidence = []
+        self.index: Optional[ProjectIndex] = None
+        self._found_files: Dict[str, Optional[Path]] = {}
         
         # Common subdirectories to search in
         self.search_dirs = [
@@ -98,6 +194,10 @@ class FrameworkDetector:
                 "error": "Path not found"
             }
         
+        # One walk over the project; every signature is scored against it
+        self.index = ProjectIndex(self.project_path)
+        self._found_files = {}
+        
         scores = {}
         all_evidence = {}
         
@@ -200,126 +300,90 @@ class FrameworkDetector:
         
         return score, evidence
     
+    def _search_roots(self) -> List[Tuple[str, ...]]:
+        """Search dirs that exist, as index-relative parts"""
+        roots = []
+        for search_dir in self.search_dirs:
+            rel = search_dir.relative_to(self.project_path).parts
+            if self.index.is_dir(rel):
+                roots.append(rel)
+        return roots
+    
     def _find_file_recursive(self, filename: str) -> Optional[Path]:
-        """Find file in project (recursively in common subdirs)"""
-        # Try direct path first
-        if (self.project_path / filename).exists():
-            return self.project_path / filename
+        """Find file in project (recursively in common subdirs, max 2 levels deep)"""
+        if filename in self._found_files:
+            return self._found_files[filename]
         
-        # Try common subdirectories
-        for search_dir in self.search_dirs:
-            if not search_dir.exists():
-                continue
-            
+        found = None
+        for root in self._search_roots():
             # Try direct
-            file_path = search_dir / filename
-            if file_path.exists():
-                return file_path
+            if self.index.exists(root + (filename,)):
+                found = self.index.path(root + (filename,))
+                break
             
-            # Try recursive search (but limit depth to 2 levels)
-            try:
-                for root, dirs, files in os.walk(search_dir):
-                    # Limit depth
-                    depth = len(Path(root).relative_to(search_dir).parts)
-                    if depth > 2:
-                        continue
-                    
-                    # Skip common ignore dirs
-                    dirs[:] = [d for d in dirs if d not in 
-                              ['venv', '.venv', '__pycache__', 'node_modules', '.git']]
-                    
-                    if filename in files:
-                        return Path(root) / filename
-            except Exception:
-                continue
+            # Files at most 2 directories below the search dir, in walk order
+            for rel in self.index.files_by_name.get(filename, []):
+                if rel[:len(root)] == root and len(rel) - len(root) - 1 <= 2:
+                    found = self.index.path(rel)
+                    break
+            if found:
+                break
         
-        return None
+        self._found_files[filename] = found
+        return found
     
     def _directory_exists_recursive(self, dirname: str) -> bool:
         """Check if directory exists (search in subdirs)"""
-        for search_dir in self.search_dirs:
-            if not search_dir.exists():
-                continue
-            
+        parts = tuple(dirname.split("/"))
+        for root in self._search_roots():
             # Direct check
-            if (search_dir / dirname).is_dir():
+            if self.index.is_dir(root + parts):
                 return True
             
-            # Recursive check (limit depth)
-            try:
-                for root, dirs, _ in os.walk(search_dir):
-                    depth = len(Path(root).relative_to(search_dir).parts)
-                    if depth > 2:
-                        continue
-                    
-                    dirs[:] = [d for d in dirs if d not in 
-                              ['venv', '.venv', '__pycache__', 'node_modules', '.git']]
-                    
-                    if dirname in dirs:
+            # Directories whose parent is at most 2 levels below the search dir
+            if len(parts) == 1:
+                for rel in self.index.dirs_by_name.get(dirname, []):
+                    if rel[:len(root)] == root and len(rel) - len(root) - 1 <= 2:
                         return True
-            except Exception:
-                continue
         
         return False
     
     def _check_dependencies(self, dependencies: List[str]) -> List[str]:
         """Check if dependencies are listed in package files"""
         found = set()
+        requirements, package_deps = self.index.manifests()
         
         # Python requirements files
-        for req_file in ["requirements.txt", "backend/requirements.txt", "pyproject.toml"]:
-            req_path = self.project_path / req_file
-            if req_path.exists():
-                try:
-                    content = req_path.read_text(encoding='utf-8').lower()
-                    for dep in dependencies:
-                        if dep.lower() in content:
-                            found.add(dep)
-                except Exception:
-                    pass
+        for content in requirements:
+            for dep in dependencies:
+                if dep.lower() in content:
+                    found.add(dep)
         
         # Node.js package files
-        for pkg_file in ["package.json", "frontend/package.json"]:
-            package_path = self.project_path / pkg_file
-            if package_path.exists():
-                try:
-                    content = package_path.read_text(encoding='utf-8')
-                    data = json.loads(content)
-                    all_deps = {**data.get("dependencies", {}), **data.get("devDependencies", {})}
-                    for dep in dependencies:
-                        if dep in all_deps:
-                            found.add(dep)
-                except Exception:
-                    pass
+        for all_deps in package_deps:
+            for dep in dependencies:
+                if dep in all_deps:
+                    found.add(dep)
         
         return list(found)
     
     def _check_patterns_in_file(self, file_path: Path, patterns: List[str]) -> List[str]:
         """Check if code patterns exist in file"""
-        if not file_path.exists():
+        content = self.index.read_text(file_path)
+        if content is None:
             return []
         
         found = []
-        try:
-            content = file_path.read_text(encoding='utf-8')
-            for pattern in patterns:
-                if pattern in content and pattern not in found:
-                    found.append(pattern)
-        except Exception:
-            pass
+        for pattern in patterns:
+            if pattern in content and pattern not in found:
+                found.append(pattern)
         
         return found
     
     def _file_contains_patterns(self, file_path: Path, patterns: List[str]) -> bool:
         """Check if file contains any of the patterns"""
-        if not file_path.exists():
-            return False
-        
-        try:
-            content = file_path.read_text(encoding='utf-8')
-            return any(pattern in content for pattern in patterns)
-        except Exception:
-            return False
+        content = self.index.read_text(file_path)
+        return content is not None and any(pattern in content for pattern in patterns)
     
     def _check_imports_recursive(self, imports: List[str]) -> List[Path]:
         """Check if imports exist in Python files (limit search)"""
@@ -327,31 +391,24 @@ class FrameworkDetector:
         checked = 0
         max_files = 50  # Don't check too many files
         
-        for search_dir in self.search_dirs:
-            if not search_dir.exists():
-                continue
-            
-            try:
-                for py_file in search_dir.rglob("*.py"):
-                    # Skip venv, cache, etc.
-                    if any(skip in str(py_file) for skip in 
-                          ['venv', '.venv', '__pycache__', 'node_modules', '.git']):
-                        continue
-                    
-                    checked += 1
-                    if checked > max_files:
-                        break
-                    
-                    try:
-                        content = py_file.read_text(encoding='utf-8')
-                        if any(imp in content for imp in imports):
-                            found.append(py_file)
-                            if len(found) >= 5:  # Cap at 5 files
-                                return found
-                    except Exception:
-                        continue
-            except Exception:
-                continue
+        for root in self._search_roots():
+            for rel in self.index.python_files:
+                if rel[:len(root)] != root:
+                    continue
+                py_file = self.index.path(rel)
+                # Skip venv, cache, etc.
+                if any(skip in str(py_file) for skip in IGNORED_DIRS):
+                    continue
+                
+                checked += 1
+                if checked > max_files:
+                    break
+                
+                content = self.index.read_text(py_file)
+                if content is not None and any(imp in content for imp in imports):
+                    found.append(py_file)
+                    if len(found) >= 5:  # Cap at 5 files
+                        return found
             
             if checked > max_files:
                 break
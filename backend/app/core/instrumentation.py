@@ -0,0 +1,255 @@
+"""
+Instrumentation - Feeds the Prometheus collectors from the hot paths
+
+- PrometheusMiddleware: pure ASGI middleware timing every HTTP request,
+  labelled with the matched route template ("/api/v1/sessions/{session_id}")
+  instead of the raw path so ids never become label values
+- instrument_engine(): SQLAlchemy cursor events timing every query by
+  operation (SELECT/INSERT/UPDATE/DELETE/OTHER)
+- record_ai_call(): AI latency, time to first token, tokens and cost per
+  provider/model (called by AIManager); model names come from the client,
+  so unknown ones are labelled "other"
+- watch_gauges(): WebSocket connections, task queue depth and checked-out DB
+  connections, evaluated only when /metrics is scraped
+
+Everything degrades to a no-op when prometheus_client is not installed.
+"""
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "<unmatched>"
+OTHER_MODEL = "other"
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+SQL_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+_prometheus = None
+
+
+def _metrics():
+    """Prometheus collectors, resolved on first use (None if unavailable)"""
+    global _prometheus
+    if _prometheus is None:
+        try:
+            from . import prometheus_metrics
+            _prometheus = prometheus_metrics
+        except ImportError:
+            _prometheus = False
+    return _prometheus or None
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """Route template of a handled request (bounded label value)"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    if "app_root_path" in scope:
+        # Mounted sub-application (e.g. /uploads static files)
+        return scope.get("root_path", "") + "/{path}"
+    return UNMATCHED_ROUTE
+
+
+class PrometheusMiddleware:
+    """Pure ASGI middleware recording request count and latency per route template"""
+
+    def __init__(self, app):
+        self.app = app
+        # (method, endpoint, status) -> (counter child, histogram child); bounded by the routes
+        self._children: Dict[Tuple[str, str, int], Tuple[Any, Any]] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics = _metrics()
+        if metrics is None:
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            method = scope["method"] if scope["method"] in HTTP_METHODS else "OTHER"
+            self._observe(metrics, method, route_template(scope), status_code, time.perf_counter() - started_at)
+
+    def _observe(self, metrics, method: str, endpoint: str, status_code: int, duration: float):
+        key = (method, endpoint, status_code)
+        children = self._children.get(key)
+        if children is None:
+            children = self._children[key] = (
+                metrics.http_requests_total.labels(method=method, endpoint=endpoint, status=status_code),
+                metrics.http_request_duration_seconds.labels(method=method, endpoint=endpoint)
+            )
+        children[0].inc()
+        children[1].observe(duration)
+
+
+# ==================== DATABASE ====================
+
+def _sql_operation(statement: str) -> str:
+    words = statement.split(None, 1)
+    operation = words[0].upper() if words else ""
+    return operation if operation in SQL_OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._xionimus_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(context, statement, "success")
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    _record_query(context, exception_context.statement or "", "error")
+
+
+def _record_query(context, statement: str, status: str):
+    started_at = getattr(context, "_xionimus_started_at", None)
+    metrics = _metrics()
+    if started_at is None or metrics is None:
+        return
+    context._xionimus_started_at = None
+    metrics.MetricsCollector.record_db_query(_sql_operation(statement), status, time.perf_counter() - started_at)
+
+
+def instrument_engine(engine) -> bool:
+    """
+    Time every query of a SQLAlchemy engine
+
+    Args:
+        engine: Engine or AsyncEngine (its sync_engine is instrumented)
+
+    Returns:
+        True if the listeners were installed (False if already instrumented or no engine)
+    """
+    if engine is None:
+        return False
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return False
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    return True
+
+
+# ==================== AI PROVIDERS ====================
+
+@lru_cache(maxsize=256)
+def model_label(model: Optional[str]) -> str:
+    """
+    Bounded label value for a model name
+
+    Known models (context limits and pricing tables) keep their name, versioned
+    names map to the longest known prefix ("claude-3-5-haiku-20241022" ->
+    "claude-3-5-haiku"), anything else becomes "other".
+    """
+    from .context_manager import ContextManager
+    from .token_tracker import MODEL_PRICING_PER_1M
+
+    model_lower = (model or "").lower()
+    known = (set(ContextManager.MODEL_LIMITS) - {"default"}) | set(MODEL_PRICING_PER_1M)
+    if model_lower in known:
+        return model_lower
+    matches = [name for name in known if model_lower.startswith(name)]
+    return max(matches, key=len) if matches else OTHER_MODEL
+
+
+def record_ai_call(
+    provider: str,
+    model: str,
+    status: str,
+    duration: float,
+    usage: Optional[Dict[str, Any]] = None,
+    ttft: Optional[float] = None
+):
+    """
+    Record one AI provider call
+
+    Args:
+        provider: Provider name
+        model: Model name
+        status: 'success', 'error' or 'cancelled'
+        duration: Total call duration in seconds
+        usage: prompt_tokens / completion_tokens (cost is estimated from them)
+        ttft: Seconds until the first streamed token
+    """
+    metrics = _metrics()
+    if metrics is None:
+        return
+    try:
+        prompt_tokens = int((usage or {}).get("prompt_tokens") or 0)
+        completion_tokens = int((usage or {}).get("completion_tokens") or 0)
+        cost = 0.0
+        if prompt_tokens or completion_tokens:
+            from .token_tracker import token_tracker
+            cost = token_tracker.estimate_cost(model, prompt_tokens, completion_tokens)
+        label = model_label(model)
+        metrics.MetricsCollector.record_ai_request(
+            provider, label, status, duration, prompt_tokens, completion_tokens, cost
+        )
+        if ttft is not None:
+            metrics.MetricsCollector.record_ai_ttft(provider, label, ttft)
+    except Exception as e:
+        logger.debug(f"AI metrics not recorded: {e}")
+
+
+# ==================== GAUGES ====================
+
+def _safe(source: Callable[[], float]) -> Callable[[], float]:
+    def read() -> float:
+        try:
+            return float(source())
+        except Exception:
+            return 0.0
+    return read
+
+
+def watch_gauges(
+    websocket_connections: Optional[Callable[[], int]] = None,
+    task_queue: Optional[Callable[[], Any]] = None,
+    engines: Tuple[Any, ...] = ()
+):
+    """
+    Bind gauges to live sources; values are read on scrape, not on the hot path
+
+    Args:
+        websocket_connections: Returns the number of open WebSocket connections
+        task_queue: Returns the TaskQueue (its get_statistics() is read)
+        engines: SQLAlchemy engines whose checked-out connections are summed
+    """
+    metrics = _metrics()
+    if metrics is None:
+        return
+
+    if websocket_connections is not None:
+        metrics.websocket_connections_active.set_function(_safe(websocket_connections))
+
+    if task_queue is not None:
+        for state in ("ready", "pending", "scheduled", "running"):
+            metrics.task_queue_tasks.labels(state=state).set_function(
+                _safe(lambda state=state: task_queue().get_statistics()[state])
+            )
+
+    pools = [getattr(engine, "sync_engine", engine).pool for engine in engines if engine is not None]
+    pools = [pool for pool in pools if hasattr(pool, "checkedout")]
+    if pools:
+        metrics.db_connections_active.set_function(_safe(lambda: sum(pool.checkedout() for pool in pools)))
@@ -0,0 +1,247 @@
+"""
+Interpreter Pool - Pre-started Python/Node/ts-node processes for the sandbox
+
+Short snippets spend most of their time starting the interpreter (tens of
+ms for python3/node, seconds for ts-node). The pool keeps a few interpreters
+per language already started, resource-limited and blocked on a private
+pipe. A run writes the code path to that pipe; the bootstrap switches to the
+execution directory and runs the file in a fresh `__main__` namespace.
+
+Each pre-started process runs exactly one program and is then discarded
+(recycled after one run), so no state, limit breach or stray thread can leak
+into another user's execution. Refills happen in the background, off the
+request path.
+
+Configuration (environment):
+    SANDBOX_WARM_POOL       comma-separated languages, e.g. "python,javascript"
+                            (default: empty = disabled)
+    SANDBOX_WARM_POOL_SIZE  idle interpreters kept per language (default: 2)
+"""
+import asyncio
+import logging
+import os
+import shutil
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Optional
+
+from .sandbox_executor import SandboxExecutor, kill_process_group, make_limits_preexec, spawn_process
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 2
+# Interpreters found dead while idle in a row before a language falls back to cold runs
+MAX_DEAD_IN_A_ROW = 3
+# CPU limit of a pre-started interpreter: the API's maximum timeout (the
+# per-request wall-clock timeout is enforced by the executor as usual)
+WARM_CPU_SECONDS = 60
+CODE_FD_ENV = "SANDBOX_CODE_FD"
+
+PYTHON_BOOTSTRAP = (
+    "import os, sys\n"
+    f"with os.fdopen(int(os.environ.pop('{CODE_FD_ENV}'))) as f:\n"
+    "    path = f.read()\n"
+    "if not path:\n"
+    "    sys.exit(0)\n"
+    "os.chdir(os.path.dirname(path))\n"
+    "sys.argv = [path]\n"
+    "sys.path[0] = os.path.dirname(path)\n"
+    "with open(path) as f:\n"
+    "    code = compile(f.read(), path, 'exec')\n"
+    "try:\n"
+    "    exec(code, {'__name__': '__main__', '__file__': path, '__builtins__': __builtins__})\n"
+    "except SystemExit:\n"
+    "    raise\n"
+    "except BaseException as e:\n"
+    "    import traceback\n"
+    "    traceback.print_exception(type(e), e, e.__traceback__.tb_next)  # hide the bootstrap frame\n"
+    "    sys.exit(1)\n"
+)
+
+NODE_BOOTSTRAP = (
+    "const fs = require('fs'), path = require('path');"
+    f"const fd = Number(process.env.{CODE_FD_ENV}); delete process.env.{CODE_FD_ENV};"
+    "const file = fs.readFileSync(fd, 'utf8');"
+    # runMain() loads process.argv[1] as the main module, so require.main === module as in a cold run
+    "if (file) { process.chdir(path.dirname(file)); process.argv = [process.argv[0], file]; require('module').runMain(); }"
+)
+
+BOOTSTRAP_ARGS = {
+    "python": ["-c", PYTHON_BOOTSTRAP],
+    "javascript": ["-e", NODE_BOOTSTRAP],
+    "typescript": ["-e", NODE_BOOTSTRAP]
+}
+
+
+class WarmProcess:
+    """An interpreter waiting for the path of the file it should run"""
+
+    def __init__(self, process: asyncio.subprocess.Process, code_fd: int):
+        self.process = process
+        self.code_fd = code_fd
+        self.started_at = time.monotonic()
+
+    def dispatch(self, code_file: Path):
+        """Hand the program to the interpreter (can only be called once)"""
+        try:
+            os.write(self.code_fd, str(code_file).encode())
+        finally:
+            self.close()
+
+    def close(self):
+        if self.code_fd >= 0:
+            os.close(self.code_fd)
+            self.code_fd = -1
+
+
+class InterpreterPool:
+    """Per-language pool of pre-started, single-use interpreters"""
+
+    def __init__(self, executor: SandboxExecutor, languages: Iterable[str], size: int = DEFAULT_POOL_SIZE):
+        """
+        Args:
+            executor: Sandbox executor providing language configs and the workspace
+            languages: Languages to pre-start (python, javascript, typescript)
+            size: Idle interpreters kept per language
+        """
+        self.executor = executor
+        self.languages = [language for language in languages if language in BOOTSTRAP_ARGS]
+        self.size = size
+        self._idle: Dict[str, Deque[WarmProcess]] = {language: deque() for language in self.languages}
+        self._refilling: Dict[str, asyncio.Task] = {}
+        self._dead_in_a_row: Dict[str, int] = {language: 0 for language in self.languages}
+        self.running = False
+
+        self.stats = {
+            'warm_runs': 0,
+            'cold_runs': 0,
+            'spawned': 0,
+            'spawn_failures': 0,
+            'discarded': 0,
+            'total_spawn_ms': 0.0
+        }
+
+    @classmethod
+    def from_env(cls, executor: SandboxExecutor) -> Optional["InterpreterPool"]:
+        """Create the pool configured by SANDBOX_WARM_POOL, or None if disabled"""
+        languages = [item.strip() for item in os.environ.get("SANDBOX_WARM_POOL", "").split(",") if item.strip()]
+        if not languages:
+            return None
+        return cls(executor, languages, size=int(os.environ.get("SANDBOX_WARM_POOL_SIZE", DEFAULT_POOL_SIZE)))
+
+    async def start(self):
+        """Pre-start interpreters for every available language"""
+        for language in list(self.languages):
+            interpreter = self.executor.LANGUAGE_CONFIGS[language]["command"][0]
+            if shutil.which(interpreter) is None:
+                logger.warning(f"⚠️ Warm pool: {interpreter} not found, {language} runs cold")
+                self.languages.remove(language)
+                del self._idle[language]
+        self.running = True
+        await asyncio.gather(*(self._refill(language) for language in self.languages))
+        logger.info(f"✅ Sandbox interpreter pool ready: {', '.join(self.languages) or 'none'} (size {self.size})")
+
+    async def stop(self):
+        """Stop refills and kill idle interpreters"""
+        self.running = False
+        for task in self._refilling.values():
+            task.cancel()
+        await asyncio.gather(*self._refilling.values(), return_exceptions=True)
+        self._refilling.clear()
+        for idle in self._idle.values():
+            while idle:
+                await self._discard(idle.popleft())
+
+    def acquire(self, language: str) -> Optional[WarmProcess]:
+        """
+        Take an idle interpreter for one run
+
+        Returns:
+            WarmProcess, or None if the language is not pooled or none is ready
+        """
+        idle = self._idle.get(language)
+        if idle is None or not self.running:
+            return None
+        warm = None
+        while idle:
+            candidate = idle.popleft()
+            if candidate.process.returncode is None:
+                warm = candidate
+                self._dead_in_a_row[language] = 0
+                break
+            # Died while idle (e.g. the interpreter cannot start under the limits)
+            asyncio.create_task(self._discard(candidate))
+            self._dead_in_a_row[language] += 1
+        if self._dead_in_a_row[language] >= MAX_DEAD_IN_A_ROW:
+            logger.warning(f"⚠️ Warm pool: {language} interpreters keep exiting while idle, {language} runs cold")
+            self.languages.remove(language)
+            del self._idle[language]
+            for candidate in idle:
+                asyncio.create_task(self._discard(candidate))
+        else:
+            self._schedule_refill(language)
+        self.stats['warm_runs' if warm else 'cold_runs'] += 1
+        return warm
+
+    def _schedule_refill(self, language: str):
+        task = self._refilling.get(language)
+        if task is None or task.done():
+            self._refilling[language] = asyncio.create_task(self._refill(language))
+
+    async def _refill(self, language: str):
+        idle = self._idle.get(language)
+        while self.running and idle is not None and len(idle) < self.size:
+            warm = await self._spawn(language)
+            if warm is None:
+                return  # interpreter broken - retried on the next acquire
+            if self._idle.get(language) is not idle:
+                await self._discard(warm)  # language fell back to cold runs meanwhile
+                return
+            idle.append(warm)
+
+    async def _spawn(self, language: str) -> Optional[WarmProcess]:
+        config = self.executor.LANGUAGE_CONFIGS[language]
+        read_fd, write_fd = os.pipe()
+        env = {**os.environ, CODE_FD_ENV: str(read_fd)}
+        started = time.perf_counter()
+        try:
+            process = await spawn_process(
+                config["command"] + BOOTSTRAP_ARGS[language],
+                cwd=self.executor.workspace_dir,
+                env=env,
+                stdin=asyncio.subprocess.PIPE,
+                preexec_fn=make_limits_preexec(language, WARM_CPU_SECONDS, config["memory_limit_mb"]),
+                pass_fds=(read_fd,)
+            )
+        except Exception as e:
+            os.close(write_fd)
+            self.stats['spawn_failures'] += 1
+            logger.warning(f"⚠️ Warm pool: could not start {language} interpreter: {e}")
+            return None
+        finally:
+            os.close(read_fd)
+        self.stats['spawned'] += 1
+        self.stats['total_spawn_ms'] += (time.perf_counter() - started) * 1000
+        return WarmProcess(process, write_fd)
+
+    async def _discard(self, warm: WarmProcess):
+        warm.close()
+        self.stats['discarded'] += 1
+        if warm.process.returncode is None:
+            kill_process_group(warm.process)
+        await warm.process.wait()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics"""
+        runs = self.stats['warm_runs'] + self.stats['cold_runs']
+        spawned = self.stats['spawned']
+        return {
+            **{key: value for key, value in self.stats.items() if key != 'total_spawn_ms'},
+            'running': self.running,
+            'languages': list(self.languages),
+            'size': self.size,
+            'idle': {language: len(idle) for language, idle in self._idle.items()},
+            'warm_rate': round(self.stats['warm_runs'] / runs * 100, 2) if runs else 0.0,
+            'avg_spawn_ms': round(self.stats['total_spawn_ms'] / spawned, 2) if spawned else 0.0
+        }
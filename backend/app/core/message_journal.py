@@ -0,0 +1,243 @@
+"""
+Message Journal - Write-behind, batched persistence of chat messages
+
+The chat stream hands finished exchanges to the journal and returns to the
+socket immediately. A background writer collects entries for up to
+`flush_interval` seconds or `max_batch` rows and writes them in one
+transaction: missing sessions are created, then all messages are inserted
+with a single multi-row INSERT.
+
+Durability: `stop()` (called from the app lifespan) drains the queue before
+shutdown. If the writer is not running, `submit()` writes inline. A batch that
+still fails after MAX_WRITE_ATTEMPTS is written row by row, so a row that can
+never be inserted only drops itself.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, select
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 200
+DEFAULT_FLUSH_INTERVAL = 0.05
+DEFAULT_MAX_QUEUE = 10000
+MAX_WRITE_ATTEMPTS = 3
+
+
+class MessageJournal:
+    """Async queue + background writer for Message rows"""
+
+    def __init__(
+        self,
+        session_factory=None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_queue: int = DEFAULT_MAX_QUEUE
+    ):
+        """
+        Args:
+            session_factory: Callable returning an AsyncSession (defaults to get_async_db_session)
+            max_batch: Flush once this many message rows are buffered
+            flush_interval: Flush at most this many seconds after the first buffered entry
+            max_queue: Bound on pending entries; submit() waits when full
+        """
+        self._session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._max_queue = max_queue
+        self._writer: Optional[asyncio.Task] = None
+
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'failed': 0,
+            'batches': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._writer is not None and not self._writer.done()
+
+    def start(self):
+        """Start the background writer (requires a running event loop)"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_queue)
+        self._writer = asyncio.create_task(self._run())
+        logger.info(f"✅ Message journal started (batch {self.max_batch}, {self.flush_interval * 1000:.0f}ms)")
+
+    async def stop(self, timeout: float = 10.0):
+        """Flush everything still queued, then stop the writer"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"❌ Message journal drain timed out, {self._queue.qsize()} entries not persisted")
+        self._writer.cancel()
+        await asyncio.gather(self._writer, return_exceptions=True)
+        self._writer = None
+        logger.info("👋 Message journal stopped")
+
+    async def submit(self, session_id: str, messages: List[Dict[str, Any]], session_defaults: Optional[Dict[str, Any]] = None):
+        """
+        Queue messages of one session for persistence
+
+        Args:
+            session_id: Target session; created with `session_defaults` if missing
+            messages: Message column values (`id` and `timestamp` are filled in if absent)
+            session_defaults: Extra Session columns used when the session is created
+        """
+        now = datetime.now(timezone.utc)
+        rows = []
+        for offset, message in enumerate(messages):
+            row = {"session_id": session_id, **message}
+            row.setdefault("id", f"msg_{uuid.uuid4().hex[:16]}")
+            # Distinct, ordered timestamps keep user before assistant within an exchange
+            row.setdefault("timestamp", (now + timedelta(microseconds=offset)).isoformat())
+            rows.append(row)
+
+        entry = {"session_id": session_id, "rows": rows, "session": session_defaults or {}}
+        self.stats['enqueued'] += len(rows)
+
+        if not self.running:
+            await self._write_batch([entry])
+            return
+        await self._queue.put(entry)
+        self._update_gauge()
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0]["rows"])
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            while size < self.max_batch:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(entry)
+                size += len(entry["rows"])
+
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                self._update_gauge()
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]):
+        rows = [row for entry in batch for row in entry["rows"]]
+        started = time.perf_counter()
+        for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+            try:
+                await self._insert(batch, rows)
+                break
+            except Exception as e:
+                if attempt == MAX_WRITE_ATTEMPTS:
+                    if len(rows) > 1:
+                        logger.warning(f"⚠️ Message journal batch failed {attempt} times, writing rows one by one: {e}")
+                        await self._write_rows_individually(batch, started)
+                        return
+                    self.stats['failed'] += len(rows)
+                    logger.error(f"❌ Message journal dropped {len(rows)} messages after {attempt} attempts: {e}")
+                    self._record(len(rows), time.perf_counter() - started, "failed")
+                    return
+                logger.warning(f"⚠️ Message journal write failed (attempt {attempt}): {e}")
+                await asyncio.sleep(0.1 * attempt)
+
+        self._finish_batch(len(rows), started)
+
+    async def _write_rows_individually(self, batch: List[Dict[str, Any]], started: float):
+        """Isolate the rows that cannot be inserted after a failed batch"""
+        written = failed = 0
+        for entry in batch:
+            for row in entry["rows"]:
+                try:
+                    await self._insert([{**entry, "rows": [row]}], [row])
+                    written += 1
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"❌ Message journal dropped message {row['id']} of session {entry['session_id']}: {e}")
+        if failed:
+            self.stats['failed'] += failed
+            self._record(failed, time.perf_counter() - started, "failed")
+        if written:
+            self._finish_batch(written, started)
+
+    def _finish_batch(self, written: int, started: float):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats['written'] += written
+        self.stats['batches'] += 1
+        self.stats['last_flush_ms'] = elapsed_ms
+        self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], elapsed_ms)
+        self.stats['total_flush_ms'] += elapsed_ms
+        self._record(written, elapsed_ms / 1000, "success")
+
+    async def _insert(self, batch: List[Dict[str, Any]], rows: List[Dict[str, Any]]):
+        from ..models.session_models import Message, Session
+
+        sessions: Dict[str, Dict[str, Any]] = {}
+        for entry in batch:
+            sessions.setdefault(entry["session_id"], entry["session"])
+
+        async with self._new_session() as db:
+            existing = set((await db.execute(
+                select(Session.id).where(Session.id.in_(list(sessions)))
+            )).scalars().all())
+            missing = [
+                {"id": session_id, "name": "Chat Session", **defaults}
+                for session_id, defaults in sessions.items()
+                if session_id not in existing
+            ]
+            if missing:
+                await db.execute(insert(Session), missing)
+            await db.execute(insert(Message), rows)
+            await db.commit()
+
+    def _new_session(self):
+        if self._session_factory is not None:
+            return self._session_factory()
+        from .database import get_async_db_session
+        return get_async_db_session()
+
+    def _update_gauge(self):
+        try:
+            from .prometheus_metrics import message_journal_queue_depth
+            message_journal_queue_depth.set(self._queue.qsize() if self._queue else 0)
+        except ImportError:
+            pass
+
+    def _record(self, rows: int, duration: float, status: str):
+        try:
+            from .prometheus_metrics import MetricsCollector
+            MetricsCollector.record_journal_flush(rows, duration, status)
+        except ImportError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get journal statistics"""
+        batches = self.stats['batches']
+        return {
+            **self.stats,
+            'running': self.running,
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'avg_flush_ms': round(self.stats['total_flush_ms'] / batches, 2) if batches else 0.0,
+            'avg_batch_rows': round(self.stats['written'] / batches, 1) if batches else 0.0
+        }
+
+
+# Global message journal
+message_journal = MessageJournal()
@@ -0,0 +1,257 @@
+"""
+Post-Generation Pipeline - Concurrent agent stages after the primary answer
+
+After a code answer, chat_completion makes extra LLM calls (auto-summary,
+Testing agent, Documentation agent). They do not depend on each other, so
+they run concurrently, each with its own timeout. A stage that fails or
+times out is dropped without affecting the others, and cancelling the
+request cancels every running stage.
+
+Two delivery modes:
+- inline: run_all() waits for all stages - the user waits for the slowest
+  stage instead of the sum of all of them
+- async: start() returns immediately; each result is published to the
+  session's stream (WebSocket) as soon as it completes and kept for polling
+  via get_job()
+
+Configuration (environment):
+    POST_GENERATION_TIMEOUTS  per-stage timeouts in seconds,
+                              e.g. "summary=20,testing=90,documentation=90"
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STAGE_TIMEOUTS = {
+    "summary": 30.0,
+    "testing": 120.0,
+    "documentation": 120.0,
+}
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_MAX_RETAINED_JOBS = 500
+
+StageResult = Optional[Dict[str, Any]]
+
+
+@dataclass
+class PostGenerationStage:
+    name: str
+    run: Callable[[], Awaitable[StageResult]]  # returns None if there is nothing to show
+    timeout: float
+
+
+def _parse_stage_timeouts(value: str) -> Dict[str, float]:
+    timeouts = {}
+    for item in value.split(","):
+        stage, _, seconds = item.partition("=")
+        try:
+            if stage.strip():
+                timeouts[stage.strip()] = float(seconds)
+        except ValueError:
+            continue
+    return timeouts
+
+
+class PostGenerationPipeline:
+    """Runs post-generation stages concurrently, inline or with async delivery"""
+
+    def __init__(self, stage_timeouts: Optional[Dict[str, float]] = None, max_retained: int = DEFAULT_MAX_RETAINED_JOBS):
+        """
+        Args:
+            stage_timeouts: Timeout per stage name (overrides DEFAULT_STAGE_TIMEOUTS)
+            max_retained: Finished async jobs kept for polling (oldest dropped first)
+        """
+        self.stage_timeouts = {**DEFAULT_STAGE_TIMEOUTS, **(stage_timeouts or {})}
+        self.max_retained = max_retained
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+        self.stats = {
+            'completed': 0,
+            'empty': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'cancelled_jobs': 0
+        }
+
+    @classmethod
+    def from_env(cls) -> "PostGenerationPipeline":
+        """Create a pipeline configured from POST_GENERATION_TIMEOUTS"""
+        return cls(_parse_stage_timeouts(os.environ.get("POST_GENERATION_TIMEOUTS", "")))
+
+    def stage(self, name: str, run: Callable[[], Awaitable[StageResult]]) -> PostGenerationStage:
+        """Create a stage with the configured timeout for its name"""
+        return PostGenerationStage(name, run, self.stage_timeouts.get(name, DEFAULT_TIMEOUT))
+
+    async def _run_stage(self, stage: PostGenerationStage) -> Tuple[str, StageResult]:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(stage.run(), stage.timeout)
+        except asyncio.TimeoutError:
+            self.stats['timed_out'] += 1
+            logger.warning(f"⏱️ Post-generation stage '{stage.name}' timed out after {stage.timeout:.0f}s")
+            return stage.name, None
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.error(f"❌ Post-generation stage '{stage.name}' failed: {e}")
+            return stage.name, None
+
+        if result is None:
+            self.stats['empty'] += 1
+        else:
+            self.stats['completed'] += 1
+            logger.info(f"✅ Post-generation stage '{stage.name}' done in {time.perf_counter() - start:.1f}s")
+        return stage.name, result
+
+    async def run_all(self, stages: Sequence[PostGenerationStage]) -> Dict[str, StageResult]:
+        """
+        Run all stages concurrently and wait for them
+
+        Returns:
+            Result per stage name, in the order of `stages` (None if failed, timed out or empty)
+        """
+        results = await asyncio.gather(*(self._run_stage(stage) for stage in stages))
+        return dict(results)
+
+    async def iter_completed(self, stages: Sequence[PostGenerationStage]) -> AsyncIterator[Tuple[str, StageResult]]:
+        """
+        Run all stages concurrently and yield (name, result) in completion order
+
+        Stages still running when the consumer stops iterating are cancelled.
+        """
+        tasks = [asyncio.ensure_future(self._run_stage(stage)) for stage in stages]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def start(
+        self,
+        message_id: str,
+        session_id: str,
+        stages: Sequence[PostGenerationStage],
+        publish: Callable[[Dict[str, Any]], Any],
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Run stages in the background and publish each result as it completes
+
+        Published messages:
+            {"type": "agent_result", "message_id", "stage", "result"}
+            {"type": "agent_results_complete", "message_id", "stages"}
+
+        Args:
+            message_id: Assistant message the results belong to
+            session_id: Chat session (for get_job / cancel_session)
+            stages: Stages to run
+            publish: Called with each message (e.g. the session's stream)
+            user_id: Owner of the job (checked by the API)
+
+        Returns:
+            The job as returned by get_job()
+        """
+        job = {
+            'message_id': message_id,
+            'session_id': session_id,
+            'user_id': user_id,
+            'status': 'running',
+            'pending': [stage.name for stage in stages],
+            'results': {},
+            'started_at': time.time()
+        }
+        self._jobs[message_id] = job
+        self._evict_finished()
+
+        task = asyncio.create_task(self._deliver(job, stages, publish))
+        self._tasks[message_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(message_id, None))
+        logger.info(f"🚀 Post-generation: {len(stages)} stage(s) running in background for {message_id}")
+        return self.get_job(message_id)
+
+    async def _deliver(self, job: Dict[str, Any], stages: Sequence[PostGenerationStage], publish):
+        message_id = job['message_id']
+        try:
+            async for name, result in self.iter_completed(stages):
+                job['pending'].remove(name)
+                job['results'][name] = result
+                self._publish(publish, {
+                    "type": "agent_result",
+                    "message_id": message_id,
+                    "stage": name,
+                    "result": result
+                })
+            job['status'] = 'complete'
+            self._publish(publish, {
+                "type": "agent_results_complete",
+                "message_id": message_id,
+                "stages": [name for name, result in job['results'].items() if result is not None]
+            })
+        except asyncio.CancelledError:
+            job['status'] = 'cancelled'
+            self.stats['cancelled_jobs'] += 1
+            raise
+        finally:
+            job['finished_at'] = time.time()
+
+    @staticmethod
+    def _publish(publish, message: Dict[str, Any]):
+        try:
+            publish(message)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to publish post-generation result: {e}")
+
+    def _evict_finished(self):
+        excess = len(self._jobs) - self.max_retained
+        if excess <= 0:
+            return
+        for message_id in [mid for mid, job in self._jobs.items() if job['status'] != 'running'][:excess]:
+            del self._jobs[message_id]
+
+    def get_job(self, message_id: str) -> Optional[Dict[str, Any]]:
+        """Get status and results of an async job"""
+        job = self._jobs.get(message_id)
+        if job is None:
+            return None
+        return {**job, 'pending': list(job['pending']), 'results': dict(job['results'])}
+
+    def cancel(self, message_id: str) -> bool:
+        """Cancel a running async job; completed stage results are kept"""
+        task = self._tasks.get(message_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    def cancel_session(self, session_id: str) -> int:
+        """Cancel all running async jobs of a session"""
+        message_ids = [mid for mid, job in self._jobs.items() if job['session_id'] == session_id]
+        return sum(1 for message_id in message_ids if self.cancel(message_id))
+
+    async def stop(self):
+        """Cancel all running async jobs (application shutdown)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pipeline statistics"""
+        return {
+            **self.stats,
+            'running_jobs': len(self._tasks),
+            'retained_jobs': len(self._jobs),
+            'stage_timeouts': dict(self.stage_timeouts)
+        }
+
+
+# Global post-generation pipeline
+post_generation_pipeline = PostGenerationPipeline.from_env()
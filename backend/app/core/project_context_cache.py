@@ -0,0 +1,254 @@
+"""
+Project Context Cache - Caches repository scan + framework detection per project
+
+Scanning an imported repository and detecting its framework walks thousands of
+files. The result only changes when the tree changes, so it is cached per
+(user, project) and validated against a cheap fingerprint:
+
+- the HEAD commit when the project is a git checkout
+- otherwise the mtimes of the project root and its top-level entries
+
+GitHub imports and workspace writes invalidate entries explicitly, which also
+covers nested changes the mtime fingerprint cannot see; an invalidation during
+a scan bumps the project's generation and the scan's result is not cached.
+Cold scans run in a worker thread so the event loop keeps serving other sockets.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProjectContext:
+    """Cached scan result, detection result and rendered context for a project"""
+    repo_path: str
+    fingerprint: str
+    repo_structure: Dict[str, Any]
+    detection_result: Dict[str, Any]
+    context_text: str
+    built_at: float = field(default_factory=time.monotonic)
+    build_seconds: float = 0.0
+
+
+def compute_fingerprint(repo_path: str) -> str:
+    """
+    Compute a cheap fingerprint of a project tree
+
+    Uses the HEAD commit if the project is a git checkout, falling back to the
+    mtimes of the root directory and its direct children. Only a handful of
+    stat calls, no recursive walk.
+    """
+    head_commit = _read_head_commit(repo_path)
+    if head_commit:
+        return f"git:{head_commit}"
+
+    digest = hashlib.sha1(usedforsecurity=False)
+    try:
+        digest.update(str(os.stat(repo_path).st_mtime_ns).encode())
+        with os.scandir(repo_path) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                digest.update(f"{entry.name}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    except OSError as e:
+        logger.debug(f"Fingerprint failed for {repo_path}: {e}")
+        return "missing"
+    return f"mtime:{digest.hexdigest()}"
+
+
+def _read_head_commit(repo_path: str) -> Optional[str]:
+    """Resolve .git/HEAD to a commit sha without spawning git"""
+    git_dir = os.path.join(repo_path, ".git")
+    head_file = os.path.join(git_dir, "HEAD")
+    try:
+        with open(head_file, "r", encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+
+    if not head.startswith("ref: "):
+        return head or None
+
+    ref = head[5:]
+    try:
+        with open(os.path.join(git_dir, ref), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        pass
+
+    # Ref may only exist in packed-refs
+    try:
+        with open(os.path.join(git_dir, "packed-refs"), "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.strip().split(" ", 1)
+                if len(parts) == 2 and parts[1] == ref:
+                    return parts[0]
+    except OSError:
+        pass
+    return None
+
+
+class ProjectContextCache:
+    """
+    LRU cache of project contexts keyed by (user_id, project_name)
+
+    Concurrent requests for the same cold project share a single scan.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl_seconds: int = 3600):
+        """
+        Initialize project context cache
+
+        Args:
+            max_entries: Maximum number of projects to keep
+            ttl_seconds: Upper bound on entry age, even if the fingerprint matches
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], ProjectContext]" = OrderedDict()
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        # In-flight builds: key -> repo_path, and generations bumped by invalidations during them
+        self._building: Dict[Tuple[str, str], str] = {}
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_or_build(
+        self,
+        user_id: str,
+        project_name: str,
+        repo_path: str,
+        builder: Callable[[str, str], Tuple[Dict[str, Any], Dict[str, Any], str]]
+    ) -> ProjectContext:
+        """
+        Return the cached context for a project, building it if stale or missing
+
+        Args:
+            user_id: Owner of the imported project
+            project_name: Project (directory) name
+            repo_path: Absolute path to the project
+            builder: Sync callable (repo_path, project_name) returning
+                (repo_structure, detection_result, context_text). Runs in a worker thread.
+        """
+        key = (str(user_id), project_name)
+        fingerprint = await asyncio.to_thread(compute_fingerprint, repo_path)
+
+        cached = self._get_valid(key, repo_path, fingerprint)
+        if cached:
+            self.hits += 1
+            return cached
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another coroutine may have built it while we waited
+            cached = self._get_valid(key, repo_path, fingerprint)
+            if cached:
+                self.hits += 1
+                return cached
+
+            self.misses += 1
+            start = time.perf_counter()
+            self._building[key] = repo_path
+            generation = self._generations.get(key, 0)
+            try:
+                repo_structure, detection_result, context_text = await asyncio.to_thread(
+                    builder, repo_path, project_name
+                )
+            finally:
+                del self._building[key]
+                invalidated = self._generations.pop(key, 0) != generation
+            elapsed = time.perf_counter() - start
+
+            entry = ProjectContext(
+                repo_path=repo_path,
+                fingerprint=fingerprint,
+                repo_structure=repo_structure,
+                detection_result=detection_result,
+                context_text=context_text,
+                build_seconds=elapsed
+            )
+            # Don't cache failed scans - the next message should retry - or
+            # scans of a tree that was invalidated while they ran
+            if repo_structure.get("success") and not invalidated:
+                self._store(key, entry)
+            logger.info(f"📂 Project context built for {project_name} in {elapsed * 1000:.0f}ms")
+            return entry
+
+    def _get_valid(self, key: Tuple[str, str], repo_path: str, fingerprint: str) -> Optional[ProjectContext]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if (
+            entry.repo_path != repo_path
+            or entry.fingerprint != fingerprint
+            or time.monotonic() - entry.built_at > self.ttl_seconds
+        ):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: Tuple[str, str], entry: ProjectContext):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._locks.pop(evicted_key, None)
+
+    def _invalidate_in_flight(self, key: Tuple[str, str]):
+        """Keep a running build of `key` from caching its (now stale) result"""
+        if key in self._building:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def invalidate(self, user_id: str, project_name: Optional[str] = None):
+        """Drop cached context for one project, or all projects of a user"""
+        user_id = str(user_id)
+        for key in list(self._entries) + list(self._building):
+            if key[0] == user_id and (project_name is None or key[1] == project_name):
+                self._invalidate_in_flight(key)
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def invalidate_path(self, path: str):
+        """Drop cached context for any project containing (or contained in) path"""
+        path = os.path.normpath(os.path.abspath(str(path)))
+        candidates = [(key, entry.repo_path) for key, entry in self._entries.items()] + list(self._building.items())
+        for key, repo_path in candidates:
+            repo_path = os.path.normpath(os.path.abspath(repo_path))
+            if path == repo_path or path.startswith(repo_path + os.sep) or repo_path.startswith(path + os.sep):
+                self._invalidate_in_flight(key)
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        """Clear all cached project contexts"""
+        for key in list(self._building):
+            self._invalidate_in_flight(key)
+        self._entries.clear()
+        self._locks.clear()
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': f"{(self.hits / total) * 100:.1f}%" if total else "0.0%"
+        }
+
+
+# Global project context cache
+project_context_cache = ProjectContextCache()
@@ -42,7 +42,15 @@ ai_requests_total = Counter(
 ai_request_duration_seconds = Histogram(
     'xionimus_ai_request_duration_seconds',
     'AI request latency',
-    ['provider', 'model']
+    ['provider', 'model'],
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 900)
+)
+
+ai_time_to_first_token_seconds = Histogram(
+    'xionimus_ai_time_to_first_token_seconds',
+    'Time until the first streamed token',
+    ['provider', 'model'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
 )
 
 ai_tokens_used = Counter(
@@ -75,6 +83,18 @@ db_connections_active = Gauge(
     'Active database connections'
 )
 
+# Connection and Queue Gauges (evaluated on scrape, see app/core/instrumentation.py)
+websocket_connections_active = Gauge(
+    'xionimus_websocket_connections_active',
+    'Open chat WebSocket connections'
+)
+
+task_queue_tasks = Gauge(
+    'xionimus_task_queue_tasks',
+    'Tasks in the agent task queue',
+    ['state']  # state: ready/pending/scheduled/running
+)
+
 # Session Metrics
 sessions_active = Gauge(
     'xionimus_sessions_active',
@@ -92,6 +112,85 @@ messages_total = Counter(
     ['role', 'type']  # role: user/assistant, type: text/image
 )
 
+# Message Journal Metrics (write-behind persistence)
+message_journal_queue_depth = Gauge(
+    'xionimus_message_journal_queue_depth',
+    'Chat message entries waiting to be persisted'
+)
+
+message_journal_rows_total = Counter(
+    'xionimus_message_journal_rows_total',
+    'Chat message rows flushed by the journal',
+    ['status']
+)
+
+message_journal_flush_duration_seconds = Histogram(
+    'xionimus_message_journal_flush_duration_seconds',
+    'Message journal batch flush latency'
+)
+
+# Cache Metrics (app/core/cache_manager.py)
+cache_requests_total = Counter(
+    'xionimus_cache_requests_total',
+    'Cache lookups',
+    ['namespace', 'result']  # result: hit/miss
+)
+
+cache_evictions_total = Counter(
+    'xionimus_cache_evictions_total',
+    'Cache entries evicted by size limits',
+    ['namespace']
+)
+
+cache_entries = Gauge(
+    'xionimus_cache_entries',
+    'Cached entries',
+    ['namespace']
+)
+
+cache_bytes = Gauge(
+    'xionimus_cache_bytes',
+    'Approximate size of cached values in bytes',
+    ['namespace']
+)
+
+# Sandbox Metrics (app/core/sandbox_engine.py)
+sandbox_queue_seconds = Histogram(
+    'xionimus_sandbox_queue_seconds',
+    'Time a code execution waited for a free sandbox slot',
+    ['language'],
+    buckets=(0.005, 0.05, 0.25, 1, 2.5, 5, 10, 30, 60)
+)
+
+sandbox_run_seconds = Histogram(
+    'xionimus_sandbox_run_seconds',
+    'Sandbox execution time (compile + run)',
+    ['language'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+
+sandbox_jobs = Gauge(
+    'xionimus_sandbox_jobs',
+    'Sandbox executions by state',
+    ['language', 'state']  # state: queued/running
+)
+
+sandbox_rejections_total = Counter(
+    'xionimus_sandbox_rejections_total',
+    'Sandbox executions rejected because the user queue was full'
+)
+
+sandbox_compile_cache_requests_total = Counter(
+    'xionimus_sandbox_compile_cache_requests_total',
+    'Compile cache lookups',
+    ['result']  # result: hit/miss
+)
+
+sandbox_compile_seconds_saved_total = Counter(
+    'xionimus_sandbox_compile_seconds_saved_total',
+    'Compile time skipped thanks to cached builds'
+)
+
 # File Upload Metrics
 uploads_total = Counter(
     'xionimus_uploads_total',
@@ -210,12 +309,36 @@ class MetricsCollector:
         if cost > 0:
             ai_cost_total.labels(provider=provider, model=model).inc(cost)
     
+    @staticmethod
+    def record_ai_ttft(provider: str, model: str, seconds: float):
+        """Record the time to the first streamed token"""
+        ai_time_to_first_token_seconds.labels(provider=provider, model=model).observe(seconds)
+    
     @staticmethod
     def record_db_query(operation: str, status: str, duration: float):
         """Record database query metrics"""
         db_queries_total.labels(operation=operation, status=status).inc()
         db_query_duration_seconds.labels(operation=operation).observe(duration)
     
+    @staticmethod
+    def record_journal_flush(rows: int, duration: float, status: str):
+        """Record a message journal batch flush"""
+        message_journal_rows_total.labels(status=status).inc(rows)
+        message_journal_flush_duration_seconds.observe(duration)
+    
+    @staticmethod
+    def record_sandbox_job(language: str, queue_seconds: float, run_seconds: float):
+        """Record a finished sandbox execution"""
+        sandbox_queue_seconds.labels(language=language).observe(queue_seconds)
+        sandbox_run_seconds.labels(language=language).observe(run_seconds)
+    
+    @staticmethod
+    def record_compile_cache(hit: bool, seconds_saved: float = 0.0):
+        """Record a compile cache lookup"""
+        sandbox_compile_cache_requests_total.labels(result='hit' if hit else 'miss').inc()
+        if hit and seconds_saved > 0:
+            sandbox_compile_seconds_saved_total.inc(seconds_saved)
+    
     @staticmethod
     def record_error(error_type: str, endpoint: str = "unknown"):
         """Record error metrics"""
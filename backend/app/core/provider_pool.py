@@ -0,0 +1,171 @@
+"""
+Provider Client Pool - Reusable AI provider clients keyed by API key
+
+Building a provider per request means a fresh SDK client, a fresh connection
+pool and a fresh TLS handshake before the first token. This pool keeps:
+
+- one shared httpx.AsyncClient per provider (HTTP/2 when `h2` is installed),
+  so all API keys for a provider reuse the same keep-alive connections
+- a bounded LRU of provider instances keyed by (provider, sha256(api_key));
+  instances idle longer than `idle_seconds` are dropped on the next acquire
+
+Raw API keys are never used as dictionary keys or logged.
+"""
+import hashlib
+import importlib.util
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Per-provider base URLs for providers we talk to with plain httpx
+PROVIDER_BASE_URLS = {
+    "perplexity": "https://api.perplexity.ai",
+}
+
+# Perplexity deep research can take up to 15 minutes
+PROVIDER_TIMEOUTS = {
+    "perplexity": 900.0,
+}
+
+
+def hash_api_key(api_key: str) -> str:
+    """Stable, non-reversible identifier for an API key"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class ProviderClientPool:
+    """
+    Bounded pool of AI provider instances sharing per-provider HTTP clients
+    """
+
+    def __init__(
+        self,
+        max_size: int = 64,
+        idle_seconds: int = 600,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0
+    ):
+        """
+        Initialize provider pool
+
+        Args:
+            max_size: Maximum number of cached provider instances
+            idle_seconds: Drop provider instances unused for this long
+            max_connections: Connection limit per provider HTTP client
+            max_keepalive_connections: Idle keep-alive connections kept per provider
+            keepalive_expiry: Seconds before idle connections are closed
+        """
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._providers: "OrderedDict[Tuple[str, str], Tuple[Any, float]]" = OrderedDict()
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_http_client(self, provider: str) -> httpx.AsyncClient:
+        """Get (or lazily create) the shared HTTP client for a provider"""
+        client = self._http_clients.get(provider)
+        if client is None or client.is_closed:
+            kwargs: Dict[str, Any] = {
+                "limits": self.limits,
+                "http2": HTTP2_AVAILABLE,
+                "timeout": httpx.Timeout(PROVIDER_TIMEOUTS.get(provider, 600.0), connect=10.0),
+            }
+            if provider in PROVIDER_BASE_URLS:
+                kwargs["base_url"] = PROVIDER_BASE_URLS[provider]
+            client = httpx.AsyncClient(**kwargs)
+            self._http_clients[provider] = client
+            logger.info(f"🔌 Shared HTTP client created for {provider} (http2={HTTP2_AVAILABLE})")
+        return client
+
+    def acquire(
+        self,
+        provider: str,
+        api_key: str,
+        factory: Callable[[str, httpx.AsyncClient], Any]
+    ) -> Any:
+        """
+        Return a pooled provider instance for (provider, api_key)
+
+        Args:
+            provider: Provider name (openai, anthropic, perplexity)
+            api_key: Raw API key
+            factory: Callable(api_key, http_client) building the provider instance
+        """
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        key = (provider, hash_api_key(api_key))
+        entry = self._providers.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._providers[key] = (entry[0], now)
+            self._providers.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        instance = factory(api_key, self.get_http_client(provider))
+        self._providers[key] = (instance, now)
+        while len(self._providers) > self.max_size:
+            self._providers.popitem(last=False)
+            self.evictions += 1
+        return instance
+
+    def _evict_idle(self, now: float):
+        """Drop provider instances idle for longer than idle_seconds (oldest first)"""
+        while self._providers:
+            key, (_, last_used) = next(iter(self._providers.items()))
+            if now - last_used <= self.idle_seconds:
+                break
+            del self._providers[key]
+            self.evictions += 1
+
+    def invalidate(self, provider: str, api_key: Optional[str] = None):
+        """Drop pooled instances for a provider, or for one key of it"""
+        key_hash = hash_api_key(api_key) if api_key else None
+        for key in list(self._providers):
+            if key[0] == provider and (key_hash is None or key[1] == key_hash):
+                del self._providers[key]
+
+    async def aclose(self):
+        """Close all shared HTTP clients (call on application shutdown)"""
+        self._providers.clear()
+        for provider, client in list(self._http_clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close {provider} HTTP client: {e}")
+        self._http_clients.clear()
+        logger.info("✅ AI provider client pool closed")
+
+    def get_stats(self) -> dict:
+        """Get pool statistics"""
+        total = self.hits + self.misses
+        return {
+            'providers_cached': len(self._providers),
+            'max_size': self.max_size,
+            'http_clients': sorted(self._http_clients),
+            'http2': HTTP2_AVAILABLE,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': f"{(self.hits / total) * 100:.1f}%" if total else "0.0%"
+        }
+
+
+# Global provider pool
+provider_pool = ProviderClientPool()
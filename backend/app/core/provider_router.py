@@ -0,0 +1,323 @@
+"""
+Provider Router - Latency-aware fallback, hedged requests and circuit breaking
+
+AIManager records latency and outcome of every provider call here. The
+router keeps a rolling window per provider/model (the least recently used
+models are dropped beyond max_models, as model names come from clients) and a
+circuit breaker per provider, and uses them to run a fallback chain (e.g. Sonnet -> Opus ->
+GPT-4o):
+
+- providers with an open circuit are skipped immediately
+- a failed call starts the next candidate right away
+- if the running call is slower than the p95 latency of its model, a hedged
+  request goes to the next candidate; the first successful answer wins and
+  the other call is cancelled
+
+Only transient provider failures (timeouts, connection errors, HTTP 429/5xx)
+count against a provider. Invalid keys or bad requests are per-user problems
+and must not open the circuit for everybody.
+
+Configuration (environment):
+    AI_HEDGING                false disables hedged requests (fallback and circuit breaker stay on)
+    AI_HEDGE_MIN_DELAY        lower bound of the hedge delay in seconds (default: 2)
+    AI_HEDGE_DEFAULT_DELAY    hedge delay until a model has enough samples (default: 30)
+    AI_CIRCUIT_RESET_SECONDS  cool-down of an open provider circuit (default: 30)
+"""
+import asyncio
+import logging
+import os
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+import httpx
+
+from .redis_client import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 100
+DEFAULT_MAX_MODELS = 64
+DEFAULT_MIN_SAMPLES = 10
+DEFAULT_HEDGE_QUANTILE = 0.95
+DEFAULT_HEDGE_MIN_DELAY = 2.0
+DEFAULT_HEDGE_DEFAULT_DELAY = 30.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_ERROR_RATE_THRESHOLD = 0.5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+Candidate = Tuple[str, str]  # (provider, model)
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    """
+    True if an exception means the provider is degraded (not the request or key)
+
+    Providers wrap SDK errors in ValueError, so the exception chain is inspected.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+            return True
+        status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+        if isinstance(status, int):
+            return status == 429 or status >= 500
+        name = type(exc).__name__
+        if "Timeout" in name or "Connection" in name or "Overloaded" in name:
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+class ModelStats:
+    """Rolling latency/outcome window of one provider/model"""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=window)  # (latency seconds, ok)
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+
+class ProviderRouter:
+    """Per-provider health tracking and hedged fallback routing"""
+
+    def __init__(
+        self,
+        window: int = DEFAULT_WINDOW,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        hedging: bool = True,
+        hedge_quantile: float = DEFAULT_HEDGE_QUANTILE,
+        hedge_min_delay: float = DEFAULT_HEDGE_MIN_DELAY,
+        hedge_default_delay: float = DEFAULT_HEDGE_DEFAULT_DELAY,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        error_rate_threshold: float = DEFAULT_ERROR_RATE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        max_models: int = DEFAULT_MAX_MODELS
+    ):
+        """
+        Args:
+            window: Calls kept per provider/model for latency and error rate
+            min_samples: Calls needed before p95 and error rate are trusted
+            hedging: Send hedged requests to the next candidate
+            hedge_quantile: Latency quantile after which a request is hedged
+            hedge_min_delay: Lower bound of the hedge delay (seconds)
+            hedge_default_delay: Hedge delay while a model has too few samples
+            failure_threshold: Consecutive provider failures that open the circuit
+            error_rate_threshold: Rolling error rate that opens the circuit
+            reset_timeout: Seconds an open circuit skips the provider
+            max_models: Provider/model windows kept (least recently used dropped first)
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self.hedging = hedging
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.reset_timeout = reset_timeout
+        self.max_models = max_models
+        self._models: "OrderedDict[Candidate, ModelStats]" = OrderedDict()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+        self.stats = {
+            'routed': 0,
+            'fallbacks': 0,
+            'hedged': 0,
+            'hedge_wins': 0,
+            'short_circuited': 0
+        }
+
+    @classmethod
+    def from_env(cls) -> "ProviderRouter":
+        """Create a router configured from AI_HEDGING / AI_HEDGE_* / AI_CIRCUIT_RESET_SECONDS"""
+        return cls(
+            hedging=os.environ.get("AI_HEDGING", "true").lower() != "false",
+            hedge_min_delay=float(os.environ.get("AI_HEDGE_MIN_DELAY", DEFAULT_HEDGE_MIN_DELAY)),
+            hedge_default_delay=float(os.environ.get("AI_HEDGE_DEFAULT_DELAY", DEFAULT_HEDGE_DEFAULT_DELAY)),
+            reset_timeout=float(os.environ.get("AI_CIRCUIT_RESET_SECONDS", DEFAULT_RESET_TIMEOUT))
+        )
+
+    def _model(self, provider: str, model: str) -> ModelStats:
+        stats = self._models.get((provider, model))
+        if stats is None:
+            stats = self._models[(provider, model)] = ModelStats(self.window)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        else:
+            self._models.move_to_end((provider, model))
+        return stats
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            breaker = self._breakers[provider] = CircuitBreaker(
+                self.failure_threshold, self.reset_timeout, name=f"AI provider {provider}"
+            )
+        return breaker
+
+    def available(self, provider: str) -> bool:
+        """False while the provider's circuit is open"""
+        return self.breaker(provider).allow()
+
+    def record(self, provider: str, model: str, latency: float, error: Optional[BaseException] = None):
+        """
+        Record the outcome of one provider call
+
+        Args:
+            provider: Provider name
+            model: Model name
+            latency: Call duration in seconds
+            error: Exception raised by the call (None on success)
+        """
+        stats = self._model(provider, model)
+        stats.calls += 1
+        breaker = self.breaker(provider)
+
+        if error is None:
+            stats.samples.append((latency, True))
+            breaker.record_success()
+            return
+        if not is_provider_failure(error):
+            stats.rejected += 1
+            return
+
+        stats.failures += 1
+        stats.samples.append((latency, False))
+        breaker.record_failure()
+        if len(stats.samples) >= self.min_samples and stats.error_rate >= self.error_rate_threshold:
+            breaker.trip(f"{stats.error_rate:.0%} errors on {model}")
+
+    def hedge_delay(self, provider: str, model: str) -> float:
+        """Seconds to wait for a call before hedging (p95 latency of the model)"""
+        stats = self._models.get((provider, model))
+        quantile = None
+        if stats is not None and sum(1 for _, ok in stats.samples if ok) >= self.min_samples:
+            quantile = stats.latency_quantile(self.hedge_quantile)
+        if quantile is None:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, quantile)
+
+    async def route(
+        self,
+        candidates: Sequence[Candidate],
+        call: Callable[[str, str], Awaitable[Dict[str, Any]]],
+        hedge: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Run `call` along a fallback chain
+
+        Args:
+            candidates: (provider, model) pairs in order of preference
+            call: Performs one provider call (should record via record())
+            hedge: Allow a hedged request to the next candidate (never for streams)
+
+        Returns:
+            The first successful response
+
+        Raises:
+            The last error if every candidate failed
+        """
+        if not candidates:
+            raise ValueError("No provider candidates to route to")
+        self.stats['routed'] += 1
+
+        allowed = [candidate for candidate in candidates if self.available(candidate[0])]
+        if len(allowed) < len(candidates):
+            self.stats['short_circuited'] += len(candidates) - len(allowed)
+            skipped = [f"{p}/{m}" for p, m in candidates if (p, m) not in allowed]
+            logger.warning(f"⚡ Skipping degraded providers: {', '.join(skipped)}")
+        if not allowed:
+            # Every provider is degraded - trying is better than failing outright
+            allowed = list(candidates)
+
+        loop = asyncio.get_running_loop()
+        pending = deque(allowed)
+        running: Dict[asyncio.Future, Tuple[int, Candidate, float]] = {}
+        hedge = hedge and self.hedging
+        last_error: Optional[BaseException] = None
+
+        def launch():
+            provider, model = pending.popleft()
+            task = asyncio.ensure_future(call(provider, model))
+            running[task] = (len(allowed) - len(pending) - 1, (provider, model), loop.time())
+
+        launch()
+        try:
+            while running:
+                timeout = None
+                if hedge and pending and len(running) == 1:
+                    (_, candidate, started_at), = running.values()
+                    timeout = max(0.0, started_at + self.hedge_delay(*candidate) - loop.time())
+
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    (_, (provider, model), _), = running.values()
+                    self.stats['hedged'] += 1
+                    logger.info(f"🏁 {provider}/{model} slower than p95 - hedging with {pending[0][0]}/{pending[0][1]}")
+                    launch()
+                    continue
+
+                for task in sorted(done, key=lambda t: running[t][0]):
+                    position, (provider, model), _ = running.pop(task)
+                    if task.exception() is None:
+                        if hedge and position > 0 and running:
+                            self.stats['hedge_wins'] += 1
+                        if position > 0:
+                            self.stats['fallbacks'] += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"⚠️ {provider}/{model} failed: {last_error}")
+
+                if not running and pending:
+                    launch()
+        finally:
+            # Cancel the losers (or everything if the caller was cancelled)
+            for task in running:
+                task.cancel()
+
+        raise last_error
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing statistics, per-model latency and circuit states"""
+        return {
+            **self.stats,
+            'hedging': self.hedging,
+            'circuits': {
+                provider: {'state': breaker.state, 'trips': breaker.trips}
+                for provider, breaker in self._breakers.items()
+            },
+            'models': {
+                f"{provider}/{model}": self._model_stats(provider, model, stats)
+                for (provider, model), stats in self._models.items()
+            }
+        }
+
+    def _model_stats(self, provider: str, model: str, stats: ModelStats) -> Dict[str, Any]:
+        p50, p95 = stats.latency_quantile(0.5), stats.latency_quantile(0.95)
+        return {
+            'calls': stats.calls,
+            'failures': stats.failures,
+            'rejected': stats.rejected,
+            'error_rate': round(stats.error_rate, 3),
+            'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+            'hedge_delay_s': round(self.hedge_delay(provider, model), 2)
+        }
+
+
+# Global provider router (AIManager instances are created per request)
+provider_router = ProviderRouter.from_env()
@@ -0,0 +1,183 @@
+"""
+RAG Ingest Queue - Batched, off-request-path indexing for the RAG system
+
+Embedding with sentence-transformers and inserting into Chroma are blocking
+and CPU-bound. `submit()` assigns the document id and returns immediately; a
+worker thread collects items for up to `flush_interval` seconds or
+`max_batch` items and indexes them per collection with one vectorized
+`embed(batch)` and one `collection.add(...)` call.
+
+Indexing is eventually consistent: a search issued right after `submit()`
+may not see the new item yet. `flush()` waits until everything queued so far
+is indexed (used before destructive operations and on shutdown).
+
+Configuration (environment):
+    RAG_INGEST_BATCH   maximum items per batch (default: 64)
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_FLUSH_INTERVAL = 0.05
+DEFAULT_MAX_QUEUE = 10000
+
+
+class RAGIngestQueue:
+    """Thread-backed batching queue in front of Chroma collections"""
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], List[Any]],
+        max_batch: Optional[int] = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_queue: int = DEFAULT_MAX_QUEUE
+    ):
+        """
+        Args:
+            embed: Embedding function called with a list of texts
+            max_batch: Index once this many items are buffered (default: RAG_INGEST_BATCH or 64)
+            flush_interval: Index at most this many seconds after the first buffered item
+            max_queue: Bound on pending items; submit() blocks when full
+        """
+        self.embed = embed
+        self.max_batch = max_batch or int(os.environ.get("RAG_INGEST_BATCH", DEFAULT_MAX_BATCH))
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self.stats = {
+            'enqueued': 0,
+            'indexed': 0,
+            'failed': 0,
+            'batches': 0,
+            'last_batch_ms': 0.0,
+            'total_batch_ms': 0.0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    def _ensure_worker(self):
+        if self.running:
+            return
+        with self._start_lock:
+            if not self.running:
+                self._worker = threading.Thread(target=self._run, name="rag-ingest", daemon=True)
+                self._worker.start()
+                logger.info(f"✅ RAG ingest worker started (batch {self.max_batch}, {self.flush_interval * 1000:.0f}ms)")
+
+    def submit(self, collection: Any, doc_id: str, document: str, metadata: Dict[str, Any]) -> str:
+        """
+        Queue one document for indexing
+
+        Args:
+            collection: Chroma collection to add to
+            doc_id: Document id (returned to the caller right away)
+            document: Text to embed and store
+            metadata: Chroma metadata
+
+        Returns:
+            The document id
+        """
+        self._ensure_worker()
+        self._queue.put({"collection": collection, "id": doc_id, "document": document, "metadata": metadata})
+        self.stats['enqueued'] += 1
+        return doc_id
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything queued so far is indexed
+
+        Returns:
+            False if the timeout expired first
+        """
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: self._queue.unfinished_tasks == 0, timeout)
+
+    def stop(self, timeout: float = 10.0):
+        """Index everything still queued, then stop the worker"""
+        if not self.running:
+            return
+        if not self.flush(timeout):
+            logger.error(f"❌ RAG ingest drain timed out, {self._queue.qsize()} items not indexed")
+        self._queue.put(None)
+        self._worker.join(timeout)
+        self._worker = None
+        logger.info("👋 RAG ingest worker stopped")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop_after_batch = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.task_done()
+                    stop_after_batch = True
+                    break
+                batch.append(item)
+
+            try:
+                self._index(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop_after_batch:
+                return
+
+    def _index(self, batch: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        by_collection: Dict[int, List[Dict[str, Any]]] = {}
+        for item in batch:
+            by_collection.setdefault(id(item["collection"]), []).append(item)
+
+        for items in by_collection.values():
+            documents = [item["document"] for item in items]
+            try:
+                embeddings = self.embed(documents)
+                items[0]["collection"].add(
+                    ids=[item["id"] for item in items],
+                    documents=documents,
+                    metadatas=[item["metadata"] for item in items],
+                    embeddings=[list(map(float, embedding)) for embedding in embeddings]
+                )
+                self.stats['indexed'] += len(items)
+            except Exception as e:
+                self.stats['failed'] += len(items)
+                logger.error(f"❌ RAG ingest dropped {len(items)} items: {e}")
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats['batches'] += 1
+        self.stats['last_batch_ms'] = elapsed_ms
+        self.stats['total_batch_ms'] += elapsed_ms
+        logger.debug(f"RAG ingest: indexed {len(batch)} items in {elapsed_ms:.0f}ms")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get ingest statistics"""
+        batches = self.stats['batches']
+        return {
+            **self.stats,
+            'running': self.running,
+            'queue_depth': self._queue.qsize(),
+            'avg_batch_ms': round(self.stats['total_batch_ms'] / batches, 2) if batches else 0.0,
+            'avg_batch_items': round((self.stats['indexed'] + self.stats['failed']) / batches, 1) if batches else 0.0
+        }
@@ -1,10 +1,18 @@
 """
 Local RAG (Retrieval-Augmented Generation) System using ChromaDB
 Provides long-term memory and context for Xionimus AI
+
+Messages and documents are indexed in batches on a worker thread
+(RAGIngestQueue); async callers use the a*-query wrappers, which run the
+blocking Chroma queries on a dedicated thread pool.
 """
 
+import asyncio
+import functools
 import logging
+import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
@@ -12,8 +20,25 @@ import chromadb
 from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 
+from .rag_ingest import RAGIngestQueue
+
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # Small, fast, good quality
+
+_embedding_function = None
+
+
+def get_embedding_function():
+    """Shared sentence-transformers embedding function (model loaded once per process)"""
+    global _embedding_function
+    if _embedding_function is None:
+        _embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=EMBEDDING_MODEL
+        )
+    return _embedding_function
+
+
 class RAGSystem:
     """Local RAG system using ChromaDB for document storage and retrieval"""
     
@@ -37,14 +62,19 @@ class RAGSystem:
         )
         
         # Use sentence transformers for embeddings (local, no API needed)
-        self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"  # Small, fast, good quality
-        )
+        self.embedding_function = get_embedding_function()
         
         # Get or create collections
         self.chat_collection = self._get_or_create_collection("chat_history")
         self.docs_collection = self._get_or_create_collection("documents")
         
+        # Indexing and queries stay off the event loop
+        self.ingest = RAGIngestQueue(self.embedding_function)
+        self._query_executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get("RAG_QUERY_THREADS", "4")),
+            thread_name_prefix="rag-query"
+        )
+        
         logger.info(f"RAG System initialized at {self.persist_dir}")
     
     def _get_or_create_collection(self, name: str):
@@ -67,7 +97,8 @@ class RAGSystem:
         session_id: str,
         message: str,
         role: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        wait: bool = False
     ) -> str:
         """
         Add a chat message to the RAG system for future retrieval
@@ -77,6 +108,7 @@ class RAGSystem:
             message: Message content
             role: Message role (user/assistant)
             metadata: Additional metadata
+            wait: Block until the message is indexed (default: queued for batch indexing)
             
         Returns:
             Document ID
@@ -91,13 +123,11 @@ class RAGSystem:
                 **(metadata or {})
             }
             
-            self.chat_collection.add(
-                documents=[message],
-                metadatas=[meta],
-                ids=[doc_id]
-            )
+            self.ingest.submit(self.chat_collection, doc_id, message, meta)
+            if wait:
+                self.ingest.flush()
             
-            logger.info(f"Added message to RAG: {doc_id}")
+            logger.info(f"Queued message for RAG: {doc_id}")
             return doc_id
             
         except Exception as e:
@@ -108,7 +138,8 @@ class RAGSystem:
         self,
         content: str,
         title: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        wait: bool = False
     ) -> str:
         """
         Add a document to the RAG system
@@ -117,6 +148,7 @@ class RAGSystem:
             content: Document content
             title: Document title
             metadata: Additional metadata
+            wait: Block until the document is indexed (default: queued for batch indexing)
             
         Returns:
             Document ID
@@ -130,13 +162,11 @@ class RAGSystem:
                 **(metadata or {})
             }
             
-            self.docs_collection.add(
-                documents=[content],
-                metadatas=[meta],
-                ids=[doc_id]
-            )
+            self.ingest.submit(self.docs_collection, doc_id, content, meta)
+            if wait:
+                self.ingest.flush()
             
-            logger.info(f"Added document to RAG: {title} ({doc_id})")
+            logger.info(f"Queued document for RAG: {title} ({doc_id})")
             return doc_id
             
         except Exception as e:
@@ -274,6 +304,35 @@ class RAGSystem:
         
         return full_context
     
+    # ==================== ASYNC QUERIES ====================
+    
+    async def _run_query(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._query_executor, functools.partial(func, *args, **kwargs))
+    
+    async def asearch_relevant_messages(self, query: str, session_id: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """search_relevant_messages on the query thread pool"""
+        return await self._run_query(self.search_relevant_messages, query, session_id, limit)
+    
+    async def asearch_documents(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """search_documents on the query thread pool"""
+        return await self._run_query(self.search_documents, query, limit)
+    
+    async def aget_context_for_query(
+        self,
+        query: str,
+        session_id: Optional[str] = None,
+        include_documents: bool = True,
+        max_context_length: int = 2000
+    ) -> str:
+        """get_context_for_query on the query thread pool"""
+        return await self._run_query(self.get_context_for_query, query, session_id, include_documents, max_context_length)
+    
+    def close(self, timeout: float = 10.0):
+        """Index everything still queued and stop the worker threads"""
+        self.ingest.stop(timeout)
+        self._query_executor.shutdown(wait=False)
+    
     def clear_session_history(self, session_id: str) -> int:
         """
         Clear chat history for a session
@@ -285,6 +344,9 @@ class RAGSystem:
             Number of messages deleted
         """
         try:
+            # Queued messages of this session must be indexed before they can be deleted
+            self.ingest.flush()
+            
             # Get all IDs for this session
             results = self.chat_collection.get(
                 where={"session_id": session_id}
@@ -312,7 +374,8 @@ class RAGSystem:
                 'documents': docs_count,
                 'total_items': chat_count + docs_count,
                 'persist_directory': str(self.persist_dir),
-                'embedding_model': 'all-MiniLM-L6-v2'
+                'embedding_model': EMBEDDING_MODEL,
+                'ingest': self.ingest.get_stats()
             }
         except Exception as e:
             logger.error(f"Error getting RAG stats: {e}")
@@ -321,6 +384,7 @@ class RAGSystem:
     def reset(self):
         """Reset the RAG system (delete all data)"""
         try:
+            self.ingest.flush()
             self.client.delete_collection("chat_history")
             self.client.delete_collection("documents")
             self.chat_collection = self._get_or_create_collection("chat_history")
@@ -0,0 +1,377 @@
+"""
+Rate Limit Backends - Where token buckets and hourly quotas live
+
+AdvancedRateLimiter decides which limit applies; the backend keeps the state:
+
+- InMemoryRateLimitBackend: per-process (default). Buckets are kept in
+  access order and dropped as soon as they have refilled completely (a full
+  bucket is indistinguishable from a new one), quota windows are dropped
+  when their hour is over, and both are capped by max_keys - memory no
+  longer grows with every distinct client/endpoint pair.
+- RedisRateLimitBackend: cluster-wide limits. Each check is one EVALSHA of
+  an atomic Lua script on the shared Redis client, so N workers enforce the
+  configured rate instead of N times it. Bucket keys expire once refilled.
+  While Redis is unavailable (circuit open) it falls back to per-process
+  limits instead of failing open.
+
+Configuration (environment):
+    RATE_LIMIT_BACKEND   redis|memory; defaults to redis when REDIS_URL is set
+    RATE_LIMIT_MAX_KEYS  buckets and quotas kept per worker (memory backend, default: 100000)
+"""
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "xionimus:ratelimit:"
+DEFAULT_MAX_KEYS = 100000
+QUOTA_WINDOW_SECONDS = 3600
+
+# (used counts {"requests", "ai_calls"}, seconds until the window resets)
+QuotaUsage = Tuple[Dict[str, int], float]
+
+# KEYS[1] bucket; ARGV capacity, refill rate (tokens/s), tokens requested
+# Returns 1 if the tokens were taken. Uses the Redis clock so all workers agree.
+TOKEN_BUCKET_SCRIPT = """
+redis.replicate_commands()
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+if tokens == nil then
+  tokens = capacity
+else
+  tokens = math.min(capacity, tokens + math.max(0, now - tonumber(state[2])) * rate)
+end
+local allowed = 0
+if tokens >= requested then
+  tokens = tokens - requested
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return allowed
+"""
+
+# KEYS[1] quota; ARGV request limit, AI call limit, is AI call (0/1), window seconds, consume (0/1)
+# Returns {allowed, requests, ai_calls, ms until reset}. consume=0 only reads.
+QUOTA_SCRIPT = """
+local counts = redis.call('HMGET', KEYS[1], 'requests', 'ai_calls')
+local requests = tonumber(counts[1]) or 0
+local ai_calls = tonumber(counts[2]) or 0
+local is_ai = tonumber(ARGV[3]) == 1
+local allowed = 1
+if requests >= tonumber(ARGV[1]) or (is_ai and ai_calls >= tonumber(ARGV[2])) then
+  allowed = 0
+end
+if allowed == 1 and tonumber(ARGV[5]) == 1 then
+  requests = redis.call('HINCRBY', KEYS[1], 'requests', 1)
+  if is_ai then
+    ai_calls = redis.call('HINCRBY', KEYS[1], 'ai_calls', 1)
+  end
+  if redis.call('PTTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+  end
+end
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl < 0 then
+  ttl = tonumber(ARGV[4]) * 1000
+end
+return {allowed, requests, ai_calls, ttl}
+"""
+
+TOKEN_BUCKET_SHA = hashlib.sha1(TOKEN_BUCKET_SCRIPT.encode()).hexdigest()
+QUOTA_SHA = hashlib.sha1(QUOTA_SCRIPT.encode()).hexdigest()
+
+
+class RateLimitBackend:
+    """Base class for rate limit state stores"""
+
+    name = "base"
+
+    async def consume(self, key: str, capacity: int, refill_rate: float, tokens: int = 1) -> bool:
+        """
+        Take tokens from a token bucket
+
+        Args:
+            key: Bucket key (client and endpoint)
+            capacity: Bucket size (burst)
+            refill_rate: Tokens added per second
+            tokens: Tokens to take
+
+        Returns:
+            True if the tokens were available
+        """
+        raise NotImplementedError
+
+    async def take_quota(self, user_id: str, limits: Dict[str, int], is_ai_call: bool) -> bool:
+        """Count one request (and AI call) against the user's hourly quota; False if exhausted"""
+        raise NotImplementedError
+
+    async def get_quota(self, user_id: str, limits: Dict[str, int]) -> QuotaUsage:
+        """Used quota of the current window and seconds until it resets"""
+        raise NotImplementedError
+
+    async def reset_user(self, user_id: str) -> Dict[str, Any]:
+        """Clear quota and buckets of a user; returns the cleared quota and bucket count"""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics"""
+        raise NotImplementedError
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets and quotas with idle eviction and a size cap"""
+
+    name = "memory"
+
+    def __init__(
+        self,
+        max_keys: int = DEFAULT_MAX_KEYS,
+        quota_window: float = QUOTA_WINDOW_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            max_keys: Maximum buckets (and, separately, quotas) kept; least recently used dropped first
+            quota_window: Length of a quota window in seconds
+            clock: Monotonic clock in seconds
+        """
+        self.max_keys = max_keys
+        self.quota_window = quota_window
+        self._clock = clock
+        # key -> [tokens, updated_at, full_at]; access order, so refilled buckets collect at the front
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        # user id -> [requests, ai_calls, window_started]; window order
+        self._quotas: "OrderedDict[str, List[float]]" = OrderedDict()
+
+        self.stats = {
+            'allowed': 0,
+            'limited': 0,
+            'expired': 0,
+            'evicted': 0
+        }
+
+    async def consume(self, key: str, capacity: int, refill_rate: float, tokens: int = 1) -> bool:
+        now = self._clock()
+        buckets = self._buckets
+        bucket = buckets.get(key)
+        if bucket is None:
+            level = float(capacity)
+        else:
+            level = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+
+        allowed = level >= tokens
+        if allowed:
+            level -= tokens
+            self.stats['allowed'] += 1
+        else:
+            self.stats['limited'] += 1
+
+        full_at = now + (capacity - level) / refill_rate
+        if bucket is None:
+            buckets[key] = [level, now, full_at]
+        else:
+            bucket[0], bucket[1], bucket[2] = level, now, full_at
+            buckets.move_to_end(key)
+        self._evict_buckets(now)
+        return allowed
+
+    def _evict_buckets(self, now: float):
+        buckets = self._buckets
+        # Refilled buckets equal fresh ones - dropping them loses nothing
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if bucket[2] > now:
+                break
+            del buckets[key]
+            self.stats['expired'] += 1
+        while len(buckets) > self.max_keys:
+            buckets.popitem(last=False)
+            self.stats['evicted'] += 1
+
+    def _quota(self, user_id: str, now: float) -> Optional[List[float]]:
+        quotas = self._quotas
+        while quotas:
+            key, quota = next(iter(quotas.items()))
+            if now - quota[2] < self.quota_window:
+                break
+            del quotas[key]
+        return quotas.get(user_id)
+
+    async def take_quota(self, user_id: str, limits: Dict[str, int], is_ai_call: bool) -> bool:
+        now = self._clock()
+        quota = self._quota(user_id, now)
+        if quota is None:
+            quota = self._quotas[user_id] = [0, 0, now]
+            while len(self._quotas) > self.max_keys:
+                self._quotas.popitem(last=False)
+                self.stats['evicted'] += 1
+
+        if quota[0] >= limits["requests"] or (is_ai_call and quota[1] >= limits["ai_calls"]):
+            return False
+        quota[0] += 1
+        if is_ai_call:
+            quota[1] += 1
+        return True
+
+    async def get_quota(self, user_id: str, limits: Dict[str, int]) -> QuotaUsage:
+        now = self._clock()
+        quota = self._quota(user_id, now)
+        if quota is None:
+            return {"requests": 0, "ai_calls": 0}, self.quota_window
+        return {"requests": int(quota[0]), "ai_calls": int(quota[1])}, self.quota_window - (now - quota[2])
+
+    async def reset_user(self, user_id: str) -> Dict[str, Any]:
+        quota = self._quotas.pop(user_id, None)
+        prefix = f"user:{user_id}:"
+        keys = [key for key in self._buckets if key.startswith(prefix)]
+        for key in keys:
+            del self._buckets[key]
+        return {
+            "found": quota is not None or bool(keys),
+            "cleared_quotas": {"requests": int(quota[0]), "ai_calls": int(quota[1])} if quota else None,
+            "cleared_buckets": len(keys)
+        }
+
+    def top_users(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Users with the most requests in their current quota window"""
+        users = sorted(self._quotas.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+        return [
+            {"user_id": user_id, "requests": int(quota[0]), "ai_calls": int(quota[1])}
+            for user_id, quota in users if quota[0] > 0
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'backend': self.name,
+            'buckets': len(self._buckets),
+            'quotas': len(self._quotas),
+            'max_keys': self.max_keys,
+            'top_users': self.top_users()
+        }
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Cluster-wide buckets and quotas via atomic Lua scripts"""
+
+    name = "redis"
+
+    def __init__(
+        self,
+        client: Any = None,
+        fallback: Optional[InMemoryRateLimitBackend] = None,
+        quota_window: int = QUOTA_WINDOW_SECONDS
+    ):
+        """
+        Args:
+            client: AsyncRedisClient (default: the shared client, resolved per call)
+            fallback: Per-process backend used while Redis is unavailable
+            quota_window: Length of a quota window in seconds
+        """
+        self._client = client
+        self.fallback = fallback or InMemoryRateLimitBackend()
+        self.quota_window = quota_window
+
+        self.stats = {
+            'allowed': 0,
+            'limited': 0,
+            'fallbacks': 0
+        }
+
+    @property
+    def client(self):
+        if self._client is not None:
+            return self._client
+        from .redis_client import get_redis
+        return get_redis()
+
+    async def _script(self, sha: str, script: str, keys: List[str], args: List[Any]) -> Any:
+        """Script result, or None if Redis is unavailable (the caller falls back)"""
+        client = self.client
+        if client is None:
+            return None
+        result = await client.evalsha(sha, script, keys, args)
+        if result is None:
+            self.stats['fallbacks'] += 1
+        return result
+
+    async def consume(self, key: str, capacity: int, refill_rate: float, tokens: int = 1) -> bool:
+        result = await self._script(
+            TOKEN_BUCKET_SHA, TOKEN_BUCKET_SCRIPT, [KEY_PREFIX + "bucket:" + key], [capacity, refill_rate, tokens]
+        )
+        if result is None:
+            return await self.fallback.consume(key, capacity, refill_rate, tokens)
+        allowed = int(result) == 1
+        self.stats['allowed' if allowed else 'limited'] += 1
+        return allowed
+
+    async def _quota_script(self, user_id: str, limits: Dict[str, int], is_ai_call: bool, consume: bool):
+        return await self._script(
+            QUOTA_SHA, QUOTA_SCRIPT, [KEY_PREFIX + "quota:" + user_id],
+            [limits["requests"], limits["ai_calls"], int(is_ai_call), self.quota_window, int(consume)]
+        )
+
+    async def take_quota(self, user_id: str, limits: Dict[str, int], is_ai_call: bool) -> bool:
+        result = await self._quota_script(user_id, limits, is_ai_call, consume=True)
+        if result is None:
+            return await self.fallback.take_quota(user_id, limits, is_ai_call)
+        return int(result[0]) == 1
+
+    async def get_quota(self, user_id: str, limits: Dict[str, int]) -> QuotaUsage:
+        result = await self._quota_script(user_id, limits, False, consume=False)
+        if result is None:
+            return await self.fallback.get_quota(user_id, limits)
+        return {"requests": int(result[1]), "ai_calls": int(result[2])}, int(result[3]) / 1000
+
+    async def reset_user(self, user_id: str) -> Dict[str, Any]:
+        usage, _ = await self.get_quota(user_id, {"requests": 0, "ai_calls": 0})
+        local = await self.fallback.reset_user(user_id)
+        client = self.client
+        if client is None:
+            return local
+        deleted_quota = await client.delete(KEY_PREFIX + "quota:" + user_id)
+        deleted_buckets = await client.delete_matching(f"{KEY_PREFIX}bucket:user:{user_id}:*")
+        return {
+            "found": bool(deleted_quota) or bool(deleted_buckets) or local["found"],
+            "cleared_quotas": usage if deleted_quota else local["cleared_quotas"],
+            "cleared_buckets": (deleted_buckets or 0) + local["cleared_buckets"]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        client = self.client
+        return {
+            **self.stats,
+            'backend': self.name,
+            'redis_available': client is not None and client.breaker.allow(),
+            'fallback': self.fallback.get_stats()
+        }
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    """
+    Create the configured backend
+
+    RATE_LIMIT_BACKEND=redis|memory; defaults to redis when REDIS_URL is set.
+    The Redis client is resolved per call (it is initialized at startup, after
+    this module is imported), so Redis may still come up later.
+    """
+    max_keys = int(os.environ.get("RATE_LIMIT_MAX_KEYS", DEFAULT_MAX_KEYS))
+    mode = os.environ.get("RATE_LIMIT_BACKEND", "").lower()
+    if not mode:
+        use_redis = bool(os.environ.get("REDIS_URL")) and os.environ.get("REDIS_BACKEND", "").lower() != "fake"
+        mode = "redis" if use_redis else "memory"
+
+    if mode == "redis":
+        logger.info("✅ Rate limits shared across workers via Redis")
+        return RedisRateLimitBackend(fallback=InMemoryRateLimitBackend(max_keys=max_keys))
+    return InMemoryRateLimitBackend(max_keys=max_keys)
@@ -1,15 +1,18 @@
 """
 Advanced Rate Limiting System
 Provides granular rate limiting with user-based quotas and endpoint-specific limits
+
+Bucket and quota state lives in a pluggable backend (see rate_limit_backend):
+per-process by default, cluster-wide in Redis with RATE_LIMIT_BACKEND=redis.
 """
 
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 from datetime import datetime, timedelta, timezone
-import asyncio
 import logging
 from fastapi import HTTPException, Request, status
-from collections import defaultdict, deque
-import json
+from collections import deque
+
+from .rate_limit_backend import InMemoryRateLimitBackend, RateLimitBackend, create_rate_limit_backend
 
 logger = logging.getLogger(__name__)
 
@@ -98,11 +101,21 @@ class AdvancedRateLimiter:
         "admin": {"requests": 10000, "ai_calls": 1000},
     }
     
-    def __init__(self):
-        self.user_buckets: Dict[str, Dict[str, TokenBucket]] = defaultdict(dict)
-        self.ip_counters: Dict[str, Dict[str, SlidingWindowCounter]] = defaultdict(dict)
-        self.user_quotas: Dict[str, Dict[str, int]] = defaultdict(lambda: {"requests": 0, "ai_calls": 0})
-        self.quota_reset_time: Dict[str, datetime] = {}
+    def __init__(self, backend: Optional[RateLimitBackend] = None):
+        """
+        Args:
+            backend: Bucket and quota store (default: per-process InMemoryRateLimitBackend)
+        """
+        self.backend = backend or InMemoryRateLimitBackend()
+        # Endpoint patterns compiled once: exact paths, then prefixes (most specific first)
+        self._exact_limits = {
+            pattern: limit for pattern, limit in self.DEFAULT_LIMITS.items() if not pattern.endswith("*")
+        }
+        self._prefix_limits: Tuple[Tuple[str, RateLimit], ...] = tuple(
+            (pattern[:-1], self.DEFAULT_LIMITS[pattern])
+            for pattern in sorted(self.DEFAULT_LIMITS, key=len, reverse=True)
+            if pattern.endswith("*")
+        )
         
     def get_client_id(self, request: Request, user_id: Optional[str] = None) -> str:
         """Get client identifier (user_id or IP)"""
@@ -120,16 +133,14 @@ class AdvancedRateLimiter:
     def match_endpoint_pattern(self, path: str) -> Optional[RateLimit]:
         """Find matching rate limit for endpoint"""
         # Exact match first
-        if path in self.DEFAULT_LIMITS:
-            return self.DEFAULT_LIMITS[path]
+        rate_limit = self._exact_limits.get(path)
+        if rate_limit is not None:
+            return rate_limit
         
         # Pattern matching (most specific first)
-        patterns = sorted(self.DEFAULT_LIMITS.keys(), key=len, reverse=True)
-        for pattern in patterns:
-            if pattern.endswith("*"):
-                prefix = pattern[:-1]
-                if path.startswith(prefix):
-                    return self.DEFAULT_LIMITS[pattern]
+        for prefix, rate_limit in self._prefix_limits:
+            if path.startswith(prefix):
+                return rate_limit
         
         return None
     
@@ -155,15 +166,12 @@ class AdvancedRateLimiter:
                     logger.warning(f"Rate limit exceeded for {client_id} on {endpoint}: {rate_limit.description}")
                     return False
             
-            # 2. Check user quotas (if authenticated)
+            # 2. Check and count user quotas (if authenticated)
             if user_id:
                 if not await self._check_user_quota(user_id, user_role, is_ai_call):
                     logger.warning(f"User quota exceeded for {user_id} (role: {user_role})")
                     return False
             
-            # 3. Record successful request
-            await self._record_request(client_id, endpoint, user_id, is_ai_call)
-            
             return True
             
         except Exception as e:
@@ -173,51 +181,21 @@ class AdvancedRateLimiter:
     
     async def _check_endpoint_limit(self, client_id: str, endpoint: str, rate_limit: RateLimit) -> bool:
         """Check endpoint-specific rate limit using token bucket"""
-        bucket_key = f"{client_id}:{endpoint}"
-        
-        if bucket_key not in self.user_buckets[client_id]:
-            # Create new token bucket
-            self.user_buckets[client_id][bucket_key] = TokenBucket(
-                capacity=rate_limit.requests,
-                refill_rate=rate_limit.requests / rate_limit.window
-            )
-        
-        bucket = self.user_buckets[client_id][bucket_key]
-        return bucket.consume(1)
+        return await self.backend.consume(
+            f"{client_id}:{endpoint}",
+            capacity=rate_limit.requests,
+            refill_rate=rate_limit.requests / rate_limit.window
+        )
     
     async def _check_user_quota(self, user_id: str, user_role: str, is_ai_call: bool) -> bool:
-        """Check hourly user quota"""
-        now = datetime.now(timezone.utc)
-        
-        # Reset quota if hour has passed
-        if user_id not in self.quota_reset_time or now - self.quota_reset_time[user_id] >= timedelta(hours=1):
-            self.user_quotas[user_id] = {"requests": 0, "ai_calls": 0}
-            self.quota_reset_time[user_id] = now
-        
+        """Check hourly user quota and count the request (atomic in the backend)"""
         quotas = self.USER_QUOTAS.get(user_role, self.USER_QUOTAS["user"])
-        current = self.user_quotas[user_id]
-        
-        # Check request quota
-        if current["requests"] >= quotas["requests"]:
-            return False
-        
-        # Check AI call quota
-        if is_ai_call and current["ai_calls"] >= quotas["ai_calls"]:
-            return False
-        
-        return True
-    
-    async def _record_request(self, client_id: str, endpoint: str, user_id: Optional[str], is_ai_call: bool):
-        """Record successful request for monitoring"""
-        if user_id:
-            self.user_quotas[user_id]["requests"] += 1
-            if is_ai_call:
-                self.user_quotas[user_id]["ai_calls"] += 1
+        return await self.backend.take_quota(user_id, quotas, is_ai_call)
     
-    def get_quota_status(self, user_id: str, user_role: str) -> Dict[str, any]:
+    async def get_quota_status(self, user_id: str, user_role: str) -> Dict[str, Any]:
         """Get current quota status for user"""
         quotas = self.USER_QUOTAS.get(user_role, self.USER_QUOTAS["user"])
-        current = self.user_quotas.get(user_id, {"requests": 0, "ai_calls": 0})
+        current, reset_in = await self.backend.get_quota(user_id, quotas)
         
         return {
             "requests": {
@@ -230,11 +208,19 @@ class AdvancedRateLimiter:
                 "limit": quotas["ai_calls"],
                 "remaining": quotas["ai_calls"] - current["ai_calls"]
             },
-            "reset_in_seconds": 3600 - (datetime.now(timezone.utc) - self.quota_reset_time.get(user_id, datetime.now(timezone.utc))).seconds
+            "reset_in_seconds": max(0, int(reset_in))
         }
+    
+    async def reset_user(self, user_id: str) -> Dict[str, Any]:
+        """Clear quota and endpoint buckets of a user"""
+        return await self.backend.reset_user(user_id)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get rate limiter statistics"""
+        return self.backend.get_stats()
 
-# Global rate limiter instance
-rate_limiter = AdvancedRateLimiter()
+# Global rate limiter instance (RATE_LIMIT_BACKEND selects the backend)
+rate_limiter = AdvancedRateLimiter(create_rate_limit_backend())
 
 class RateLimitExceeded(HTTPException):
     """Rate limit exceeded exception"""
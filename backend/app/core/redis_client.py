@@ -1,138 +1,393 @@
 """
 Redis Client Configuration for Caching and Session Management
+
+Async (redis.asyncio) client on an explicit connection pool. Every command
+goes through a circuit breaker: after repeated failures Redis is skipped
+for a cool-down period instead of reconnecting on every call, and callers
+get the same "unavailable" result as when Redis is not configured
+(graceful degradation).
+
+REDIS_BACKEND=fake selects an in-process backend (tests, local dev).
 """
-import redis
-import os
+import asyncio
+import fnmatch
 import logging
-from typing import Optional
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
 # Redis Configuration
 REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", "50"))
 
-# Global Redis client
-redis_client: Optional[redis.Redis] = None
 
-def get_redis_client() -> Optional[redis.Redis]:
-    """
-    Get Redis client instance
-    Returns None if Redis is not available (graceful degradation)
-    """
-    global redis_client
-    
-    if redis_client is None:
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` failures; half-open after `reset_timeout`"""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0, name: str = "Redis"):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """True if a call may be attempted (closed, or half-open trial)"""
+        return self.state != "open"
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"✅ {self.name} reachable again - circuit closed")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.trip(f"{self.failures} failures")
+
+    def trip(self, reason: str):
+        """Open the circuit (or restart the cool-down of a failed half-open trial)"""
+        if self.opened_at is None:
+            self.trips += 1
+            logger.warning(f"⚠️ {self.name} circuit open for {self.reset_timeout:.0f}s after {reason}")
+        self.opened_at = time.monotonic()
+
+
+class FakeRedis:
+    """In-process stand-in for redis.asyncio.Redis (subset used by the app)"""
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expiry: Dict[str, float] = {}
+
+    def _alive(self, key: str) -> bool:
+        expires_at = self._expiry.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._data
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._data[key] if self._alive(key) else None
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        self._data[key] = value if isinstance(value, str) else str(value)
+        if ex:
+            self._expiry[key] = time.monotonic() + ex
+        else:
+            self._expiry.pop(key, None)
+        return True
+
+    async def setex(self, key: str, seconds: int, value: Any) -> bool:
+        return await self.set(key, value, ex=seconds)
+
+    async def mget(self, keys: Sequence[str]) -> List[Optional[str]]:
+        return [await self.get(key) for key in keys]
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return removed
+
+    async def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._alive(key))
+
+    async def keys(self, pattern: str = "*") -> List[str]:
+        return [key for key in list(self._data) if self._alive(key) and fnmatch.fnmatchcase(key, pattern)]
+
+    async def scan_iter(self, match: str = "*", count: Optional[int] = None):
+        for key in await self.keys(match):
+            yield key
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    """Buffers commands and runs them on execute(), like a redis pipeline"""
+
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._commands = []
+
+
+class AsyncRedisClient:
+    """Pooled async Redis client with circuit breaker and pipelined bulk helpers"""
+
+    def __init__(self, client, breaker: Optional[CircuitBreaker] = None, pool=None):
+        """
+        Args:
+            client: redis.asyncio.Redis (or FakeRedis)
+            breaker: Circuit breaker guarding every command
+            pool: Connection pool owned by this client (disconnected on close)
+        """
+        self.client = client
+        self.breaker = breaker or CircuitBreaker()
+        self.pool = pool
+        self.stats = {'calls': 0, 'failures': 0, 'short_circuited': 0}
+
+    @classmethod
+    def from_url(cls, url: str, max_connections: int = REDIS_MAX_CONNECTIONS) -> "AsyncRedisClient":
+        import redis.asyncio as aioredis
+        pool = aioredis.ConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            decode_responses=True,
+            socket_timeout=5,
+            socket_connect_timeout=5,
+            retry_on_timeout=True,
+            health_check_interval=30
+        )
+        return cls(aioredis.Redis(connection_pool=pool), pool=pool)
+
+    async def _call(self, name: str, coro_factory, default: Any = None) -> Any:
+        if not self.breaker.allow():
+            self.stats['short_circuited'] += 1
+            return default
+        self.stats['calls'] += 1
         try:
-            redis_client = redis.from_url(
-                REDIS_URL,
-                decode_responses=True,
-                socket_timeout=5,
-                socket_connect_timeout=5,
-                retry_on_timeout=True,
-                health_check_interval=30
-            )
-            # Test connection
-            redis_client.ping()
-            logger.info(f"✅ Redis connected successfully at {REDIS_URL}")
+            result = await coro_factory()
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.warning(f"⚠️ Redis connection failed: {e}. Continuing without cache...")
-            redis_client = None
-    
-    return redis_client
+            self.stats['failures'] += 1
+            self.breaker.record_failure()
+            logger.error(f"Redis {name} error: {e}")
+            return default
+        self.breaker.record_success()
+        return result
 
-def close_redis():
-    """Close Redis connection"""
-    global redis_client
-    if redis_client:
+    async def ping(self) -> bool:
+        return bool(await self._call("ping", self.client.ping, default=False))
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._call("get", lambda: self.client.get(key))
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
+        return bool(await self._call("set", lambda: self.client.set(key, value, ex=ex), default=False))
+
+    async def delete(self, *keys: str) -> Optional[int]:
+        """Number of keys removed, or None if Redis is unavailable"""
+        return await self._call("delete", lambda: self.client.delete(*keys))
+
+    async def exists(self, *keys: str) -> int:
+        return await self._call("exists", lambda: self.client.exists(*keys), default=0)
+
+    async def mget(self, keys: Sequence[str]) -> List[Optional[str]]:
+        """Get many keys in one round trip (missing keys -> None)"""
+        if not keys:
+            return []
+        result = await self._call("mget", lambda: self.client.mget(list(keys)))
+        return result if result is not None else [None] * len(keys)
+
+    async def mset(self, mapping: Dict[str, str], ex: Optional[int] = None) -> bool:
+        """Set many keys (with optional TTL) in one pipelined round trip"""
+        if not mapping:
+            return True
+
+        async def run():
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ex)
+            return await pipe.execute()
+
+        return await self._call("mset", run) is not None
+
+    async def evalsha(self, sha: str, script: str, keys: Sequence[str], args: Sequence[Any]) -> Any:
+        """
+        Run a cached Lua script (loaded with EVAL on first use)
+
+        Returns:
+            The script result, or None if Redis is unavailable
+        """
+        async def run():
+            from redis.exceptions import NoScriptError
+            try:
+                return await self.client.evalsha(sha, len(keys), *keys, *args)
+            except NoScriptError:
+                return await self.client.eval(script, len(keys), *keys, *args)
+
+        return await self._call("evalsha", run)
+
+    async def delete_matching(self, pattern: str) -> Optional[int]:
+        """Delete all keys matching a glob pattern (SCAN, never KEYS); None if Redis is unavailable"""
+        async def run():
+            keys = [key async for key in self.client.scan_iter(match=pattern, count=500)]
+            return await self.client.delete(*keys) if keys else 0
+
+        return await self._call("delete_matching", run)
+
+    async def aclose(self):
         try:
-            redis_client.close()
-            logger.info("👋 Redis connection closed")
+            await self.client.aclose()
+            if self.pool is not None:
+                await self.pool.disconnect()
         except Exception as e:
             logger.warning(f"⚠️ Redis close failed: {e}")
-        finally:
-            redis_client = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'circuit': self.breaker.state, 'circuit_trips': self.breaker.trips}
+
+
+# Global Redis client
+redis_client: Optional[AsyncRedisClient] = None
+
+
+def get_redis() -> Optional[AsyncRedisClient]:
+    """
+    Get the shared async Redis client
+    Returns None if Redis is not configured (graceful degradation)
+    """
+    return redis_client
+
+
+def create_async_redis_client():
+    """
+    Create a dedicated redis.asyncio client for long-lived async consumers (e.g. pub/sub)
+    Returns None if REDIS_URL is not configured
+    """
+    if not os.environ.get("REDIS_URL"):
+        return None
+    import redis.asyncio as aioredis
+    return aioredis.from_url(
+        REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=5,
+        retry_on_timeout=True,
+        health_check_interval=30
+    )
+
 
 async def init_redis():
-    """Initialize Redis connection"""
+    """Initialize the shared Redis client"""
+    global redis_client
+    if os.environ.get("REDIS_BACKEND", "").lower() == "fake":
+        redis_client = AsyncRedisClient(FakeRedis())
+        logger.info("ℹ️  Using in-process fake Redis backend (REDIS_BACKEND=fake)")
+        return
     # Only try to connect if REDIS_URL is explicitly set
-    if os.environ.get("REDIS_URL"):
-        get_redis_client()
-    else:
+    if not os.environ.get("REDIS_URL"):
         logger.info("ℹ️  Redis not configured (REDIS_URL not set). Skipping Redis initialization.")
+        return
+
+    redis_client = AsyncRedisClient.from_url(REDIS_URL)
+    if await redis_client.ping():
+        logger.info(f"✅ Redis connected successfully at {REDIS_URL}")
+    else:
+        logger.warning("⚠️ Redis connection failed. Continuing without cache until it becomes reachable...")
+
 
 async def close_redis_async():
-    """Async wrapper for closing Redis"""
-    close_redis()
+    """Close the shared Redis client and its connection pool"""
+    global redis_client
+    if redis_client:
+        await redis_client.aclose()
+        logger.info("👋 Redis connection closed")
+        redis_client = None
 
 
 async def get_redis_health() -> bool:
     """
     Check Redis health for readiness probe
-    
+
     Returns:
         bool: True if Redis is healthy, False otherwise
     """
-    try:
-        client = get_redis_client()
-        if client:
-            client.ping()
-            return True
-        return False
-    except Exception as e:
-        logger.error(f"Redis health check failed: {e}")
+    client = get_redis()
+    if client is None:
         return False
+    return await client.ping()
 
 
 # Utility functions for common Redis operations
-def cache_set(key: str, value: str, expire_seconds: int = 3600) -> bool:
+async def cache_set(key: str, value: str, expire_seconds: int = 3600) -> bool:
     """
     Set a value in Redis cache
     Returns True if successful, False otherwise
     """
-    try:
-        client = get_redis_client()
-        if client:
-            client.setex(key, expire_seconds, value)
-            return True
-    except Exception as e:
-        logger.error(f"Redis cache_set error: {e}")
-    return False
+    client = get_redis()
+    return await client.set(key, value, ex=expire_seconds) if client else False
+
 
-def cache_get(key: str) -> Optional[str]:
+async def cache_get(key: str) -> Optional[str]:
     """
     Get a value from Redis cache
     Returns None if key doesn't exist or Redis unavailable
     """
-    try:
-        client = get_redis_client()
-        if client:
-            return client.get(key)
-    except Exception as e:
-        logger.error(f"Redis cache_get error: {e}")
-    return None
+    client = get_redis()
+    return await client.get(key) if client else None
+
+
+async def cache_mget(keys: Sequence[str]) -> List[Optional[str]]:
+    """
+    Get several values in one round trip
+    Returns None for each missing key (all None if Redis unavailable)
+    """
+    client = get_redis()
+    return await client.mget(keys) if client else [None] * len(keys)
+
+
+async def cache_mset(mapping: Dict[str, str], expire_seconds: int = 3600) -> bool:
+    """
+    Set several values (pipelined) with a shared TTL
+    Returns True if successful, False otherwise
+    """
+    client = get_redis()
+    return await client.mset(mapping, ex=expire_seconds) if client else False
+
 
-def cache_delete(key: str) -> bool:
+async def cache_delete(key: str) -> bool:
     """
     Delete a key from Redis cache
     Returns True if successful, False otherwise
     """
-    try:
-        client = get_redis_client()
-        if client:
-            client.delete(key)
-            return True
-    except Exception as e:
-        logger.error(f"Redis cache_delete error: {e}")
-    return False
+    client = get_redis()
+    if client is None:
+        return False
+    return await client.delete(key) is not None
+
 
-def cache_exists(key: str) -> bool:
+async def cache_exists(key: str) -> bool:
     """
     Check if a key exists in Redis cache
     """
-    try:
-        client = get_redis_client()
-        if client:
-            return client.exists(key) > 0
-    except Exception as e:
-        logger.error(f"Redis cache_exists error: {e}")
-    return False
+    client = get_redis()
+    return await client.exists(key) > 0 if client else False
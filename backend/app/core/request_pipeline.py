@@ -0,0 +1,235 @@
+"""
+Request Pipeline - Versioning, authentication, rate limiting and security headers
+
+One pure ASGI middleware replaces the former stack of BaseHTTPMiddleware
+layers (security headers, auth + rate limiting, API versioning). Each
+BaseHTTPMiddleware layer ran the endpoint in a separate task and copied the
+response body through a memory stream, which cost throughput and delayed
+SSE/streaming chunks. Here:
+
+- legacy /api/* paths are routed to /api/v1/* in place (scope["path"])
+- public, auth and SSE routes are looked up in tables built once at import
+- 401/429 are answered directly, everything else goes straight to the app
+- headers are injected into http.response.start; the body is never buffered
+
+WebSocket and lifespan scopes pass through untouched.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, State
+
+from .token_cache import request_claims
+from .versioning import APIVersion, DeprecationInfo, VersionUsage, get_versioned_path, is_versioned_path
+
+logger = logging.getLogger(__name__)
+
+# Public endpoints (no auth required but rate limited)
+PUBLIC_PATHS = frozenset({
+    "/api/health",
+    "/api/health/live",
+    "/api/health/ready",
+    "/api/health/startup",
+    "/api/health/metrics",
+    "/api/v1/health",  # Versioned health endpoint - public
+    "/api/v1/health/live",
+    "/api/v1/health/ready",
+    "/api/v1/health/startup",
+    "/api/v1/health/metrics",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/",
+    "/metrics",
+    "/api/metrics",  # Prometheus metrics endpoint - public
+    "/api/v1/metrics",  # V1 metrics endpoint - public
+    "/api/rate-limits/limits",
+    "/api/rate-limits/health",
+    "/api/metrics/performance",  # Performance tracking - no auth needed
+    "/api/metrics/health",
+    "/api/v1/metrics/health",  # V1 metrics health - public
+    "/api/settings/github-config",  # GitHub config status check - no auth needed (no sensitive data)
+    "/api/github/import",  # GitHub import - allow public repo imports without auth
+    "/api/github/import/status",  # Import status - no auth needed
+    "/api/version",  # API version info - public
+    "/api/v1/version",  # API version info - public
+    "/api/migration-guide",  # Migration guide - public
+    "/api/v1/migration-guide",  # Migration guide - public
+    "/api/version/stats",  # Version stats - public
+    "/api/v1/version/stats",  # Version stats - public
+    "/api/v1/multi-agents/types",  # Agent types list - public for UI dropdown
+    "/api/github/oauth/status",  # GitHub OAuth status - public (no sensitive data)
+    "/api/v1/github/oauth/status",  # V1 GitHub OAuth status - public
+    "/api/v1/github/admin/github-pat/store",  # Store GitHub PAT - public for setup
+    "/api/v1/github/admin/github-pat/status",  # Check PAT status - public
+    "/api/v1/github/admin/github-oauth/store",  # Store OAuth credentials - public for setup
+    "/api/v1/github/admin/github-oauth/status",  # Check OAuth status - public
+    "/api/v1/github/admin/github-oauth/credentials",  # Get OAuth credentials - public
+})
+
+# Auth endpoints (no auth required for login/register but rate limited)
+AUTH_PATHS = frozenset({"/api/auth/login", "/api/auth/register", "/api/v1/auth/login", "/api/v1/auth/register"})
+
+# Public path prefixes (no auth required for paths starting with these)
+PUBLIC_PATH_PREFIXES = (
+    "/api/github/import/check-directory/",  # Directory availability check - no auth needed
+)
+
+# SSE endpoints that pass token as query parameter (EventSource can't send headers)
+# These endpoints handle their own authentication via query param
+SSE_PATH_PREFIXES = (
+    "/api/v1/github-pat/import-progress/",
+    "/api/github-pat/import-progress/",  # Legacy
+)
+
+# Route-class lookup tables: exact paths and prefixes that skip the auth check
+OPEN_PATHS = PUBLIC_PATHS | AUTH_PATHS
+OPEN_PATH_PREFIXES = PUBLIC_PATH_PREFIXES + SSE_PATH_PREFIXES
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
+SECURITY_HEADERS: RawHeaders = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"permissions-policy", b"geolocation=(), microphone=(), camera=()"),
+]
+VERSIONED_HEADERS: RawHeaders = SECURITY_HEADERS + [(b"api-version", APIVersion.CURRENT.encode())]
+DEPRECATED_HEADERS: RawHeaders = SECURITY_HEADERS + [
+    (b"deprecation", b"true"),
+    (b"sunset", DeprecationInfo.get_sunset_header().encode()),
+    (b"warning", f'299 - "{DeprecationInfo.WARNING_MESSAGE}"'.encode()),
+]
+
+
+def requires_auth(path: str) -> bool:
+    """True if an /api/ path needs a Bearer token"""
+    return path not in OPEN_PATHS and not path.startswith(OPEN_PATH_PREFIXES)
+
+
+def token_claims(token: str, state: Optional[State] = None) -> Optional[Dict[str, Any]]:
+    """
+    Verified claims of a JWT for rate limiting (user id and role)
+
+    Uses the verified-token cache and stores the claims on the request state,
+    where get_current_user picks them up instead of verifying again.
+    Invalid tokens return None - the endpoint dependencies reject them.
+    """
+    try:
+        return request_claims(state, token)
+    except Exception as e:
+        # Log for monitoring but don't block request
+        logger.debug(f"Token decode failed in rate limiter: {str(e)}")
+        return None
+
+
+def _with_headers(headers: RawHeaders, extra: RawHeaders) -> RawHeaders:
+    """Response headers with `extra` set (replacing headers of the same name)"""
+    names = {name for name, _ in extra}
+    return [(name, value) for name, value in headers if name not in names] + extra
+
+
+class RequestPipelineMiddleware:
+    """Pure ASGI middleware: API versioning, auth check, rate limiting, security headers"""
+
+    def __init__(self, app, rate_limiter=None, enable_redirect: bool = True, log_usage: bool = True):
+        """
+        Args:
+            app: ASGI application
+            rate_limiter: Limiter with check_rate_limit() (default: the global AdvancedRateLimiter)
+            enable_redirect: Route /api/* to /api/v1/* (backward compatibility)
+            log_usage: Count API version usage for migration tracking
+        """
+        self.app = app
+        if rate_limiter is None:
+            from .rate_limiter import rate_limiter
+        self.rate_limiter = rate_limiter
+        self.enable_redirect = enable_redirect
+        self.version_usage = VersionUsage(log_usage)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        extra_headers = SECURITY_HEADERS
+
+        if path.startswith("/api/"):
+            if is_versioned_path(path):
+                self.version_usage.record(path, versioned=True)
+                extra_headers = VERSIONED_HEADERS
+            elif self.enable_redirect:
+                self.version_usage.record(path, versioned=False)
+                # Route internally to /api/v1/* (same request, no redirect round trip)
+                scope["path"] = get_versioned_path(path)
+                extra_headers = DEPRECATED_HEADERS + [
+                    (b"link", f'</api/{APIVersion.CURRENT}{path[4:]}>; rel="successor-version"'.encode())
+                ]
+            path = scope["path"]
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = _with_headers(list(message.get("headers", ())), extra_headers)
+            await send(message)
+
+        if path.startswith("/api/"):
+            rejection = await self._check_request(scope, path)
+            if rejection is not None:
+                await rejection(scope, receive, send_with_headers)
+                return
+
+        await self.app(scope, receive, send_with_headers)
+
+    async def _check_request(self, scope, path: str) -> Optional[JSONResponse]:
+        """Auth check for protected routes and rate limiting; returns the rejection response"""
+        user_id = None
+        user_role = "user"
+
+        if requires_auth(path):
+            auth_header = Headers(scope=scope).get("authorization")
+            if not auth_header or not auth_header.startswith("Bearer "):
+                return JSONResponse(
+                    status_code=401,
+                    content={"detail": "Authentication required", "type": "auth_required"}
+                )
+
+            parts = auth_header.split(" ")
+            token = parts[1] if len(parts) == 2 else None
+            if not token:
+                return JSONResponse(
+                    status_code=401,
+                    content={"detail": "Invalid token format", "type": "auth_invalid"}
+                )
+
+            # Extract user info for rate limiting (invalid tokens are rejected by the endpoints)
+            claims = token_claims(token, State(scope.setdefault("state", {})))
+            if claims is not None:
+                user_id = claims.get("sub")
+                user_role = claims.get("role", "user")
+
+        allowed = await self.rate_limiter.check_rate_limit(
+            request=Request(scope),
+            user_id=user_id,
+            user_role=user_role,
+            is_ai_call="/api/chat/" in path
+        )
+        if not allowed:
+            return JSONResponse(
+                status_code=429,
+                content={
+                    "detail": "Rate limit exceeded. Please try again later.",
+                    "type": "rate_limit_exceeded",
+                    "retry_after": "60"
+                },
+                headers={"Retry-After": "60"}
+            )
+        return None
+
+    def get_stats(self) -> dict:
+        """Get API version usage statistics"""
+        return self.version_usage.get_stats()
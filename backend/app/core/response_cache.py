@@ -0,0 +1,258 @@
+"""
+AI Response Cache - Opt-in caching of deterministic AI calls
+
+Auto-summaries, documentation prompts and research questions are often sent
+again with identical (or nearly identical) prompts. Callers opt in by passing
+`cache_scope` (usually the user id) to AIManager.generate_response; the
+response is then cached under
+(scope, provider, model, normalized messages, params).
+
+- Exact mode: a dedicated CacheManager (LRU, TTL, entry/byte limits,
+  single-flight for concurrent identical calls)
+- Semantic mode (optional): on an exact miss, the prompt is embedded with the
+  RAG embedding function and a cached response of the same scope/model whose
+  prompt has cosine similarity >= threshold is reused
+
+Scopes never share entries, so one user can never receive a response cached
+for another. Streams are never cached. Hits, misses, tokens and dollars
+saved are reported to the token tracker.
+
+Configuration (environment):
+    AI_RESPONSE_CACHE              false disables the cache entirely
+    AI_RESPONSE_CACHE_TTL          seconds (default: 3600)
+    AI_RESPONSE_CACHE_MAX_ENTRIES  default: 2000
+    AI_RESPONSE_CACHE_MB           default: 64
+    AI_RESPONSE_CACHE_SEMANTIC     true enables embedding-similarity lookups
+    AI_RESPONSE_CACHE_SIMILARITY   cosine similarity for a semantic hit (default: 0.95)
+"""
+import asyncio
+import logging
+import os
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .cache_manager import CacheManager, MISSING, make_key
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "ai_responses"
+DEFAULT_TTL = 3600
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_MB = 64
+DEFAULT_SIMILARITY = 0.95
+SEMANTIC_ENTRIES_PER_BUCKET = 200
+MAX_SEMANTIC_BUCKETS = 1000
+
+
+def normalize_messages(messages: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """(role, content) pairs with line endings and surrounding whitespace normalized"""
+    normalized = []
+    for msg in messages:
+        content = msg.get("content") or ""
+        if not isinstance(content, str):
+            content = str(content)
+        content = "\n".join(line.rstrip() for line in content.strip().splitlines())
+        normalized.append((msg.get("role", "user"), content))
+    return normalized
+
+
+def _prompt_text(normalized: List[Tuple[str, str]]) -> str:
+    return "\n\n".join(f"{role}: {content}" for role, content in normalized)
+
+
+class ResponseCache:
+    """Exact and optional embedding-similarity cache for AI responses"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        ttl_seconds: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+        semantic: bool = False,
+        similarity_threshold: float = DEFAULT_SIMILARITY,
+        embed: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        usage_tracker: Any = None
+    ):
+        """
+        Args:
+            enabled: Master switch (disabled = every call goes to the provider)
+            ttl_seconds: Default time-to-live of cached responses
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum approximate size of all cached responses
+            semantic: Enable embedding-similarity lookups on exact misses
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            embed: Embedding function (default: the RAG system's sentence-transformers model)
+            usage_tracker: Receives hit/miss events (default: token_tracker)
+        """
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.semantic = semantic
+        self.similarity_threshold = similarity_threshold
+        self.cache = CacheManager(max_size=max_entries, default_ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+        self._embed = embed
+        self._usage_tracker = usage_tracker
+        # bucket (scope, provider, model, params) -> recent (prompt embedding, exact key)
+        self._vectors: "OrderedDict[str, Deque[Tuple[Any, str]]]" = OrderedDict()
+
+        self.stats = {
+            'hits': 0,
+            'semantic_hits': 0,
+            'misses': 0,
+            'bypassed': 0,
+            'embedding_errors': 0
+        }
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Create a response cache configured from AI_RESPONSE_CACHE_* variables"""
+        return cls(
+            enabled=os.environ.get("AI_RESPONSE_CACHE", "true").lower() != "false",
+            ttl_seconds=float(os.environ.get("AI_RESPONSE_CACHE_TTL", DEFAULT_TTL)),
+            max_entries=int(os.environ.get("AI_RESPONSE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_bytes=int(float(os.environ.get("AI_RESPONSE_CACHE_MB", DEFAULT_MAX_MB)) * 1024 * 1024),
+            semantic=os.environ.get("AI_RESPONSE_CACHE_SEMANTIC", "false").lower() == "true",
+            similarity_threshold=float(os.environ.get("AI_RESPONSE_CACHE_SIMILARITY", DEFAULT_SIMILARITY))
+        )
+
+    @property
+    def usage_tracker(self):
+        if self._usage_tracker is None:
+            from .token_tracker import token_tracker
+            self._usage_tracker = token_tracker
+        return self._usage_tracker
+
+    async def get_or_generate(
+        self,
+        scope: str,
+        provider: str,
+        model: str,
+        messages: List[Dict[str, Any]],
+        params: Dict[str, Any],
+        generate: Callable[[], Awaitable[Dict[str, Any]]],
+        ttl_seconds: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Return a cached response or generate (and cache) a new one
+
+        Args:
+            scope: Isolation scope (e.g. user id); entries are never shared across scopes
+            provider: Provider name
+            model: Model name
+            messages: Chat messages sent to the provider
+            params: Other parameters that change the answer (e.g. ultra_thinking)
+            generate: Performs the provider call on a miss
+            ttl_seconds: TTL for this response (default: cache TTL)
+
+        Returns:
+            The response; cached responses carry `cached: "exact" | "semantic"`
+        """
+        if not self.enabled:
+            self.stats['bypassed'] += 1
+            return await generate()
+
+        normalized = normalize_messages(messages)
+        bucket = make_key(scope, provider, model, params)
+        key = make_key(bucket, normalized)
+        outcome = "hit"
+        generated = None
+
+        async def load():
+            nonlocal outcome, generated
+            if self.semantic:
+                match = await self._semantic_lookup(bucket, normalized)
+                if match is not None:
+                    outcome = "semantic_hit"
+                    return match
+            outcome = "miss"
+            response = generated = await generate()
+            if not response.get("content"):
+                return None  # Nothing worth caching (negative caching disabled)
+            response = {k: v for k, v in response.items() if k != "cached"}
+            if self.semantic:
+                await self._remember_vector(bucket, normalized, key)
+            return response
+
+        response = await self.cache.get_or_set(
+            key, load, ttl_seconds=ttl_seconds or self.ttl_seconds, namespace=NAMESPACE, negative_ttl=None
+        )
+        if response is None:
+            # Empty answer (not cached) - a caller that joined the in-flight load retries itself
+            return generated if generated is not None else await generate()
+        self.stats['misses' if outcome == "miss" else outcome + 's'] += 1
+        self.usage_tracker.track_cache_event(outcome, model, response.get("usage"))
+        if outcome == "miss":
+            return dict(response)  # callers may modify the response; the cached copy stays intact
+        logger.info(f"💾 AI response cache {outcome.replace('_', ' ')}: {provider}/{model}")
+        return {**response, "cached": "semantic" if outcome == "semantic_hit" else "exact"}
+
+    async def _semantic_lookup(self, bucket: str, normalized: List[Tuple[str, str]]) -> Optional[Dict[str, Any]]:
+        candidates = self._vectors.get(bucket)
+        if not candidates:
+            return None
+        vector = await self._embed_prompt(normalized)
+        if vector is None:
+            return None
+
+        import numpy as np
+        matrix = np.stack([candidate for candidate, _ in candidates])
+        scores = matrix @ vector
+        for index in np.argsort(scores)[::-1]:
+            if scores[index] < self.similarity_threshold:
+                break
+            cached = self.cache.get(candidates[index][1], MISSING, namespace=NAMESPACE)
+            if cached is not MISSING and cached is not None:
+                return cached
+        return None
+
+    async def _remember_vector(self, bucket: str, normalized: List[Tuple[str, str]], key: str):
+        vector = await self._embed_prompt(normalized)
+        if vector is None:
+            return
+        candidates = self._vectors.get(bucket)
+        if candidates is None:
+            candidates = self._vectors[bucket] = deque(maxlen=SEMANTIC_ENTRIES_PER_BUCKET)
+            while len(self._vectors) > MAX_SEMANTIC_BUCKETS:
+                self._vectors.popitem(last=False)
+        else:
+            self._vectors.move_to_end(bucket)
+        candidates.append((vector, key))
+
+    async def _embed_prompt(self, normalized: List[Tuple[str, str]]):
+        """Unit-length prompt embedding (None if the embedding model is unavailable)"""
+        try:
+            if self._embed is None:
+                from .rag_system import get_embedding_function
+                self._embed = get_embedding_function()
+            # Sentence-transformers inference is CPU-bound - keep it off the event loop
+            embedding = (await asyncio.to_thread(self._embed, [_prompt_text(normalized)]))[0]
+        except Exception as e:
+            self.stats['embedding_errors'] += 1
+            logger.warning(f"⚠️ Response cache embedding failed: {e}")
+            return None
+
+        import numpy as np
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def clear(self):
+        """Drop all cached responses"""
+        self.cache.clear(NAMESPACE)
+        self._vectors.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get response cache statistics"""
+        cache_stats = self.cache.get_stats()
+        return {
+            **self.stats,
+            'enabled': self.enabled,
+            'semantic': self.semantic,
+            'entries': cache_stats['total_entries'],
+            'bytes': cache_stats['total_bytes'],
+            'coalesced': cache_stats['namespaces'].get(NAMESPACE, {}).get('coalesced', 0)
+        }
+
+
+# Global AI response cache
+response_cache = ResponseCache.from_env()
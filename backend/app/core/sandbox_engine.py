@@ -0,0 +1,323 @@
+"""
+Sandbox Engine - Concurrent, fair scheduling of sandbox executions
+
+Executions run on the event loop (asyncio subprocesses, see
+SandboxExecutor.execute_code_async), bounded by a global slot count and a
+per-language limit (JVM/Go toolchains are far heavier than a Python run).
+
+Waiting jobs are queued per user and dispatched round-robin across users,
+so one user submitting many programs cannot starve everyone else. Each user
+may have at most `max_queued_per_user` jobs waiting; further submissions are
+rejected with SandboxQueueFull (HTTP 429 in the API).
+
+Configuration (environment):
+    SANDBOX_MAX_CONCURRENCY      total parallel executions (default: 4)
+    SANDBOX_LANGUAGE_LIMITS      per-language caps, e.g. "java=1,go=2,csharp=1"
+    SANDBOX_MAX_QUEUED_PER_USER  waiting jobs per user (default: 5)
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+from .sandbox_executor import SandboxExecutor, sandbox_executor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_QUEUED_PER_USER = 5
+
+
+class SandboxQueueFull(Exception):
+    """Raised when a user already has the maximum number of queued executions"""
+    pass
+
+
+def _parse_language_limits(value: str) -> Dict[str, int]:
+    limits = {}
+    for item in value.split(","):
+        language, _, limit = item.partition("=")
+        if language.strip() and limit.strip().isdigit():
+            limits[language.strip()] = int(limit)
+    return limits
+
+
+class _Job:
+    __slots__ = (
+        "user_id", "language", "code", "timeout", "stdin_input", "notify",
+        "future", "task", "enqueued_at", "started_at"
+    )
+
+    def __init__(self, user_id, language, code, timeout, stdin_input, notify):
+        self.user_id = user_id
+        self.language = language
+        self.code = code
+        self.timeout = timeout
+        self.stdin_input = stdin_input
+        self.notify: Optional[Callable[[str, Any], None]] = notify
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.task: Optional[asyncio.Task] = None
+        self.enqueued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+
+
+class SandboxEngine:
+    """Per-language concurrency pools with per-user fair queues"""
+
+    def __init__(
+        self,
+        executor: Optional[SandboxExecutor] = None,
+        max_concurrency: Optional[int] = None,
+        language_limits: Optional[Dict[str, int]] = None,
+        max_queued_per_user: Optional[int] = None
+    ):
+        """
+        Args:
+            executor: Executor running the programs (default: global sandbox_executor)
+            max_concurrency: Total parallel executions
+            language_limits: Parallel executions per language (default: max_concurrency)
+            max_queued_per_user: Waiting jobs allowed per user
+        """
+        self.executor = executor or sandbox_executor
+        self.max_concurrency = max_concurrency or int(
+            os.environ.get("SANDBOX_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+        )
+        self.language_limits = language_limits if language_limits is not None else _parse_language_limits(
+            os.environ.get("SANDBOX_LANGUAGE_LIMITS", "")
+        )
+        self.max_queued_per_user = max_queued_per_user or int(
+            os.environ.get("SANDBOX_MAX_QUEUED_PER_USER", DEFAULT_MAX_QUEUED_PER_USER)
+        )
+
+        # user_id -> waiting jobs; order of keys is the round-robin order
+        self._queues: "OrderedDict[str, Deque[_Job]]" = OrderedDict()
+        self._running: Dict[str, int] = {}
+        self._running_total = 0
+
+        self.stats = {
+            'submitted': 0,
+            'started': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'rejected': 0,
+            'total_queue_ms': 0.0,
+            'max_queue_ms': 0.0,
+            'total_run_ms': 0.0
+        }
+
+    def language_limit(self, language: str) -> int:
+        return min(self.language_limits.get(language, self.max_concurrency), self.max_concurrency)
+
+    async def execute(
+        self,
+        user_id: str,
+        code: str,
+        language: str = "python",
+        timeout: Optional[int] = None,
+        stdin_input: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue an execution and wait for its result
+
+        Returns:
+            Executor result dict (stdout, stderr, exit_code, ...) plus queue_time
+
+        Raises:
+            SandboxQueueFull: the user already has max_queued_per_user jobs waiting
+        """
+        job = self._submit(user_id, code, language, timeout, stdin_input)
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            # Client went away: drop the job from the queue or kill the program
+            self._cancel(job)
+            raise
+
+    async def stream(
+        self,
+        user_id: str,
+        code: str,
+        language: str = "python",
+        timeout: Optional[int] = None,
+        stdin_input: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Queue an execution and yield its progress as events
+
+        Yields dicts with an "event" key: queued, started, stdout, stderr,
+        then complete (result) or error. Closing the iterator cancels the job.
+
+        Raises:
+            SandboxQueueFull: the user already has max_queued_per_user jobs waiting
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        job = self._submit(
+            user_id, code, language, timeout, stdin_input,
+            notify=lambda event, data: events.put_nowait((event, data))
+        )
+        try:
+            yield {"event": "queued", "position": self.queue_position(job)}
+            while True:
+                event, data = await events.get()
+                if event in ("stdout", "stderr"):
+                    yield {"event": event, "data": data}
+                elif event == "started":
+                    yield {"event": "started", "queue_time": data}
+                elif event == "complete":
+                    yield {"event": "complete", "result": data}
+                    return
+                else:
+                    yield {"event": "error", "error": data}
+                    return
+        finally:
+            if not job.future.done():
+                self._cancel(job)
+
+    def queue_position(self, job: _Job) -> int:
+        """Number of the user's own jobs ahead of this one (0 = next), -1 if not queued"""
+        queue = self._queues.get(job.user_id)
+        if not queue or job not in queue:
+            return -1
+        return list(queue).index(job)
+
+    def _submit(self, user_id, code, language, timeout, stdin_input, notify=None) -> _Job:
+        queue = self._queues.get(user_id)
+        if queue is not None and len(queue) >= self.max_queued_per_user:
+            self.stats['rejected'] += 1
+            self._record_rejection()
+            raise SandboxQueueFull(
+                f"Too many queued executions ({len(queue)}); wait for running programs to finish"
+            )
+
+        job = _Job(user_id, language, code, timeout, stdin_input, notify)
+        self._queues.setdefault(user_id, deque()).append(job)
+        self.stats['submitted'] += 1
+        self._dispatch()
+        self._update_gauges(language)
+        return job
+
+    def _dispatch(self):
+        """Start waiting jobs while slots are free, round-robin across users"""
+        while self._running_total < self.max_concurrency and self._queues:
+            for user_id, queue in self._queues.items():
+                job = queue[0]
+                if self._running.get(job.language, 0) < self.language_limit(job.language):
+                    break
+            else:
+                return  # every user's next job waits for a busy language
+
+            queue.popleft()
+            if queue:
+                self._queues.move_to_end(user_id)
+            else:
+                del self._queues[user_id]
+            self._start(job)
+
+    def _start(self, job: _Job):
+        job.started_at = time.monotonic()
+        queue_ms = (job.started_at - job.enqueued_at) * 1000
+        self.stats['total_queue_ms'] += queue_ms
+        self.stats['max_queue_ms'] = max(self.stats['max_queue_ms'], queue_ms)
+        self.stats['started'] += 1
+
+        self._running[job.language] = self._running.get(job.language, 0) + 1
+        self._running_total += 1
+        if job.notify:
+            job.notify("started", round(queue_ms / 1000, 3))
+        job.task = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: _Job):
+        on_output = (lambda stream, text: job.notify(stream, text)) if job.notify else None
+        try:
+            result = await self.executor.execute_code_async(
+                code=job.code,
+                language=job.language,
+                timeout=job.timeout,
+                stdin_input=job.stdin_input,
+                on_output=on_output
+            )
+            result["queue_time"] = round(job.started_at - job.enqueued_at, 3)
+            self.stats['completed'] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+            if job.notify:
+                job.notify("complete", result)
+        except asyncio.CancelledError:
+            self.stats['cancelled'] += 1
+            if not job.future.done():
+                job.future.cancel()
+            if job.notify:
+                job.notify("error", "Execution cancelled")
+        except Exception as e:
+            logger.error(f"❌ Sandbox job failed for user {job.user_id}: {e}")
+            self.stats['failed'] += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+            if job.notify:
+                job.notify("error", str(e))
+        finally:
+            run_seconds = time.monotonic() - job.started_at
+            self.stats['total_run_ms'] += run_seconds * 1000
+            self._running[job.language] -= 1
+            self._running_total -= 1
+            self._record_job(job, run_seconds)
+            self._dispatch()
+            self._update_gauges(job.language)
+
+    def _cancel(self, job: _Job):
+        queue = self._queues.get(job.user_id)
+        if queue is not None and job in queue:
+            queue.remove(job)
+            if not queue:
+                del self._queues[job.user_id]
+            self.stats['cancelled'] += 1
+            job.future.cancel()
+            self._update_gauges(job.language)
+        elif job.task is not None and not job.task.done():
+            job.task.cancel()
+
+    def _update_gauges(self, language: str):
+        try:
+            from .prometheus_metrics import sandbox_jobs
+            queued = sum(1 for queue in self._queues.values() for job in queue if job.language == language)
+            sandbox_jobs.labels(language=language, state="queued").set(queued)
+            sandbox_jobs.labels(language=language, state="running").set(self._running.get(language, 0))
+        except ImportError:
+            pass
+
+    def _record_job(self, job: _Job, run_seconds: float):
+        try:
+            from .prometheus_metrics import MetricsCollector
+            MetricsCollector.record_sandbox_job(job.language, job.started_at - job.enqueued_at, run_seconds)
+        except ImportError:
+            pass
+
+    def _record_rejection(self):
+        try:
+            from .prometheus_metrics import sandbox_rejections_total
+            sandbox_rejections_total.inc()
+        except ImportError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get engine statistics"""
+        started = self.stats['started']
+        finished = started - self._running_total
+        return {
+            **{key: value for key, value in self.stats.items() if not key.startswith('total_')},
+            'max_queue_ms': round(self.stats['max_queue_ms'], 2),
+            'max_concurrency': self.max_concurrency,
+            'language_limits': dict(self.language_limits),
+            'running': {language: count for language, count in self._running.items() if count},
+            'queued': sum(len(queue) for queue in self._queues.values()),
+            'queued_users': len(self._queues),
+            'avg_queue_ms': round(self.stats['total_queue_ms'] / started, 2) if started else 0.0,
+            'avg_run_ms': round(self.stats['total_run_ms'] / finished, 2) if finished else 0.0
+        }
+
+
+# Global sandbox engine
+sandbox_engine = SandboxEngine()
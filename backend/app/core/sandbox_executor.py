@@ -2,6 +2,8 @@
 Secure Code Execution Engine - Subprocess-based Sandbox
 Provides safe, isolated code execution without Docker
 """
+import asyncio
+import codecs
 import sys
 import subprocess
 if sys.platform == "win32":
@@ -13,14 +15,25 @@ import time
 import logging
 import uuid
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Callable, Optional, List
 from pathlib import Path
 import shutil
 
+from .compile_cache import CompileCache, compile_cache
+
 IS_WINDOWS = sys.platform == 'win32'
 
 logger = logging.getLogger(__name__)
 
+# Callback receiving ("stdout" | "stderr", text) while a program runs
+OutputCallback = Callable[[str, str], None]
+OUTPUT_CHUNK_SIZE = 4096
+# Output kept per stream; the rest is read and discarded so the program never blocks
+MAX_OUTPUT_BYTES = 1024 * 1024
+# After a kill, how long to wait for the pipes to close (a process that left
+# the sandbox's process group could hold them open forever)
+DRAIN_GRACE_SECONDS = 1.0
+
 # Import resource module only on Unix systems
 if sys.platform != 'win32':
     import resource
@@ -29,6 +42,83 @@ else:
     HAS_RESOURCE = False
     logger.info("Running on Windows - resource limits not available")
 
+
+def make_limits_preexec(language: str, cpu_seconds: int, memory_limit_mb: int):
+    """
+    Build the preexec_fn applying resource limits in the child (None on Windows)
+    """
+    if not HAS_RESOURCE:
+        return None
+    
+    # Java/JVM, Go, and TypeScript (ts-node) reserve large address spaces
+    limit_address_space = language not in ("java", "go", "typescript")
+    
+    def set_limits():
+        """Set resource limits (Unix only)"""
+        try:
+            if limit_address_space:
+                # Set memory limit (in bytes)
+                memory_bytes = memory_limit_mb * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+            
+            # Set CPU time limit
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+            
+            # Disable core dumps
+            resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+            
+            # Limit number of processes
+            resource.setrlimit(resource.RLIMIT_NPROC, (50, 50))
+        except Exception:
+            pass  # Runs in the forked child - logging here is not safe
+    
+    return set_limits
+
+
+async def spawn_process(
+    cmd: List[str],
+    cwd: Path,
+    env: Optional[Dict[str, str]] = None,
+    stdin=asyncio.subprocess.DEVNULL,
+    preexec_fn=None,
+    pass_fds=()
+) -> asyncio.subprocess.Process:
+    """
+    Start a sandboxed subprocess with piped stdout/stderr
+    """
+    kwargs: Dict[str, Any] = {
+        "stdin": stdin,
+        "stdout": asyncio.subprocess.PIPE,
+        "stderr": asyncio.subprocess.PIPE,
+        "cwd": str(cwd),
+        "env": env
+    }
+    if preexec_fn is not None:
+        kwargs["preexec_fn"] = preexec_fn
+    if pass_fds:
+        kwargs["pass_fds"] = pass_fds
+    if IS_WINDOWS:
+        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+    else:
+        # Own process group, so background children can be killed with the program
+        kwargs["start_new_session"] = True
+    return await asyncio.create_subprocess_exec(*cmd, **kwargs)
+
+
+def kill_process_group(process: asyncio.subprocess.Process):
+    """
+    Kill a sandboxed program and everything it started (just the process on Windows)
+    """
+    if IS_WINDOWS:
+        if process.returncode is None:
+            process.kill()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass  # Group already gone
+
+
 class SandboxExecutor:
     """
     Secure code executor using subprocess with resource limits
@@ -130,14 +220,11 @@ class SandboxExecutor:
     }
     
     def __init__(self):
-        # Use cross-platform temp directory
-        if sys.platform == 'win32':
-            # Windows: Use system temp directory
-            temp_base = Path(tempfile.gettempdir())
-            self.workspace_dir = temp_base / "xionimus_sandbox"
-        else:
-            # Unix: Use /tmp
-            self.workspace_dir = Path("tempfile.gettempdir() + os.sepxionimus_sandbox")
+        # Use cross-platform temp directory (must be absolute: programs run with cwd=exec_dir)
+        self.workspace_dir = Path(tempfile.gettempdir()).resolve() / "xionimus_sandbox"
+        self.compile_cache = compile_cache
+        # Optional pre-started interpreters (app/core/interpreter_pool.py), attached at startup
+        self.interpreter_pool = None
         
         # Create directory with parents if needed
         self.workspace_dir.mkdir(parents=True, exist_ok=True)
@@ -149,6 +236,22 @@ class SandboxExecutor:
         language: str = "python",
         timeout: Optional[int] = None,
         stdin_input: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute code synchronously (scripts/tests only)
+        
+        Async code must await execute_code_async() (or go through the
+        sandbox engine) so the event loop is never blocked.
+        """
+        return asyncio.run(self.execute_code_async(code, language, timeout, stdin_input))
+    
+    async def execute_code_async(
+        self,
+        code: str,
+        language: str = "python",
+        timeout: Optional[int] = None,
+        stdin_input: Optional[str] = None,
+        on_output: Optional[OutputCallback] = None
     ) -> Dict[str, Any]:
         """
         Execute code in a secure subprocess
@@ -158,6 +261,7 @@ class SandboxExecutor:
             language: Programming language (python, javascript, bash, cpp, c, csharp, java, go, php, ruby, perl, typescript)
             timeout: Max execution time in seconds
             stdin_input: Optional stdin input
+            on_output: Optional callback(stream, text) receiving stdout/stderr while the program runs
             
         Returns:
             Dict with stdout, stderr, exit_code, execution_time
@@ -178,9 +282,6 @@ class SandboxExecutor:
         exec_dir = self.workspace_dir / execution_id
         exec_dir.mkdir(exist_ok=True)
         
-        # Store language for later reference in _execute_with_limits
-        self._current_language = language
-        
         try:
             # Write code to temporary file
             code_file = exec_dir / f"code{config['extension']}"
@@ -216,7 +317,7 @@ class SandboxExecutor:
             # Handle compiled languages
             if config.get("compiled", False):
                 logger.info(f"🔨 Compiling {language} code...")
-                compile_result = self._compile_code(
+                compile_result = await self._compile_code(
                     code_file=code_file,
                     config=config,
                     exec_dir=exec_dir,
@@ -259,13 +360,26 @@ class SandboxExecutor:
             # Execute with resource limits
             start_time = time.time()
             
-            result = self._execute_with_limits(
-                cmd=cmd,
-                timeout=timeout,
-                memory_limit_mb=config["memory_limit_mb"],
-                stdin_input=stdin_input,
-                cwd=exec_dir
-            )
+            warm = self.interpreter_pool.acquire(language) if self.interpreter_pool else None
+            if warm is not None:
+                logger.info(f"   ⚡ Using pre-started {language} interpreter")
+                result = await self._execute_warm(
+                    warm,
+                    code_file=code_file,
+                    timeout=timeout,
+                    stdin_input=stdin_input,
+                    on_output=on_output
+                )
+            else:
+                result = await self._execute_with_limits(
+                    cmd=cmd,
+                    timeout=timeout,
+                    memory_limit_mb=config["memory_limit_mb"],
+                    stdin_input=stdin_input,
+                    cwd=exec_dir,
+                    language=language,
+                    on_output=on_output
+                )
             
             execution_time = time.time() - start_time
             
@@ -294,14 +408,14 @@ class SandboxExecutor:
                 "execution_id": execution_id
             }
         finally:
-            # Cleanup temporary directory
+            # Cleanup temporary directory (off the event loop - Go caches can be large)
             try:
-                shutil.rmtree(exec_dir)
+                await asyncio.to_thread(shutil.rmtree, exec_dir)
                 logger.debug(f"🗑️ Cleaned up execution directory: {execution_id}")
             except Exception as e:
                 logger.warning(f"⚠️ Cleanup failed for {execution_id}: {e}")
     
-    def _compile_code(
+    async def _compile_code(
         self,
         code_file: Path,
         config: Dict[str, Any],
@@ -314,6 +428,8 @@ class SandboxExecutor:
         Returns:
             Dict with success, binary_path, stderr, exit_code, class_name (for Java)
         """
+        env = None
+        class_name = None
         try:
             # Determine output binary name and compile command
             if language in ["cpp", "c"]:
@@ -323,7 +439,6 @@ class SandboxExecutor:
                 binary_path = exec_dir / "program.exe"
                 if IS_WINDOWS:
                     # Try dotnet first, then csc
-                    import shutil
                     if shutil.which("dotnet"):
                         compile_cmd = ["dotnet", "build", "-o", str(exec_dir), str(code_file)]
                     elif shutil.which("csc"):
@@ -352,46 +467,11 @@ class SandboxExecutor:
             elif language == "go":
                 binary_path = exec_dir / "program"
                 # Set GOCACHE for Go build cache
-                import os
                 env = os.environ.copy()
                 env['GOCACHE'] = str(exec_dir / ".cache")
                 env['HOME'] = str(exec_dir)
                 # go build -o program code.go
                 compile_cmd = config["compile_command"] + [str(binary_path), str(code_file)]
-                
-                # Pass env to Popen
-                popen_kwargs = {
-                    "stdout": subprocess.PIPE,
-                    "stderr": subprocess.PIPE,
-                    "cwd": exec_dir,
-                    "env": env,
-                    "text": True
-                }
-                if IS_WINDOWS:
-                    popen_kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
-                
-                process = subprocess.Popen(compile_cmd, **popen_kwargs)
-                
-                stdout, stderr = process.communicate(timeout=30)
-                
-                if process.returncode == 0:
-                    logger.info(f"   ✅ Compilation successful")
-                    return {
-                        "success": True,
-                        "binary_path": binary_path,
-                        "stdout": stdout,
-                        "stderr": stderr,
-                        "exit_code": 0
-                    }
-                else:
-                    logger.error(f"   ❌ Compilation failed with exit code {process.returncode}")
-                    logger.error(f"   Stderr: {stderr}")
-                    return {
-                        "success": False,
-                        "stderr": stderr,
-                        "stdout": stdout,
-                        "exit_code": process.returncode
-                    }
             else:
                 return {
                     "success": False,
@@ -400,27 +480,51 @@ class SandboxExecutor:
             
             logger.info(f"   Compile command: {' '.join(compile_cmd)}")
             
-            # Run compilation
-            popen_kwargs = {
-                "stdout": subprocess.PIPE,
-                "stderr": subprocess.PIPE,
-                "cwd": exec_dir,
-                "text": True
-            }
-            if IS_WINDOWS:
-                popen_kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+            # Reuse a previous build of the same source and flags
+            cache_key = None
+            if self.compile_cache.enabled:
+                source = (java_file if language == "java" else code_file).read_bytes()
+                cache_key = CompileCache.make_key(language, compile_cmd, exec_dir, source)
+                cached = await self.compile_cache.restore(cache_key, exec_dir)
+                if cached is not None:
+                    logger.info(f"   ⚡ Compile cache hit (saved {cached.get('compile_ms', 0):.0f}ms)")
+                    result = {
+                        "success": True,
+                        "binary_path": binary_path,
+                        "stdout": "",
+                        "stderr": "",
+                        "exit_code": 0,
+                        "cached": True
+                    }
+                    if language == "java":
+                        result["class_name"] = class_name
+                    return result
             
-            process = subprocess.Popen(compile_cmd, **popen_kwargs)
+            # Run compilation
+            compile_start = time.time()
+            process = await self._run_process(compile_cmd, cwd=exec_dir, timeout=30, env=env)
+            compile_ms = (time.time() - compile_start) * 1000
             
-            stdout, stderr = process.communicate(timeout=30)
+            if process["timeout_occurred"]:
+                return {
+                    "success": False,
+                    "stderr": "Compilation timeout (30s exceeded)",
+                    "exit_code": -1
+                }
             
-            if process.returncode == 0:
-                logger.info(f"   ✅ Compilation successful")
+            if process["exit_code"] == 0:
+                logger.info(f"   ✅ Compilation successful ({compile_ms:.0f}ms)")
+                if cache_key is not None:
+                    if language == "java":
+                        artifacts = sorted(path.name for path in exec_dir.glob("*.class"))
+                    else:
+                        artifacts = [binary_path.name] if binary_path.is_file() else []
+                    await self.compile_cache.store(cache_key, exec_dir, artifacts, compile_ms)
                 result = {
                     "success": True,
                     "binary_path": binary_path,
-                    "stdout": stdout,
-                    "stderr": stderr,
+                    "stdout": process["stdout"],
+                    "stderr": process["stderr"],
                     "exit_code": 0
                 }
                 # For Java, pass the class name
@@ -428,21 +532,15 @@ class SandboxExecutor:
                     result["class_name"] = class_name
                 return result
             else:
-                logger.error(f"   ❌ Compilation failed with exit code {process.returncode}")
-                logger.error(f"   Stderr: {stderr}")
+                logger.error(f"   ❌ Compilation failed with exit code {process['exit_code']}")
+                logger.error(f"   Stderr: {process['stderr']}")
                 return {
                     "success": False,
-                    "stderr": stderr,
-                    "stdout": stdout,
-                    "exit_code": process.returncode
+                    "stderr": process["stderr"],
+                    "stdout": process["stdout"],
+                    "exit_code": process["exit_code"]
                 }
                 
-        except subprocess.TimeoutExpired:
-            return {
-                "success": False,
-                "stderr": "Compilation timeout (30s exceeded)",
-                "exit_code": -1
-            }
         except Exception as e:
             return {
                 "success": False,
@@ -470,94 +568,29 @@ class SandboxExecutor:
             logger.error(f"Error extracting Java class name: {e}")
             return None
     
-    def _execute_with_limits(
+    async def _execute_with_limits(
         self,
         cmd: List[str],
         timeout: int,
         memory_limit_mb: int,
         stdin_input: Optional[str],
-        cwd: Path
+        cwd: Path,
+        language: str = "",
+        on_output: Optional[OutputCallback] = None
     ) -> Dict[str, Any]:
         """
         Execute command with resource limits
         """
-        # Check if this is a Java, Go, or TypeScript execution (needs special handling for their runtimes)
-        is_java = len(cmd) > 0 and "java" in cmd[0]
-        is_go = hasattr(self, '_current_language') and self._current_language == "go"
-        is_typescript = hasattr(self, '_current_language') and self._current_language == "typescript"
-        
-        # Setup resource limits (works on Unix-like systems)
-        def set_limits():
-            """Set resource limits (Unix only)"""
-            if not HAS_RESOURCE:
-                # Windows doesn't support resource limits
-                logger.debug("Resource limits not available on Windows")
-                return
-            
-            try:
-                # For Java/JVM, Go, and TypeScript (ts-node), don't set AS (address space) limit
-                if not (is_java or is_go or is_typescript):
-                    # Set memory limit (in bytes)
-                    memory_bytes = memory_limit_mb * 1024 * 1024
-                    if HAS_RESOURCE: resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
-                
-                # Set CPU time limit
-                if HAS_RESOURCE: resource.setrlimit(resource.RLIMIT_CPU, (timeout, timeout))
-                
-                # Disable core dumps
-                if HAS_RESOURCE: resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
-                
-                # Limit number of processes
-                if HAS_RESOURCE: resource.setrlimit(resource.RLIMIT_NPROC, (50, 50))
-            except Exception as e:
-                logger.warning(f"⚠️ Could not set resource limits: {e}")
-        
         try:
-            # Execute subprocess with timeout
-            # Note: preexec_fn is Unix-only, not available on Windows
-            popen_kwargs = {
-                "stdout": subprocess.PIPE,
-                "stderr": subprocess.PIPE,
-                "stdin": subprocess.PIPE if stdin_input else None,
-                "cwd": cwd,
-                "text": True
-            }
-            
-            # Add preexec_fn only on Unix systems
-            if HAS_RESOURCE:
-                popen_kwargs["preexec_fn"] = set_limits
-            
-            # Add Windows-specific flag to prevent console window
-            if IS_WINDOWS:
-                popen_kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
-            
-            process = subprocess.Popen(cmd, **popen_kwargs)
-            
-            # Wait for completion with timeout
-            try:
-                stdout, stderr = process.communicate(
-                    input=stdin_input,
-                    timeout=timeout
-                )
-                
-                return {
-                    "stdout": stdout,
-                    "stderr": stderr,
-                    "exit_code": process.returncode,
-                    "timeout_occurred": False
-                }
-                
-            except subprocess.TimeoutExpired:
-                # Kill process if timeout
-                process.kill()
-                process.wait()
-                
-                return {
-                    "stdout": "",
-                    "stderr": f"Execution timeout ({timeout}s exceeded)",
-                    "exit_code": -1,
-                    "timeout_occurred": True
-                }
+            result = await self._run_process(
+                cmd,
+                cwd=cwd,
+                timeout=timeout,
+                stdin_input=stdin_input,
+                preexec_fn=make_limits_preexec(language, timeout, memory_limit_mb),
+                on_output=on_output
+            )
+            return self._mark_timeout(result, timeout)
                 
         except Exception as e:
             return {
@@ -567,6 +600,146 @@ class SandboxExecutor:
                 "timeout_occurred": False
             }
     
+    async def _execute_warm(
+        self,
+        warm,
+        code_file: Path,
+        timeout: int,
+        stdin_input: Optional[str],
+        on_output: Optional[OutputCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Run code in a pre-started interpreter from the interpreter pool
+        """
+        try:
+            warm.dispatch(code_file)
+            result = await self._communicate(warm.process, timeout, stdin_input, on_output)
+            return self._mark_timeout(result, timeout)
+        except Exception as e:
+            kill_process_group(warm.process)
+            return {
+                "stdout": "",
+                "stderr": f"Execution error: {str(e)}",
+                "exit_code": -1,
+                "timeout_occurred": False
+            }
+    
+    @staticmethod
+    def _mark_timeout(result: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+        if result["timeout_occurred"]:
+            result["stderr"] = (result["stderr"] + "\n" if result["stderr"] else "") + f"Execution timeout ({timeout}s exceeded)"
+            result["exit_code"] = -1
+        return result
+    
+    async def _run_process(
+        self,
+        cmd: List[str],
+        cwd: Path,
+        timeout: float,
+        env: Optional[Dict[str, str]] = None,
+        stdin_input: Optional[str] = None,
+        preexec_fn=None,
+        on_output: Optional[OutputCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a subprocess without blocking the event loop
+        
+        stdout/stderr are read incrementally (and forwarded to `on_output`);
+        on timeout the process is killed and the output read so far is returned.
+        """
+        process = await spawn_process(
+            cmd,
+            cwd=cwd,
+            env=env,
+            stdin=asyncio.subprocess.PIPE if stdin_input else asyncio.subprocess.DEVNULL,
+            preexec_fn=preexec_fn
+        )
+        return await self._communicate(process, timeout, stdin_input, on_output)
+    
+    async def _communicate(
+        self,
+        process: asyncio.subprocess.Process,
+        timeout: float,
+        stdin_input: Optional[str] = None,
+        on_output: Optional[OutputCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Feed stdin, collect stdout/stderr and wait for a started process
+        """
+        output = {"stdout": [], "stderr": []}
+        
+        async def pump(stream: asyncio.StreamReader, name: str):
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            remaining = MAX_OUTPUT_BYTES
+            while True:
+                chunk = await stream.read(OUTPUT_CHUNK_SIZE)
+                if remaining <= 0:
+                    if not chunk:
+                        return
+                    continue  # Over the limit: keep the pipe flowing, drop the output
+                truncated = len(chunk) > remaining
+                text = decoder.decode(chunk[:remaining], final=not chunk or truncated)
+                remaining -= len(chunk)
+                if truncated:
+                    text += f"\n[output truncated after {MAX_OUTPUT_BYTES} bytes]\n"
+                if text:
+                    output[name].append(text)
+                    if on_output is not None:
+                        on_output(name, text)
+                if not chunk:
+                    return
+        
+        async def feed_stdin():
+            if process.stdin is None:
+                return
+            try:
+                if stdin_input:
+                    process.stdin.write(stdin_input.encode())
+                    await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Program exited without reading stdin
+            finally:
+                process.stdin.close()
+        
+        # Readers run alongside the stdin write (a program echoing its input
+        # would otherwise block on a full stdout pipe) and survive a timeout
+        # so the pipes can still be read to EOF after the kill
+        readers = [
+            asyncio.ensure_future(pump(process.stdout, "stdout")),
+            asyncio.ensure_future(pump(process.stderr, "stderr"))
+        ]
+        
+        async def communicate():
+            await asyncio.gather(feed_stdin(), *(asyncio.shield(reader) for reader in readers))
+            return await process.wait()
+        
+        timeout_occurred = False
+        try:
+            exit_code = await asyncio.wait_for(communicate(), timeout)
+        except asyncio.TimeoutError:
+            timeout_occurred = True
+            exit_code = -1
+        finally:
+            if process.returncode is None or not all(reader.done() for reader in readers):
+                # Timeout or cancellation (client went away), or background
+                # children still holding the pipes: never leave anything running
+                kill_process_group(process)
+            # wait() only returns once the pipes are closed, so drain them first
+            _, pending = await asyncio.wait(readers, timeout=DRAIN_GRACE_SECONDS)
+            for reader in pending:
+                reader.cancel()
+            if not pending:
+                await process.wait()
+            elif process.returncode is None:
+                logger.warning(f"⚠️ Sandbox process {process.pid} did not exit after kill")
+        
+        return {
+            "stdout": "".join(output["stdout"]),
+            "stderr": "".join(output["stderr"]),
+            "exit_code": exit_code,
+            "timeout_occurred": timeout_occurred
+        }
+    
     def get_supported_languages(self) -> List[Dict[str, Any]]:
         """Get list of supported languages with metadata"""
         return [
@@ -0,0 +1,302 @@
+"""
+Stream Backplane - Cross-process fan-out for WebSocket session messages
+
+With several uvicorn workers, the sockets of one chat session can live in
+different processes. The backplane lets the worker that produces a message
+reach every worker hosting a socket for that session:
+
+- InMemoryBackplane: single process (default) and tests. Several instances
+  sharing one InMemoryBus behave like separate workers.
+- RedisBackplane: Redis pub/sub, one channel per session. A worker only
+  subscribes to sessions it has local sockets for.
+
+Messages are always delivered to local sockets directly; the backplane only
+carries them to *other* workers, so local latency is unchanged.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Set
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "xionimus:stream:session:"
+PRESENCE_KEY = "xionimus:stream:workers"
+PRESENCE_TTL_SECONDS = 45
+PRESENCE_REFRESH_SECONDS = 15
+
+DeliverCallback = Callable[[str, Dict[str, Any]], Any]
+
+
+class StreamBackplane:
+    """Base class for session message backplanes"""
+
+    def __init__(self):
+        self.worker_id = uuid4().hex[:12]
+        self._deliver: Optional[DeliverCallback] = None
+        self._presence: Dict[str, Any] = {"sessions": 0, "connections": 0}
+        self.published = 0
+        self.received = 0
+
+    async def start(self, deliver: DeliverCallback):
+        """Start receiving; `deliver(session_id, message)` sends to local sockets"""
+        self._deliver = deliver
+
+    async def stop(self):
+        """Stop receiving and release resources"""
+        self._deliver = None
+
+    def publish(self, session_id: str, message: Dict[str, Any]):
+        """Publish a message to other workers (non-blocking, order-preserving)"""
+        raise NotImplementedError
+
+    async def subscribe(self, session_id: str):
+        """Start receiving messages for a session (first local socket connected)"""
+        raise NotImplementedError
+
+    async def unsubscribe(self, session_id: str):
+        """Stop receiving messages for a session (last local socket gone)"""
+        raise NotImplementedError
+
+    def remote_listeners(self, session_id: str) -> int:
+        """Best-known number of other workers listening to a session"""
+        return 0
+
+    async def report_presence(self, sessions: int, connections: int):
+        """Record this worker's local connection counts for cluster status"""
+        self._presence = {"sessions": sessions, "connections": connections}
+
+    async def cluster_status(self) -> Dict[str, Any]:
+        """Connection counts across all workers"""
+        return {
+            "backplane": self.name,
+            "workers": 1,
+            "cluster_sessions": self._presence["sessions"],
+            "cluster_connections": self._presence["connections"]
+        }
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    def _deliver_remote(self, session_id: str, message: Dict[str, Any]):
+        if self._deliver is not None:
+            self.received += 1
+            self._deliver(session_id, message)
+
+
+class InMemoryBus:
+    """Shared state for InMemoryBackplane instances in one process"""
+
+    def __init__(self):
+        self.subscribers: Dict[str, Set["InMemoryBackplane"]] = {}
+        self.presence: Dict[str, Dict[str, Any]] = {}
+
+
+class InMemoryBackplane(StreamBackplane):
+    """Backplane for a single process; pass a shared bus to simulate workers"""
+
+    def __init__(self, bus: Optional[InMemoryBus] = None):
+        super().__init__()
+        self.bus = bus or InMemoryBus()
+
+    async def stop(self):
+        for subscribers in self.bus.subscribers.values():
+            subscribers.discard(self)
+        self.bus.presence.pop(self.worker_id, None)
+        await super().stop()
+
+    def publish(self, session_id: str, message: Dict[str, Any]):
+        others = [b for b in self.bus.subscribers.get(session_id, ()) if b is not self]
+        if not others:
+            return
+        self.published += 1
+        loop = asyncio.get_running_loop()
+        for backplane in others:
+            # call_soon keeps FIFO order, like a pub/sub channel
+            loop.call_soon(backplane._deliver_remote, session_id, message)
+
+    async def subscribe(self, session_id: str):
+        self.bus.subscribers.setdefault(session_id, set()).add(self)
+
+    async def unsubscribe(self, session_id: str):
+        subscribers = self.bus.subscribers.get(session_id)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del self.bus.subscribers[session_id]
+
+    def remote_listeners(self, session_id: str) -> int:
+        return len([b for b in self.bus.subscribers.get(session_id, ()) if b is not self])
+
+    async def report_presence(self, sessions: int, connections: int):
+        await super().report_presence(sessions, connections)
+        self.bus.presence[self.worker_id] = dict(self._presence)
+
+    async def cluster_status(self) -> Dict[str, Any]:
+        presence = self.bus.presence or {self.worker_id: self._presence}
+        return {
+            "backplane": self.name,
+            "workers": len(presence),
+            "cluster_sessions": sum(p["sessions"] for p in presence.values()),
+            "cluster_connections": sum(p["connections"] for p in presence.values())
+        }
+
+
+class RedisBackplane(StreamBackplane):
+    """Redis pub/sub backplane - one channel per session"""
+
+    def __init__(self, client, max_outbound: int = 10000):
+        """
+        Args:
+            client: redis.asyncio client (decode_responses=True)
+            max_outbound: Bound on messages waiting to be published
+        """
+        super().__init__()
+        self.client = client
+        self._pubsub = None
+        self._outbound: "asyncio.Queue" = asyncio.Queue(maxsize=max_outbound)
+        self._tasks = []
+        self._subscribed: Set[str] = set()
+        self._receivers: Dict[str, int] = {}
+        self.dropped = 0
+
+    async def start(self, deliver: DeliverCallback):
+        await super().start(deliver)
+        await self.client.ping()
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        # A per-worker channel keeps the pubsub connection open before any session subscribes
+        await self._pubsub.subscribe(f"xionimus:stream:worker:{self.worker_id}")
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._publish_loop()),
+            asyncio.create_task(self._presence_loop())
+        ]
+        logger.info(f"✅ Redis stream backplane started (worker {self.worker_id})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            await self.client.hdel(PRESENCE_KEY, self.worker_id)
+            if self._pubsub is not None:
+                await self._pubsub.aclose()
+            await self.client.aclose()
+        except Exception as e:
+            logger.warning(f"⚠️ Redis backplane shutdown: {e}")
+        await super().stop()
+
+    def publish(self, session_id: str, message: Dict[str, Any]):
+        try:
+            self._outbound.put_nowait((session_id, message))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"⚠️ Backplane outbound queue full, dropping message for {session_id}")
+
+    async def subscribe(self, session_id: str):
+        if session_id in self._subscribed or self._pubsub is None:
+            return
+        self._subscribed.add(session_id)
+        await self._pubsub.subscribe(CHANNEL_PREFIX + session_id)
+
+    async def unsubscribe(self, session_id: str):
+        if session_id not in self._subscribed or self._pubsub is None:
+            return
+        self._subscribed.discard(session_id)
+        await self._pubsub.unsubscribe(CHANNEL_PREFIX + session_id)
+
+    def remote_listeners(self, session_id: str) -> int:
+        return self._receivers.get(session_id, 0)
+
+    async def _publish_loop(self):
+        while True:
+            session_id, message = await self._outbound.get()
+            envelope = json.dumps({"origin": self.worker_id, "message": message})
+            try:
+                receivers = await self.client.publish(CHANNEL_PREFIX + session_id, envelope)
+                # PUBLISH counts our own subscription too
+                own = 1 if session_id in self._subscribed else 0
+                self._receivers[session_id] = max(0, receivers - own)
+                self.published += 1
+            except Exception as e:
+                logger.error(f"Redis backplane publish failed: {e}")
+
+    async def _listen(self):
+        while True:
+            try:
+                async for raw in self._pubsub.listen():
+                    if raw.get("type") != "message":
+                        continue
+                    channel = raw["channel"]
+                    if not channel.startswith(CHANNEL_PREFIX):
+                        continue
+                    envelope = json.loads(raw["data"])
+                    if envelope.get("origin") == self.worker_id:
+                        continue  # Already delivered locally
+                    self._deliver_remote(channel[len(CHANNEL_PREFIX):], envelope["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis backplane listener error: {e}")
+                await asyncio.sleep(1)
+
+    async def report_presence(self, sessions: int, connections: int):
+        await super().report_presence(sessions, connections)
+        await self._write_presence()
+
+    async def _write_presence(self):
+        try:
+            await self.client.hset(
+                PRESENCE_KEY,
+                self.worker_id,
+                json.dumps({**self._presence, "ts": time.time()})
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Backplane presence update failed: {e}")
+
+    async def _presence_loop(self):
+        while True:
+            await self._write_presence()
+            await asyncio.sleep(PRESENCE_REFRESH_SECONDS)
+
+    async def cluster_status(self) -> Dict[str, Any]:
+        try:
+            entries = await self.client.hgetall(PRESENCE_KEY)
+        except Exception as e:
+            logger.warning(f"⚠️ Backplane status unavailable: {e}")
+            return await super().cluster_status()
+
+        now = time.time()
+        workers = [json.loads(v) for v in entries.values()]
+        workers = [w for w in workers if now - w.get("ts", 0) <= PRESENCE_TTL_SECONDS]
+        return {
+            "backplane": self.name,
+            "workers": len(workers),
+            "cluster_sessions": sum(w["sessions"] for w in workers),
+            "cluster_connections": sum(w["connections"] for w in workers)
+        }
+
+
+async def create_backplane() -> StreamBackplane:
+    """
+    Create the configured backplane
+
+    STREAM_BACKPLANE=redis|memory; defaults to redis when REDIS_URL is set.
+    Falls back to in-memory if Redis is unreachable.
+    """
+    from .redis_client import create_async_redis_client
+
+    mode = os.environ.get("STREAM_BACKPLANE", "").lower()
+    if mode == "memory" or (not mode and not os.environ.get("REDIS_URL")):
+        return InMemoryBackplane()
+
+    client = create_async_redis_client()
+    if client is None:
+        logger.warning("⚠️ STREAM_BACKPLANE=redis but REDIS_URL not set - using in-memory backplane")
+        return InMemoryBackplane()
+    return RedisBackplane(client)
@@ -0,0 +1,155 @@
+"""
+Stream Delivery - Backpressure-aware WebSocket fan-out with chunk coalescing
+
+Each socket gets a SocketSender: a bounded queue drained by its own writer
+task. Producers enqueue without awaiting the network, so one slow client
+never stalls the AI stream or other sockets. A socket whose queue overflows
+is treated as a slow consumer and dropped.
+
+ChunkCoalescer batches provider deltas into frames, flushing when the buffer
+reaches `max_bytes` or `max_delay` seconds after the first buffered delta.
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Defaults: ~one frame per display refresh, or earlier for bursts
+DEFAULT_FLUSH_BYTES = 2048
+DEFAULT_FLUSH_DELAY = 0.016
+DEFAULT_QUEUE_SIZE = 256
+
+
+class SocketSender:
+    """Bounded send queue + writer task for one WebSocket"""
+
+    def __init__(
+        self,
+        websocket: Any,
+        on_drop: Callable[["SocketSender", str], None],
+        max_queue: int = DEFAULT_QUEUE_SIZE
+    ):
+        self.websocket = websocket
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_queue)
+        self._on_drop = on_drop
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.sent = 0
+
+    def start(self):
+        """Start the writer task"""
+        self._task = asyncio.create_task(self._writer())
+
+    def offer(self, message: Dict[str, Any]) -> bool:
+        """
+        Enqueue a message without blocking
+
+        Returns:
+            False if the socket is closed or its queue is full (slow consumer)
+        """
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            self._drop("send queue full")
+            return False
+
+    async def _writer(self):
+        try:
+            while True:
+                message = await self.queue.get()
+                try:
+                    await self.websocket.send_json(message)
+                    self.sent += 1
+                finally:
+                    self.queue.task_done()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._drop(f"send failed: {e}")
+
+    def _drop(self, reason: str):
+        if self.closed:
+            return
+        self.closed = True
+        self._on_drop(self, reason)
+
+    async def drain(self, timeout: float = 5.0):
+        """Wait until all queued messages are sent (or timeout)"""
+        if self.closed:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out draining WebSocket send queue")
+
+    def stop(self):
+        """Stop the writer task; queued messages are discarded"""
+        self.closed = True
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+
+class ChunkCoalescer:
+    """
+    Coalesces stream deltas into chunk frames by size and time window
+
+    Example:
+        coalescer = ChunkCoalescer(publish)
+        for delta in deltas:
+            coalescer.add(delta)
+        coalescer.flush()
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[Dict[str, Any]], Any],
+        max_bytes: int = DEFAULT_FLUSH_BYTES,
+        max_delay: float = DEFAULT_FLUSH_DELAY
+    ):
+        """
+        Args:
+            publish: Sync callable receiving each chunk frame
+            max_bytes: Flush once buffered text reaches this size (UTF-8 bytes)
+            max_delay: Flush at most this many seconds after the first buffered delta
+        """
+        self._publish = publish
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self._parts: List[str] = []
+        self._size = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.frames = 0
+        self.deltas = 0
+
+    def add(self, text: str):
+        """Buffer a delta, flushing if the size threshold is reached"""
+        if not text:
+            return
+        self.deltas += 1
+        self._parts.append(text)
+        self._size += len(text.encode("utf-8"))
+        if self._size >= self.max_bytes:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self.flush)
+
+    def flush(self):
+        """Publish buffered text as one chunk frame"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._parts:
+            return
+        content = "".join(self._parts)
+        self._parts = []
+        self._size = 0
+        self.frames += 1
+        self._publish({
+            "type": "chunk",
+            "content": content,
+            "chunk_id": self.frames
+        })
@@ -2,11 +2,22 @@
 Task Queue System for Agent Orchestration
 Manages agent tasks with priorities, dependencies, and retry logic
 
+Event-driven: dequeue() waits on a future that enqueue/promotion resolves
+instead of polling. Failed tasks are retried after their delay from a timer
+heap (mark_failed returns immediately). Cancelling a ready task marks its
+heap entry as removed (lazy deletion, O(log n) amortized). Finished tasks
+are kept for inspection up to TASK_QUEUE_MAX_FINISHED, oldest dropped first.
+TaskWorkerPool runs TASK_QUEUE_WORKERS workers pulling tasks concurrently.
+
 Location: /backend/app/core/task_queue.py
 """
 import asyncio
+import itertools
 import logging
-from typing import Dict, List, Any, Optional, Set
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timezone
 from enum import Enum
 from dataclasses import dataclass, field
@@ -15,11 +26,15 @@ import heapq
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_FINISHED = 1000
+DEFAULT_WORKERS = 4
+
 
 class TaskStatus(Enum):
     """Task execution status"""
     PENDING = "pending"          # Waiting for execution
     READY = "ready"             # Dependencies satisfied, ready to execute
+    SCHEDULED = "scheduled"     # Failed, waiting for its retry delay
     RUNNING = "running"         # Currently executing
     COMPLETED = "completed"     # Successfully completed
     FAILED = "failed"           # Failed (may retry)
@@ -114,19 +129,47 @@ class TaskQueue:
     Task queue with priority, dependency resolution, and retry logic
     """
     
-    def __init__(self):
+    def __init__(self, max_finished: int = DEFAULT_MAX_FINISHED):
+        """
+        Args:
+            max_finished: Completed/failed/cancelled/skipped tasks kept (oldest dropped first)
+        """
+        self.max_finished = max_finished
+        
         # All tasks by ID
         self._tasks: Dict[str, Task] = {}
         
-        # Priority queue of ready tasks (heapq)
-        self._ready_queue: List[Task] = []
+        # Priority queue of ready tasks: heap of [-priority, seq, task]
+        # Cancelled entries keep their slot with task=None (lazy deletion)
+        self._ready_queue: List[list] = []
+        self._ready_entries: Dict[str, list] = {}
+        self._removed_entries = 0
+        self._seq = itertools.count()
+        
+        # Retry timer heap: (ready_at monotonic, seq, task_id); one loop timer armed for the earliest
+        self._scheduled: List[Tuple[float, int, str]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at: Optional[float] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Consumers blocked in dequeue() / join()
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._idle_waiters: List[asyncio.Future] = []
         
         # Tasks by status
         self._pending_tasks: Set[str] = set()
         self._running_tasks: Set[str] = set()
+        self._scheduled_tasks: Set[str] = set()
         self._completed_tasks: Set[str] = set()
         self._failed_tasks: Set[str] = set()
         
+        # Finished task IDs in finish order (bounded retention)
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        # Pending tasks listing each task ID as a dependency
+        self._pending_refs: Dict[str, int] = {}
+        # Evicted completed/skipped tasks that pending tasks still depend on
+        self._evicted_satisfied: Set[str] = set()
+        
         # Dependency graph: task_id -> set of task_ids that depend on it
         self._dependents: Dict[str, Set[str]] = {}
         
@@ -135,11 +178,17 @@ class TaskQueue:
             "total_enqueued": 0,
             "total_completed": 0,
             "total_failed": 0,
-            "total_retries": 0
+            "total_retries": 0,
+            "total_evicted": 0
         }
         
         logger.info("📋 Task Queue initialized")
     
+    @classmethod
+    def from_env(cls) -> "TaskQueue":
+        """Create a queue configured from TASK_QUEUE_MAX_FINISHED"""
+        return cls(max_finished=int(os.environ.get("TASK_QUEUE_MAX_FINISHED", DEFAULT_MAX_FINISHED)))
+    
     async def enqueue(self, task: Task) -> None:
         """
         Add task to queue
@@ -156,19 +205,19 @@ class TaskQueue:
         self._stats["total_enqueued"] += 1
         
         # Set status based on dependencies
-        if task.dependencies:
+        if task.dependencies and not self._are_dependencies_satisfied(task):
             task.status = TaskStatus.PENDING
             self._pending_tasks.add(task.task_id)
+            for dep_id in task.dependencies:
+                self._pending_refs[dep_id] = self._pending_refs.get(dep_id, 0) + 1
             
-            # Register as dependent
+            # Register as dependent of every unfinished dependency
             for dep_id in task.dependencies:
-                if dep_id not in self._dependents:
-                    self._dependents[dep_id] = set()
-                self._dependents[dep_id].add(task.task_id)
+                if not self._is_dependency_satisfied(dep_id):
+                    self._dependents.setdefault(dep_id, set()).add(task.task_id)
         else:
-            # No dependencies - ready to execute
-            task.status = TaskStatus.READY
-            heapq.heappush(self._ready_queue, task)
+            # No (open) dependencies - ready to execute
+            self._push_ready(task)
         
         logger.info(
             f"📝 Task enqueued: {task.agent_type} "
@@ -177,15 +226,15 @@ class TaskQueue:
     
     async def dequeue(self, timeout: Optional[float] = None) -> Optional[Task]:
         """
-        Get next ready task (highest priority)
-        Returns None if no tasks available
+        Get next ready task (highest priority, FIFO within a priority)
+        Waits until a task is ready; returns None if the timeout expires first
         """
-        start_time = datetime.now(timezone.utc)
+        deadline = None if timeout is None else time.monotonic() + timeout
         
         while True:
-            # Check if we have ready tasks
-            if self._ready_queue:
-                task = heapq.heappop(self._ready_queue)
+            self._promote_due()
+            task = self._pop_ready()
+            if task is not None:
                 task.status = TaskStatus.RUNNING
                 task.started_at = datetime.now(timezone.utc)
                 
@@ -198,13 +247,164 @@ class TaskQueue:
                 return task
             
             # Check timeout
-            if timeout is not None:
-                elapsed = (datetime.now(timezone.utc) - start_time).total_seconds()
-                if elapsed >= timeout:
-                    return None
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
             
-            # Wait a bit and try again
-            await asyncio.sleep(0.1)
+            # Wait until a task becomes ready (enqueue, dependency, retry timer)
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                # Hand a wake-up we can no longer use to the next consumer
+                if waiter.done() and not waiter.cancelled() and self._ready_entries:
+                    self._wake_one()
+                raise
+            finally:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+    
+    async def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until no task is ready, scheduled for retry or running
+        Returns False if the timeout expired first
+        """
+        if self._is_idle():
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self._idle_waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if waiter in self._idle_waiters:
+                self._idle_waiters.remove(waiter)
+    
+    def _push_ready(self, task: Task) -> None:
+        task.status = TaskStatus.READY
+        entry = [-task.priority.value, next(self._seq), task]
+        self._ready_entries[task.task_id] = entry
+        heapq.heappush(self._ready_queue, entry)
+        self._wake_one()
+    
+    def _pop_ready(self) -> Optional[Task]:
+        while self._ready_queue:
+            task = heapq.heappop(self._ready_queue)[-1]
+            if task is None:
+                self._removed_entries -= 1
+                continue
+            del self._ready_entries[task.task_id]
+            return task
+        return None
+    
+    def _remove_ready(self, task_id: str) -> None:
+        """Drop a task from the ready heap (entry marked removed, heap compacted when half stale)"""
+        entry = self._ready_entries.pop(task_id, None)
+        if entry is None:
+            return
+        entry[-1] = None
+        self._removed_entries += 1
+        if self._removed_entries > 64 and self._removed_entries * 2 > len(self._ready_queue):
+            self._ready_queue = [entry for entry in self._ready_queue if entry[-1] is not None]
+            heapq.heapify(self._ready_queue)
+            self._removed_entries = 0
+    
+    def _wake_one(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+    
+    def _is_idle(self) -> bool:
+        return not (self._ready_entries or self._scheduled_tasks or self._running_tasks)
+    
+    def _notify_idle(self) -> None:
+        if not self._idle_waiters or not self._is_idle():
+            return
+        waiters, self._idle_waiters = self._idle_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+    
+    def _schedule_retry(self, task: Task, delay: float) -> None:
+        task.status = TaskStatus.SCHEDULED
+        self._scheduled_tasks.add(task.task_id)
+        heapq.heappush(self._scheduled, (time.monotonic() + delay, next(self._seq), task.task_id))
+        self._arm_timer()
+    
+    def _promote_due(self) -> None:
+        """Move retries whose delay has passed to the ready heap"""
+        now = time.monotonic()
+        while self._scheduled and self._scheduled[0][0] <= now:
+            _, _, task_id = heapq.heappop(self._scheduled)
+            task = self._tasks.get(task_id)
+            if task is None or task.status != TaskStatus.SCHEDULED:
+                continue  # Cancelled while waiting
+            self._scheduled_tasks.discard(task_id)
+            self._push_ready(task)
+        self._arm_timer()
+    
+    def _arm_timer(self) -> None:
+        """Keep one event-loop timer armed for the earliest scheduled retry"""
+        if not self._scheduled:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = self._timer_at = None
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Promoted by the next dequeue()
+        ready_at = self._scheduled[0][0]
+        if self._timer is not None and self._timer_loop is loop and self._timer_at <= ready_at:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(max(0.0, ready_at - time.monotonic()), self._on_timer)
+        self._timer_at = ready_at
+        self._timer_loop = loop
+    
+    def _on_timer(self) -> None:
+        self._timer = self._timer_at = None
+        self._promote_due()
+    
+    def _finish(self, task_id: str) -> None:
+        """Record a finished task and drop the oldest beyond max_finished"""
+        self._finished[task_id] = None
+        self._finished.move_to_end(task_id)
+        while len(self._finished) > self.max_finished:
+            old_id, _ = self._finished.popitem(last=False)
+            old_task = self._tasks.pop(old_id, None)
+            if (
+                old_id in self._pending_refs and old_task is not None
+                and old_task.status in [TaskStatus.COMPLETED, TaskStatus.SKIPPED]
+            ):
+                self._evicted_satisfied.add(old_id)
+            self._completed_tasks.discard(old_id)
+            self._failed_tasks.discard(old_id)
+            self._dependents.pop(old_id, None)
+            self._stats["total_evicted"] += 1
+    
+    def _leave_pending(self, task: Task) -> None:
+        """Remove a task from the pending set and release its dependency references"""
+        if task.task_id not in self._pending_tasks:
+            return
+        self._pending_tasks.discard(task.task_id)
+        for dep_id in task.dependencies:
+            refs = self._pending_refs.get(dep_id, 0) - 1
+            if refs > 0:
+                self._pending_refs[dep_id] = refs
+            else:
+                self._pending_refs.pop(dep_id, None)
+                self._evicted_satisfied.discard(dep_id)
     
     async def mark_completed(self, task_id: str, result: Any = None) -> None:
         """
@@ -220,7 +420,8 @@ class TaskQueue:
         task.completed_at = datetime.now(timezone.utc)
         task.result = result
         
-        # Update sets
+        # Update sets (tasks run without dequeue() are still in the ready heap)
+        self._remove_ready(task_id)
         self._running_tasks.discard(task_id)
         self._completed_tasks.add(task_id)
         
@@ -229,30 +430,35 @@ class TaskQueue:
         
         logger.info(
             f"✅ Task completed: {task.agent_type} "
-            f"(duration={task.duration():.2f}s)"
+            f"(duration={task.duration() or 0:.2f}s)"
         )
         
         # Check dependent tasks
         await self._check_dependents(task_id)
+        self._finish(task_id)
+        self._notify_idle()
     
     async def mark_failed(self, task_id: str, error: str) -> None:
         """
         Mark task as failed
-        May retry if retries available
+        May retry if retries available (after the retry delay, without blocking the caller)
         """
         if task_id not in self._tasks:
             logger.warning(f"⚠️ Task {task_id} not found")
             return
         
         task = self._tasks[task_id]
+        if task_id in self._finished:
+            logger.warning(f"⚠️ Task {task_id} already finished ({task.status.value})")
+            return
         task.error = error
+        task.status = TaskStatus.FAILED
+        self._remove_ready(task_id)
+        self._running_tasks.discard(task_id)
         
         # Check if can retry
         if task.can_retry():
             task.retry_count += 1
-            task.status = TaskStatus.READY
-            
-            # Re-queue with delay
             self._stats["total_retries"] += 1
             
             logger.warning(
@@ -260,16 +466,15 @@ class TaskQueue:
                 f"{task.agent_type}"
             )
             
-            # Add back to queue after delay
-            await asyncio.sleep(task.retry_delay * task.retry_count)
-            heapq.heappush(self._ready_queue, task)
+            # Re-queue after the (linearly growing) retry delay
+            delay = task.retry_delay * task.retry_count
+            if delay > 0:
+                self._schedule_retry(task, delay)
+            else:
+                self._push_ready(task)
         else:
             # No more retries
-            task.status = TaskStatus.FAILED
             task.completed_at = datetime.now(timezone.utc)
-            
-            # Update sets
-            self._running_tasks.discard(task_id)
             self._failed_tasks.add(task_id)
             
             # Update statistics
@@ -279,29 +484,23 @@ class TaskQueue:
             
             # Handle dependent tasks
             await self._handle_failed_task_dependents(task_id)
+            self._finish(task_id)
+        self._notify_idle()
     
     async def _check_dependents(self, completed_task_id: str) -> None:
         """
         Check if any dependent tasks can now run
         """
-        if completed_task_id not in self._dependents:
-            return
-        
-        # Get tasks that depend on this one
-        dependent_ids = self._dependents[completed_task_id].copy()
-        
-        for dep_id in dependent_ids:
-            if dep_id not in self._tasks:
+        for dep_id in self._dependents.pop(completed_task_id, ()):
+            dep_task = self._tasks.get(dep_id)
+            if dep_task is None or dep_task.status != TaskStatus.PENDING:
                 continue
             
-            dep_task = self._tasks[dep_id]
-            
             # Check if all dependencies are completed
             if self._are_dependencies_satisfied(dep_task):
                 # Move to ready queue
-                dep_task.status = TaskStatus.READY
-                self._pending_tasks.discard(dep_id)
-                heapq.heappush(self._ready_queue, dep_task)
+                self._leave_pending(dep_task)
+                self._push_ready(dep_task)
                 
                 logger.info(
                     f"🎯 Task now ready: {dep_task.agent_type} "
@@ -313,24 +512,18 @@ class TaskQueue:
         Handle tasks that depend on a failed task
         Skip non-blocking dependents, fail blocking ones
         """
-        if failed_task_id not in self._dependents:
-            return
-        
-        dependent_ids = self._dependents[failed_task_id].copy()
-        
-        for dep_id in dependent_ids:
-            if dep_id not in self._tasks:
+        for dep_id in self._dependents.pop(failed_task_id, ()):
+            dep_task = self._tasks.get(dep_id)
+            if dep_task is None or dep_task.status != TaskStatus.PENDING:
                 continue
             
-            dep_task = self._tasks[dep_id]
+            self._leave_pending(dep_task)
+            dep_task.completed_at = datetime.now(timezone.utc)
             
             if dep_task.blocking:
                 # Blocking task - fail it too
                 dep_task.status = TaskStatus.FAILED
                 dep_task.error = f"Dependency {failed_task_id} failed"
-                dep_task.completed_at = datetime.now(timezone.utc)
-                
-                self._pending_tasks.discard(dep_id)
                 self._failed_tasks.add(dep_id)
                 
                 logger.warning(
@@ -342,9 +535,6 @@ class TaskQueue:
             else:
                 # Non-blocking - skip it
                 dep_task.status = TaskStatus.SKIPPED
-                dep_task.completed_at = datetime.now(timezone.utc)
-                
-                self._pending_tasks.discard(dep_id)
                 
                 logger.info(
                     f"⏭️ Task skipped (non-blocking): {dep_task.agent_type}"
@@ -352,28 +542,26 @@ class TaskQueue:
                 
                 # Check if its dependents can run
                 await self._check_dependents(dep_id)
+            self._finish(dep_id)
     
     def _are_dependencies_satisfied(self, task: Task) -> bool:
         """Check if all task dependencies are completed"""
-        for dep_id in task.dependencies:
-            if dep_id not in self._tasks:
-                return False
-            
-            dep_task = self._tasks[dep_id]
-            
-            # Dependency must be completed or skipped
-            if dep_task.status not in [TaskStatus.COMPLETED, TaskStatus.SKIPPED]:
-                return False
-        
-        return True
+        return all(self._is_dependency_satisfied(dep_id) for dep_id in task.dependencies)
+    
+    def _is_dependency_satisfied(self, dep_id: str) -> bool:
+        """A dependency is satisfied once completed or skipped (evicted ones only while pending tasks need them)"""
+        dep_task = self._tasks.get(dep_id)
+        if dep_task is None:
+            return dep_id in self._evicted_satisfied
+        return dep_task.status in [TaskStatus.COMPLETED, TaskStatus.SKIPPED]
     
     def get_task(self, task_id: str) -> Optional[Task]:
         """Get task by ID"""
         return self._tasks.get(task_id)
     
     def get_ready_tasks(self) -> List[Task]:
-        """Get all ready tasks (sorted by priority)"""
-        return sorted(self._ready_queue, key=lambda t: t.priority.value, reverse=True)
+        """Get all ready tasks (in dequeue order)"""
+        return [entry[-1] for entry in sorted(self._ready_entries.values())]
     
     def get_running_tasks(self) -> List[Task]:
         """Get all currently running tasks"""
@@ -383,27 +571,34 @@ class TaskQueue:
         """Get all pending tasks (waiting for dependencies)"""
         return [self._tasks[tid] for tid in self._pending_tasks]
     
+    def get_scheduled_tasks(self) -> List[Task]:
+        """Get all tasks waiting for their retry delay"""
+        return [self._tasks[tid] for tid in self._scheduled_tasks]
+    
     def get_completed_tasks(self) -> List[Task]:
-        """Get all completed tasks"""
+        """Get all completed tasks (retained ones)"""
         return [self._tasks[tid] for tid in self._completed_tasks]
     
     def get_failed_tasks(self) -> List[Task]:
-        """Get all failed tasks"""
+        """Get all failed tasks (retained ones)"""
         return [self._tasks[tid] for tid in self._failed_tasks]
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get queue statistics"""
         return {
             "total_tasks": len(self._tasks),
-            "ready": len(self._ready_queue),
+            "ready": len(self._ready_entries),
             "running": len(self._running_tasks),
             "pending": len(self._pending_tasks),
+            "scheduled": len(self._scheduled_tasks),
             "completed": len(self._completed_tasks),
             "failed": len(self._failed_tasks),
+            "retained_finished": len(self._finished),
             "enqueued": self._stats["total_enqueued"],
             "total_completed": self._stats["total_completed"],
             "total_failed": self._stats["total_failed"],
             "total_retries": self._stats["total_retries"],
+            "total_evicted": self._stats["total_evicted"],
             "success_rate": (
                 self._stats["total_completed"] / self._stats["total_enqueued"]
                 if self._stats["total_enqueued"] > 0 else 0
@@ -417,18 +612,19 @@ class TaskQueue:
             "ready_tasks": [t.to_dict() for t in self.get_ready_tasks()],
             "running_tasks": [t.to_dict() for t in self.get_running_tasks()],
             "pending_tasks": [t.to_dict() for t in self.get_pending_tasks()],
+            "scheduled_tasks": [t.to_dict() for t in self.get_scheduled_tasks()],
             "failed_tasks": [t.to_dict() for t in self.get_failed_tasks()]
         }
     
     async def cancel_task(self, task_id: str) -> bool:
-        """Cancel a pending or ready task"""
+        """Cancel a pending, ready or scheduled task"""
         if task_id not in self._tasks:
             return False
         
         task = self._tasks[task_id]
         
-        # Can only cancel pending or ready tasks
-        if task.status not in [TaskStatus.PENDING, TaskStatus.READY]:
+        # Can only cancel tasks that are not running or finished
+        if task.status not in [TaskStatus.PENDING, TaskStatus.READY, TaskStatus.SCHEDULED]:
             logger.warning(
                 f"⚠️ Cannot cancel task with status {task.status.value}"
             )
@@ -437,11 +633,12 @@ class TaskQueue:
         task.status = TaskStatus.CANCELLED
         task.completed_at = datetime.now(timezone.utc)
         
-        # Remove from queues
-        self._pending_tasks.discard(task_id)
-        if task in self._ready_queue:
-            self._ready_queue.remove(task)
-            heapq.heapify(self._ready_queue)
+        # Remove from queues (scheduled heap entries are skipped when due)
+        self._leave_pending(task)
+        self._scheduled_tasks.discard(task_id)
+        self._remove_ready(task_id)
+        self._finish(task_id)
+        self._notify_idle()
         
         logger.info(f"🚫 Task cancelled: {task.agent_type}")
         return True
@@ -450,20 +647,107 @@ class TaskQueue:
         """Clear all tasks (for testing)"""
         self._tasks.clear()
         self._ready_queue.clear()
+        self._ready_entries.clear()
+        self._removed_entries = 0
+        self._scheduled.clear()
+        self._arm_timer()
         self._pending_tasks.clear()
         self._running_tasks.clear()
+        self._scheduled_tasks.clear()
         self._completed_tasks.clear()
         self._failed_tasks.clear()
+        self._finished.clear()
+        self._pending_refs.clear()
+        self._evicted_satisfied.clear()
         self._dependents.clear()
         self._stats = {
             "total_enqueued": 0,
             "total_completed": 0,
             "total_failed": 0,
-            "total_retries": 0
+            "total_retries": 0,
+            "total_evicted": 0
         }
+        self._notify_idle()
         logger.info("🧹 Task Queue cleared")
 
 
+class TaskWorkerPool:
+    """
+    Workers pulling tasks from a TaskQueue concurrently
+    The handler's return value completes the task; an exception fails (and may retry) it
+    """
+    
+    def __init__(
+        self,
+        queue: TaskQueue,
+        handler: Callable[[Task], Awaitable[Any]],
+        concurrency: Optional[int] = None
+    ):
+        """
+        Args:
+            queue: Queue to pull from
+            handler: Executes one task
+            concurrency: Number of workers (default: TASK_QUEUE_WORKERS or 4)
+        """
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency or int(os.environ.get("TASK_QUEUE_WORKERS", DEFAULT_WORKERS))
+        self._workers: List[asyncio.Task] = []
+        
+        self.stats = {
+            'processed': 0,
+            'failed': 0
+        }
+    
+    @property
+    def running(self) -> bool:
+        return any(not worker.done() for worker in self._workers)
+    
+    def start(self):
+        """Start the workers (requires a running event loop)"""
+        if self.running:
+            return
+        self._workers = [
+            asyncio.create_task(self._run(), name=f"task-worker-{i}") for i in range(self.concurrency)
+        ]
+        logger.info(f"✅ Task worker pool started ({self.concurrency} workers)")
+    
+    async def stop(self, drain: bool = True, timeout: float = 10.0):
+        """Stop the workers, by default after the queue has drained"""
+        if not self.running:
+            return
+        if drain and not await self.queue.join(timeout):
+            logger.error("❌ Task worker pool drain timed out")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("👋 Task worker pool stopped")
+    
+    async def _run(self):
+        while True:
+            task = await self.queue.dequeue()
+            try:
+                result = await self.handler(task)
+            except asyncio.CancelledError:
+                await self.queue.mark_failed(task.task_id, "Worker stopped")
+                raise
+            except Exception as e:
+                self.stats['failed'] += 1
+                await self.queue.mark_failed(task.task_id, str(e))
+            else:
+                self.stats['processed'] += 1
+                await self.queue.mark_completed(task.task_id, result)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker pool statistics"""
+        return {
+            **self.stats,
+            'workers': self.concurrency,
+            'running': self.running
+        }
+
+
 # Global queue instance
 _queue: Optional[TaskQueue] = None
 
@@ -472,7 +756,7 @@ def get_task_queue() -> TaskQueue:
     """Get or create global task queue instance"""
     global _queue
     if _queue is None:
-        _queue = TaskQueue()
+        _queue = TaskQueue.from_env()
     return _queue
 
 
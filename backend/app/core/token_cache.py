@@ -0,0 +1,243 @@
+"""
+Verified Token Cache - One JWT signature check per token per TTL
+
+The request pipeline verifies the Bearer token of every protected request
+(for rate limiting) and the get_current_user dependency needs the same
+claims. Verified claims are cached by SHA-256 of the token (the token itself
+is never stored) and handed from the pipeline to the dependency through
+request.state, so a request verifies its token at most once and repeated
+requests with the same token skip the HMAC check until the entry expires.
+
+An entry expires at min(token exp, verification time + TTL); expired tokens
+are never served from the cache. Revocation:
+
+- revoke(token, claims): a verified token is rejected until its exp (e.g. logout)
+- revoke_user(user_id): every token of the user issued before now is
+  rejected (e.g. deactivation, password change)
+- add_revocation_listener(): hooks called on every revocation (e.g. to
+  propagate it to other workers)
+
+Configuration (environment):
+    JWT_CACHE_TTL          seconds a verified token is trusted (default: 300, 0 disables the cache)
+    JWT_CACHE_MAX_ENTRIES  default: 10000
+    JWT_REVOKED_MAX_ENTRIES  revoked tokens remembered (default: 100000, soonest-expiring dropped first)
+"""
+import hashlib
+import heapq
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import jwt
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_REVOKED = 100000
+STATE_KEY = "verified_token"  # request.state attribute: (token hash, claims)
+
+Claims = Dict[str, Any]
+
+
+class RevokedTokenError(jwt.InvalidTokenError):
+    """Token was revoked (logout, deactivated user)"""
+
+
+def decode_token(token: str) -> Claims:
+    """Verify signature and expiry of a JWT (raises jwt.InvalidTokenError)"""
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """Bounded LRU cache of verified JWT claims with revocation"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_revoked: int = DEFAULT_MAX_REVOKED,
+        decode: Optional[Callable[[str], Claims]] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            ttl_seconds: How long a verification is trusted (0 = always verify)
+            max_entries: Maximum cached tokens (least recently used dropped first)
+            max_revoked: Maximum revoked tokens remembered (soonest-expiring dropped first)
+            decode: Verifies a token and returns its claims (default: decode_token)
+            clock: Wall clock in seconds (exp/iat are Unix timestamps)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_revoked = max_revoked
+        self._decode = decode or decode_token
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Claims]]" = OrderedDict()  # hash -> (expires_at, claims)
+        self._revoked_tokens: Dict[str, float] = {}  # hash -> exp
+        self._revocation_expiry: List[Tuple[float, str]] = []  # heap of (exp, hash), stale entries skipped
+        self._revoked_users: "OrderedDict[str, float]" = OrderedDict()  # user id -> revocation time, oldest first
+        self._listeners = []
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'rejected': 0
+        }
+
+    @classmethod
+    def from_env(cls) -> "VerifiedTokenCache":
+        """Create a cache configured from JWT_CACHE_TTL / JWT_CACHE_MAX_ENTRIES"""
+        return cls(
+            ttl_seconds=float(os.environ.get("JWT_CACHE_TTL", DEFAULT_TTL)),
+            max_entries=int(os.environ.get("JWT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_revoked=int(os.environ.get("JWT_REVOKED_MAX_ENTRIES", DEFAULT_MAX_REVOKED))
+        )
+
+    def verify(self, token: str, key: Optional[str] = None) -> Claims:
+        """
+        Claims of a valid token (cached) or raise
+
+        Args:
+            token: Encoded JWT
+            key: token_hash(token), if already computed
+
+        Raises:
+            jwt.InvalidTokenError: Invalid signature, expired or revoked
+        """
+        key = key or token_hash(token)
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, claims = entry
+            if now < expires_at:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return claims
+            del self._entries[key]
+
+        self.stats['misses'] += 1
+        claims = self._decode(token)
+        self._check_revoked(key, claims)
+        if self.ttl_seconds > 0:
+            expires_at = now + self.ttl_seconds
+            if claims.get("exp") is not None:
+                expires_at = min(expires_at, float(claims["exp"]))
+            self._entries[key] = (expires_at, claims)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return claims
+
+    def _check_revoked(self, key: str, claims: Claims):
+        if key in self._revoked_tokens:
+            self.stats['rejected'] += 1
+            raise RevokedTokenError("Token has been revoked")
+        revoked_at = self._revoked_users.get(str(claims.get("sub")))
+        # Tokens issued in the second of the revocation stay valid (iat has 1s resolution)
+        if revoked_at is not None and float(claims.get("iat") or 0) < int(revoked_at):
+            self.stats['rejected'] += 1
+            raise RevokedTokenError("Token has been revoked")
+
+    def revoke(self, token: str, claims: Claims):
+        """
+        Reject a token until it expires
+
+        Args:
+            token: Encoded JWT
+            claims: The token's claims as returned by verify() - only verified
+                tokens may be revoked, so an attacker cannot fill the revocation list
+        """
+        key = token_hash(token)
+        self._entries.pop(key, None)
+        now = self._clock()
+        # No token outlives JWT_EXPIRE_MINUTES, whatever its exp claims
+        horizon = now + settings.JWT_EXPIRE_MINUTES * 60
+        exp = min(float(claims.get("exp") or horizon), horizon)
+        self._revoked_tokens[key] = exp
+        heapq.heappush(self._revocation_expiry, (exp, key))
+        self._prune_revocations(now)
+        self._notify("token", key)
+
+    def revoke_user(self, user_id: str):
+        """Reject every token of a user issued before now"""
+        now = self._clock()
+        self._revoked_users[str(user_id)] = now
+        self._revoked_users.move_to_end(str(user_id))
+        for key in [key for key, (_, claims) in self._entries.items() if str(claims.get("sub")) == str(user_id)]:
+            del self._entries[key]
+        self._prune_revocations(now)
+        self._notify("user", str(user_id))
+        logger.info(f"🔒 Revoked tokens of user {user_id}")
+
+    def add_revocation_listener(self, listener: Callable[[str, str], Any]):
+        """Call listener(kind, value) on every revocation; kind is 'token' (hash) or 'user' (id)"""
+        self._listeners.append(listener)
+
+    def _notify(self, kind: str, value: str):
+        for listener in self._listeners:
+            try:
+                listener(kind, value)
+            except Exception as e:
+                logger.warning(f"⚠️ Token revocation listener failed: {e}")
+
+    def _prune_revocations(self, now: float):
+        """Drop expired revocations (amortized O(log n), oldest first)"""
+        expiry = self._revocation_expiry
+        while expiry and (expiry[0][0] <= now or len(self._revoked_tokens) > self.max_revoked):
+            exp, key = heapq.heappop(expiry)
+            if self._revoked_tokens.get(key) == exp:
+                del self._revoked_tokens[key]
+        # No token outlives JWT_EXPIRE_MINUTES, so older user revocations are moot
+        horizon = now - settings.JWT_EXPIRE_MINUTES * 60
+        while self._revoked_users and next(iter(self._revoked_users.values())) <= horizon:
+            self._revoked_users.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached verifications (revocations are kept)"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': len(self._entries),
+            'revoked_tokens': len(self._revoked_tokens),
+            'revoked_users': len(self._revoked_users),
+            'hit_rate': round(self.stats['hits'] / lookups, 3) if lookups else 0.0,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+
+def request_claims(state: Optional[Any], token: str, cache: Optional[VerifiedTokenCache] = None) -> Claims:
+    """
+    Claims of the request's Bearer token, verified at most once per request
+
+    Reuses the claims the request pipeline stored on request.state (if they
+    belong to the same token) and stores them there otherwise.
+
+    Raises:
+        jwt.InvalidTokenError: Invalid signature, expired or revoked
+    """
+    key = token_hash(token)
+    verified = getattr(state, STATE_KEY, None) if state is not None else None
+    if verified is not None and verified[0] == key:
+        return verified[1]
+    claims = (cache or token_cache).verify(token, key)
+    if state is not None:
+        setattr(state, STATE_KEY, (key, claims))
+    return claims
+
+
+# Global verified-token cache
+token_cache = VerifiedTokenCache.from_env()
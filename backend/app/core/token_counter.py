@@ -0,0 +1,138 @@
+"""
+Token Count Cache - Memoized token counts shared by ContextManager and TokenUsageTracker
+
+Chat history is re-sent with every request, and the same messages are
+counted several times per request (context stats before/after trimming,
+trimming itself, usage tracking). Counts are cached under
+(encoding, content hash), so unchanged history costs one hash per message
+and only new messages are encoded. Misses are encoded in one batch.
+
+Keys are BLAKE2 digests, so the cache never holds message content.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 100000
+APPROXIMATE = "approx"  # encoding name used when no encoder is available
+
+
+def approximate_tokens(text: str) -> int:
+    """Character-based estimate (4 chars = 1 token)"""
+    return len(text) // 4
+
+
+class TokenCountCache:
+    """LRU of token counts keyed by (encoding name, content hash)"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries: Maximum number of cached counts (least recently used evicted)
+        """
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+        self._lock = threading.Lock()  # sync chat endpoints run in the threadpool
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'encoded_chars': 0,
+            'batches': 0
+        }
+
+    @staticmethod
+    def _key(encoding: str, text: str) -> Tuple[str, bytes]:
+        return encoding, hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def count(self, text: str, encoder: Any = None, encoding: Optional[str] = None) -> int:
+        """
+        Count tokens of one text
+
+        Args:
+            text: Text to count
+            encoder: tiktoken-style encoder (None = approximate count)
+            encoding: Cache namespace; defaults to encoder.name
+        """
+        return self.count_many([text], encoder, encoding)[0]
+
+    def count_many(self, texts: Sequence[str], encoder: Any = None, encoding: Optional[str] = None) -> List[int]:
+        """
+        Count tokens of many texts; cached counts are reused, misses encoded in one batch
+
+        Returns:
+            Token counts in the order of `texts`
+        """
+        if encoding is None:
+            encoding = APPROXIMATE if encoder is None else getattr(encoder, "name", None) or type(encoder).__name__
+        counts: List[Optional[int]] = [None] * len(texts)
+        missing: Dict[Tuple[str, bytes], List[int]] = {}
+        # Hash outside the lock (hashlib releases the GIL for large texts)
+        keys = [self._key(encoding, text) if text else None for text in texts]
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key is None:
+                    counts[i] = 0
+                    continue
+                cached = self._counts.get(key)
+                if cached is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self._counts.move_to_end(key)
+                    counts[i] = cached
+            # Duplicates within one call are encoded once and count as hits
+            self.stats['hits'] += sum(1 for key in keys if key is not None) - len(missing)
+            self.stats['misses'] += len(missing)
+
+        if missing:
+            miss_keys = list(missing)
+            miss_texts = [texts[missing[key][0]] for key in miss_keys]
+            encoded = self._encode(miss_texts, encoder)
+            with self._lock:
+                self.stats['encoded_chars'] += sum(len(text) for text in miss_texts)
+                for key, value in zip(miss_keys, encoded):
+                    self._counts[key] = value
+                    self._counts.move_to_end(key)
+                    for i in missing[key]:
+                        counts[i] = value
+                while len(self._counts) > self.max_entries:
+                    self._counts.popitem(last=False)
+
+        return counts
+
+    def _encode(self, texts: List[str], encoder: Any) -> List[int]:
+        if encoder is None:
+            return [approximate_tokens(text) for text in texts]
+        try:
+            if len(texts) > 1 and hasattr(encoder, "encode_ordinary_batch"):
+                self.stats['batches'] += 1
+                return [len(tokens) for tokens in encoder.encode_ordinary_batch(texts)]
+            encode = getattr(encoder, "encode_ordinary", None) or encoder.encode
+            return [len(encode(text)) for text in texts]
+        except Exception as e:
+            logger.warning(f"Token encoding failed: {e}, using approximation")
+            return [approximate_tokens(text) for text in texts]
+
+    def clear(self):
+        """Drop all cached counts"""
+        with self._lock:
+            self._counts.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        total = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': len(self._counts),
+            'max_entries': self.max_entries,
+            'hit_rate': round(self.stats['hits'] / total * 100, 2) if total else 0.0
+        }
+
+
+# Global token count cache
+token_count_cache = TokenCountCache()
@@ -10,17 +10,30 @@ import json
 import os
 import tempfile
 
-try:
-    import tiktoken
-    TIKTOKEN_AVAILABLE = True
-except ImportError:
-    TIKTOKEN_AVAILABLE = False
-    print("⚠️ Tiktoken not installed. Using approximate counting (4 chars = 1 token).")
-    print("   Install with: pip install tiktoken")
-    logging.info("ℹ️ tiktoken not available - using character-based estimation (4 chars = 1 token)")
+from .tokenizers import tokenizer_registry
 
 logger = logging.getLogger(__name__)
 
+# USD per 1M (input, output) tokens - longest matching model prefix wins
+MODEL_PRICING_PER_1M = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-5": (1.25, 10.00),
+    "o1": (15.00, 60.00),
+    "o3": (2.00, 8.00),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-opus-4": (15.00, 75.00),
+    "claude-3-opus": (15.00, 75.00),
+    "claude-3-sonnet": (3.00, 15.00),
+    "sonar-deep-research": (2.00, 8.00),
+    "sonar-pro": (3.00, 15.00),
+    "sonar": (1.00, 1.00),
+}
+
 
 class TokenUsageTracker:
     """Track token usage and provide fork/summary recommendations"""
@@ -41,18 +54,8 @@ class TokenUsageTracker:
         self.HARD_LIMIT = 100000  # Recommend fork/summary
         self.CRITICAL_LIMIT = 150000  # Strong recommendation
         
-        # Initialize tiktoken encoders for precise token counting
-        self._encoders = {}
-        if TIKTOKEN_AVAILABLE:
-            try:
-                # Initialize commonly used encoders
-                self._encoders['gpt-4'] = tiktoken.encoding_for_model("gpt-4")
-                self._encoders['gpt-3.5-turbo'] = tiktoken.encoding_for_model("gpt-3.5-turbo")
-                self._encoders['claude'] = tiktoken.get_encoding("cl100k_base")  # Claude uses similar tokenization
-                logger.info("✅ Initialized tiktoken encoders for precise token counting")
-            except Exception as e:
-                logger.warning(f"Failed to initialize tiktoken encoders: {e}")
-                self._encoders = {}
+        # Encoders are loaded lazily (shared tokenizer registry)
+        self.tokenizers = tokenizer_registry
         
     def load_usage(self):
         """Load usage data from storage"""
@@ -72,16 +75,23 @@ class TokenUsageTracker:
                         'all_time_tokens': 0,
                         'sessions_count': 0
                     })
+                    self.response_cache = data.get('response_cache', self._empty_cache_stats())
             else:
                 self.reset_session()
                 self.total_usage = {
                     'all_time_tokens': 0,
                     'sessions_count': 0
                 }
+                self.response_cache = self._empty_cache_stats()
         except Exception as e:
             logger.error(f"Failed to load token usage: {e}")
             self.reset_session()
             self.total_usage = {'all_time_tokens': 0, 'sessions_count': 0}
+            self.response_cache = self._empty_cache_stats()
+    
+    @staticmethod
+    def _empty_cache_stats() -> Dict[str, Any]:
+        return {'hits': 0, 'semantic_hits': 0, 'misses': 0, 'tokens_saved': 0, 'cost_saved_usd': 0.0}
     
     def save_usage(self):
         """Save usage data to storage"""
@@ -89,6 +99,7 @@ class TokenUsageTracker:
             data = {
                 'current_session': self.current_session,
                 'total_usage': self.total_usage,
+                'response_cache': self.response_cache,
                 'last_updated': datetime.now(timezone.utc).isoformat()
             }
             with open(self.storage_file, 'w') as f:
@@ -150,6 +161,44 @@ class TokenUsageTracker:
         
         logger.info(f"📊 Token usage: +{total_tokens} (session total: {self.current_session['total_tokens']})")
     
+    def estimate_cost(self, model: str, prompt_tokens: int = 0, completion_tokens: int = 0) -> float:
+        """
+        Estimate the USD cost of a call
+        
+        Args:
+            model: Model name (matched by longest known prefix)
+            prompt_tokens: Input tokens
+            completion_tokens: Output tokens
+        
+        Returns:
+            Cost in USD (0.0 for unknown models)
+        """
+        model_lower = (model or "").lower()
+        matches = [name for name in MODEL_PRICING_PER_1M if model_lower.startswith(name)]
+        if not matches:
+            return 0.0
+        input_price, output_price = MODEL_PRICING_PER_1M[max(matches, key=len)]
+        return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+    
+    def track_cache_event(self, result: str, model: str = "", usage: Optional[Dict[str, Any]] = None):
+        """
+        Track a response cache lookup (tokens and dollars saved on hits)
+        
+        Args:
+            result: 'hit', 'semantic_hit' or 'miss'
+            model: Model of the cached response
+            usage: Usage of the cached response (tokens that were not spent again)
+        """
+        if result == 'miss':
+            self.response_cache['misses'] += 1
+            return
+        self.response_cache['semantic_hits' if result == 'semantic_hit' else 'hits'] += 1
+        usage = usage or {}
+        prompt_tokens = usage.get('prompt_tokens') or 0
+        completion_tokens = usage.get('completion_tokens') or 0
+        self.response_cache['tokens_saved'] += usage.get('total_tokens') or prompt_tokens + completion_tokens
+        self.response_cache['cost_saved_usd'] += self.estimate_cost(model, prompt_tokens, completion_tokens)
+    
     def get_usage_stats(self) -> Dict[str, Any]:
         """Get current usage statistics"""
         current_tokens = self.current_session['total_tokens']
@@ -180,7 +229,11 @@ class TokenUsageTracker:
                 'hard_limit_percentage': round(hard_percentage, 1)
             },
             'recommendation': recommendation,
-            'total_usage': self.total_usage
+            'total_usage': self.total_usage,
+            'response_cache': {
+                **self.response_cache,
+                'cost_saved_usd': round(self.response_cache['cost_saved_usd'], 4)
+            }
         }
     
     def _get_recommendation(self, tokens: int) -> Dict[str, Any]:
@@ -227,54 +280,20 @@ class TokenUsageTracker:
     
     def estimate_tokens(self, text: str, model: str = "gpt-4") -> int:
         """
-        Precisely count tokens for text using tiktoken
+        Precisely count tokens for text using the model's tokenizer
         
         Args:
             text: Text to count tokens for
-            model: Model name to determine correct encoding (gpt-4, gpt-3.5-turbo, claude)
+            model: Model name to determine correct encoding (gpt-4o, gpt-4, claude, sonar, ...)
         
         Returns:
-            Precise token count
+            Token count (character-based estimate if the tokenizer cannot be loaded)
         """
         if not text:
             return 0
         
-        if not TIKTOKEN_AVAILABLE or not self._encoders:
-            # Fallback to character-based estimation
-            logger.debug("Using character-based token estimation (tiktoken not available)")
-            return len(text) // 4
-        
         try:
-            # Determine which encoder to use
-            encoder_key = 'gpt-4'  # Default
-            
-            if 'gpt-3.5' in model.lower() or 'turbo' in model.lower():
-                encoder_key = 'gpt-3.5-turbo'
-            elif 'claude' in model.lower() or 'anthropic' in model.lower():
-                encoder_key = 'claude'
-            elif 'gpt-4' in model.lower() or 'gpt-5' in model.lower():
-                encoder_key = 'gpt-4'
-            
-            # Get encoder
-            encoder = self._encoders.get(encoder_key)
-            if not encoder:
-                # Try to get encoder for this model
-                try:
-                    encoder = tiktoken.encoding_for_model(model)
-                    self._encoders[model] = encoder
-                except Exception:
-                    # Fall back to default encoder
-                    encoder = self._encoders.get('gpt-4')
-            
-            if encoder:
-                # Precise token count
-                tokens = len(encoder.encode(text))
-                logger.debug(f"Precise token count for {len(text)} chars: {tokens} tokens (model: {encoder_key})")
-                return tokens
-            else:
-                # Fallback
-                return len(text) // 4
-                
+            return self.tokenizers.count(text, model, exact=True)
         except Exception as e:
             logger.warning(f"Token counting error: {e}, falling back to estimation")
             return len(text) // 4
@@ -0,0 +1,159 @@
+"""
+Tokenizer Registry - Model-aware, lazily loaded token counting
+
+Maps every model to a tokenizer family and loads the BPE ranks of a family
+only when an exact count is first needed (one encoder per encoding, shared
+by ContextManager and TokenUsageTracker). Load time and failures are
+recorded; a failed load (e.g. no network for the tiktoken download) is not
+retried for RETRY_AFTER_SECONDS.
+
+Two paths:
+- approximate (exact=False): characters / chars_per_token of the family,
+  no BPE - for hot paths such as context statistics
+- exact (exact=True): BPE count through the shared token_count_cache - for
+  final budgeting (context trimming, usage tracking)
+
+Claude and Perplexity (Llama-based sonar) tokenizers are not available
+locally; their families use cl100k_base as the closest proxy and report
+`exact: False` in get_stats().
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .token_counter import token_count_cache
+
+logger = logging.getLogger(__name__)
+
+RETRY_AFTER_SECONDS = 300
+
+
+@dataclass(frozen=True)
+class TokenizerFamily:
+    encoding: str  # tiktoken encoding used for exact counts
+    chars_per_token: float  # approximate counter
+    exact: bool  # False if `encoding` is only a proxy for the real tokenizer
+
+
+FAMILIES = {
+    "o200k": TokenizerFamily("o200k_base", 4.0, True),
+    "cl100k": TokenizerFamily("cl100k_base", 4.0, True),
+    "claude": TokenizerFamily("cl100k_base", 3.5, False),
+    "llama": TokenizerFamily("cl100k_base", 4.0, False),
+}
+
+# (substring, family) - first match wins, so specific names come first
+MODEL_FAMILIES = [
+    ("claude", "claude"),
+    ("anthropic", "claude"),
+    ("sonar", "llama"),
+    ("llama", "llama"),
+    ("perplexity", "llama"),
+    ("gpt-4o", "o200k"),
+    ("gpt-4.1", "o200k"),
+    ("gpt-5", "o200k"),
+    ("chatgpt-4o", "o200k"),
+    ("gpt-4", "cl100k"),
+    ("gpt-3.5", "cl100k"),
+    ("turbo", "cl100k"),
+]
+O_SERIES_PREFIXES = ("o1", "o3", "o4")
+DEFAULT_FAMILY = "cl100k"
+
+
+def _load_tiktoken_encoding(name: str):
+    import tiktoken
+    return tiktoken.get_encoding(name)
+
+
+class TokenizerRegistry:
+    """Lazily loaded encoders per encoding family"""
+
+    def __init__(self, load_encoding: Optional[Callable[[str], Any]] = None):
+        """
+        Args:
+            load_encoding: Loader for an encoding name (default: tiktoken.get_encoding)
+        """
+        self._load_encoding = load_encoding or _load_tiktoken_encoding
+        self._encoders: Dict[str, Any] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.loads: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def family_for_model(model: Optional[str]) -> str:
+        """Tokenizer family of a model name (e.g. 'claude-3-opus' -> 'claude')"""
+        model_lower = (model or "").lower()
+        if model_lower.startswith(O_SERIES_PREFIXES):
+            return "o200k"
+        for pattern, family in MODEL_FAMILIES:
+            if pattern in model_lower:
+                return family
+        return DEFAULT_FAMILY
+
+    def get_encoder(self, family: str) -> Optional[Any]:
+        """Encoder of a family, loaded on first use; None if unavailable"""
+        encoding = FAMILIES[family].encoding
+        encoder = self._encoders.get(encoding)
+        if encoder is not None:
+            return encoder
+
+        with self._lock:
+            if encoding in self._encoders:
+                return self._encoders[encoding]
+            failed_at = self._failed_at.get(encoding)
+            if failed_at is not None and time.monotonic() - failed_at < RETRY_AFTER_SECONDS:
+                return None
+
+            start = time.perf_counter()
+            try:
+                encoder = self._load_encoding(encoding)
+            except Exception as e:
+                self._failed_at[encoding] = time.monotonic()
+                self.loads[encoding] = {'loaded': False, 'error': str(e)[:200]}
+                logger.warning(f"⚠️ Tokenizer {encoding} unavailable ({e}). Using approximate counting.")
+                return None
+
+            load_ms = (time.perf_counter() - start) * 1000
+            self._encoders[encoding] = encoder
+            self._failed_at.pop(encoding, None)
+            self.loads[encoding] = {'loaded': True, 'load_ms': round(load_ms, 1)}
+            logger.info(f"✅ Tokenizer {encoding} loaded in {load_ms:.0f}ms")
+            return encoder
+
+    def count(self, text: str, model: Optional[str] = None, exact: bool = False) -> int:
+        """
+        Count tokens of text for a model
+
+        Args:
+            text: Text to count
+            model: Model name (selects the tokenizer family)
+            exact: Use the BPE encoder (loads it on first use) instead of the approximation
+        """
+        return self.count_many([text], model, exact)[0]
+
+    def count_many(self, texts: Sequence[str], model: Optional[str] = None, exact: bool = False) -> List[int]:
+        """Count tokens of many texts (exact counts are batched and memoized)"""
+        family = self.family_for_model(model)
+        if exact:
+            encoder = self.get_encoder(family)
+            if encoder is not None:
+                return token_count_cache.count_many(texts, encoder)
+        chars_per_token = FAMILIES[family].chars_per_token
+        return [int(len(text) / chars_per_token) if text else 0 for text in texts]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get loaded encoders, load times and family mapping"""
+        return {
+            'encodings': dict(self.loads),
+            'families': {
+                name: {'encoding': family.encoding, 'exact': family.exact, 'chars_per_token': family.chars_per_token}
+                for name, family in FAMILIES.items()
+            }
+        }
+
+
+# Global tokenizer registry
+tokenizer_registry = TokenizerRegistry()
@@ -5,9 +5,6 @@ Provides backward-compatible API versioning with deprecation warnings.
 Supports gradual migration from /api/* to /api/v1/*
 """
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Callable
 import logging
 from datetime import datetime, timedelta
 
@@ -40,115 +37,60 @@ class DeprecationInfo:
         return cls.SUNSET_DATE.strftime("%a, %d %b %Y %H:%M:%S GMT")
 
 
-class APIVersioningMiddleware(BaseHTTPMiddleware):
+def is_versioned_path(path: str) -> bool:
+    """Check if path includes version number (/api/v1/, /api/v2/, ...)"""
+    parts = path.split("/", 3)
+    return len(parts) > 2 and parts[2].startswith("v") and parts[2][1:].isdigit()
+
+
+def extract_version(path: str) -> str:
+    """Extract version from path like /api/v1/..."""
+    parts = path.split("/", 3)
+    if len(parts) > 2 and parts[2].startswith("v"):
+        return parts[2]
+    return "unknown"
+
+
+def get_versioned_path(path: str) -> str:
     """
-    Middleware for API versioning with backward compatibility
+    Convert unversioned path to versioned path
     
-    Features:
-    - Redirects /api/* to /api/v1/* internally (backward compatibility)
-    - Adds deprecation headers for unversioned endpoints
-    - Logs usage statistics for migration tracking
+    Example:
+        /api/auth/login -> /api/v1/auth/login
     """
+    return f"/api/{APIVersion.CURRENT}{path[4:]}"
+
+
+class VersionUsage:
+    """
+    API version usage counters for migration tracking
     
-    def __init__(self, app, enable_redirect: bool = True, log_usage: bool = True):
-        """
-        Args:
-            app: FastAPI application
-            enable_redirect: Enable automatic redirect from /api/* to /api/v1/*
-            log_usage: Log API version usage for tracking
-        """
-        super().__init__(app)
-        self.enable_redirect = enable_redirect
+    Legacy /api/* requests are routed to /api/v1/* by the request pipeline
+    (app/core/request_pipeline.py), which also adds the deprecation headers.
+    """
+    
+    def __init__(self, log_usage: bool = True):
         self.log_usage = log_usage
         self.usage_stats = {
             "v1": 0,
             "unversioned": 0,
         }
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Handle API versioning for each request"""
-        
-        path = request.url.path
-        
-        # Skip non-API paths
-        if not path.startswith("/api/"):
-            return await call_next(request)
-        
-        # Check if path is versioned
-        is_versioned = self._is_versioned_path(path)
-        
-        if not is_versioned and self.enable_redirect:
-            # Unversioned path like /api/auth/login
-            # Redirect internally to /api/v1/auth/login
-            new_path = self._get_versioned_path(path)
-            
-            # Log usage
-            if self.log_usage:
-                self.usage_stats["unversioned"] += 1
-                if self.usage_stats["unversioned"] % 100 == 1:  # Log every 100 requests
-                    logger.warning(
-                        f"📊 Unversioned API usage: {self.usage_stats['unversioned']} requests "
-                        f"(v1: {self.usage_stats['v1']})"
-                    )
-            
-            # Modify request path for internal routing
-            request.scope["path"] = new_path
-            
-            # Process request
-            response = await call_next(request)
-            
-            # Add deprecation headers
-            response.headers["Deprecation"] = "true"
-            response.headers["Sunset"] = DeprecationInfo.get_sunset_header()
-            response.headers["Link"] = f'</api/{APIVersion.CURRENT}{path[4:]}>; rel="successor-version"'
-            response.headers["Warning"] = f'299 - "{DeprecationInfo.WARNING_MESSAGE}"'
-            
-            return response
-        
-        elif is_versioned:
-            # Versioned path like /api/v1/auth/login
-            if self.log_usage:
-                version = self._extract_version(path)
-                if version in self.usage_stats:
-                    self.usage_stats[version] += 1
-            
-            # Process normally
-            response = await call_next(request)
-            
-            # Add version header
-            response.headers["API-Version"] = APIVersion.CURRENT
-            
-            return response
-        
-        else:
-            # Versioned path but redirect disabled
-            return await call_next(request)
-    
-    def _is_versioned_path(self, path: str) -> bool:
-        """Check if path includes version number"""
-        # Check for /api/v1/, /api/v2/, etc.
-        parts = path.split("/")
-        return len(parts) > 2 and parts[2].startswith("v") and parts[2][1:].isdigit()
-    
-    def _extract_version(self, path: str) -> str:
-        """Extract version from path like /api/v1/..."""
-        parts = path.split("/")
-        if len(parts) > 2 and parts[2].startswith("v"):
-            return parts[2]
-        return "unknown"
-    
-    def _get_versioned_path(self, path: str) -> str:
-        """
-        Convert unversioned path to versioned path
-        
-        Example:
-            /api/auth/login -> /api/v1/auth/login
-        """
-        # Remove /api prefix
-        without_prefix = path[4:]  # Remove '/api'
-        
-        # Add version
-        return f"/api/{APIVersion.CURRENT}{without_prefix}"
+    def record(self, path: str, versioned: bool):
+        """Count one API request"""
+        if not self.log_usage:
+            return
+        if versioned:
+            version = extract_version(path)
+            if version in self.usage_stats:
+                self.usage_stats[version] += 1
+            return
+        self.usage_stats["unversioned"] += 1
+        if self.usage_stats["unversioned"] % 100 == 1:  # Log every 100 requests
+            logger.warning(
+                f"📊 Unversioned API usage: {self.usage_stats['unversioned']} requests "
+                f"(v1: {self.usage_stats['v1']})"
+            )
     
     def get_stats(self) -> dict:
         """Get API version usage statistics"""
@@ -98,8 +98,25 @@ async def lifespan(app: FastAPI):
     # Initialize Redis cache
     logger.info("💾 Initializing Redis cache...")
     await init_redis()
+    from app.core.cache_manager import cache_manager, create_cache_l2
+    cache_manager.l2 = create_cache_l2()
     logger.info("✅ Redis initialization complete")
     
+    # Cross-worker WebSocket fan-out (Redis pub/sub when REDIS_URL is set)
+    from app.core.stream_backplane import create_backplane
+    await chat_stream.manager.start_backplane(await create_backplane())
+    
+    # Write-behind chat message persistence
+    from app.core.message_journal import message_journal
+    message_journal.start()
+    
+    # Optional pre-started sandbox interpreters (SANDBOX_WARM_POOL)
+    from app.core.sandbox_executor import sandbox_executor
+    from app.core.interpreter_pool import InterpreterPool
+    sandbox_executor.interpreter_pool = InterpreterPool.from_env(sandbox_executor)
+    if sandbox_executor.interpreter_pool:
+        await sandbox_executor.interpreter_pool.start()
+    
     # Initialize MongoDB for research history
     logger.info("🍃 Checking MongoDB configuration...")
     from app.core.mongo_db import connect_mongodb, close_mongodb
@@ -125,6 +142,18 @@ async def lifespan(app: FastAPI):
     
     yield
     
+    await chat_stream.manager.stop_backplane()
+    # Drain queued messages before the database closes
+    await message_journal.stop()
+    if sandbox_executor.interpreter_pool:
+        await sandbox_executor.interpreter_pool.stop()
+    from app.core.post_generation import post_generation_pipeline
+    await post_generation_pipeline.stop()
+    # Index queued RAG messages/documents before exit
+    await asyncio.to_thread(rag_api.rag_system.close)
+    from app.core.provider_pool import provider_pool
+    await provider_pool.aclose()
+    await cache_manager.aclose()
     await close_database()
     await close_redis_async()
     try:
@@ -174,169 +203,20 @@ app.add_exception_handler(XionimusException, xionimus_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, generic_exception_handler)
 
-# Security Headers Middleware
-@app.middleware("http")
-async def security_headers_middleware(request: Request, call_next):
-    """Add security headers to all responses"""
-    response = await call_next(request)
-    
-    # Security headers
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-    
-    return response
-
-logger.info("✅ Security headers middleware enabled")
-
-# Authentication & Authorization Middleware with Rate Limiting
-from app.core.auth import AuthenticationError
-
-@app.middleware("http")
-async def auth_and_rate_limit_middleware(request: Request, call_next):
-    """
-    Combined Authentication and Rate Limiting middleware
-    - Handles both auth requirements and rate limiting
-    - WebSocket endpoints: skip both auth and rate limiting
-    - Public endpoints: skip auth but apply rate limiting
-    - Protected endpoints: require auth and apply rate limiting
-    - SSE endpoints: skip auth check (token passed as query param, validated in endpoint)
-    """
-    # Public endpoints (no auth required but rate limited)
-    public_paths = {
-        "/api/health",
-        "/api/health/live",
-        "/api/health/ready",
-        "/api/health/startup",
-        "/api/health/metrics",
-        "/api/v1/health",  # Versioned health endpoint - public
-        "/api/v1/health/live",
-        "/api/v1/health/ready",
-        "/api/v1/health/startup",
-        "/api/v1/health/metrics",
-        "/docs", 
-        "/redoc",
-        "/openapi.json",
-        "/",
-        "/metrics",
-        "/api/metrics",  # Prometheus metrics endpoint - public
-        "/api/v1/metrics",  # V1 metrics endpoint - public
-        "/api/rate-limits/limits",
-        "/api/rate-limits/health",
-        "/api/metrics/performance",  # Performance tracking - no auth needed
-        "/api/metrics/health",
-        "/api/v1/metrics/health",  # V1 metrics health - public
-        "/api/settings/github-config",  # GitHub config status check - no auth needed (no sensitive data)
-        "/api/github/import",  # GitHub import - allow public repo imports without auth
-        "/api/github/import/status",  # Import status - no auth needed
-        "/api/version",  # API version info - public
-        "/api/v1/version",  # API version info - public
-        "/api/migration-guide",  # Migration guide - public
-        "/api/v1/migration-guide",  # Migration guide - public
-        "/api/version/stats",  # Version stats - public
-        "/api/v1/version/stats",  # Version stats - public
-        "/api/v1/multi-agents/types",  # Agent types list - public for UI dropdown
-        "/api/github/oauth/status",  # GitHub OAuth status - public (no sensitive data)
-        "/api/v1/github/oauth/status",  # V1 GitHub OAuth status - public
-        "/api/v1/github/admin/github-pat/store",  # Store GitHub PAT - public for setup
-        "/api/v1/github/admin/github-pat/status",  # Check PAT status - public
-        "/api/v1/github/admin/github-oauth/store",  # Store OAuth credentials - public for setup
-        "/api/v1/github/admin/github-oauth/status",  # Check OAuth status - public
-        "/api/v1/github/admin/github-oauth/credentials",  # Get OAuth credentials - public
-    }
-    
-    # Public path prefixes (no auth required for paths starting with these)
-    public_path_prefixes = [
-        "/api/github/import/check-directory/",  # Directory availability check - no auth needed
-    ]
-    
-    # SSE endpoints that pass token as query parameter (EventSource can't send headers)
-    # These endpoints handle their own authentication via query param
-    sse_endpoints = [
-        "/api/v1/github-pat/import-progress/",
-        "/api/github-pat/import-progress/",  # Legacy
-    ]
-    
-    # Auth endpoints (no auth required for login/register but rate limited)
-    auth_paths = {"/api/auth/login", "/api/auth/register", "/api/v1/auth/login", "/api/v1/auth/register"}
-    
-    # Skip everything for WebSockets and static uploads
-    if ("websocket" in request.headers.get("upgrade", "").lower() or
-        request.url.path.startswith("/uploads/")):
-        return await call_next(request)
-    
-    # Extract user info for rate limiting (if authenticated)
-    user_id = None
-    user_role = "user"
-    
-    if request.url.path.startswith("/api/"):
-        auth_header = request.headers.get("authorization")
-        
-        # Check if path matches any public prefix
-        is_public_prefix = any(request.url.path.startswith(prefix) for prefix in public_path_prefixes)
-        
-        # Check if this is an SSE endpoint (uses query param token instead of header)
-        is_sse_endpoint = any(request.url.path.startswith(endpoint) for endpoint in sse_endpoints)
-        
-        # Authentication check for protected endpoints
-        # Skip auth check for SSE endpoints (they validate token internally via query param)
-        if (request.url.path not in public_paths and 
-            request.url.path not in auth_paths and
-            not is_public_prefix and
-            not is_sse_endpoint):
-            
-            if not auth_header or not auth_header.startswith("Bearer "):
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Authentication required", "type": "auth_required"}
-                )
-            
-            token = auth_header.split(" ")[1] if len(auth_header.split(" ")) == 2 else None
-            if not token:
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Invalid token format", "type": "auth_invalid"}
-                )
-            
-            # Extract user info for rate limiting (basic parsing)
-            try:
-                import jwt
-                from app.core.config import settings
-                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-                user_id = payload.get("sub")
-                user_role = payload.get("role", "user")
-            except Exception as e:
-                # Invalid token will be caught by endpoint dependencies
-                # Log for monitoring but don't block request
-                logger.debug(f"Token decode failed in rate limiter: {str(e)}")
-                pass
-        
-        # Rate limiting check for all API endpoints
-        is_ai_call = "/api/chat/" in request.url.path
-        
-        rate_limit_allowed = await rate_limiter.check_rate_limit(
-            request=request,
-            user_id=user_id,
-            user_role=user_role,
-            is_ai_call=is_ai_call
-        )
-        
-        if not rate_limit_allowed:
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "detail": "Rate limit exceeded. Please try again later.",
-                    "type": "rate_limit_exceeded",
-                    "retry_after": "60"
-                },
-                headers={"Retry-After": "60"}
-            )
-    
-    response = await call_next(request)
-    return response
+# Request pipeline: API versioning, auth check, rate limiting, security headers
+# One pure ASGI middleware (no BaseHTTPMiddleware layers - streaming responses are not buffered)
+# Added before CORS so that preflight requests are answered without auth
+from app.core.request_pipeline import RequestPipelineMiddleware
+from app.core.versioning import APIVersion
+app.add_middleware(
+    RequestPipelineMiddleware,
+    rate_limiter=rate_limiter,
+    enable_redirect=True,  # Legacy /api/* routes are served by /api/v1/*
+    log_usage=True  # Track migration progress
+)
+logger.info("✅ Request pipeline enabled (auth, rate limiting, security headers)")
+logger.info(f"✅ API Versioning enabled (current: {APIVersion.CURRENT})")
+logger.info("   ℹ️  Legacy /api/* routes redirect to /api/v1/* with deprecation headers")
 
 # Configure CORS (Environment-aware)
 from app.core.cors_config import get_cors_middleware_config, CORSConfig
@@ -355,15 +235,18 @@ CORSConfig.print_config_summary()
 # - Code Review: 10 req/min (protects review costs)
 logger.info("✅ Rate limiting configured")
 
-# API Versioning System
-from app.core.versioning import APIVersioningMiddleware, APIVersion
-app.add_middleware(
-    APIVersioningMiddleware,
-    enable_redirect=True,  # Enable backward compatibility
-    log_usage=True  # Track migration progress
+# Prometheus instrumentation (added last = outermost, so it times the whole stack)
+from app.core.instrumentation import PrometheusMiddleware, instrument_engine, watch_gauges
+from app.core.database import engine as db_engine, async_engine as db_async_engine
+app.add_middleware(PrometheusMiddleware)
+instrument_engine(db_engine)
+instrument_engine(db_async_engine)
+watch_gauges(
+    websocket_connections=lambda: chat_stream.manager.connection_count,
+    task_queue=get_task_queue,
+    engines=(db_engine, db_async_engine)
 )
-logger.info(f"✅ API Versioning enabled (current: {APIVersion.CURRENT})")
-logger.info("   ℹ️  Legacy /api/* routes redirect to /api/v1/* with deprecation headers")
+logger.info("✅ Prometheus instrumentation enabled (HTTP routes, AI calls, DB queries, gauges)")
 
 # Register API routes
 # Core APIs (always loaded)
@@ -534,12 +417,12 @@ async def health_check():
     - System metrics (uptime, memory)
     - Configuration status
     """
-    from app.core.ai_manager import AIManager
+    from app.core.ai_manager import get_ai_manager
     from datetime import datetime, timezone
     import time
     import psutil
     
-    ai_manager = AIManager()
+    ai_manager = get_ai_manager()
     
     # Calculate uptime
     uptime_seconds = time.time() - app.state.start_time if hasattr(app.state, 'start_time') else 0
@@ -551,11 +434,10 @@ async def health_check():
     db_status = "connected"
     db_error = None
     try:
-        from app.core.database import engine, DATABASE_URL
-        from sqlalchemy import text
-        # Test database connection
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+        from app.core.database import DATABASE_URL, get_database_health
+        # Test database connection (async engine - does not block the event loop)
+        if not await get_database_health():
+            raise RuntimeError("SELECT 1 failed")
     except Exception as e:
         db_status = "error"
         db_error = str(e)
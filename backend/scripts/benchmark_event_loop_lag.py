@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Event Loop Lag Benchmark - Sync vs. Async Database Access
+
+Misst, wie stark Datenbank-Queries den Event-Loop blockieren:
+- sync:  db.execute() direkt im async Handler (bisheriges Verhalten)
+- async: AsyncSession über aiosqlite / asyncpg (get_async_db)
+
+Während die Queries laufen, tickt ein Monitor alle 5 ms und misst die
+Verspätung jedes Ticks. Diese Verspätung erlebt jeder WebSocket-Stream
+im selben Worker.
+
+Verwendung:
+    python scripts/benchmark_event_loop_lag.py
+    python scripts/benchmark_event_loop_lag.py --requests 50 --rows 200000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+TICK_SECONDS = 0.005
+
+# Deliberately slow query - stands in for a large session/message scan
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < :rows) "
+    "SELECT SUM(x) FROM n"
+)
+
+
+async def monitor_lag(stop: asyncio.Event, lags: list):
+    """Sleep TICK_SECONDS repeatedly and record how late each wake-up is"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((loop.time() - start - TICK_SECONDS) * 1000)
+
+
+async def run_sync(url: str, requests: int, rows: int):
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(bind=engine)
+
+    async def handler():
+        db = SessionLocal()
+        try:
+            db.execute(SLOW_QUERY, {"rows": rows}).scalar()
+        finally:
+            db.close()
+
+    try:
+        return await measure(handler, requests)
+    finally:
+        engine.dispose()
+
+
+async def run_async(url: str, requests: int, rows: int):
+    engine = create_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:", 1))
+    AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def handler():
+        async with AsyncSessionLocal() as db:
+            (await db.execute(SLOW_QUERY, {"rows": rows})).scalar()
+
+    try:
+        return await measure(handler, requests)
+    finally:
+        await engine.dispose()
+
+
+async def measure(handler, requests: int) -> dict:
+    stop = asyncio.Event()
+    lags = []
+    monitor = asyncio.create_task(monitor_lag(stop, lags))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await monitor
+    lags.sort()
+    return {
+        "total_s": elapsed,
+        "ticks": len(lags),
+        "p50_ms": statistics.median(lags) if lags else 0.0,
+        "p99_ms": lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0,
+        "max_ms": lags[-1] if lags else 0.0,
+    }
+
+
+def print_result(name: str, result: dict):
+    print(
+        f"{name:<6} total={result['total_s']:.2f}s ticks={result['ticks']:<5} "
+        f"lag p50={result['p50_ms']:.1f}ms p99={result['p99_ms']:.1f}ms max={result['max_ms']:.1f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Event-Loop-Lag: sync vs. async DB")
+    parser.add_argument("--requests", type=int, default=20, help="Gleichzeitige Requests")
+    parser.add_argument("--rows", type=int, default=100000, help="Arbeit pro Query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        print(f"📊 {args.requests} concurrent requests, query size {args.rows}")
+        print_result("sync", await run_sync(url, args.requests, args.rows))
+        print_result("async", await run_async(url, args.requests, args.rows))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
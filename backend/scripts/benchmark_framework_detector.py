@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Framework Detector Benchmark - Verzeichnis-Traversierungen und Dateizugriffe
+
+Erzeugt einige große Beispiel-Repositories (FastAPI-Monorepo mit
+node_modules, Django-Projekt, Next.js-App) in einem temporären Verzeichnis
+und misst pro detect()-Aufruf:
+- traversals: Aufrufe von os.walk / Path.rglob
+- reads:      Aufrufe von Path.read_text
+- Laufzeit
+
+Mit --baseline kann eine andere Version von framework_detector.py (z.B. aus
+git) geladen werden; Ergebnisse (Framework + Scores) werden verglichen.
+
+Verwendung:
+    python scripts/benchmark_framework_detector.py
+    git show HEAD~1:backend/app/core/framework_detector.py > /tmp/old_detector.py
+    python scripts/benchmark_framework_detector.py --baseline /tmp/old_detector.py --scale 2
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core import framework_detector
+
+
+def write(path: Path, content: str = ""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def make_fastapi_monorepo(root: Path, scale: int):
+    write(root / "backend" / "main.py", "from fastapi import FastAPI\napp = FastAPI()\n@app.get('/')\nasync def index():\n    pass\n")
+    write(root / "backend" / "requirements.txt", "fastapi\nuvicorn\npydantic\n")
+    for package in ("api", "core", "models", "services"):
+        for n in range(60 * scale):
+            body = "from fastapi import APIRouter\n" if n % 7 == 0 else "import os\n"
+            write(root / "backend" / "app" / package / f"module_{n}.py", body + "x = 1\n" * 20)
+    write(root / "frontend" / "package.json", json.dumps({"dependencies": {"react": "18"}}))
+    for n in range(1500 * scale):
+        write(root / "frontend" / "node_modules" / f"pkg{n % 150}" / f"file_{n}.js", "module.exports = 1\n")
+    for n in range(500 * scale):
+        write(root / ".git" / "objects" / f"{n % 64:02x}" / f"obj_{n}", "blob")
+
+
+def make_django_project(root: Path, scale: int):
+    write(root / "manage.py", "import django\nfrom django.core.management import execute_from_command_line\n")
+    write(root / "requirements.txt", "Django==4.2\n")
+    for app in range(10 * scale):
+        base = root / f"app_{app}"
+        write(base / "models.py", "from django.db import models\n")
+        write(base / "views.py", "from django.http import HttpResponse\n")
+        write(base / "urls.py", "urlpatterns = []\n")
+        for n in range(15):
+            write(base / "migrations" / f"{n:04d}_auto.py", "from django.db import migrations\n")
+    for n in range(1000 * scale):
+        write(root / "venv" / "lib" / "site-packages" / f"pkg{n % 100}" / f"mod_{n}.py", "import os\n")
+
+
+def make_nextjs_app(root: Path, scale: int):
+    write(root / "package.json", json.dumps({"dependencies": {"next": "14", "react": "18"}}))
+    write(root / "next.config.js", "module.exports = {}\n")
+    for n in range(200 * scale):
+        write(root / "pages" / f"page_{n}.tsx", "export default function Page() { return null }\n")
+        write(root / "components" / f"group_{n % 20}" / f"Component{n}.tsx", "export const C = () => null\n")
+    for n in range(3000 * scale):
+        write(root / "node_modules" / f"pkg{n % 300}" / "dist" / f"file_{n}.js", "module.exports = 1\n")
+
+
+SAMPLES = {
+    "fastapi-monorepo": make_fastapi_monorepo,
+    "django-project": make_django_project,
+    "nextjs-app": make_nextjs_app,
+}
+
+
+class Counters:
+    """Counts directory traversals and file reads while active"""
+
+    def __init__(self):
+        self.traversals = 0
+        self.reads = 0
+
+    def __enter__(self):
+        self._walk, self._rglob, self._read_text = os.walk, Path.rglob, Path.read_text
+        counters = self
+
+        def walk(*args, **kwargs):
+            counters.traversals += 1
+            return counters._walk(*args, **kwargs)
+
+        def rglob(self, *args, **kwargs):
+            counters.traversals += 1
+            return counters._rglob(self, *args, **kwargs)
+
+        def read_text(self, *args, **kwargs):
+            counters.reads += 1
+            return counters._read_text(self, *args, **kwargs)
+
+        os.walk, Path.rglob, Path.read_text = walk, rglob, read_text
+        return self
+
+    def __exit__(self, *exc):
+        os.walk, Path.rglob, Path.read_text = self._walk, self._rglob, self._read_text
+
+
+def load_module(path: str):
+    spec = importlib.util.spec_from_file_location("baseline_framework_detector", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(module, project: Path, runs: int):
+    with Counters() as counters:
+        result = module.FrameworkDetector(str(project)).detect()
+    start = time.perf_counter()
+    for _ in range(runs):
+        module.FrameworkDetector(str(project)).detect()
+    elapsed_ms = (time.perf_counter() - start) / runs * 1000
+    return result, counters, elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FrameworkDetector")
+    parser.add_argument("--scale", type=int, default=1, help="Size multiplier for the sample repos")
+    parser.add_argument("--runs", type=int, default=5, help="Timed detect() runs per sample")
+    parser.add_argument("--baseline", help="Path to another framework_detector.py to compare against")
+    args = parser.parse_args()
+
+    implementations = [("current", framework_detector)]
+    if args.baseline:
+        implementations.insert(0, ("baseline", load_module(args.baseline)))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, make_sample in SAMPLES.items():
+            project = Path(tmpdir) / name
+            make_sample(project, args.scale)
+            results = []
+            for label, module in implementations:
+                result, counters, elapsed_ms = measure(module, project, args.runs)
+                results.append(result)
+                print(
+                    f"{name:18s} {label:8s} framework={result['framework']:8s} "
+                    f"traversals={counters.traversals:<4d} reads={counters.reads:<4d} time={elapsed_ms:.1f}ms"
+                )
+            if len(results) == 2:
+                same = all(r['framework'] == results[0]['framework'] and r['all_scores'] == results[0]['all_scores'] for r in results)
+                print(f"{name:18s} scores identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Middleware Benchmark - BaseHTTPMiddleware-Stack vs. reine ASGI-Pipeline
+
+Vergleicht den Durchsatz von /api/v1/health/live mit
+- stacked:  Security-Header, Auth + Rate Limiting und API-Versionierung als
+            drei BaseHTTPMiddleware-Schichten (bisheriger Aufbau in main.py)
+- pipeline: RequestPipelineMiddleware (eine reine ASGI-Middleware)
+
+Beide Varianten laufen hinter CORS und nutzen einen Rate Limiter, der alles
+erlaubt, damit nur der Middleware-Overhead gemessen wird. Requests gehen
+in-process über httpx.ASGITransport (kein Netzwerk, kein Server).
+
+Verwendung:
+    python scripts/benchmark_middleware.py
+    python scripts/benchmark_middleware.py --requests 5000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+from app.core.request_pipeline import (
+    RequestPipelineMiddleware, SECURITY_HEADERS, requires_auth, token_claims
+)
+from app.core.versioning import get_versioned_path, is_versioned_path
+
+PATH = "/api/v1/health/live"
+
+
+class AllowAllLimiter:
+    async def check_rate_limit(self, request, user_id=None, user_role="user", is_ai_call=False):
+        return True
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get(PATH)
+    async def live():
+        return {"status": "alive"}
+
+    return app
+
+
+def stacked_app() -> FastAPI:
+    app = build_app()
+    limiter = AllowAllLimiter()
+
+    @app.middleware("http")
+    async def security_headers(request: Request, call_next):
+        response = await call_next(request)
+        for name, value in SECURITY_HEADERS:
+            response.headers[name.decode()] = value.decode()
+        return response
+
+    @app.middleware("http")
+    async def auth_and_rate_limit(request: Request, call_next):
+        path = request.url.path
+        user_id = None
+        if path.startswith("/api/") and requires_auth(path):
+            auth_header = request.headers.get("authorization", "")
+            if not auth_header.startswith("Bearer "):
+                return JSONResponse(status_code=401, content={"detail": "Authentication required"})
+            user_id = (token_claims(auth_header[7:]) or {}).get("sub")
+        if not await limiter.check_rate_limit(request=request, user_id=user_id):
+            return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"})
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def versioning(request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/api/") and not is_versioned_path(path):
+            request.scope["path"] = get_versioned_path(path)
+        response = await call_next(request)
+        response.headers["API-Version"] = "v1"
+        return response
+
+    app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:3000"])
+    return app
+
+
+def pipeline_app() -> FastAPI:
+    app = build_app()
+    app.add_middleware(RequestPipelineMiddleware, rate_limiter=AllowAllLimiter(), log_usage=False)
+    app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:3000"])
+    return app
+
+
+async def measure(app: FastAPI, requests: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):  # Warm-up (route compilation, middleware stack build)
+            await client.get(PATH)
+
+        remaining = requests
+        latencies = []
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                response = await client.get(PATH)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def print_result(name: str, result: dict):
+    print(f"{name:<9} {result['rps']:>8.0f} req/s  p50={result['p50_ms']:.2f}ms  p99={result['p99_ms']:.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Middleware-Durchsatz: BaseHTTPMiddleware vs. reines ASGI")
+    parser.add_argument("--requests", type=int, default=3000, help="Requests pro Variante")
+    parser.add_argument("--concurrency", type=int, default=10, help="Gleichzeitige Clients")
+    args = parser.parse_args()
+
+    print(f"📊 {args.requests} requests on {PATH}, concurrency {args.concurrency}")
+    stacked = await measure(stacked_app(), args.requests, args.concurrency)
+    pipeline = await measure(pipeline_app(), args.requests, args.concurrency)
+    print_result("stacked", stacked)
+    print_result("pipeline", pipeline)
+    print(f"➡️  {pipeline['rps'] / stacked['rps']:.2f}x throughput")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
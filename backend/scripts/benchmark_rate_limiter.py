@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Benchmark - Durchsatz und Speicher der Rate-Limit-Backends
+
+Schickt eine Mischung aus Requests (viele Client-IPs, Pfade mit IDs, ein Teil
+authentifiziert) durch AdvancedRateLimiter.check_rate_limit() mit
+- legacy: bisheriger Aufbau (nie bereinigte Dicts, Pattern-Sortierung pro Request)
+- memory: InMemoryRateLimitBackend (Idle-Eviction, vorkompilierte Patterns)
+- redis:  RedisRateLimitBackend (atomare Lua-Skripte), nur mit --redis-url bzw. REDIS_URL
+
+Ausgegeben werden Checks pro Sekunde und die danach noch gehaltenen Buckets.
+
+Verwendung:
+    python scripts/benchmark_rate_limiter.py
+    python scripts/benchmark_rate_limiter.py --checks 50000 --clients 5000
+    python scripts/benchmark_rate_limiter.py --redis-url redis://localhost:6379/0 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from starlette.requests import Request
+
+from app.core.rate_limit_backend import InMemoryRateLimitBackend, RedisRateLimitBackend
+from app.core.rate_limiter import AdvancedRateLimiter, TokenBucket
+from app.core.redis_client import AsyncRedisClient
+
+PATHS = ["/api/v1/sessions/{id}", "/api/chat/", "/api/files/{id}", "/api/github/repos/{id}", "/api/auth/login"]
+
+
+class LegacyRateLimiter(AdvancedRateLimiter):
+    """Previous implementation: per-process dicts, never pruned, patterns sorted per request"""
+
+    def __init__(self):
+        super().__init__()
+        self.user_buckets = defaultdict(dict)
+        self.user_quotas = defaultdict(lambda: {"requests": 0, "ai_calls": 0})
+
+    def match_endpoint_pattern(self, path):
+        if path in self.DEFAULT_LIMITS:
+            return self.DEFAULT_LIMITS[path]
+        for pattern in sorted(self.DEFAULT_LIMITS.keys(), key=len, reverse=True):
+            if pattern.endswith("*") and path.startswith(pattern[:-1]):
+                return self.DEFAULT_LIMITS[pattern]
+        return None
+
+    async def _check_endpoint_limit(self, client_id, endpoint, rate_limit):
+        bucket_key = f"{client_id}:{endpoint}"
+        if bucket_key not in self.user_buckets[client_id]:
+            self.user_buckets[client_id][bucket_key] = TokenBucket(
+                capacity=rate_limit.requests, refill_rate=rate_limit.requests / rate_limit.window
+            )
+        return self.user_buckets[client_id][bucket_key].consume(1)
+
+    async def _check_user_quota(self, user_id, user_role, is_ai_call):
+        quotas = self.USER_QUOTAS.get(user_role, self.USER_QUOTAS["user"])
+        current = self.user_quotas[user_id]
+        if current["requests"] >= quotas["requests"] or (is_ai_call and current["ai_calls"] >= quotas["ai_calls"]):
+            return False
+        current["requests"] += 1
+        if is_ai_call:
+            current["ai_calls"] += 1
+        return True
+
+    def get_stats(self):
+        return {"buckets": sum(len(buckets) for buckets in self.user_buckets.values())}
+
+
+def workload(checks: int, clients: int, seed: int = 42) -> list:
+    """(request, user_id) pairs; every fifth client is logged in"""
+    rng = random.Random(seed)
+    items = []
+    for _ in range(checks):
+        client = rng.randrange(clients)
+        path = rng.choice(PATHS).replace("{id}", str(rng.randrange(1000)))
+        request = Request({
+            "type": "http", "method": "GET", "path": path, "query_string": b"", "headers": [],
+            "client": (f"10.{client // 65536}.{client // 256 % 256}.{client % 256}", 1234),
+            "server": ("bench", 80), "scheme": "http"
+        })
+        items.append((request, f"user-{client}" if client % 5 == 0 else None))
+    return items
+
+
+async def measure(limiter: AdvancedRateLimiter, items: list, concurrency: int) -> dict:
+    allowed = 0
+    position = 0
+
+    async def worker():
+        nonlocal allowed, position
+        while position < len(items):
+            request, user_id = items[position]
+            position += 1
+            if await limiter.check_rate_limit(request, user_id=user_id, is_ai_call="/api/chat/" in request.url.path):
+                allowed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stats = limiter.get_stats()
+    return {"cps": len(items) / elapsed, "allowed": allowed, "buckets": stats.get("buckets", "-")}
+
+
+def print_result(name: str, result: dict):
+    print(f"{name:<7} {result['cps']:>9.0f} checks/s  allowed={result['allowed']}  buckets={result['buckets']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rate-Limiter-Durchsatz: legacy vs. memory vs. redis")
+    parser.add_argument("--checks", type=int, default=20000, help="Checks pro Variante")
+    parser.add_argument("--clients", type=int, default=2000, help="Verschiedene Client-IPs")
+    parser.add_argument("--concurrency", type=int, default=10, help="Gleichzeitige Checks")
+    parser.add_argument("--redis-url", default=os.environ.get("REDIS_URL"), help="Redis für das redis-Backend")
+    parser.add_argument("--max-keys", type=int, default=10000, help="RATE_LIMIT_MAX_KEYS für das memory-Backend")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # "Rate limit exceeded" warnings
+
+    items = workload(args.checks, args.clients)
+    print(f"📊 {args.checks} checks, {args.clients} clients, concurrency {args.concurrency}")
+    legacy = await measure(LegacyRateLimiter(), items, args.concurrency)
+    print_result("legacy", legacy)
+    memory = await measure(AdvancedRateLimiter(InMemoryRateLimitBackend(max_keys=args.max_keys)), items, args.concurrency)
+    print_result("memory", memory)
+    print(f"➡️  memory: {memory['cps'] / legacy['cps']:.2f}x throughput")
+
+    if not args.redis_url:
+        print("ℹ️  redis skipped (no --redis-url / REDIS_URL)")
+        return
+    client = AsyncRedisClient.from_url(args.redis_url)
+    try:
+        if not await client.ping():
+            print(f"❌ Redis not reachable at {args.redis_url}")
+            return
+        await client.delete_matching("xionimus:ratelimit:*")
+        backend = RedisRateLimitBackend(client=client)
+        redis = await measure(AdvancedRateLimiter(backend), items, args.concurrency)
+        redis["buckets"] = "redis"
+        print_result("redis", redis)
+        if backend.stats['fallbacks']:
+            print(f"⚠️ {backend.stats['fallbacks']} checks fell back to local limits")
+        await client.delete_matching("xionimus:ratelimit:*")
+    finally:
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Task Queue Benchmark - Polling vs. ereignisgesteuerte TaskQueue
+
+Misst für
+- polling: bisheriges Verhalten (dequeue() prüft alle 100ms, cancel_task()
+           entfernt per list.remove + heapify)
+- event:   TaskQueue (Future-basiertes dequeue(), Lazy-Deletion beim Cancel)
+
+1. Dispatch-Latenz: ein wartender Worker, Tasks kommen einzeln in zufälligen
+   Abständen; gemessen wird enqueue -> dequeue
+2. Durchsatz: --tasks Tasks (Standard 10.000) liegen in der Queue, ein
+   TaskWorkerPool mit --workers Workern arbeitet sie ab
+3. Cancel: --cancel Tasks aus der vollen Queue abbrechen
+
+Verwendung:
+    python scripts/benchmark_task_queue.py
+    python scripts/benchmark_task_queue.py --tasks 20000 --workers 16 --cancel 2000
+"""
+
+import argparse
+import asyncio
+import heapq
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.task_queue import Task, TaskPriority, TaskQueue, TaskStatus, TaskWorkerPool
+
+PRIORITIES = list(TaskPriority)
+
+
+class PollingTaskQueue(TaskQueue):
+    """Previous behaviour: 100ms polling in dequeue(), O(n) cancel"""
+
+    async def dequeue(self, timeout=None):
+        started = time.monotonic()
+        while True:
+            if self._ready_entries:
+                return await super().dequeue(timeout=0)
+            if timeout is not None and time.monotonic() - started >= timeout:
+                return None
+            await asyncio.sleep(0.1)
+
+    async def cancel_task(self, task_id):
+        entry = self._ready_entries.pop(task_id, None)
+        if entry is None:
+            return False
+        self._ready_queue.remove(entry)
+        heapq.heapify(self._ready_queue)
+        entry[-1].status = TaskStatus.CANCELLED
+        self._finish(task_id)
+        return True
+
+
+def make_task(rng: random.Random) -> Task:
+    return Task(agent_type="engineer", priority=rng.choice(PRIORITIES))
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def dispatch_latency(queue: TaskQueue, samples: int) -> dict:
+    rng = random.Random(1)
+    latencies = []
+
+    async def consumer():
+        for _ in range(samples):
+            task = await queue.dequeue()
+            latencies.append(time.perf_counter() - task.metadata["enqueued_at"])
+            await queue.mark_completed(task.task_id)
+
+    worker = asyncio.ensure_future(consumer())
+    for _ in range(samples):
+        await asyncio.sleep(rng.uniform(0, 0.01))
+        task = make_task(rng)
+        task.metadata["enqueued_at"] = time.perf_counter()
+        await queue.enqueue(task)
+    await worker
+    return {"p50_ms": percentile(latencies, 0.5) * 1000, "p99_ms": percentile(latencies, 0.99) * 1000}
+
+
+async def throughput(queue: TaskQueue, tasks: int, workers: int) -> dict:
+    rng = random.Random(2)
+    for _ in range(tasks):
+        await queue.enqueue(make_task(rng))
+
+    async def handler(task):
+        await asyncio.sleep(0)
+
+    pool = TaskWorkerPool(queue, handler, concurrency=workers)
+    started = time.perf_counter()
+    pool.start()
+    await queue.join()
+    elapsed = time.perf_counter() - started
+    await pool.stop()
+    return {"tps": tasks / elapsed, "retained": queue.get_statistics()["retained_finished"]}
+
+
+async def cancel(queue: TaskQueue, tasks: int, cancels: int) -> dict:
+    rng = random.Random(3)
+    queued = [make_task(rng) for _ in range(tasks)]
+    for task in queued:
+        await queue.enqueue(task)
+    victims = rng.sample(queued, cancels)
+    started = time.perf_counter()
+    for task in victims:
+        await queue.cancel_task(task.task_id)
+    elapsed = time.perf_counter() - started
+    return {"us_per_cancel": elapsed / cancels * 1e6}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="TaskQueue: Polling vs. ereignisgesteuert")
+    parser.add_argument("--tasks", type=int, default=10000, help="Tasks für Durchsatz und Cancel")
+    parser.add_argument("--workers", type=int, default=8, help="Worker im TaskWorkerPool")
+    parser.add_argument("--samples", type=int, default=200, help="Tasks für die Dispatch-Latenz")
+    parser.add_argument("--cancel", type=int, default=1000, help="Abgebrochene Tasks")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # One log line per task otherwise
+
+    print(f"📊 {args.tasks} queued tasks, {args.workers} workers, {args.samples} latency samples")
+    for name, queue_class in (("polling", PollingTaskQueue), ("event", TaskQueue)):
+        latency = await dispatch_latency(queue_class(), args.samples)
+        rate = await throughput(queue_class(), args.tasks, args.workers)
+        cancelled = await cancel(queue_class(), args.tasks, args.cancel)
+        print(
+            f"{name:<8} dispatch p50={latency['p50_ms']:.2f}ms p99={latency['p99_ms']:.2f}ms  "
+            f"{rate['tps']:>7.0f} tasks/s (retained {rate['retained']})  "
+            f"cancel {cancelled['us_per_cancel']:.1f}µs"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
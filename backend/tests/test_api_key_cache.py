@@ -0,0 +1,63 @@
+"""
+Tests for the per-user decrypted API key cache
+"""
+import time
+
+from app.core.api_key_cache import ApiKeyCache
+
+
+def test_hit_after_put():
+    """Test that cached keys are returned without reloading"""
+    cache = ApiKeyCache()
+    assert cache.get("user-1") is None
+
+    cache.put("user-1", {"openai": "sk-one", "anthropic": "sk-ant"})
+
+    assert cache.get("user-1") == {"openai": "sk-one", "anthropic": "sk-ant"}
+    assert cache.get_stats()['hits'] == 1
+    assert cache.get_stats()['misses'] == 1
+
+
+def test_empty_result_is_cached():
+    """Test that 'no keys stored' is cached too, so it does not hit the DB each message"""
+    cache = ApiKeyCache()
+    cache.put("user-1", {})
+
+    assert cache.get("user-1") == {}
+
+
+def test_ttl_expiry():
+    """Test that entries expire after the TTL"""
+    cache = ApiKeyCache(ttl_seconds=0.01)
+    cache.put("user-1", {"openai": "sk-one"})
+    time.sleep(0.02)
+
+    assert cache.get("user-1") is None
+
+
+def test_invalidate_zeroes_key_material():
+    """Test that invalidation wipes the cached buffers"""
+    cache = ApiKeyCache()
+    cache.put("user-1", {"openai": "sk-secret"})
+    buffer = cache._entries["user-1"].keys["openai"]
+
+    cache.invalidate("user-1")
+
+    assert cache.get("user-1") is None
+    assert bytes(buffer) == b"\x00" * len("sk-secret")
+    assert cache.get_stats()['invalidations'] == 1
+
+
+def test_lru_eviction_zeroes_key_material():
+    """Test that the least recently used user is evicted and wiped at max_users"""
+    cache = ApiKeyCache(max_users=2)
+    cache.put("user-1", {"openai": "sk-one"})
+    cache.put("user-2", {"openai": "sk-two"})
+    buffer = cache._entries["user-1"].keys["openai"]
+    cache.get("user-2")
+    cache.put("user-3", {"openai": "sk-three"})
+
+    assert cache.get("user-1") is None
+    assert cache.get("user-2") == {"openai": "sk-two"}
+    assert set(buffer) == {0}
+    assert cache.get_stats()['evictions'] == 1
@@ -0,0 +1,53 @@
+"""
+Tests for the async database layer
+"""
+import asyncio
+import tempfile
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base, _to_async_url
+
+
+def test_async_url_mapping():
+    """Test that sync URLs map to their async drivers"""
+    assert _to_async_url("sqlite:////tmp/x.db") == "sqlite+aiosqlite:////tmp/x.db"
+    assert _to_async_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    assert _to_async_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+
+def test_session_endpoints_use_async_session():
+    """Test session + message endpoints round-trip through an AsyncSession"""
+    from app.api.sessions import (
+        AddMessageRequest, CreateSessionRequest, add_message, create_session,
+        delete_session, get_session_messages
+    )
+    from app.models import session_models  # noqa: F401 - registers tables
+
+    async def run(db_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+        try:
+            async with AsyncSessionLocal() as db:
+                session = await create_session(CreateSessionRequest(name="Async"), current_user=None, db=db)
+            async with AsyncSessionLocal() as db:
+                await add_message(AddMessageRequest(session_id=session.id, role="user", content="hi"), db=db)
+            async with AsyncSessionLocal() as db:
+                messages = await get_session_messages(session.id, db=db)
+            async with AsyncSessionLocal() as db:
+                deleted = await delete_session(session.id, current_user=None, db=db)
+            return session, messages, deleted
+        finally:
+            await engine.dispose()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        session, messages, deleted = asyncio.run(run(Path(tmpdir) / "test.db"))
+
+    assert session.name == "Async"
+    assert session.created_at
+    assert [m.content for m in messages] == ["hi"]
+    assert deleted["status"] == "deleted"
@@ -0,0 +1,130 @@
+"""
+Tests for the LRU/TTL cache engine
+"""
+import asyncio
+import time
+
+from app.core.cache_manager import MISSING, CacheManager, make_key
+
+
+class FakeL2:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key, MISSING)
+
+    async def set(self, key, value, ttl_seconds):
+        self.data[key] = value
+
+
+def test_lru_evicts_least_recently_used():
+    """Test that a read refreshes recency so the other entry is evicted"""
+    cache = CacheManager(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get_stats()['namespaces']['default']['evictions'] == 1
+
+
+def test_byte_limit_evicts():
+    """Test that size accounting enforces max_bytes"""
+    cache = CacheManager(max_size=100, max_bytes=10)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 6
+    assert cache.get_stats()['total_bytes'] == 6
+
+
+def test_oversized_write_drops_previous_value():
+    """Test that a value larger than max_bytes is not cached and evicts the old one"""
+    cache = CacheManager(max_size=100, max_bytes=100)
+    cache.set("k", "small")
+    cache.set("k", "x" * 1000)
+
+    assert cache.get("k", MISSING) is MISSING
+    assert cache.get_stats()['total_bytes'] == 0
+
+
+def test_ttl_expiry_and_negative_caching():
+    """Test expiry and that a cached None is distinguishable from a miss"""
+    cache = CacheManager()
+    cache.set("gone", "v", ttl_seconds=0.01)
+    cache.set("none", None)
+    time.sleep(0.02)
+
+    assert cache.get("gone", MISSING) is MISSING
+    assert cache.get("none", MISSING) is None
+    assert cache.get_stats()['namespaces']['default']['expirations'] == 1
+
+
+def test_make_key_accepts_non_json_arguments():
+    """Test that keys can be built from arbitrary objects"""
+    class Thing:
+        def __repr__(self):
+            return "Thing()"
+
+    assert make_key(Thing(), a={1, 2}) == make_key(Thing(), a={1, 2})
+    assert make_key(1, b=2) != make_key(1, b=3)
+
+
+def test_concurrent_misses_share_one_load():
+    """Test single-flight: concurrent get_or_set calls run the loader once"""
+    cache = CacheManager()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_set("k", loader, namespace="ai") for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert results == ["value"] * 10
+    assert len(calls) == 1
+    assert cache.get_stats()['namespaces']['ai']['coalesced'] == 9
+
+
+def test_none_result_is_negatively_cached():
+    """Test that a None result is cached and not reloaded"""
+    cache = CacheManager()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return None
+
+    async def run():
+        await cache.get_or_set("k", loader)
+        return await cache.get_or_set("k", loader)
+
+    assert asyncio.run(run()) is None
+    assert len(calls) == 1
+
+
+def test_l2_tier_serves_l1_misses():
+    """Test that values found in L2 are used and promoted to L1"""
+    l2 = FakeL2()
+    cache = CacheManager(l2=l2)
+
+    async def loader():
+        return {"answer": 42}
+
+    asyncio.run(cache.get_or_set("k", loader, namespace="ns"))
+    other_worker = CacheManager(l2=l2)
+
+    async def must_not_load():
+        raise AssertionError("loader should not run")
+
+    assert asyncio.run(other_worker.get_or_set("k", must_not_load, namespace="ns")) == {"answer": 42}
+    assert other_worker.get("k", namespace="ns") == {"answer": 42}
+    assert other_worker.get_stats()['namespaces']['ns']['l2_hits'] == 1
@@ -0,0 +1,103 @@
+"""
+Tests for the content-addressed sandbox compile cache
+"""
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.core.compile_cache import CompileCache
+from app.core.sandbox_executor import SandboxExecutor
+
+C_PROGRAM = '#include <stdio.h>\nint main(){int n; if (scanf("%d", &n) != 1) n = 0; printf("%d\\n", n * 2); return 0;}'
+
+
+def _write_artifact(directory: Path, name: str, size: int) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    return path
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+def test_rerun_with_new_stdin_skips_compiler(tmp_path):
+    """Test that the second run of the same source restores the binary from the cache"""
+    executor = SandboxExecutor()
+    executor.compile_cache = CompileCache(cache_dir=tmp_path / "cache", max_bytes=50 * 1024 * 1024)
+
+    first = executor.execute_code(C_PROGRAM, "c", stdin_input="2")
+    second = executor.execute_code(C_PROGRAM, "c", stdin_input="21")
+    stats = executor.compile_cache.get_stats()
+
+    assert first["stdout"] == "4\n"
+    assert second["stdout"] == "42\n"
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
+    assert stats['compile_ms_saved'] > 0
+
+
+def test_key_ignores_run_directory_but_not_flags(tmp_path):
+    """Test that per-run paths are normalized out of the key while flags are kept"""
+    source = b"int main(){}"
+    key_a = CompileCache.make_key("c", ["gcc", "-O2", "-o", str(tmp_path / "a" / "program")], tmp_path / "a", source)
+    key_b = CompileCache.make_key("c", ["gcc", "-O2", "-o", str(tmp_path / "b" / "program")], tmp_path / "b", source)
+    key_c = CompileCache.make_key("c", ["gcc", "-O0", "-o", str(tmp_path / "b" / "program")], tmp_path / "b", source)
+
+    assert key_a == key_b
+    assert key_a != key_c
+
+
+def test_lru_eviction_by_size(tmp_path):
+    """Test that the least recently used build is evicted when over budget"""
+    async def scenario():
+        cache = CompileCache(cache_dir=tmp_path / "cache", max_bytes=250)
+        build = tmp_path / "build"
+        for key in ("k1", "k2"):
+            _write_artifact(build, "program", 100)
+            await cache.store(key, build, ["program"], compile_ms=10)
+        await cache.restore("k1", tmp_path / "run")  # k1 becomes most recently used
+        _write_artifact(build, "program", 100)
+        await cache.store("k3", build, ["program"], compile_ms=10)
+        return cache
+
+    (tmp_path / "run").mkdir()
+    cache = asyncio.run(scenario())
+
+    assert (tmp_path / "cache" / "k1").exists()
+    assert not (tmp_path / "cache" / "k2").exists()
+    assert cache.get_stats()['evictions'] == 1
+    assert cache.get_stats()['bytes'] == 200
+
+
+def test_tampered_artifact_is_dropped(tmp_path):
+    """Test that an artifact modified on disk is treated as a miss and removed"""
+    async def scenario():
+        cache = CompileCache(cache_dir=tmp_path / "cache", max_bytes=1024)
+        _write_artifact(tmp_path / "build", "program", 10)
+        await cache.store("k1", tmp_path / "build", ["program"], compile_ms=10)
+        (tmp_path / "cache" / "k1" / "program").write_bytes(b"evil")
+        (tmp_path / "run").mkdir()
+        return cache, await cache.restore("k1", tmp_path / "run")
+
+    cache, meta = asyncio.run(scenario())
+
+    assert meta is None
+    assert cache.get_stats()['corrupt'] == 1
+    assert not (tmp_path / "cache" / "k1").exists()
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    """Test that cached builds survive a restart"""
+    async def scenario():
+        first = CompileCache(cache_dir=tmp_path / "cache", max_bytes=1024)
+        _write_artifact(tmp_path / "build", "program", 10)
+        await first.store("k1", tmp_path / "build", ["program"], compile_ms=25, extra={"class_name": "Main"})
+        (tmp_path / "run").mkdir()
+        second = CompileCache(cache_dir=tmp_path / "cache", max_bytes=1024)
+        return await second.restore("k1", tmp_path / "run")
+
+    meta = asyncio.run(scenario())
+
+    assert meta["class_name"] == "Main"
+    assert (tmp_path / "run" / "program").read_bytes() == b"x" * 10
@@ -0,0 +1,54 @@
+"""
+Tests for the indexed framework detector
+"""
+import json
+import os
+
+from app.core.framework_detector import FrameworkDetector
+
+
+def _write(path, content=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_detects_fastapi_in_backend_subdirectory(tmp_path):
+    """Test that entry files and imports below backend/ are found"""
+    _write(tmp_path / "backend" / "main.py", "from fastapi import FastAPI\napp = FastAPI()\n@app.get('/')\nasync def index(): pass\n")
+    _write(tmp_path / "backend" / "app" / "api" / "users.py", "from fastapi import APIRouter\n")
+    _write(tmp_path / "requirements.txt", "fastapi\nuvicorn\n")
+
+    result = FrameworkDetector(str(tmp_path)).detect()
+
+    assert result["framework"] == "fastapi"
+    assert "✅ Found backend/main.py" in result["evidence"]
+    assert "✅ Found app/api/ directory" in result["evidence"]
+
+
+def test_ignored_directories_are_not_evidence(tmp_path):
+    """Test that vendored code (node_modules, venv) does not count"""
+    _write(tmp_path / "node_modules" / "express" / "app.js", "express()")
+    _write(tmp_path / "venv" / "lib" / "manage.py", "import django")
+    _write(tmp_path / "package.json", json.dumps({"dependencies": {}}))
+
+    result = FrameworkDetector(str(tmp_path)).detect()
+
+    assert result["framework"] == "unknown"
+
+
+def test_single_traversal_and_memoized_reads(tmp_path, monkeypatch):
+    """Test that one detect() walks the tree once and reads each file at most once"""
+    _write(tmp_path / "app.py", "from flask import Flask\napp = Flask(__name__)\n@app.route('/')\ndef index(): pass\n")
+    _write(tmp_path / "wsgi.py", "from app import app\n")
+    _write(tmp_path / "requirements.txt", "flask\n")
+    walks = []
+    real_walk = os.walk
+    monkeypatch.setattr(os, "walk", lambda *args, **kwargs: walks.append(args) or real_walk(*args, **kwargs))
+
+    detector = FrameworkDetector(str(tmp_path))
+    result = detector.detect()
+
+    assert result["framework"] == "flask"
+    assert len(walks) == 1
+    assert detector.index.stats['traversals'] == 1
+    assert detector.index.stats['files_read'] == 3
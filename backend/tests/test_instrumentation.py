@@ -0,0 +1,160 @@
+"""
+Tests for Prometheus instrumentation of HTTP routes, DB queries and AI calls
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.core.ai_manager import AIManager
+from app.core.instrumentation import PrometheusMiddleware, instrument_engine, model_label, watch_gauges, UNMATCHED_ROUTE
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.add_middleware(PrometheusMiddleware)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_http_requests_are_labelled_by_route_template(client):
+    """Test that ids in the path do not become label values"""
+    labels = dict(method="GET", endpoint="/items/{item_id}", status="200")
+    before = sample("xionimus_http_requests_total", **labels)
+
+    client.get("/items/1")
+    client.get("/items/2")
+
+    assert sample("xionimus_http_requests_total", **labels) == before + 2
+    assert sample("xionimus_http_request_duration_seconds_count", method="GET", endpoint="/items/{item_id}") >= 2
+    assert sample("xionimus_http_requests_total", method="GET", endpoint="/items/1", status="200") == 0
+
+
+def test_unmatched_paths_and_errors_share_bounded_labels(client):
+    """Test that unknown paths collapse into one label and exceptions count as 500"""
+    unmatched = dict(method="GET", endpoint=UNMATCHED_ROUTE, status="404")
+    failed = dict(method="GET", endpoint="/boom", status="500")
+    before_unmatched = sample("xionimus_http_requests_total", **unmatched)
+    before_failed = sample("xionimus_http_requests_total", **failed)
+
+    client.get("/does-not-exist/123")
+    client.get("/boom")
+
+    assert sample("xionimus_http_requests_total", **unmatched) == before_unmatched + 1
+    assert sample("xionimus_http_requests_total", **failed) == before_failed + 1
+
+
+def test_sqlalchemy_queries_are_timed_by_operation():
+    """Test that the cursor hooks record successful and failed queries once per engine"""
+    engine = create_engine("sqlite://")
+    assert instrument_engine(engine) is True
+    assert instrument_engine(engine) is False
+    before_ok = sample("xionimus_db_queries_total", operation="SELECT", status="success")
+    before_err = sample("xionimus_db_queries_total", operation="SELECT", status="error")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing_table"))
+
+    assert sample("xionimus_db_queries_total", operation="SELECT", status="success") == before_ok + 1
+    assert sample("xionimus_db_queries_total", operation="SELECT", status="error") == before_err + 1
+
+
+class FakeProvider:
+    async def generate_response(self, messages, model, stream=False):
+        return {"content": "ok", "usage": {"prompt_tokens": 100, "completion_tokens": 50}}
+
+
+def test_ai_calls_record_latency_tokens_and_cost():
+    """Test that non-streaming calls export tokens and cost per provider/model"""
+    manager = AIManager()
+    manager.providers["openai"] = FakeProvider()
+    labels = dict(provider="openai", model="gpt-4o-mini")
+    before_prompt = sample("xionimus_ai_tokens_total", type="prompt", **labels)
+    before_calls = sample("xionimus_ai_requests_total", status="success", **labels)
+    before_cost = sample("xionimus_ai_cost_dollars_total", **labels)
+
+    asyncio.run(manager.generate_response("openai", "gpt-4o-mini", [{"role": "user", "content": "hi"}]))
+
+    assert sample("xionimus_ai_tokens_total", type="prompt", **labels) == before_prompt + 100
+    assert sample("xionimus_ai_requests_total", status="success", **labels) == before_calls + 1
+    assert sample("xionimus_ai_cost_dollars_total", **labels) > before_cost
+
+
+def test_client_supplied_model_names_have_bounded_labels():
+    """Test that arbitrary model names cannot create new label values"""
+    manager = AIManager()
+    manager.providers["openai"] = FakeProvider()
+    before_other = sample("xionimus_ai_requests_total", provider="openai", model="other", status="success")
+
+    for index in range(3):
+        asyncio.run(manager.generate_response("openai", f"made-up-model-{index}", [{"role": "user", "content": "hi"}]))
+
+    assert sample("xionimus_ai_requests_total", provider="openai", model="other", status="success") == before_other + 3
+    assert sample("xionimus_ai_requests_total", provider="openai", model="made-up-model-0", status="success") == 0
+    assert model_label("claude-3-5-haiku-20241022") == "claude-3-5-haiku"
+    assert model_label("GPT-4o-mini") == "gpt-4o-mini"
+
+
+def test_streams_record_time_to_first_token():
+    """Test that streamed calls export TTFT and that early close counts as cancelled"""
+    manager = AIManager()
+
+    async def fake_stream(*args):
+        await asyncio.sleep(0.01)
+        yield {"content": "Hello"}
+        yield {"content": " world"}
+
+    manager._stream_provider = fake_stream
+    labels = dict(provider="anthropic", model="claude-sonnet-4-5-20250929")
+    before_ttft = sample("xionimus_ai_time_to_first_token_seconds_count", **labels)
+    before_cancelled = sample("xionimus_ai_requests_total", status="cancelled", **labels)
+
+    async def consume(limit=None):
+        stream = manager.stream_response("anthropic", "claude-sonnet-4-5-20250929", [{"role": "user", "content": "hi"}])
+        received = []
+        async for chunk in stream:
+            received.append(chunk["content"])
+            if limit and len(received) == limit:
+                await stream.aclose()
+                break
+        return received
+
+    assert asyncio.run(consume()) == ["Hello", " world"]
+    asyncio.run(consume(limit=1))
+
+    assert sample("xionimus_ai_time_to_first_token_seconds_count", **labels) == before_ttft + 2
+    assert sample("xionimus_ai_requests_total", status="cancelled", **labels) == before_cancelled + 1
+    assert sample("xionimus_ai_tokens_total", type="completion", **labels) > 0
+
+
+def test_gauges_are_read_on_scrape():
+    """Test that gauges follow their sources without explicit updates"""
+    connections = {"count": 3}
+
+    class Queue:
+        def get_statistics(self):
+            return {"ready": 2, "pending": 1, "scheduled": 0, "running": 4}
+
+    watch_gauges(websocket_connections=lambda: connections["count"], task_queue=lambda: Queue())
+    assert sample("xionimus_websocket_connections_active") == 3
+    connections["count"] = 5
+    assert sample("xionimus_websocket_connections_active") == 5
+    assert sample("xionimus_task_queue_tasks", state="running") == 4
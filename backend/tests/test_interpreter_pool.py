@@ -0,0 +1,119 @@
+"""
+Tests for the pre-started sandbox interpreter pool
+"""
+import asyncio
+import copy
+import shutil
+
+import pytest
+
+from app.core.interpreter_pool import InterpreterPool
+from app.core.sandbox_executor import SandboxExecutor
+
+
+def _run_with_pool(languages, scenario, size=1, configure=None):
+    async def main():
+        executor = SandboxExecutor()
+        if configure:
+            executor.LANGUAGE_CONFIGS = copy.deepcopy(executor.LANGUAGE_CONFIGS)
+            configure(executor.LANGUAGE_CONFIGS)
+        executor.interpreter_pool = InterpreterPool(executor, languages, size=size)
+        await executor.interpreter_pool.start()
+        try:
+            return await scenario(executor)
+        finally:
+            await executor.interpreter_pool.stop()
+    return asyncio.run(main())
+
+
+def test_warm_python_run_matches_cold_behaviour():
+    """Test that a pre-started interpreter sees stdin, argv, __name__ and its own directory"""
+    code = "import os, sys\nprint(input(), __name__, os.path.basename(sys.argv[0]), os.getcwd() == os.path.dirname(__file__))"
+
+    async def scenario(executor):
+        result = await executor.execute_code_async(code, "python", stdin_input="hello")
+        return result, executor.interpreter_pool.get_stats()
+
+    result, stats = _run_with_pool(["python"], scenario)
+
+    assert result["stdout"] == "hello __main__ code.py True\n"
+    assert stats['warm_runs'] == 1
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+def test_warm_javascript_run_matches_cold_behaviour():
+    """Test that a pre-started node runs the file as the main module, like `node code.js`"""
+    code = (
+        "const path = require('path');\n"
+        "console.log(require.main === module ? 'main' : 'not main', path.basename(process.argv[1]), "
+        "process.cwd() === __dirname);"
+    )
+
+    async def cold_then_warm(executor):
+        pool, executor.interpreter_pool = executor.interpreter_pool, None
+        cold = await executor.execute_code_async(code, "javascript")
+        executor.interpreter_pool = pool
+        warm = await executor.execute_code_async(code, "javascript")
+        return cold, warm, pool.get_stats()
+
+    def roomy_address_space(configs):
+        configs["javascript"]["memory_limit_mb"] = 4096  # V8 reserves its code range up front
+
+    cold, warm, stats = _run_with_pool(["javascript"], cold_then_warm, configure=roomy_address_space)
+
+    assert cold["stdout"] == "main code.js true\n"
+    assert warm["stdout"] == cold["stdout"]
+    assert stats['warm_runs'] == 1
+
+
+def test_each_interpreter_runs_one_program():
+    """Test that state does not leak between runs (interpreters are single-use)"""
+    async def scenario(executor):
+        first = await executor.execute_code_async("import builtins\nbuiltins.leaked = 1\nprint('set')", "python")
+        await asyncio.sleep(0.1)  # let the refill finish
+        second = await executor.execute_code_async("import builtins\nprint(hasattr(builtins, 'leaked'))", "python")
+        return first, second, executor.interpreter_pool.get_stats()
+
+    first, second, stats = _run_with_pool(["python"], scenario)
+
+    assert first["stdout"] == "set\n"
+    assert second["stdout"] == "False\n"
+    assert stats['warm_runs'] == 2
+    assert stats['spawned'] >= 3
+
+
+def test_tracebacks_hide_the_bootstrap():
+    """Test that errors look like a normal python3 run"""
+    async def scenario(executor):
+        return await executor.execute_code_async("raise ValueError('boom')", "python")
+
+    result = _run_with_pool(["python"], scenario)
+
+    assert result["exit_code"] == 1
+    assert "<string>" not in result["stderr"]
+    assert "ValueError: boom" in result["stderr"]
+
+
+def test_interpreters_dying_while_idle_fall_back_to_cold_runs():
+    """Test that a language whose interpreter cannot start under its limits is no longer pooled"""
+    def tiny_memory(configs):
+        configs["python"]["memory_limit_mb"] = 1
+
+    async def scenario(executor):
+        pool = executor.interpreter_pool
+        for _ in range(3):
+            await asyncio.sleep(0.3)
+            pool.acquire("python")
+        return pool.get_stats()
+
+    stats = _run_with_pool(["python"], scenario, configure=tiny_memory)
+
+    assert "python" not in stats['languages']
+    assert stats['warm_runs'] == 0
+
+
+def test_pool_is_disabled_without_configuration(monkeypatch):
+    """Test that the pool is opt-in"""
+    monkeypatch.delenv("SANDBOX_WARM_POOL", raising=False)
+
+    assert InterpreterPool.from_env(SandboxExecutor()) is None
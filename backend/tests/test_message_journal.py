@@ -0,0 +1,99 @@
+"""
+Tests for the write-behind message journal
+"""
+import asyncio
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.core.message_journal import MessageJournal
+from app.models.session_models import Message, Session
+
+
+async def _with_database(db_path, scenario):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        return await scenario(factory)
+    finally:
+        await engine.dispose()
+
+
+def _run(scenario):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        return asyncio.run(_with_database(Path(tmpdir) / "journal.db", scenario))
+
+
+def _exchange(n):
+    return [
+        {"role": "user", "content": f"q{n}"},
+        {"role": "assistant", "content": f"a{n}"}
+    ]
+
+
+def test_batches_are_flushed_and_drained_on_stop():
+    """Test that concurrent submits are grouped into few transactions and drained on stop"""
+    async def scenario(factory):
+        journal = MessageJournal(session_factory=factory, max_batch=100, flush_interval=0.05)
+        journal.start()
+        await asyncio.gather(*(journal.submit(f"s{n % 3}", _exchange(n)) for n in range(20)))
+        await journal.stop()
+
+        async with factory() as db:
+            messages = await db.scalar(select(func.count(Message.id)))
+            sessions = await db.scalar(select(func.count(Session.id)))
+        return journal.get_stats(), messages, sessions
+
+    stats, messages, sessions = _run(scenario)
+
+    assert messages == 40
+    assert sessions == 3
+    assert stats['written'] == 40
+    assert stats['batches'] < 20
+    assert stats['queue_depth'] == 0
+
+
+def test_exchange_order_is_preserved():
+    """Test that the user message sorts before the assistant reply"""
+    async def scenario(factory):
+        journal = MessageJournal(session_factory=factory)
+        await journal.submit("s1", _exchange(1))  # not started: written inline
+        async with factory() as db:
+            rows = (await db.execute(
+                select(Message.role).where(Message.session_id == "s1").order_by(Message.timestamp)
+            )).scalars().all()
+        return journal.get_stats(), rows
+
+    stats, roles = _run(scenario)
+
+    assert roles == ["user", "assistant"]
+    assert stats['batches'] == 1
+
+
+def test_unwritable_row_only_drops_itself():
+    """Test that a row failing every attempt does not take the rest of the batch with it"""
+    async def scenario(factory):
+        journal = MessageJournal(session_factory=factory, max_batch=100, flush_interval=0.05)
+        await journal.submit("s1", [{"id": "msg_taken", "role": "user", "content": "first"}])
+        journal.start()
+        await asyncio.gather(
+            journal.submit("s2", _exchange(1)),
+            journal.submit("s3", [{"id": "msg_taken", "role": "user", "content": "duplicate id"}]),
+            journal.submit("s4", _exchange(2))
+        )
+        await journal.stop()
+
+        async with factory() as db:
+            sessions = (await db.execute(select(Message.session_id).order_by(Message.session_id))).scalars().all()
+        return journal.get_stats(), sessions
+
+    stats, sessions = _run(scenario)
+
+    assert sessions == ["s1", "s2", "s2", "s4", "s4"]
+    assert stats['failed'] == 1
+    assert stats['written'] == 5
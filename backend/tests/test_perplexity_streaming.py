@@ -0,0 +1,99 @@
+"""
+Tests for Perplexity incremental streaming and SSE parsing
+"""
+import asyncio
+import json
+
+import httpx
+
+from app.core.ai_manager import AIManager, PerplexityProvider, iter_sse_data
+
+
+async def _lines(items):
+    for item in items:
+        yield item
+
+
+def _collect(agen):
+    async def run():
+        return [item async for item in agen]
+    return asyncio.run(run())
+
+
+def test_sse_parser_joins_multiline_data():
+    """Test that multi-line data fields form one event and comments are skipped"""
+    lines = [": keep-alive", "data: {\"a\":", "data: 1}", "", "event: ping", "data: [DONE]", ""]
+
+    assert _collect(iter_sse_data(_lines(lines))) == ['{"a":\n1}', "[DONE]"]
+
+
+def test_sse_parser_flushes_last_event_without_blank_line():
+    """Test that a trailing event without terminator is still yielded"""
+    assert _collect(iter_sse_data(_lines(["data: tail"]))) == ["tail"]
+
+
+class _ChunkedStream(httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def _sse_event(payload):
+    return f"data: {json.dumps(payload)}\n\n".encode()
+
+
+def _manager_with_transport(handler):
+    client = httpx.AsyncClient(base_url="https://api.perplexity.ai", transport=httpx.MockTransport(handler))
+    manager = AIManager()
+    manager.providers["perplexity"] = PerplexityProvider("pplx-test", http_client=client)
+    return manager
+
+
+def test_perplexity_stream_yields_deltas_then_citations_and_metrics():
+    """Test deltas arrive in order, followed by trailing citations and metrics events"""
+    chunks = [
+        _sse_event({"choices": [{"delta": {"content": "Hello"}}]}),
+        _sse_event({"choices": [{"delta": {"content": " world"}}], "citations": ["https://example.com"]}),
+        _sse_event({"choices": [{"delta": {}}], "usage": {"completion_tokens": 2}}),
+        b"data: [DONE]\n\n",
+    ]
+
+    def handler(request):
+        assert request.headers["Authorization"] == "Bearer pplx-test"
+        return httpx.Response(200, stream=_ChunkedStream(chunks))
+
+    manager = _manager_with_transport(handler)
+    events = _collect(manager.stream_response(
+        provider="perplexity",
+        model="sonar",
+        messages=[{"role": "user", "content": "hi"}]
+    ))
+
+    assert [e["content"] for e in events if "type" not in e] == ["Hello", " world"]
+    citations = next(e for e in events if e.get("type") == "citations")
+    assert citations["citations"] == ["https://example.com"]
+    metrics = events[-1]
+    assert metrics["type"] == "metrics"
+    assert metrics["metrics"]["completion_tokens"] == 2
+    assert metrics["metrics"]["ttft_ms"] is not None
+
+
+def test_perplexity_stream_error_status_raises():
+    """Test that a non-200 status surfaces as ValueError"""
+    def handler(request):
+        return httpx.Response(401, json={"error": {"message": "bad key"}})
+
+    manager = _manager_with_transport(handler)
+
+    try:
+        _collect(manager.stream_response(
+            provider="perplexity",
+            model="sonar",
+            messages=[{"role": "user", "content": "hi"}]
+        ))
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "401" in str(e)
@@ -0,0 +1,97 @@
+"""
+Tests for the concurrent post-generation pipeline
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core.post_generation import PostGenerationPipeline, _parse_stage_timeouts
+
+
+def _stage(pipeline, name, delay, result=None, error=None, timeout=None):
+    async def run():
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+
+    stage = pipeline.stage(name, run)
+    if timeout is not None:
+        stage.timeout = timeout
+    return stage
+
+
+@pytest.mark.asyncio
+async def test_stages_run_concurrently():
+    """Test that total time is the slowest stage, not the sum"""
+    pipeline = PostGenerationPipeline()
+    stages = [_stage(pipeline, name, 0.2, {"agent": name}) for name in ("summary", "testing", "documentation")]
+
+    start = time.perf_counter()
+    results = await pipeline.run_all(stages)
+
+    assert time.perf_counter() - start < 0.5
+    assert list(results) == ["summary", "testing", "documentation"]
+    assert results["testing"] == {"agent": "testing"}
+
+
+@pytest.mark.asyncio
+async def test_failures_and_timeouts_are_isolated():
+    """Test that a failing or slow stage does not affect the others"""
+    pipeline = PostGenerationPipeline()
+    results = await pipeline.run_all([
+        _stage(pipeline, "summary", 0, {"agent": "Summary"}),
+        _stage(pipeline, "testing", 0, error=RuntimeError("provider down")),
+        _stage(pipeline, "documentation", 5, {"agent": "Documentation"}, timeout=0.05),
+    ])
+
+    assert results == {"summary": {"agent": "Summary"}, "testing": None, "documentation": None}
+    assert pipeline.stats['failed'] == 1
+    assert pipeline.stats['timed_out'] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_delivery_publishes_in_completion_order():
+    """Test that results are published as they complete and kept for polling"""
+    pipeline = PostGenerationPipeline()
+    published = []
+    job = pipeline.start("msg-1", "session-1", [
+        _stage(pipeline, "testing", 0.1, {"agent": "Testing"}),
+        _stage(pipeline, "summary", 0, {"agent": "Summary"}),
+    ], published.append, user_id="user-1")
+
+    assert job['status'] == 'running'
+    assert job['pending'] == ["testing", "summary"]
+
+    await asyncio.sleep(0.3)
+
+    assert [m.get("stage") for m in published] == ["summary", "testing", None]
+    assert published[-1] == {"type": "agent_results_complete", "message_id": "msg-1", "stages": ["summary", "testing"]}
+    assert pipeline.get_job("msg-1")['status'] == 'complete'
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_running_stages():
+    """Test that cancelling a job cancels its stages and keeps finished results"""
+    pipeline = PostGenerationPipeline()
+    published = []
+    pipeline.start("msg-2", "session-2", [
+        _stage(pipeline, "summary", 0, {"agent": "Summary"}),
+        _stage(pipeline, "testing", 10, {"agent": "Testing"}),
+    ], published.append)
+    await asyncio.sleep(0.05)
+
+    assert pipeline.cancel_session("session-2") == 1
+    await asyncio.sleep(0.05)
+
+    job = pipeline.get_job("msg-2")
+    assert job['status'] == 'cancelled'
+    assert job['results'] == {"summary": {"agent": "Summary"}}
+    assert job['pending'] == ["testing"]
+    assert pipeline.get_stats()['running_jobs'] == 0
+
+
+def test_parse_stage_timeouts():
+    """Test POST_GENERATION_TIMEOUTS parsing"""
+    assert _parse_stage_timeouts("summary=20, testing=90.5,bad,docs=x") == {"summary": 20.0, "testing": 90.5}
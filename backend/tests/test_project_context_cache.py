@@ -0,0 +1,127 @@
+"""
+Tests for Project Context Cache
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from app.core.project_context_cache import ProjectContextCache, compute_fingerprint
+
+
+def _builder_counter():
+    calls = []
+
+    def builder(repo_path, project_name):
+        calls.append(repo_path)
+        return {"success": True, "path": repo_path}, {"framework": "fastapi"}, f"context for {project_name}"
+
+    return builder, calls
+
+
+class TestProjectContextCache:
+    """Test project context caching and invalidation"""
+
+    def test_second_lookup_is_cached(self):
+        """Test that an unchanged tree is only scanned once"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ProjectContextCache()
+            builder, calls = _builder_counter()
+
+            first = asyncio.run(cache.get_or_build("user-1", "proj", tmpdir, builder))
+            second = asyncio.run(cache.get_or_build("user-1", "proj", tmpdir, builder))
+
+            assert len(calls) == 1
+            assert first is second
+            assert second.context_text == "context for proj"
+            assert cache.get_stats()['hits'] == 1
+
+    def test_tree_change_triggers_rescan(self):
+        """Test that adding a top-level file changes the fingerprint"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ProjectContextCache()
+            builder, calls = _builder_counter()
+
+            asyncio.run(cache.get_or_build("user-1", "proj", tmpdir, builder))
+            time.sleep(0.01)
+            with open(os.path.join(tmpdir, "main.py"), "w") as f:
+                f.write("print('hi')")
+            asyncio.run(cache.get_or_build("user-1", "proj", tmpdir, builder))
+
+            assert len(calls) == 2
+
+    def test_invalidate_path_drops_containing_project(self):
+        """Test that a write below the project root invalidates it"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ProjectContextCache()
+            builder, calls = _builder_counter()
+
+            asyncio.run(cache.get_or_build("user-1", "proj", tmpdir, builder))
+            cache.invalidate_path(os.path.join(tmpdir, "src", "deep", "file.py"))
+            asyncio.run(cache.get_or_build("user-1", "proj", tmpdir, builder))
+
+            assert len(calls) == 2
+
+    def test_concurrent_cold_lookups_share_one_scan(self):
+        """Test that concurrent misses for the same project scan once"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ProjectContextCache()
+            builder, calls = _builder_counter()
+
+            async def run():
+                return await asyncio.gather(*[
+                    cache.get_or_build("user-1", "proj", tmpdir, builder) for _ in range(5)
+                ])
+
+            results = asyncio.run(run())
+
+            assert len(calls) == 1
+            assert all(r is results[0] for r in results)
+
+    def test_failed_scan_not_cached(self):
+        """Test that failed scans are retried on the next lookup"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ProjectContextCache()
+            calls = []
+
+            def failing_builder(repo_path, project_name):
+                calls.append(repo_path)
+                return {"error": "boom"}, {}, ""
+
+            asyncio.run(cache.get_or_build("user-1", "proj", tmpdir, failing_builder))
+            asyncio.run(cache.get_or_build("user-1", "proj", tmpdir, failing_builder))
+
+            assert len(calls) == 2
+
+    def test_invalidation_during_build_is_not_lost(self):
+        """Test that a scan invalidated while running does not cache its pre-change result"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = ProjectContextCache()
+            builder, calls = _builder_counter()
+
+            def slow_builder(repo_path, project_name):
+                time.sleep(0.1)
+                return builder(repo_path, project_name)
+
+            async def run():
+                build = asyncio.ensure_future(cache.get_or_build("user-1", "proj", tmpdir, slow_builder))
+                await asyncio.sleep(0.02)
+                cache.invalidate("user-1", "proj")
+                await build
+                await cache.get_or_build("user-1", "proj", tmpdir, slow_builder)
+
+            asyncio.run(run())
+
+            assert len(calls) == 2
+            assert cache._generations == {}
+
+    def test_git_head_fingerprint(self):
+        """Test that git checkouts are fingerprinted by HEAD commit"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.makedirs(os.path.join(tmpdir, ".git", "refs", "heads"))
+            with open(os.path.join(tmpdir, ".git", "HEAD"), "w") as f:
+                f.write("ref: refs/heads/main\n")
+            with open(os.path.join(tmpdir, ".git", "refs", "heads", "main"), "w") as f:
+                f.write("abc123\n")
+
+            assert compute_fingerprint(tmpdir) == "git:abc123"
@@ -0,0 +1,70 @@
+"""
+Tests for the AI provider client pool
+"""
+import asyncio
+
+import pytest
+
+from app.core.provider_pool import ProviderClientPool, hash_api_key
+
+
+class FakeProvider:
+    def __init__(self, api_key, http_client=None):
+        self.api_key = api_key
+        self.http_client = http_client
+
+
+@pytest.fixture
+def pool():
+    pool = ProviderClientPool(max_size=2, idle_seconds=600)
+    yield pool
+    asyncio.run(pool.aclose())
+
+
+def test_same_key_reuses_provider(pool):
+    """Test that repeated requests with one key share a provider instance"""
+    first = pool.acquire("openai", "sk-test-1", FakeProvider)
+    second = pool.acquire("openai", "sk-test-1", FakeProvider)
+
+    assert first is second
+    assert pool.get_stats()['hits'] == 1
+
+
+def test_keys_share_http_client(pool):
+    """Test that different keys of one provider share the HTTP connection pool"""
+    first = pool.acquire("openai", "sk-test-1", FakeProvider)
+    second = pool.acquire("openai", "sk-test-2", FakeProvider)
+    other = pool.acquire("anthropic", "sk-ant-1", FakeProvider)
+
+    assert first is not second
+    assert first.http_client is second.http_client
+    assert other.http_client is not first.http_client
+
+
+def test_lru_eviction(pool):
+    """Test that the least recently used provider is evicted at max_size"""
+    first = pool.acquire("openai", "key-1", FakeProvider)
+    pool.acquire("openai", "key-2", FakeProvider)
+    pool.acquire("openai", "key-1", FakeProvider)  # key-1 becomes most recent
+    pool.acquire("openai", "key-3", FakeProvider)  # evicts key-2
+
+    assert pool.acquire("openai", "key-1", FakeProvider) is first
+    assert pool.get_stats()['evictions'] == 1
+
+
+def test_idle_eviction():
+    """Test that idle providers are dropped on the next acquire"""
+    pool = ProviderClientPool(idle_seconds=0)
+    first = pool.acquire("openai", "key-1", FakeProvider)
+    second = pool.acquire("openai", "key-1", FakeProvider)
+
+    assert first is not second
+    asyncio.run(pool.aclose())
+
+
+def test_raw_key_not_stored(pool):
+    """Test that pool keys use the key hash, never the raw key"""
+    pool.acquire("openai", "sk-secret", FakeProvider)
+
+    assert all("sk-secret" not in key[1] for key in pool._providers)
+    assert ("openai", hash_api_key("sk-secret")) in pool._providers
@@ -0,0 +1,144 @@
+"""
+Tests for hedged, latency-aware provider routing
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.core.provider_router import ProviderRouter, is_provider_failure
+
+
+class FakeProviders:
+    """Calls that sleep `delay` seconds, then answer or raise; records calls and cancellations"""
+
+    def __init__(self, router, behaviour):
+        self.router = router
+        self.behaviour = behaviour
+        self.calls = []
+        self.cancelled = []
+
+    async def call(self, provider, model):
+        self.calls.append(model)
+        delay, error = self.behaviour[model]
+        started_at = time.perf_counter()
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        if error:
+            self.router.record(provider, model, time.perf_counter() - started_at, error)
+            raise error
+        self.router.record(provider, model, time.perf_counter() - started_at)
+        return {"model": model}
+
+
+def _warm(router, provider, model, latency, n=20):
+    for _ in range(n):
+        router.record(provider, model, latency)
+
+
+def _timeout():
+    try:
+        raise httpx.ReadTimeout("timed out")
+    except httpx.ReadTimeout as e:
+        try:
+            raise ValueError(f"Anthropic API error: {e}")
+        except ValueError as wrapped:
+            return wrapped
+
+
+@pytest.mark.asyncio
+async def test_failure_falls_through_immediately():
+    """Test that the next candidate starts as soon as the primary fails"""
+    router = ProviderRouter()
+    fake = FakeProviders(router, {"sonnet": (0, _timeout()), "opus": (0, None)})
+
+    result = await router.route([("anthropic", "sonnet"), ("anthropic", "opus")], fake.call)
+
+    assert result == {"model": "opus"}
+    assert router.stats['fallbacks'] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_loser_cancelled():
+    """Test that a call slower than its p95 is hedged and the slower one cancelled"""
+    router = ProviderRouter(hedge_min_delay=0.05)
+    _warm(router, "anthropic", "sonnet", 0.05)
+    fake = FakeProviders(router, {"sonnet": (5, None), "gpt-4o": (0.05, None)})
+
+    start = time.perf_counter()
+    result = await router.route([("anthropic", "sonnet"), ("openai", "gpt-4o")], fake.call)
+
+    assert result == {"model": "gpt-4o"}
+    assert time.perf_counter() - start < 1
+    await asyncio.sleep(0)  # let the cancelled call unwind
+    assert fake.cancelled == ["sonnet"]
+    assert router.stats['hedged'] == 1
+    assert router.stats['hedge_wins'] == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    """Test that no hedge is sent while the primary is within its p95"""
+    router = ProviderRouter(hedge_min_delay=0.5)
+    fake = FakeProviders(router, {"sonnet": (0.05, None), "gpt-4o": (0, None)})
+
+    result = await router.route([("anthropic", "sonnet"), ("openai", "gpt-4o")], fake.call)
+
+    assert result == {"model": "sonnet"}
+    assert fake.calls == ["sonnet"]
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_skips_provider():
+    """Test that repeated provider failures open the circuit and requests skip it"""
+    router = ProviderRouter(failure_threshold=3)
+    for _ in range(3):
+        router.record("anthropic", "sonnet", 1.0, _timeout())
+    fake = FakeProviders(router, {"sonnet": (0, None), "gpt-4o": (0, None)})
+
+    result = await router.route([("anthropic", "sonnet"), ("openai", "gpt-4o")], fake.call)
+
+    assert result == {"model": "gpt-4o"}
+    assert fake.calls == ["gpt-4o"]
+    assert router.get_stats()['circuits']['anthropic']['state'] == 'open'
+
+
+def test_client_errors_do_not_open_the_circuit():
+    """Test that invalid keys / bad requests are not counted as provider failures"""
+    router = ProviderRouter(failure_threshold=2)
+    for _ in range(5):
+        router.record("openai", "gpt-4o", 0.1, ValueError("OpenAI API error: Invalid API key provided"))
+
+    assert router.available("openai")
+    assert router.get_stats()['models']['openai/gpt-4o']['rejected'] == 5
+
+
+def test_model_windows_are_bounded():
+    """Test that client-supplied model names cannot grow the per-model windows without limit"""
+    router = ProviderRouter(max_models=8)
+    _warm(router, "anthropic", "sonnet", 0.5)
+    for index in range(100):
+        router.record("openai", f"made-up-{index}", 0.1)
+        router.record("anthropic", "sonnet", 0.5)  # in use, so never the least recently used
+
+    models = router.get_stats()['models']
+    assert len(models) == 8
+    assert "anthropic/sonnet" in models
+    assert "openai/made-up-99" in models
+
+
+def test_failure_classification():
+    """Test transient vs permanent error classification"""
+    class StatusError(Exception):
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    assert is_provider_failure(_timeout())
+    assert is_provider_failure(StatusError(529))
+    assert is_provider_failure(StatusError(429))
+    assert not is_provider_failure(StatusError(401))
+    assert not is_provider_failure(ValueError("bad request"))
@@ -0,0 +1,85 @@
+"""
+Tests for batched RAG indexing
+"""
+import threading
+import time
+
+from app.core.rag_ingest import RAGIngestQueue
+
+
+class FakeCollection:
+    def __init__(self):
+        self.adds = []
+
+    def add(self, ids, documents, metadatas, embeddings):
+        self.adds.append({"ids": ids, "documents": documents, "metadatas": metadatas, "embeddings": embeddings})
+
+
+class RecordingEmbedder:
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+
+    def __call__(self, texts):
+        time.sleep(self.delay)
+        self.batches.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_submissions_are_indexed_in_batches():
+    """Test that many submissions become one embed + add call per collection"""
+    embedder = RecordingEmbedder()
+    chat, docs = FakeCollection(), FakeCollection()
+    ingest = RAGIngestQueue(embedder, max_batch=100, flush_interval=0.2)
+
+    for i in range(20):
+        ingest.submit(chat, f"m{i}", f"message {i}", {"session_id": "s1"})
+    ingest.submit(docs, "d1", "a document", {"title": "Doc"})
+
+    assert ingest.flush(timeout=5)
+    assert len(chat.adds) == 1
+    assert chat.adds[0]["ids"] == [f"m{i}" for i in range(20)]
+    assert chat.adds[0]["embeddings"][0] == [9.0, 1.0]
+    assert docs.adds[0]["documents"] == ["a document"]
+    assert len(embedder.batches) == 2
+    assert ingest.get_stats()['indexed'] == 21
+    ingest.stop()
+
+
+def test_submit_does_not_wait_for_embedding():
+    """Test that callers return immediately while embedding is slow"""
+    ingest = RAGIngestQueue(RecordingEmbedder(delay=0.3), flush_interval=0.01)
+    collection = FakeCollection()
+
+    start = time.perf_counter()
+    doc_id = ingest.submit(collection, "m1", "hello", {})
+
+    assert doc_id == "m1"
+    assert time.perf_counter() - start < 0.1
+    assert ingest.flush(timeout=5)
+    assert len(collection.adds) == 1
+    ingest.stop()
+
+
+def test_failed_batch_is_counted_and_worker_survives():
+    """Test that an embedding error drops the batch but later items are indexed"""
+    calls = []
+
+    def flaky_embed(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise RuntimeError("model not loaded")
+        return [[1.0] for _ in texts]
+
+    ingest = RAGIngestQueue(flaky_embed, flush_interval=0.01)
+    collection = FakeCollection()
+    ingest.submit(collection, "m1", "first", {})
+    ingest.flush(timeout=5)
+    ingest.submit(collection, "m2", "second", {})
+    ingest.flush(timeout=5)
+
+    assert ingest.get_stats()['failed'] == 1
+    assert collection.adds[0]["ids"] == ["m2"]
+    ingest.stop()
+    assert not ingest.running
+    assert threading.active_count() >= 1
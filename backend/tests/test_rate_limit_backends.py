@@ -0,0 +1,223 @@
+"""
+Tests for the rate limit backends (in-memory eviction, Redis Lua scripts)
+"""
+import asyncio
+import fnmatch
+
+from starlette.requests import Request
+
+from app.core.rate_limit_backend import (
+    KEY_PREFIX, QUOTA_SHA, TOKEN_BUCKET_SHA, InMemoryRateLimitBackend, RedisRateLimitBackend
+)
+from app.core.rate_limiter import AdvancedRateLimiter
+from app.core.redis_client import CircuitBreaker
+
+USER_LIMITS = {"requests": 3, "ai_calls": 1}
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class LuaRedis:
+    """AsyncRedisClient stand-in running Python ports of the Lua scripts on a shared store"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+        self.expiry = {}
+        self.down = False
+        self.breaker = CircuitBreaker()
+
+    def _ttl_ms(self, key):
+        if key not in self.data:
+            return -2
+        return -1 if key not in self.expiry else (self.expiry[key] - self.clock()) * 1000
+
+    async def evalsha(self, sha, script, keys, args):
+        if self.down:
+            return None
+        key = keys[0]
+        if key in self.expiry and self.expiry[key] <= self.clock():
+            del self.data[key], self.expiry[key]
+        state = self.data.setdefault(key, {})
+        now = self.clock()
+        if sha == TOKEN_BUCKET_SHA:
+            capacity, rate, requested = args
+            tokens = capacity if "tokens" not in state else min(
+                capacity, state["tokens"] + max(0, now - state["ts"]) * rate
+            )
+            allowed = tokens >= requested
+            state.update(tokens=tokens - requested if allowed else tokens, ts=now)
+            self.expiry[key] = now + (capacity - state["tokens"]) / rate + 1
+            return int(allowed)
+        assert sha == QUOTA_SHA
+        max_requests, max_ai, is_ai, window, consume = args
+        requests, ai_calls = state.get("requests", 0), state.get("ai_calls", 0)
+        allowed = not (requests >= max_requests or (is_ai and ai_calls >= max_ai))
+        if allowed and consume:
+            state["requests"] = requests = requests + 1
+            if is_ai:
+                state["ai_calls"] = ai_calls = ai_calls + 1
+            self.expiry.setdefault(key, now + window)
+        if not state:
+            del self.data[key]
+        ttl = self._ttl_ms(key)
+        return [int(allowed), requests, ai_calls, ttl if ttl >= 0 else window * 1000]
+
+    async def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    async def delete_matching(self, pattern):
+        return await self.delete(*[key for key in list(self.data) if fnmatch.fnmatchcase(key, pattern)])
+
+
+def make_request(path, client="10.0.0.1"):
+    return Request({
+        "type": "http", "method": "GET", "path": path, "query_string": b"",
+        "headers": [], "client": (client, 1234), "server": ("test", 80), "scheme": "http"
+    })
+
+
+def test_token_bucket_refills_and_drops_idle_buckets():
+    """Test refill over time and that refilled buckets are evicted"""
+    clock = Clock()
+    backend = InMemoryRateLimitBackend(clock=clock)
+
+    async def run():
+        results = [await backend.consume("ip:a:/x", capacity=3, refill_rate=1.0) for _ in range(4)]
+        clock.now += 1
+        results.append(await backend.consume("ip:a:/x", capacity=3, refill_rate=1.0))
+        results.append(await backend.consume("ip:a:/x", capacity=3, refill_rate=1.0))
+        assert len(backend._buckets) == 1
+
+        # Bucket "a" refills completely; the next call drops it
+        clock.now += 3
+        await backend.consume("ip:b:/x", capacity=3, refill_rate=1.0)
+        return results
+
+    assert asyncio.run(run()) == [True, True, True, False, True, False]
+    assert list(backend._buckets) == ["ip:b:/x"]
+    assert backend.get_stats()['expired'] == 1
+
+
+def test_bucket_and_quota_counts_are_capped():
+    """Test that distinct clients beyond max_keys evict the least recently used"""
+    backend = InMemoryRateLimitBackend(max_keys=100, clock=Clock())
+
+    async def run():
+        for i in range(1000):
+            await backend.consume(f"ip:10.0.{i}:/api/x", capacity=100, refill_rate=1.0)
+            await backend.take_quota(f"user-{i}", USER_LIMITS, False)
+
+    asyncio.run(run())
+
+    stats = backend.get_stats()
+    assert stats['buckets'] == 100
+    assert stats['quotas'] == 100
+    assert "ip:10.0.999:/api/x" in backend._buckets
+
+
+def test_quota_window_limits_and_resets():
+    """Test hourly request/AI call quotas and window expiry"""
+    clock = Clock()
+    backend = InMemoryRateLimitBackend(quota_window=3600, clock=clock)
+
+    async def run():
+        results = [
+            await backend.take_quota("u1", USER_LIMITS, True),
+            await backend.take_quota("u1", USER_LIMITS, True),   # AI quota exhausted
+            await backend.take_quota("u1", USER_LIMITS, False),
+            await backend.take_quota("u1", USER_LIMITS, False),
+            await backend.take_quota("u1", USER_LIMITS, False),  # request quota exhausted
+        ]
+        clock.now += 600
+        usage, reset_in = await backend.get_quota("u1", USER_LIMITS)
+        clock.now += 3000
+        results.append(await backend.take_quota("u1", USER_LIMITS, True))
+        return results, usage, reset_in
+
+    results, usage, reset_in = asyncio.run(run())
+
+    assert results == [True, False, True, True, False, True]
+    assert usage == {"requests": 3, "ai_calls": 1}
+    assert reset_in == 3000
+
+
+def test_precompiled_patterns_match_most_specific_first():
+    """Test exact paths, wildcard prefixes and unmatched paths"""
+    limiter = AdvancedRateLimiter()
+    limits = limiter.DEFAULT_LIMITS
+
+    assert limiter.match_endpoint_pattern("/api/auth/login") is limits["/api/auth/login"]
+    assert limiter.match_endpoint_pattern("/api/chat/") is limits["/api/chat/"]
+    assert limiter.match_endpoint_pattern("/api/chat/stream") is limits["/api/chat/*"]
+    assert limiter.match_endpoint_pattern("/api/github/repos") is limits["/api/github/*"]
+    assert limiter.match_endpoint_pattern("/api/sessions/1") is limits["/api/*"]
+    assert limiter.match_endpoint_pattern("/health") is None
+
+
+def test_limiter_enforces_endpoint_limits_and_resets_users():
+    """Test check_rate_limit end to end on the in-memory backend"""
+    limiter = AdvancedRateLimiter(InMemoryRateLimitBackend(clock=Clock()))
+
+    async def run():
+        logins = [await limiter.check_rate_limit(make_request("/api/auth/login")) for _ in range(6)]
+        other_ip = await limiter.check_rate_limit(make_request("/api/auth/login", client="10.0.0.2"))
+        for _ in range(5):
+            await limiter.check_rate_limit(make_request("/api/admin/users"), user_id="42", user_role="admin")
+        status = await limiter.get_quota_status("42", "admin")
+        cleared = await limiter.reset_user("42")
+        return logins, other_ip, status, cleared, await limiter.get_quota_status("42", "admin")
+
+    logins, other_ip, status, cleared, after = asyncio.run(run())
+
+    assert logins == [True] * 5 + [False]
+    assert other_ip is True
+    assert status["requests"]["used"] == 5
+    assert cleared == {"found": True, "cleared_quotas": {"requests": 5, "ai_calls": 0}, "cleared_buckets": 1}
+    assert after["requests"]["used"] == 0
+
+
+def test_redis_backend_shares_limits_across_workers():
+    """Test that two workers on one Redis enforce the limit once, not twice"""
+    clock = Clock()
+    redis = LuaRedis(clock)
+    workers = [AdvancedRateLimiter(RedisRateLimitBackend(client=redis)) for _ in range(2)]
+
+    async def run():
+        results = [
+            await workers[i % 2].check_rate_limit(make_request("/api/auth/login")) for i in range(8)
+        ]
+        for worker in workers:
+            await worker.check_rate_limit(make_request("/api/chat/"), user_id="7", user_role="user", is_ai_call=True)
+        status = await workers[0].get_quota_status("7", "user")
+        cleared = await workers[1].reset_user("7")
+        return results, status, cleared
+
+    results, status, cleared = asyncio.run(run())
+
+    assert results == [True] * 5 + [False] * 3
+    assert status["ai_calls"]["used"] == 2
+    assert status["reset_in_seconds"] == 3600
+    assert cleared["cleared_quotas"] == {"requests": 2, "ai_calls": 2}
+    assert cleared["cleared_buckets"] == 1
+    assert f"{KEY_PREFIX}bucket:ip:10.0.0.1:/api/auth/login" in redis.data
+
+
+def test_redis_backend_falls_back_to_local_limits():
+    """Test per-process limits (not fail-open) while Redis is unavailable"""
+    redis = LuaRedis(Clock())
+    redis.down = True
+    backend = RedisRateLimitBackend(client=redis, fallback=InMemoryRateLimitBackend(clock=Clock()))
+    limiter = AdvancedRateLimiter(backend)
+
+    async def run():
+        return [await limiter.check_rate_limit(make_request("/api/auth/login")) for _ in range(6)]
+
+    assert asyncio.run(run()) == [True] * 5 + [False]
+    assert backend.get_stats()['fallbacks'] == 6
@@ -0,0 +1,77 @@
+"""
+Tests for the async Redis client, circuit breaker and fake backend
+"""
+import asyncio
+import time
+
+from app.core import redis_client
+from app.core.redis_client import AsyncRedisClient, CircuitBreaker, FakeRedis
+
+
+class FailingRedis(FakeRedis):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.down = True
+
+    async def get(self, key):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("connection refused")
+        return await super().get(key)
+
+
+def test_pipelined_mset_and_mget():
+    """Test bulk helpers against the fake backend, including TTLs"""
+    async def run():
+        client = AsyncRedisClient(FakeRedis())
+        assert await client.mset({"a": "1", "b": "2"}, ex=60)
+        assert await client.mset({"short": "x"}, ex=0.01)
+        await asyncio.sleep(0.02)
+        return await client.mget(["a", "missing", "b", "short"])
+
+    assert asyncio.run(run()) == ["1", None, "2", None]
+
+
+def test_circuit_opens_after_failures_and_short_circuits():
+    """Test that failures stop hitting Redis until the reset timeout"""
+    backend = FailingRedis()
+    client = AsyncRedisClient(backend, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.05))
+
+    async def run():
+        results = [await client.get("k") for _ in range(5)]
+        assert backend.calls == 2
+        assert client.breaker.state == "open"
+
+        # Half-open trial succeeds -> circuit closes
+        backend.down = False
+        await backend.set("k", "v")
+        time.sleep(0.06)
+        results.append(await client.get("k"))
+        return results
+
+    results = asyncio.run(run())
+
+    assert results == [None] * 5 + ["v"]
+    assert client.breaker.state == "closed"
+    assert client.get_stats()['short_circuited'] == 3
+
+
+def test_module_helpers_use_fake_backend(monkeypatch):
+    """Test init_redis with REDIS_BACKEND=fake and the cache_* helpers"""
+    monkeypatch.setenv("REDIS_BACKEND", "fake")
+
+    async def run():
+        await redis_client.init_redis()
+        try:
+            assert await redis_client.get_redis_health()
+            assert await redis_client.cache_set("k", "v", expire_seconds=60)
+            assert await redis_client.cache_exists("k")
+            assert await redis_client.cache_mget(["k", "x"]) == ["v", None]
+            assert await redis_client.cache_delete("k")
+            return await redis_client.cache_get("k")
+        finally:
+            await redis_client.close_redis_async()
+
+    assert asyncio.run(run()) is None
+    assert redis_client.get_redis() is None
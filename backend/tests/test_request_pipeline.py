@@ -0,0 +1,127 @@
+"""
+Tests for the pure ASGI request pipeline (versioning, auth, rate limiting, headers)
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.request_pipeline import RequestPipelineMiddleware, requires_auth
+
+
+class RecordingLimiter:
+    def __init__(self, allow=True):
+        self.allow = allow
+        self.calls = []
+
+    async def check_rate_limit(self, request, user_id=None, user_role="user", is_ai_call=False):
+        self.calls.append((request.url.path, user_id, user_role))
+        return self.allow
+
+
+def make_client(limiter):
+    app = FastAPI()
+
+    @app.get("/api/v1/health/live")
+    async def live():
+        return {"status": "alive"}
+
+    @app.get("/api/v1/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    app.add_middleware(RequestPipelineMiddleware, rate_limiter=limiter)
+    return TestClient(app)
+
+
+def test_public_route_gets_security_and_version_headers():
+    """Test that public routes skip auth but are rate limited and get headers"""
+    limiter = RecordingLimiter()
+    response = make_client(limiter).get("/api/v1/health/live")
+
+    assert response.status_code == 200
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert response.headers["API-Version"] == "v1"
+    assert limiter.calls == [("/api/v1/health/live", None, "user")]
+
+
+def test_legacy_path_is_routed_to_v1_with_deprecation_headers():
+    """Test that /api/* is served by /api/v1/* with deprecation headers"""
+    response = make_client(RecordingLimiter()).get("/api/health/live")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+    assert response.headers["Deprecation"] == "true"
+    assert response.headers["Link"] == '</api/v1/health/live>; rel="successor-version"'
+    assert "API-Version" not in response.headers
+
+
+def test_protected_route_requires_bearer_token():
+    """Test that protected routes are rejected before reaching the app"""
+    limiter = RecordingLimiter()
+    client = make_client(limiter)
+
+    missing = client.get("/api/v1/items/1")
+    malformed = client.get("/api/v1/items/1", headers={"Authorization": "Bearer a b"})
+
+    assert missing.status_code == 401
+    assert missing.json()["type"] == "auth_required"
+    assert missing.headers["X-Content-Type-Options"] == "nosniff"
+    assert malformed.json()["type"] == "auth_invalid"
+    assert limiter.calls == []
+
+
+def test_token_claims_feed_the_rate_limiter():
+    """Test that user id and role reach the limiter and a denial returns 429"""
+    token = jwt.encode(
+        {"sub": "user-1", "role": "admin", "exp": datetime.now(timezone.utc) + timedelta(hours=1)},
+        settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM
+    )
+    limiter = RecordingLimiter(allow=False)
+    response = make_client(limiter).get("/api/v1/items/7", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "60"
+    assert limiter.calls == [("/api/v1/items/7", "user-1", "admin")]
+
+
+def test_route_class_tables():
+    """Test the precompiled public/auth/SSE lookups"""
+    assert not requires_auth("/api/v1/auth/login")
+    assert not requires_auth("/api/github/import/check-directory/foo")
+    assert not requires_auth("/api/v1/github-pat/import-progress/abc")
+    assert requires_auth("/api/v1/sessions/abc")
+
+
+def test_streaming_body_is_not_buffered():
+    """Test that the first chunk reaches the client while the app is still producing"""
+    release = asyncio.Event()
+    sent = []
+
+    async def streaming_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]})
+        await send({"type": "http.response.body", "body": b"data: 1\n\n", "more_body": True})
+        await release.wait()
+        await send({"type": "http.response.body", "body": b"data: 2\n\n"})
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def run():
+        middleware = RequestPipelineMiddleware(streaming_app, rate_limiter=RecordingLimiter())
+        scope = {"type": "http", "method": "GET", "path": "/stream", "headers": [], "query_string": b""}
+        task = asyncio.create_task(middleware(scope, receive, send))
+        await asyncio.sleep(0.01)
+        assert [m["type"] for m in sent] == ["http.response.start", "http.response.body"]
+        assert (b"x-frame-options", b"DENY") in sent[0]["headers"]
+        release.set()
+        await task
+
+    asyncio.run(run())
+    assert sent[-1]["body"] == b"data: 2\n\n"
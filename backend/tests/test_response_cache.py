@@ -0,0 +1,166 @@
+"""
+Tests for the opt-in AI response cache
+"""
+import asyncio
+
+import pytest
+
+from app.core.response_cache import ResponseCache
+from app.core.token_tracker import TokenUsageTracker
+
+
+class RecordingTracker:
+    def __init__(self):
+        self.events = []
+
+    def track_cache_event(self, result, model="", usage=None):
+        self.events.append(result)
+
+
+class FakeProvider:
+    def __init__(self, content="answer"):
+        self.calls = 0
+        self.content = content
+
+    async def generate(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"content": self.content, "usage": {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500}}
+
+
+def _messages(text):
+    return [{"role": "user", "content": text}]
+
+
+@pytest.mark.asyncio
+async def test_exact_hit_after_normalization():
+    """Test that whitespace/line-ending differences hit the same entry"""
+    tracker = RecordingTracker()
+    cache = ResponseCache(usage_tracker=tracker)
+    provider = FakeProvider()
+
+    first = await cache.get_or_generate("user-1", "openai", "gpt-4o-mini", _messages("Summarize foo.py\r\n"), {}, provider.generate)
+    first["content"] = "modified by caller"
+    second = await cache.get_or_generate("user-1", "openai", "gpt-4o-mini", _messages("  Summarize foo.py"), {}, provider.generate)
+
+    assert provider.calls == 1
+    assert second["content"] == "answer"
+    assert second["cached"] == "exact"
+    assert tracker.events == ["miss", "hit"]
+
+
+@pytest.mark.asyncio
+async def test_scopes_models_and_params_are_isolated():
+    """Test that users, models and params never share entries"""
+    cache = ResponseCache(usage_tracker=RecordingTracker())
+    provider = FakeProvider()
+
+    await cache.get_or_generate("user-1", "openai", "gpt-4o-mini", _messages("q"), {}, provider.generate)
+    await cache.get_or_generate("user-2", "openai", "gpt-4o-mini", _messages("q"), {}, provider.generate)
+    await cache.get_or_generate("user-1", "openai", "gpt-4o", _messages("q"), {}, provider.generate)
+    await cache.get_or_generate("user-1", "openai", "gpt-4o-mini", _messages("q"), {"ultra_thinking": True}, provider.generate)
+
+    assert provider.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_request():
+    """Test single-flight for identical concurrent calls"""
+    cache = ResponseCache(usage_tracker=RecordingTracker())
+    provider = FakeProvider()
+
+    results = await asyncio.gather(*(
+        cache.get_or_generate("user-1", "openai", "gpt-4o-mini", _messages("q"), {}, provider.generate)
+        for _ in range(5)
+    ))
+
+    assert provider.calls == 1
+    assert all(result["content"] == "answer" for result in results)
+
+
+@pytest.mark.asyncio
+async def test_empty_answers_and_disabled_cache_are_not_cached():
+    """Test that empty answers are regenerated and a disabled cache always calls the provider"""
+    cache = ResponseCache(usage_tracker=RecordingTracker())
+    empty = FakeProvider(content="")
+    for _ in range(2):
+        await cache.get_or_generate("user-1", "openai", "gpt-4o-mini", _messages("q"), {}, empty.generate)
+    assert empty.calls == 2
+
+    disabled = ResponseCache(enabled=False, usage_tracker=RecordingTracker())
+    provider = FakeProvider()
+    for _ in range(2):
+        await disabled.get_or_generate("user-1", "openai", "gpt-4o-mini", _messages("q"), {}, provider.generate)
+    assert provider.calls == 2
+
+
+class PromptRecordingProvider:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_response(self, messages, model, stream=False, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        return {"content": f"summary {len(self.prompts)}", "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}}
+
+
+@pytest.mark.asyncio
+async def test_auto_summary_is_keyed_on_the_generated_code(monkeypatch):
+    """Test that new code with the same file names misses the cache (the prompt only names the files)"""
+    from app.api import chat
+    from app.core import ai_manager as ai_manager_module
+
+    monkeypatch.setattr(ai_manager_module, "response_cache", ResponseCache(usage_tracker=RecordingTracker()))
+    manager = ai_manager_module.AIManager()
+    provider = PromptRecordingProvider()
+    manager.providers["openai"] = provider
+    messages = [{"role": "user", "content": "Build a todo app"}]
+    files = {"files": [{"success": True, "file_path": "src/app.py"}]}
+
+    first = await chat._generate_auto_summary(manager, {}, messages, files, "```python\nprint('todo')\n```", "user-1")
+    repeated = await chat._generate_auto_summary(manager, {}, messages, files, "```python\nprint('todo')\n```", "user-1")
+    other_code = await chat._generate_auto_summary(manager, {}, messages, files, "```python\nprint('shop')\n```", "user-1")
+
+    assert len(provider.prompts) == 2
+    assert "src/app.py" in provider.prompts[0]
+    assert repeated["content"] == first["content"]
+    assert other_code["content"] != first["content"]
+
+
+@pytest.mark.asyncio
+async def test_semantic_hit_for_similar_prompt():
+    """Test embedding-similarity lookups within a scope"""
+    def embed(texts):
+        # Bag of words over a tiny vocabulary
+        vocabulary = ["summarize", "foo", "bar", "please", "tests"]
+        return [[text.lower().count(word) for word in vocabulary] for text in texts]
+
+    tracker = RecordingTracker()
+    cache = ResponseCache(semantic=True, similarity_threshold=0.85, embed=embed, usage_tracker=tracker)
+    provider = FakeProvider()
+
+    await cache.get_or_generate("user-1", "openai", "gpt-4o-mini", _messages("summarize foo bar"), {}, provider.generate)
+    similar = await cache.get_or_generate("user-1", "openai", "gpt-4o-mini", _messages("please summarize foo bar"), {}, provider.generate)
+    other_user = await cache.get_or_generate("user-2", "openai", "gpt-4o-mini", _messages("please summarize foo bar"), {}, provider.generate)
+    unrelated = await cache.get_or_generate("user-1", "openai", "gpt-4o-mini", _messages("tests"), {}, provider.generate)
+
+    assert similar["cached"] == "semantic"
+    assert "cached" not in other_user
+    assert "cached" not in unrelated
+    assert provider.calls == 3
+    assert tracker.events == ["miss", "semantic_hit", "miss", "miss"]
+
+
+def test_token_tracker_records_savings(tmp_path, monkeypatch):
+    """Test that cache hits add tokens and dollars saved to the token tracker"""
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    tracker = TokenUsageTracker()
+
+    tracker.track_cache_event("miss", "gpt-4o")
+    tracker.track_cache_event("hit", "gpt-4o", {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500})
+    stats = tracker.get_usage_stats()['response_cache']
+
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['tokens_saved'] == 1500
+    assert stats['cost_saved_usd'] == pytest.approx(0.0075)  # 1000 * 2.50/1M + 500 * 10.00/1M
+    assert tracker.estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 0) == pytest.approx(0.15)
@@ -0,0 +1,177 @@
+"""
+Tests for the async sandbox engine (fair queues, concurrency limits, streaming)
+"""
+import asyncio
+
+import pytest
+
+from app.core.sandbox_engine import SandboxEngine, SandboxQueueFull
+from app.core.sandbox_executor import SandboxExecutor
+
+
+class RecordingExecutor:
+    """Stand-in executor that records start order and peak concurrency"""
+
+    def __init__(self, duration=0.02):
+        self.duration = duration
+        self.started = []
+        self.running = 0
+        self.peak = 0
+
+    async def execute_code_async(self, code, language, timeout=None, stdin_input=None, on_output=None):
+        self.started.append(code)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.duration)
+        finally:
+            self.running -= 1
+        return {"success": True, "stdout": code, "stderr": "", "exit_code": 0, "language": language}
+
+
+def test_users_are_served_round_robin():
+    """Test that a user with a long queue does not starve other users"""
+    async def scenario():
+        executor = RecordingExecutor()
+        engine = SandboxEngine(executor=executor, max_concurrency=1, max_queued_per_user=10)
+        jobs = [engine.execute("alice", f"a{n}") for n in range(4)]
+        jobs.append(engine.execute("bob", "b0"))
+        await asyncio.gather(*jobs)
+        return executor.started
+
+    started = asyncio.run(scenario())
+
+    assert started.index("b0") <= 2
+
+
+def test_language_limit_caps_concurrency():
+    """Test that a per-language limit bounds parallel runs of that language"""
+    async def scenario():
+        executor = RecordingExecutor()
+        engine = SandboxEngine(executor=executor, max_concurrency=4, language_limits={"java": 1})
+        await asyncio.gather(*(engine.execute(f"user-{n}", "x", language="java") for n in range(3)))
+        return executor.peak, engine.get_stats()
+
+    peak, stats = asyncio.run(scenario())
+
+    assert peak == 1
+    assert stats['completed'] == 3
+    assert stats['max_queue_ms'] > 0
+
+
+def test_full_user_queue_is_rejected():
+    """Test that submissions beyond max_queued_per_user raise SandboxQueueFull"""
+    async def scenario():
+        engine = SandboxEngine(executor=RecordingExecutor(), max_concurrency=1, max_queued_per_user=1)
+        running = asyncio.ensure_future(engine.execute("alice", "first"))
+        queued = asyncio.ensure_future(engine.execute("alice", "second"))
+        await asyncio.sleep(0)
+        with pytest.raises(SandboxQueueFull):
+            await engine.execute("alice", "third")
+        await asyncio.gather(running, queued)
+        return engine.get_stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats['rejected'] == 1
+    assert stats['completed'] == 2
+
+
+def test_stream_delivers_output_while_running():
+    """Test that stdout arrives before the program finishes"""
+    code = "import time\nprint('first', flush=True)\ntime.sleep(0.5)\nprint('second')"
+
+    async def scenario():
+        engine = SandboxEngine(executor=SandboxExecutor(), max_concurrency=1)
+        events = []
+        async for event in engine.stream("alice", code, "python"):
+            events.append((event["event"], asyncio.get_running_loop().time(), event))
+        return events
+
+    events = asyncio.run(scenario())
+    kinds = [kind for kind, _, _ in events]
+
+    assert kinds[0] == "queued"
+    assert "started" in kinds
+    assert kinds[-1] == "complete"
+    first_output = next(at for kind, at, _ in events if kind == "stdout")
+    assert events[-1][1] - first_output >= 0.3
+    assert events[-1][2]["result"]["stdout"] == "first\nsecond\n"
+
+
+def test_timeout_kills_program_and_keeps_partial_output():
+    """Test that a timed-out program is killed without blocking the event loop"""
+    async def scenario():
+        executor = SandboxExecutor()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.05)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        result = await executor.execute_code_async(
+            "import time\nprint('partial', flush=True)\ntime.sleep(30)", "python", timeout=1
+        )
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+
+    assert result["timeout_occurred"] is True
+    assert result["stdout"] == "partial\n"
+    assert ticks >= 10
+
+
+def test_large_stdin_echo_does_not_deadlock():
+    """Test that output is read while stdin is written (input larger than the pipe buffer)"""
+    stdin_input = "line of input\n" * 50000  # ~700 KB, far beyond the pipe and reader buffers
+
+    async def scenario():
+        executor = SandboxExecutor()
+        return await asyncio.wait_for(
+            executor.execute_code_async(
+                "import sys\nfor line in sys.stdin:\n    sys.stdout.write(line)",
+                "python", timeout=3, stdin_input=stdin_input
+            ),
+            10
+        )
+
+    result = asyncio.run(scenario())
+
+    assert result["timeout_occurred"] is False
+    assert result["stdout"] == stdin_input
+
+
+def test_timeout_kills_background_children():
+    """Test that a backgrounded child holding the pipes cannot keep the call (and its slot) alive"""
+    async def scenario():
+        executor = SandboxExecutor()
+        start = asyncio.get_running_loop().time()
+        result = await asyncio.wait_for(
+            executor.execute_code_async("sleep 20 &\necho hi", "bash", timeout=2), 10
+        )
+        return result, asyncio.get_running_loop().time() - start
+
+    result, elapsed = asyncio.run(scenario())
+
+    assert result["stdout"] == "hi\n"
+    assert result["timeout_occurred"] is True
+    assert elapsed < 5
+
+
+def test_output_is_capped_per_stream(monkeypatch):
+    """Test that a program writing without end cannot grow the collected output without limit"""
+    monkeypatch.setattr("app.core.sandbox_executor.MAX_OUTPUT_BYTES", 1000)
+
+    async def scenario():
+        return await SandboxExecutor().execute_code_async(
+            "import sys\nwhile True:\n    sys.stdout.write('x' * 4096)", "python", timeout=1
+        )
+
+    result = asyncio.run(scenario())
+
+    assert result["stdout"].startswith("x" * 1000 + "\n[output truncated after 1000 bytes]")
+    assert len(result["stdout"]) < 1100
@@ -0,0 +1,149 @@
+"""
+Tests for coalesced, backpressure-aware WebSocket delivery
+"""
+import asyncio
+
+import pytest
+
+from app.api.chat_stream import ConnectionManager
+from app.core.stream_delivery import ChunkCoalescer
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0, block: bool = False):
+        self.sent = []
+        self.delay = delay
+        self.block = block
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.block:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+
+@pytest.mark.asyncio
+async def test_coalescer_flushes_on_size():
+    """Test that deltas are merged until the byte threshold is hit"""
+    frames = []
+    coalescer = ChunkCoalescer(frames.append, max_bytes=10, max_delay=10)
+
+    for delta in ["abc", "def", "ghij", "k"]:
+        coalescer.add(delta)
+    coalescer.flush()
+
+    assert [f["content"] for f in frames] == ["abcdefghij", "k"]
+    assert [f["chunk_id"] for f in frames] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_coalescer_flushes_on_time_window():
+    """Test that a small buffered delta is flushed after max_delay"""
+    frames = []
+    coalescer = ChunkCoalescer(frames.append, max_bytes=1000, max_delay=0.01)
+
+    coalescer.add("hi")
+    assert frames == []
+    await asyncio.sleep(0.05)
+
+    assert [f["content"] for f in frames] == ["hi"]
+
+
+@pytest.mark.asyncio
+async def test_fan_out_is_concurrent_and_ordered():
+    """Test that each socket receives all messages in order, in parallel"""
+    manager = ConnectionManager()
+    sockets = [FakeWebSocket(delay=0.02) for _ in range(5)]
+    for ws in sockets:
+        await manager.connect(ws, "s1")
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for i in range(3):
+        await manager.send_message({"n": i}, "s1")
+    await manager.drain("s1")
+    elapsed = loop.time() - start
+
+    for ws in sockets:
+        assert [m["n"] for m in ws.sent] == [0, 1, 2]
+    # Sequential delivery would take 5 sockets * 3 msgs * 20ms = 300ms
+    assert elapsed < 0.2
+
+    for ws in sockets:
+        manager.disconnect(ws, "s1")
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_dropped_without_blocking():
+    """Test that a socket whose queue overflows is dropped, others keep receiving"""
+    manager = ConnectionManager(max_queue=4)
+    fast = FakeWebSocket()
+    stuck = FakeWebSocket(block=True)
+    await manager.connect(fast, "s1")
+    await manager.connect(stuck, "s1")
+
+    for i in range(20):
+        manager.publish({"n": i}, "s1")
+        await asyncio.sleep(0)  # producer awaits the provider between deltas
+    await manager.drain("s1")
+    await asyncio.sleep(0)
+
+    assert stuck not in manager.active_connections["s1"]
+    assert fast in manager.active_connections["s1"]
+    assert len(fast.sent) == 20
+    assert stuck.closed_with == 1013
+    assert manager.get_stats()["dropped_slow_consumers"] == 1
+
+    manager.disconnect(fast, "s1")
+
+
+@pytest.mark.asyncio
+async def test_backplane_fans_out_across_workers():
+    """Test that a session's socket on another worker receives published messages"""
+    from app.core.stream_backplane import InMemoryBackplane, InMemoryBus
+
+    bus = InMemoryBus()
+    worker_a = ConnectionManager(backplane=InMemoryBackplane(bus))
+    worker_b = ConnectionManager(backplane=InMemoryBackplane(bus))
+    await worker_a.start_backplane()
+    await worker_b.start_backplane()
+
+    tab_a = FakeWebSocket()
+    tab_b = FakeWebSocket()
+    other_session = FakeWebSocket()
+    await worker_a.connect(tab_a, "s1")
+    await worker_b.connect(tab_b, "s1")
+    await worker_b.connect(other_session, "s2")
+
+    for i in range(3):
+        worker_a.publish({"n": i}, "s1")
+    await asyncio.sleep(0)
+    await worker_a.drain("s1")
+    await worker_b.drain("s1")
+
+    assert [m["n"] for m in tab_a.sent] == [0, 1, 2]
+    assert [m["n"] for m in tab_b.sent] == [0, 1, 2]
+    assert other_session.sent == []
+
+    # Worker A has no local socket left, but the session still has a listener on B
+    worker_a.disconnect(tab_a, "s1")
+    assert worker_a.has_listeners("s1")
+    await asyncio.sleep(0)
+
+    status = await worker_b.backplane.cluster_status()
+    assert status["workers"] == 2
+    assert status["cluster_connections"] == 2
+
+    worker_b.disconnect(tab_b, "s1")
+    worker_b.disconnect(other_session, "s2")
+    await asyncio.sleep(0)
+    await worker_a.stop_backplane()
+    await worker_b.stop_backplane()
@@ -0,0 +1,235 @@
+"""
+Tests for the event-driven task queue and worker pool
+"""
+import asyncio
+import time
+
+from app.core.task_queue import Task, TaskPriority, TaskQueue, TaskStatus, TaskWorkerPool
+
+
+def make_task(**kwargs):
+    return Task(agent_type="engineer", **kwargs)
+
+
+def test_dequeue_wakes_on_enqueue_without_polling():
+    """Test that a waiting consumer gets a task as soon as it is enqueued"""
+    queue = TaskQueue()
+
+    async def run():
+        consumer = asyncio.ensure_future(queue.dequeue())
+        await asyncio.sleep(0.01)
+        enqueued_at = time.perf_counter()
+        await queue.enqueue(make_task())
+        task = await consumer
+        return task, time.perf_counter() - enqueued_at, await queue.dequeue(timeout=0.01)
+
+    task, latency, timed_out = asyncio.run(run())
+
+    assert task.status == TaskStatus.RUNNING
+    assert latency < 0.05  # The polling queue needed up to 100ms
+    assert timed_out is None
+
+
+def test_priority_order_is_fifo_within_a_priority():
+    """Test highest priority first, then enqueue order"""
+    queue = TaskQueue()
+    tasks = [
+        make_task(description="a"),
+        make_task(description="b", priority=TaskPriority.HIGH),
+        make_task(description="c"),
+        make_task(description="d", priority=TaskPriority.HIGH),
+    ]
+
+    async def run():
+        for task in tasks:
+            await queue.enqueue(task)
+        assert [t.description for t in queue.get_ready_tasks()] == ["b", "d", "a", "c"]
+        return [(await queue.dequeue()).description for _ in tasks]
+
+    assert asyncio.run(run()) == ["b", "d", "a", "c"]
+
+
+def test_failed_task_is_retried_after_delay_without_blocking():
+    """Test that mark_failed returns at once and the retry becomes ready later"""
+    queue = TaskQueue()
+    task = make_task(retry_delay=0.05, max_retries=1)
+
+    async def run():
+        await queue.enqueue(task)
+        await queue.dequeue()
+        started = time.perf_counter()
+        await queue.mark_failed(task.task_id, "boom")
+        returned_after = time.perf_counter() - started
+        assert task.status == TaskStatus.SCHEDULED
+        assert queue.get_statistics()["scheduled"] == 1
+        retried = await queue.dequeue(timeout=1)
+        waited = time.perf_counter() - started
+        await queue.mark_failed(task.task_id, "boom again")
+        return retried, returned_after, waited
+
+    retried, returned_after, waited = asyncio.run(run())
+
+    assert retried is task
+    assert returned_after < 0.01
+    assert 0.04 < waited < 0.5
+    assert task.status == TaskStatus.FAILED
+    assert queue.get_statistics()["total_retries"] == 1
+
+
+def test_cancel_uses_lazy_deletion():
+    """Test that cancelled ready and scheduled tasks are never handed out"""
+    queue = TaskQueue()
+    tasks = [make_task(description=str(i)) for i in range(200)]
+    retry = make_task(retry_delay=0.01, priority=TaskPriority.HIGH)
+
+    async def run():
+        for task in tasks:
+            await queue.enqueue(task)
+        for task in tasks[:150]:
+            assert await queue.cancel_task(task.task_id)
+        await queue.enqueue(retry)
+        assert await queue.dequeue() is retry
+        await queue.mark_failed(retry.task_id, "boom")
+        assert await queue.cancel_task(retry.task_id)
+        await asyncio.sleep(0.03)
+        return [(await queue.dequeue(timeout=0.01)) for _ in range(51)]
+
+    remaining = asyncio.run(run())
+
+    assert [t.description for t in remaining[:-1]] == [str(i) for i in range(150, 200)]
+    assert remaining[-1] is None
+    assert retry.status == TaskStatus.CANCELLED
+    assert len(queue._ready_queue) < 200  # Compacted once most entries were stale
+
+
+def test_dependencies_and_bounded_retention():
+    """Test dependents becoming ready and eviction of the oldest finished tasks"""
+    queue = TaskQueue(max_finished=3)
+    first = make_task()
+    second = make_task(dependencies=[first.task_id])
+
+    async def run():
+        await queue.enqueue(first)
+        await queue.enqueue(second)
+        assert second.status == TaskStatus.PENDING
+        await queue.mark_completed((await queue.dequeue()).task_id, "done")
+        assert second.status == TaskStatus.READY
+        await queue.mark_completed((await queue.dequeue()).task_id, "done")
+        for _ in range(3):
+            task = make_task()
+            await queue.enqueue(task)
+            await queue.mark_completed((await queue.dequeue()).task_id)
+
+    asyncio.run(run())
+
+    stats = queue.get_statistics()
+    assert stats["retained_finished"] == 3
+    assert stats["total_evicted"] == 2
+    assert queue.get_task(first.task_id) is None
+    assert stats["total_completed"] == 5
+    assert queue._dependents == {}
+
+
+def test_evicted_dependency_still_satisfies_dependents():
+    """Test that a completed dependency evicted from retention does not block its dependents"""
+    queue = TaskQueue(max_finished=2)
+    first = make_task()
+    slow = make_task()
+    dependent = make_task(dependencies=[first.task_id, slow.task_id])
+
+    async def run():
+        await queue.enqueue(first)
+        await queue.enqueue(slow)
+        await queue.enqueue(dependent)
+        await queue.mark_completed(first.task_id)
+        for _ in range(3):
+            task = make_task()
+            await queue.enqueue(task)
+            await queue.mark_completed(task.task_id)
+        assert queue.get_task(first.task_id) is None
+        await queue.mark_completed(slow.task_id)
+        return await queue.dequeue(timeout=0.2)
+
+    ready = asyncio.run(run())
+
+    assert ready is dependent
+    assert queue._evicted_satisfied == set()
+
+
+def test_eviction_bookkeeping_stays_bounded():
+    """Test that evicted task IDs are only remembered while pending tasks depend on them"""
+    queue = TaskQueue(max_finished=100)
+
+    async def run():
+        for _ in range(10000):
+            parent = make_task()
+            child = make_task(dependencies=[parent.task_id])
+            await queue.enqueue(parent)
+            await queue.enqueue(child)
+            await queue.mark_completed(parent.task_id)
+            await queue.mark_completed(child.task_id)
+
+    asyncio.run(run())
+
+    assert len(queue._tasks) == 100
+    assert len(queue._finished) == 100
+    assert len(queue._evicted_satisfied) == 0
+    assert queue._pending_refs == {}
+
+
+def test_worker_pool_processes_tasks_concurrently():
+    """Test that the pool runs `concurrency` handlers at once and drains the queue"""
+    queue = TaskQueue()
+    active = {"now": 0, "max": 0}
+
+    async def handler(task):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        if task.description == "flaky" and task.retry_count == 0:
+            raise RuntimeError("first attempt fails")
+        return task.description
+
+    async def run():
+        pool = TaskWorkerPool(queue, handler, concurrency=4)
+        pool.start()
+        for i in range(20):
+            await queue.enqueue(make_task(description="flaky" if i == 0 else str(i), retry_delay=0.01))
+        assert await queue.join(timeout=2)
+        await pool.stop()
+        return pool
+
+    pool = asyncio.run(run())
+
+    assert active["max"] == 4
+    assert pool.stats == {"processed": 20, "failed": 1}
+    assert queue.get_statistics()["total_completed"] == 20
+    assert not pool.running
+
+
+def test_smart_execution_follows_dependencies_and_retries():
+    """Test the orchestrator's event-driven smart mode end to end"""
+    from app.core.enhanced_orchestrator import EnhancedOrchestrator, ExecutionContext, ExecutionPlan
+
+    calls = []
+
+    class FakeAIManager:
+        async def generate_response(self, provider, model, messages, stream=False, api_keys=None):
+            calls.append(messages[0]["content"].rsplit("Your Task: ", 1)[1].split("\n")[0])
+            if calls.count("flaky") == 1 and calls[-1] == "flaky":
+                raise RuntimeError("provider hiccup")
+            return {"content": "ok"}
+
+    orchestrator = EnhancedOrchestrator(FakeAIManager())
+    orchestrator.task_queue = TaskQueue()
+    first = Task(agent_type="architect", description="flaky", retry_delay=0.01)
+    second = Task(agent_type="engineer", description="build", dependencies=[first.task_id])
+    third = Task(agent_type="tester", description="test", dependencies=[second.task_id])
+    plan = ExecutionPlan(tasks=[first, second, third])
+
+    result = asyncio.run(asyncio.wait_for(orchestrator.execute(plan, ExecutionContext(), api_keys={}), 5))
+
+    assert calls == ["flaky", "flaky", "build", "test"]
+    assert result.status == "success"
+    assert result.completed_tasks == 3
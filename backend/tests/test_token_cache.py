@@ -0,0 +1,191 @@
+"""
+Tests for the verified-JWT cache
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import jwt
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.datastructures import State
+
+from app.api.auth import create_access_token, router as auth_router
+from app.core.auth import AuthenticationError, verify_token
+from app.core.config import settings
+from app.core.request_pipeline import RequestPipelineMiddleware
+from app.core.token_cache import RevokedTokenError, VerifiedTokenCache, request_claims, token_cache
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class CountingDecoder:
+    def __init__(self, claims):
+        self.claims = claims
+        self.calls = 0
+
+    def __call__(self, token):
+        self.calls += 1
+        return dict(self.claims)
+
+
+def test_verified_claims_are_reused_until_ttl():
+    """Test that a token is verified once per TTL"""
+    clock = Clock()
+    decode = CountingDecoder({"sub": "u1", "exp": clock.now + 3600})
+    cache = VerifiedTokenCache(ttl_seconds=60, decode=decode, clock=clock)
+
+    for _ in range(5):
+        assert cache.verify("token-a")["sub"] == "u1"
+    clock.now += 61
+    cache.verify("token-a")
+
+    assert decode.calls == 2
+    assert cache.get_stats()['hits'] == 4
+
+
+def test_entries_never_outlive_token_exp():
+    """Test that an entry expires with the token even if the TTL is longer"""
+    clock = Clock()
+    decode = CountingDecoder({"sub": "u1", "exp": clock.now + 10})
+    cache = VerifiedTokenCache(ttl_seconds=300, decode=decode, clock=clock)
+
+    cache.verify("token-a")
+    clock.now += 11
+    cache.verify("token-a")
+
+    assert decode.calls == 2
+
+
+def test_cache_is_bounded():
+    """Test that the least recently used tokens are evicted"""
+    cache = VerifiedTokenCache(max_entries=2, decode=CountingDecoder({"sub": "u1"}))
+    for token in ("a", "b", "c"):
+        cache.verify(token)
+
+    stats = cache.get_stats()
+    assert stats['entries'] == 2
+    assert stats['evictions'] == 1
+
+
+def test_revoked_token_is_rejected_and_listeners_notified():
+    """Test logout-style revocation of a single token"""
+    events = []
+    token = create_access_token({"sub": "u1"})
+    cache = VerifiedTokenCache()
+    cache.add_revocation_listener(lambda kind, value: events.append(kind))
+
+    claims = cache.verify(token)
+    cache.revoke(token, claims)
+
+    with pytest.raises(RevokedTokenError):
+        cache.verify(token)
+    assert events == ["token"]
+
+
+def test_revocations_are_bounded_and_expire():
+    """Test that far-future exp claims and floods of revocations cannot grow the list without limit"""
+    clock = Clock()
+    cache = VerifiedTokenCache(max_revoked=3, clock=clock)
+    for index in range(5):
+        cache.revoke(f"token-{index}", {"sub": "u1", "exp": 32503680000})  # year 3000
+
+    assert cache.get_stats()['revoked_tokens'] == 3
+    clock.now += settings.JWT_EXPIRE_MINUTES * 60 + 1
+    cache.revoke("token-late", {"sub": "u1", "exp": clock.now + 60})
+    assert cache.get_stats()['revoked_tokens'] == 1
+
+
+def test_logout_only_revokes_verified_tokens():
+    """Test that logout rejects forged tokens instead of storing them"""
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api/v1/auth")
+    client = TestClient(app)
+    forged = jwt.encode({"sub": "u1", "exp": 32503680000}, "wrong-key", algorithm="HS256")
+    revoked_before = token_cache.get_stats()['revoked_tokens']
+
+    response = client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {forged}"})
+
+    assert response.status_code == 401
+    assert token_cache.get_stats()['revoked_tokens'] == revoked_before
+
+    token = create_access_token({"sub": "u-logout"})
+    assert client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    with pytest.raises(RevokedTokenError):
+        token_cache.verify(token)
+
+
+def test_revoke_user_rejects_only_older_tokens():
+    """Test that tokens issued before a user revocation are rejected"""
+    clock = Clock()
+    old = CountingDecoder({"sub": "u1", "iat": clock.now - 100})
+    cache = VerifiedTokenCache(decode=old, clock=clock)
+    cache.verify("old-token")
+
+    cache.revoke_user("u1")
+
+    with pytest.raises(RevokedTokenError):
+        cache.verify("old-token")
+    cache._decode = CountingDecoder({"sub": "u1", "iat": clock.now + 5})
+    assert cache.verify("new-token")["sub"] == "u1"
+
+
+def test_dependency_reuses_claims_from_request_state():
+    """Test that verify_token does not verify again within the same request"""
+    decode = CountingDecoder({"sub": "u1"})
+    cache = VerifiedTokenCache(ttl_seconds=0, decode=decode)
+    state = State()
+
+    request_claims(state, "token-a", cache)
+    request_claims(state, "token-a", cache)
+
+    assert decode.calls == 1
+
+
+def test_pipeline_and_dependency_share_one_verification():
+    """Test that a protected request verifies its token once, and repeat requests not at all"""
+    class AllowAll:
+        async def check_rate_limit(self, request, user_id=None, user_role="user", is_ai_call=False):
+            return True
+
+    app = FastAPI()
+
+    @app.get("/api/v1/whoami")
+    async def whoami(request: Request):
+        token = request.headers["authorization"][7:]
+        payload = await verify_token(token, request)
+        return {"sub": payload["sub"]}
+
+    app.add_middleware(RequestPipelineMiddleware, rate_limiter=AllowAll())
+    client = TestClient(app)
+    token = create_access_token({"sub": "user-shared"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    misses = token_cache.stats['misses']
+    assert client.get("/api/v1/whoami", headers=headers).json() == {"sub": "user-shared"}
+    assert token_cache.stats['misses'] == misses + 1
+    client.get("/api/v1/whoami", headers=headers)
+    assert token_cache.stats['misses'] == misses + 1
+
+
+def test_verify_token_maps_errors_to_401():
+    """Test that expired and revoked tokens raise AuthenticationError"""
+    expired = jwt.encode(
+        {"sub": "u1", "exp": datetime.now(timezone.utc) - timedelta(minutes=1)},
+        settings.SECRET_KEY,
+        algorithm="HS256"
+    )
+    with pytest.raises(AuthenticationError, match="expired"):
+        asyncio.run(verify_token(expired))
+
+    revoked = create_access_token({"sub": "u2"})
+    token_cache.revoke(revoked, token_cache.verify(revoked))
+    with pytest.raises(AuthenticationError, match="revoked"):
+        asyncio.run(verify_token(revoked, SimpleNamespace(state=State())))
@@ -0,0 +1,100 @@
+"""
+Tests for memoized token counting (ContextManager / TokenUsageTracker)
+"""
+from app.core.context_manager import ContextManager
+from app.core.token_counter import TokenCountCache, token_count_cache
+from app.core.tokenizers import TokenizerRegistry
+
+
+class WordEncoder:
+    """tiktoken-style encoder: one token per word, records what it encodes"""
+
+    name = "test-words"
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode_ordinary(self, text):
+        self.encoded.append(text)
+        return text.split()
+
+    def encode_ordinary_batch(self, texts):
+        return [self.encode_ordinary(text) for text in texts]
+
+
+def _manager(encoder):
+    manager = ContextManager()
+    manager.tokenizers = TokenizerRegistry(load_encoding=lambda name: encoder)
+    return manager
+
+
+def _history(n):
+    messages = [{"role": "system", "content": "you are helpful"}]
+    for i in range(n):
+        messages.append({"role": "user", "content": f"question number {i} " + "word " * 50})
+        messages.append({"role": "assistant", "content": f"answer number {i} " + "word " * 50})
+    return messages
+
+
+def test_repeated_counts_hit_the_cache():
+    """Test that identical content is encoded once"""
+    cache = TokenCountCache()
+    encoder = WordEncoder()
+
+    assert cache.count_many(["a b c", "d e", "a b c"], encoder) == [3, 2, 3]
+    assert cache.count("a b c", encoder) == 3
+    assert encoder.encoded == ["a b c", "d e"]
+    assert cache.get_stats()['hits'] == 2
+
+
+def test_encodings_do_not_share_counts():
+    """Test that the encoding name is part of the key"""
+    cache = TokenCountCache()
+
+    assert cache.count("one two three four five six seven eight", WordEncoder()) == 8
+    assert cache.count("one two three four five six seven eight", None) == 9  # 39 chars / 4
+
+
+def test_lru_bound():
+    """Test that the cache stays within max_entries"""
+    cache = TokenCountCache(max_entries=2)
+    encoder = WordEncoder()
+    cache.count_many(["a", "b", "c"], encoder)
+
+    assert cache.get_stats()['entries'] == 2
+
+
+def test_trim_only_encodes_new_messages():
+    """Test that re-trimming a grown conversation encodes just the new messages"""
+    token_count_cache.clear()
+    encoder = WordEncoder()
+    manager = _manager(encoder)
+    history = _history(200)
+
+    manager.get_context_stats(history, "gpt-4o")
+    manager.trim_context(history, "default")
+    encoder.encoded.clear()
+
+    grown = history + [{"role": "user", "content": "a brand new question"}]
+    manager.get_context_stats(grown, "gpt-4o")
+    trimmed, stats = manager.trim_context(grown, "default")
+    manager.get_context_stats(trimmed, "gpt-4o")
+
+    assert encoder.encoded == ["a brand new question"]
+    assert stats['trimmed'] is True
+    assert trimmed[0]["role"] == "system"
+    assert trimmed[-1]["content"] == "a brand new question"
+    assert stats['final_tokens'] == manager.count_messages_tokens(trimmed)
+    assert stats['final_tokens'] <= 8000 - 4000
+
+
+def test_trim_keeps_recent_messages_in_order():
+    """Test that trimming keeps the most recent messages chronologically"""
+    manager = _manager(WordEncoder())
+    history = _history(100)
+
+    trimmed, stats = manager.trim_context(history, "default")
+    kept = trimmed[1:]
+
+    assert kept == history[len(history) - len(kept):]
+    assert stats['removed_messages'] == len(history) - len(trimmed)
@@ -0,0 +1,75 @@
+"""
+Tests for the model-aware tokenizer registry
+"""
+import pytest
+
+from app.core.context_manager import ContextManager
+from app.core.tokenizers import FAMILIES, TokenizerRegistry
+
+
+class CharEncoder:
+    """tiktoken-style encoder: one token per character"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def encode_ordinary(self, text):
+        return list(text)
+
+
+@pytest.mark.parametrize("model,family", [
+    ("gpt-4", "cl100k"),
+    ("gpt-4o", "o200k"),
+    ("gpt-4.1", "o200k"),
+    ("gpt-5", "o200k"),
+    ("o1", "o200k"),
+    ("o3", "o200k"),
+    ("claude-sonnet-4-5-20250929", "claude"),
+    ("claude-3-opus", "claude"),
+    ("sonar-pro", "llama"),
+    ("sonar-deep-research", "llama"),
+    ("default", "cl100k"),
+])
+def test_models_map_to_families(model, family):
+    """Test that models resolve to their tokenizer family"""
+    assert TokenizerRegistry.family_for_model(model) == family
+
+
+def test_every_context_model_has_a_family():
+    """Test that every model with a context limit resolves to a known family"""
+    for model in ContextManager.MODEL_LIMITS:
+        assert TokenizerRegistry.family_for_model(model) in FAMILIES
+
+
+def test_encoders_load_lazily_once_per_encoding():
+    """Test that nothing loads until an exact count, and each encoding loads once"""
+    loaded = []
+    registry = TokenizerRegistry(load_encoding=lambda name: loaded.append(name) or CharEncoder(name))
+
+    assert registry.count("hello world", "gpt-4o") == 2  # approximate: 11 chars / 4
+    assert loaded == []
+
+    assert registry.count("hello world", "gpt-4o", exact=True) == 11
+    assert registry.count("hello", "gpt-5", exact=True) == 5
+    assert registry.count("hello", "claude-3-opus", exact=True) == 5
+    assert registry.count("hello", "sonar", exact=True) == 5
+
+    assert loaded == ["o200k_base", "cl100k_base"]
+    assert registry.get_stats()['encodings']['o200k_base']['loaded'] is True
+    assert 'load_ms' in registry.get_stats()['encodings']['cl100k_base']
+
+
+def test_failed_load_falls_back_without_retrying():
+    """Test that an unavailable encoding uses the approximation and is not reloaded per call"""
+    attempts = []
+
+    def load(name):
+        attempts.append(name)
+        raise OSError("offline")
+
+    registry = TokenizerRegistry(load_encoding=load)
+
+    assert registry.count("a" * 1000, "gpt-4", exact=True) == 250
+    assert registry.count("a" * 700, "claude-3-opus", exact=True) == 200
+    assert attempts == ["cl100k_base"]
+    assert registry.get_stats()['encodings']['cl100k_base']['loaded'] is False